@@ -36,7 +36,437 @@ def get_generalized_index(ssz_class: Any, *path: PyUnion[int, SSZVariableName])
 
 def compute_merkle_proof(object: SSZObject,
                          index: GeneralizedIndex) -> list[Bytes32]:
-    return build_proof(object.get_backing(), index)'''
+    return build_proof(object.get_backing(), index)
+
+
+# Select the array-backed ``process_rewards_and_penalties``; requires NumPy
+VECTORIZED_REWARDS_AND_PENALTIES = False
+# Select the fused ``process_epoch`` that runs over a single columnar snapshot; requires NumPy
+FUSED_EPOCH_PROCESSING = False
+
+
+def _get_inactivity_penalty_denominator_altair() -> uint64:
+    return config.INACTIVITY_SCORE_BIAS * INACTIVITY_PENALTY_QUOTIENT_ALTAIR
+
+
+# The inactivity penalty denominator of ``get_inactivity_penalty_deltas`` of the current fork
+get_inactivity_penalty_denominator = _get_inactivity_penalty_denominator_altair
+
+
+def _get_proportional_slashing_multiplier_altair() -> uint64:
+    return PROPORTIONAL_SLASHING_MULTIPLIER_ALTAIR
+
+
+# The proportional slashing multiplier of ``process_slashings`` of the current fork
+get_proportional_slashing_multiplier = _get_proportional_slashing_multiplier_altair
+
+
+@dataclass
+class EpochColumns(ValidatorColumns):
+    """
+    Per-validator columns of a ``BeaconState``, gathered once at the start of a fused epoch transition.
+    The columns are ``numpy`` arrays indexed by validator index and are kept in sync with the state
+    by the fused sub-steps that modify the corresponding fields.
+    """
+    previous_epoch_participation: Any
+    current_epoch_participation: Any
+    inactivity_scores: Any
+
+    def is_unslashed_participating(self, flag_index: int, epoch: Epoch, current_epoch: Epoch) -> Any:
+        if epoch == current_epoch:
+            participation = self.current_epoch_participation
+        else:
+            participation = self.previous_epoch_participation
+        has_flag = ((participation >> flag_index) & 1).astype(bool)
+        return self.is_active(epoch) & ~self.slashed & has_flag
+
+
+def get_epoch_columns(state: BeaconState) -> EpochColumns:
+    # The fused sub-steps update their columns, so they work on a copy of the shared registry snapshot
+    validator_columns = get_validator_columns(state)
+    return EpochColumns(
+        previous_epoch_participation=numpy.frombuffer(state.previous_epoch_participation.encode_bytes(), dtype='u1'),
+        current_epoch_participation=numpy.frombuffer(state.current_epoch_participation.encode_bytes(), dtype='u1'),
+        inactivity_scores=numpy.frombuffer(state.inactivity_scores.encode_bytes(), dtype='<u8'),
+        **{name: value.copy() for name, value in validator_columns.__dict__.items()},
+    )
+
+
+def extend_epoch_columns(state: BeaconState, columns: EpochColumns) -> None:
+    """
+    Append the registry columns of the validators added to ``state`` after ``columns`` was gathered.
+    """
+    start = len(columns.effective_balance)
+    validators = [state.validators[index] for index in range(start, len(state.validators))]
+    for name in VALIDATOR_COLUMNS_UINT64_FIELDS:
+        values = numpy.array([int(getattr(validator, name)) for validator in validators], dtype='<u8')
+        setattr(columns, name, numpy.concatenate([getattr(columns, name), values]))
+    columns.slashed = numpy.concatenate([
+        columns.slashed, numpy.array([bool(validator.slashed) for validator in validators], dtype=bool)])
+    columns.withdrawal_prefix = numpy.concatenate([
+        columns.withdrawal_prefix,
+        numpy.array([validator.withdrawal_credentials[0] for validator in validators], dtype='u1'),
+    ])
+
+
+def _sum_uint64_array(values: Any) -> int:
+    # Sum the 32-bit halves separately so that the sum cannot wrap around
+    return (int((values >> 32).sum()) << 32) + int((values & 0xFFFFFFFF).sum())
+
+
+def _get_total_balance_column(effective_balances: Any) -> Gwei:
+    return Gwei(max(int(EFFECTIVE_BALANCE_INCREMENT), _sum_uint64_array(effective_balances)))
+
+
+def process_justification_and_finalization_fused(state: BeaconState, columns: EpochColumns) -> None:
+    # Initial FFG checkpoint values have a `0x00` stub for `root`.
+    # Skip FFG updates in the first two epochs to avoid corner cases that might result in modifying this stub.
+    if get_current_epoch(state) <= GENESIS_EPOCH + 1:
+        return
+    current_epoch = get_current_epoch(state)
+    previous_target = columns.is_unslashed_participating(
+        TIMELY_TARGET_FLAG_INDEX, get_previous_epoch(state), current_epoch)
+    current_target = columns.is_unslashed_participating(TIMELY_TARGET_FLAG_INDEX, current_epoch, current_epoch)
+    total_active_balance = get_total_active_balance(state)
+    previous_target_balance = _get_total_balance_column(columns.effective_balance[previous_target])
+    current_target_balance = _get_total_balance_column(columns.effective_balance[current_target])
+    weigh_justification_and_finalization(state, total_active_balance, previous_target_balance, current_target_balance)
+
+
+def process_inactivity_updates_fused(state: BeaconState, columns: EpochColumns) -> None:
+    # Skip the genesis epoch as score updates are based on the previous epoch participation
+    if get_current_epoch(state) == GENESIS_EPOCH:
+        return
+
+    previous_epoch = get_previous_epoch(state)
+    eligible = columns.is_eligible(previous_epoch)
+    matching_target = eligible & columns.is_unslashed_participating(
+        TIMELY_TARGET_FLAG_INDEX, previous_epoch, get_current_epoch(state))
+    not_matching_target = eligible & ~matching_target
+    if int(columns.inactivity_scores[not_matching_target].max(initial=0)) + config.INACTIVITY_SCORE_BIAS >= 2**64:
+        _process_inactivity_updates(state)
+        columns.inactivity_scores = numpy.frombuffer(state.inactivity_scores.encode_bytes(), dtype='<u8')
+        return
+
+    scores = columns.inactivity_scores.copy()
+    # Increase the inactivity score of inactive validators
+    scores[matching_target] -= numpy.minimum(1, scores[matching_target])
+    scores[not_matching_target] += int(config.INACTIVITY_SCORE_BIAS)
+    # Decrease the inactivity score of all eligible validators during a leak-free epoch
+    if not is_in_inactivity_leak(state):
+        scores[eligible] -= numpy.minimum(int(config.INACTIVITY_SCORE_RECOVERY_RATE), scores[eligible])
+
+    if not numpy.array_equal(scores, columns.inactivity_scores):
+        state.inactivity_scores = packed_list_from_bytes(state.inactivity_scores.__class__, scores.tobytes())
+    columns.inactivity_scores = scores
+
+
+def process_rewards_and_penalties_fused(state: BeaconState, columns: EpochColumns) -> None:
+    # No rewards are applied at the end of `GENESIS_EPOCH` because rewards are for work done in the previous epoch
+    if get_current_epoch(state) == GENESIS_EPOCH:
+        return
+
+    previous_epoch = get_previous_epoch(state)
+    effective_balances = columns.effective_balance
+    inactivity_scores = columns.inactivity_scores
+    balances = numpy.frombuffer(state.balances.encode_bytes(), dtype='<u8')
+    eligible = columns.is_eligible(previous_epoch)
+
+    # Spec scalars are converted to `int` so that NumPy keeps the arithmetic in uint64
+    increment = int(EFFECTIVE_BALANCE_INCREMENT)
+    base_reward_per_increment = int(get_base_reward_per_increment(state))
+    max_base_reward = int(effective_balances.max(initial=0)) // increment * base_reward_per_increment
+    active_increments = int(get_total_active_balance(state)) // increment
+    base_rewards = effective_balances // increment * base_reward_per_increment
+    is_leaking = is_in_inactivity_leak(state)
+
+    deltas = []
+    for flag_index, flag_weight in enumerate(PARTICIPATION_FLAG_WEIGHTS):
+        weight = int(flag_weight)
+        participating = columns.is_unslashed_participating(flag_index, previous_epoch, get_current_epoch(state))
+        participating_balance = max(increment, _sum_uint64_array(effective_balances[participating]))
+        if participating_balance >= 2**64:
+            return _process_rewards_and_penalties(state)
+        participating_increments = participating_balance // increment
+        # Previous epoch participation can exceed the current active balance once validators have exited
+        if max_base_reward * weight * max(active_increments, participating_increments) >= 2**64:
+            return _process_rewards_and_penalties(state)
+        rewards = numpy.zeros_like(balances)
+        penalties = numpy.zeros_like(balances)
+        if not is_leaking:
+            rewards[participating] = (
+                base_rewards[participating] * weight * participating_increments
+                // (active_increments * int(WEIGHT_DENOMINATOR))
+            )
+        if flag_index != TIMELY_HEAD_FLAG_INDEX:
+            not_participating = eligible & ~participating
+            penalties[not_participating] = base_rewards[not_participating] * weight // int(WEIGHT_DENOMINATOR)
+        deltas.append((rewards, penalties))
+
+    matching_target = columns.is_unslashed_participating(
+        TIMELY_TARGET_FLAG_INDEX, previous_epoch, get_current_epoch(state))
+    not_matching_target = eligible & ~matching_target
+    max_penalty_numerator = (
+        int(effective_balances[not_matching_target].max(initial=0))
+        * int(inactivity_scores[not_matching_target].max(initial=0))
+    )
+    if max_penalty_numerator >= 2**64:
+        return _process_rewards_and_penalties(state)
+    inactivity_penalties = numpy.zeros_like(balances)
+    inactivity_penalties[not_matching_target] = (
+        effective_balances[not_matching_target] * inactivity_scores[not_matching_target]
+        // int(get_inactivity_penalty_denominator())
+    )
+    deltas.append((numpy.zeros_like(balances), inactivity_penalties))
+
+    # Apply the deltas in the same order as the reference, saturating each decrease at zero
+    for rewards, penalties in deltas:
+        increased_balances = balances + rewards
+        if numpy.any(increased_balances < balances):
+            return _process_rewards_and_penalties(state)
+        balances = numpy.where(penalties > increased_balances, 0, increased_balances - penalties).astype('<u8')
+
+    state.balances = packed_list_from_bytes(state.balances.__class__, balances.tobytes())
+
+
+def process_rewards_and_penalties_vectorized(state: BeaconState) -> None:
+    """
+    Array-backed ``process_rewards_and_penalties``.
+    Registry columns, previous epoch participation, inactivity scores and balances are read into uint64 arrays once,
+    the flag and inactivity deltas are computed over the whole registry,
+    and the balances are written back in bulk.
+    Falls back to the reference implementation whenever an intermediate value could overflow ``uint64``.
+    """
+    if get_current_epoch(state) == GENESIS_EPOCH:
+        return
+    process_rewards_and_penalties_fused(state, get_epoch_columns(state))
+
+
+def _registry_updates_drop_ejections(ejected: Any, view_updated: Any) -> bool:
+    # The reference updates validators through the views yielded by iterating ``state.validators``; each such write
+    # restores the registry captured when the iteration started, dropping the exits initiated on lower indices.
+    # Report whether that happens so that the fused step can defer to the reference and match it exactly.
+    ejected_indices = numpy.flatnonzero(ejected)
+    view_updated_indices = numpy.flatnonzero(view_updated)
+    return len(ejected_indices) > 0 and len(view_updated_indices) > 0 and view_updated_indices[-1] > ejected_indices[0]
+
+
+# The churn limit applied to the activation queue by ``process_registry_updates`` of the current fork
+get_fused_activation_churn_limit = get_validator_churn_limit
+
+
+def _process_registry_updates_fused_altair(state: BeaconState, columns: EpochColumns) -> None:
+    current_epoch = get_current_epoch(state)
+    # Process activation eligibility and ejections
+    queue_eligible = (
+        (columns.activation_eligibility_epoch == int(FAR_FUTURE_EPOCH))
+        & (columns.effective_balance == int(MAX_EFFECTIVE_BALANCE))
+    )
+    ejected = columns.is_active(current_epoch) & (columns.effective_balance <= int(config.EJECTION_BALANCE))
+    if _registry_updates_drop_ejections(ejected, queue_eligible):
+        return _process_registry_updates(state)
+    for index in numpy.flatnonzero(queue_eligible | ejected).tolist():
+        if queue_eligible[index]:
+            state.validators[index].activation_eligibility_epoch = current_epoch + 1
+            columns.activation_eligibility_epoch[index] = int(current_epoch) + 1
+        if ejected[index]:
+            initiate_validator_exit(state, ValidatorIndex(index))
+            columns.exit_epoch[index] = int(state.validators[index].exit_epoch)
+            columns.withdrawable_epoch[index] = int(state.validators[index].withdrawable_epoch)
+
+    # Queue validators eligible for activation and not yet dequeued for activation
+    activation_queue = numpy.flatnonzero(
+        (columns.activation_eligibility_epoch <= int(state.finalized_checkpoint.epoch))
+        & (columns.activation_epoch == int(FAR_FUTURE_EPOCH))
+    )
+    # Order by the sequence of activation_eligibility_epoch setting and then index
+    activation_queue = activation_queue[
+        numpy.argsort(columns.activation_eligibility_epoch[activation_queue], kind='stable')]
+    # Dequeued validators for activation up to activation churn limit
+    for index in activation_queue[:int(get_fused_activation_churn_limit(state))].tolist():
+        state.validators[index].activation_epoch = compute_activation_exit_epoch(current_epoch)
+        columns.activation_epoch[index] = int(state.validators[index].activation_epoch)
+
+
+def _get_slashing_penalty_altair(effective_balance: Gwei,
+                                 adjusted_total_slashing_balance: Gwei,
+                                 total_balance: Gwei) -> Gwei:
+    increment = EFFECTIVE_BALANCE_INCREMENT  # Factored out from penalty numerator to avoid uint64 overflow
+    penalty_numerator = effective_balance // increment * adjusted_total_slashing_balance
+    return penalty_numerator // total_balance * increment
+
+
+# The penalty of a slashed validator in ``process_slashings`` of the current fork
+get_slashing_penalty = _get_slashing_penalty_altair
+
+
+def process_slashings_fused(state: BeaconState, columns: EpochColumns) -> None:
+    epoch = get_current_epoch(state)
+    total_balance = get_total_active_balance(state)
+    # Computed before anything else, as the reference rejects the state on uint64 overflow
+    total_slashing_balance = sum(state.slashings) * get_proportional_slashing_multiplier()
+    # Only the slashed validators in the middle of their withdrawability delay this epoch are penalized
+    penalized = columns.slashed & (columns.withdrawable_epoch == int(epoch + EPOCHS_PER_SLASHINGS_VECTOR // 2))
+    if not numpy.any(penalized):
+        return
+    adjusted_total_slashing_balance = min(total_slashing_balance, total_balance)
+    for index in numpy.flatnonzero(penalized).tolist():
+        penalty = get_slashing_penalty(
+            state.validators[index].effective_balance, adjusted_total_slashing_balance, total_balance)
+        decrease_balance(state, ValidatorIndex(index), penalty)
+
+
+# The registry updates of the current fork, over a columnar snapshot
+process_registry_updates_fused = _process_registry_updates_fused_altair
+
+
+def process_effective_balance_updates_fused(state: BeaconState, columns: EpochColumns) -> int:
+    if len(columns.effective_balance) < len(state.validators):
+        extend_epoch_columns(state, columns)
+    balances = numpy.frombuffer(state.balances.encode_bytes(), dtype='<u8')
+    effective_balances = compute_effective_balance_column(balances, columns)
+    if effective_balances is None:
+        _process_effective_balance_updates(state)
+        effective_balances = get_validator_columns(state).effective_balance.copy()
+        rewritten = int((effective_balances != columns.effective_balance).sum())
+    else:
+        rewritten = write_effective_balance_column(state, columns.effective_balance, effective_balances)
+    columns.effective_balance = effective_balances
+    return rewritten
+
+
+# The state and columns of the fused epoch transition in progress, if any
+_fused_epoch_state: Optional[BeaconState] = None
+_fused_epoch_columns: Optional[EpochColumns] = None
+
+
+def get_fused_epoch_columns(state: BeaconState) -> Optional[EpochColumns]:
+    if _fused_epoch_state is state:
+        return _fused_epoch_columns
+    return None
+
+
+def process_epoch_fused(state: BeaconState) -> None:
+    """
+    Run ``process_epoch`` of the current fork with the justification, inactivity, rewards, registry, slashings
+    and effective balance steps computed over a single columnar snapshot of ``state``.
+    """
+    global _fused_epoch_state, _fused_epoch_columns
+    _fused_epoch_state, _fused_epoch_columns = state, get_epoch_columns(state)
+    try:
+        _process_epoch(state)
+    finally:
+        _fused_epoch_state, _fused_epoch_columns = None, None
+
+
+def _process_epoch_selected(state: BeaconState) -> None:
+    if FUSED_EPOCH_PROCESSING and NUMPY_AVAILABLE:
+        process_epoch_fused(state)
+    else:
+        _process_epoch(state)
+
+
+def _process_justification_and_finalization_selected(state: BeaconState) -> None:
+    columns = get_fused_epoch_columns(state)
+    if columns is not None:
+        process_justification_and_finalization_fused(state, columns)
+    else:
+        _process_justification_and_finalization(state)
+
+
+def _process_inactivity_updates_selected(state: BeaconState) -> None:
+    columns = get_fused_epoch_columns(state)
+    if columns is not None:
+        process_inactivity_updates_fused(state, columns)
+    else:
+        _process_inactivity_updates(state)
+
+
+def _process_rewards_and_penalties_selected(state: BeaconState) -> None:
+    columns = get_fused_epoch_columns(state)
+    if columns is not None:
+        process_rewards_and_penalties_fused(state, columns)
+    elif VECTORIZED_REWARDS_AND_PENALTIES and NUMPY_AVAILABLE:
+        process_rewards_and_penalties_vectorized(state)
+    else:
+        _process_rewards_and_penalties(state)
+
+
+def _process_registry_updates_selected(state: BeaconState) -> None:
+    columns = get_fused_epoch_columns(state)
+    if columns is not None:
+        process_registry_updates_fused(state, columns)
+    else:
+        _process_registry_updates(state)
+
+
+def _process_slashings_selected(state: BeaconState) -> None:
+    columns = get_fused_epoch_columns(state)
+    if columns is not None:
+        process_slashings_fused(state, columns)
+    else:
+        _process_slashings(state)
+
+
+def _process_effective_balance_updates_fused_selected(state: BeaconState) -> None:
+    columns = get_fused_epoch_columns(state)
+    if columns is not None:
+        process_effective_balance_updates_fused(state, columns)
+    else:
+        _process_effective_balance_updates_selected(state)
+
+
+_process_epoch = process_epoch
+process_epoch = _process_epoch_selected
+_process_justification_and_finalization = process_justification_and_finalization
+process_justification_and_finalization = _process_justification_and_finalization_selected
+_process_inactivity_updates = process_inactivity_updates
+process_inactivity_updates = _process_inactivity_updates_selected
+_process_rewards_and_penalties = process_rewards_and_penalties
+process_rewards_and_penalties = _process_rewards_and_penalties_selected
+_process_registry_updates = process_registry_updates
+process_registry_updates = _process_registry_updates_selected
+_process_slashings = process_slashings
+process_slashings = _process_slashings_selected
+process_effective_balance_updates = _process_effective_balance_updates_fused_selected
+
+
+def _get_next_sync_committee_indices_from_sample(state: BeaconState) -> Sequence[ValidatorIndex]:
+    epoch = Epoch(get_current_epoch(state) + 1)
+    return compute_balance_weighted_sample(
+        state,
+        get_active_validator_indices(state, epoch),
+        get_seed(state, epoch, DOMAIN_SYNC_COMMITTEE),
+        SYNC_COMMITTEE_SIZE,
+    )
+
+
+_get_next_sync_committee_indices = get_next_sync_committee_indices
+get_next_sync_committee_indices = _get_next_sync_committee_indices_from_sample
+
+
+def _get_justification_target_balances_altair(state: BeaconState) -> Tuple[Gwei, Gwei]:
+    if not NUMPY_AVAILABLE:
+        target_indices = [
+            get_unslashed_participating_indices(state, TIMELY_TARGET_FLAG_INDEX, epoch)
+            for epoch in (get_previous_epoch(state), get_current_epoch(state))
+        ]
+        return get_total_balance(state, target_indices[0]), get_total_balance(state, target_indices[1])
+    # Sum the target balances over the cached registry columns
+    columns = get_validator_columns(state)
+    target_balances: list[Gwei] = []
+    for epoch, participation in (
+        (get_previous_epoch(state), state.previous_epoch_participation),
+        (get_current_epoch(state), state.current_epoch_participation),
+    ):
+        flags = numpy.frombuffer(participation.encode_bytes(), dtype='u1')
+        has_target = ((flags >> TIMELY_TARGET_FLAG_INDEX) & 1).astype(bool)
+        participating = columns.is_active(epoch) & ~columns.slashed & has_target
+        target_balances.append(_get_total_balance_column(columns.effective_balance[participating]))
+    return target_balances[0], target_balances[1]
+
+
+get_justification_target_balances = _get_justification_target_balances_altair'''
 
 
     @classmethod
@@ -32,7 +32,35 @@ def get_pow_chain_head() -> PowBlock:
 
 def validator_is_connected(validator_index: ValidatorIndex) -> bool:
     # pylint: disable=unused-argument
-    return True"""
+    return True
+
+
+def _get_inactivity_penalty_denominator_bellatrix() -> uint64:
+    return config.INACTIVITY_SCORE_BIAS * INACTIVITY_PENALTY_QUOTIENT_BELLATRIX
+
+
+get_inactivity_penalty_denominator = _get_inactivity_penalty_denominator_bellatrix
+
+
+def _get_proportional_slashing_multiplier_bellatrix() -> uint64:
+    return PROPORTIONAL_SLASHING_MULTIPLIER_BELLATRIX
+
+
+get_proportional_slashing_multiplier = _get_proportional_slashing_multiplier_bellatrix
+
+
+def _replay_block_bellatrix(state: BeaconState, block: BeaconBlock) -> None:
+    # The payload was verified when the block was imported, so it is not sent to the execution engine again
+    global EXECUTION_ENGINE
+    execution_engine = EXECUTION_ENGINE
+    EXECUTION_ENGINE = NoopExecutionEngine()
+    try:
+        _replay_block_phase0(state, block)
+    finally:
+        EXECUTION_ENGINE = execution_engine
+
+
+replay_block = _replay_block_bellatrix"""
 
     @classmethod
     def execution_engine_cls(cls) -> str:
@@ -41,6 +41,82 @@ TPoint = TypeVar('TPoint')  # For generic function. G1 or G2 point.
 def retrieve_blobs_and_proofs(beacon_block_root: Root) -> Tuple[Sequence[Blob], Sequence[KZGProof]]:
     # pylint: disable=unused-argument
     return [], []
+
+
+get_fused_activation_churn_limit = get_validator_activation_churn_limit
+
+
+class DomainCosets:
+    """
+    Cosets of the subgroup of order ``coset_size``, in the bit-reversed order of the domain.
+
+    Holds each coset, its shift ``h``, the inverse of the shift and ``h^coset_size``.
+    """
+
+    def __init__(self, roots_of_unity_brp: Sequence[BLSFieldElement], coset_size: int) -> None:
+        self.cosets = tuple(
+            tuple(roots_of_unity_brp[start:start + coset_size])
+            for start in range(0, len(roots_of_unity_brp), coset_size)
+        )
+        self.shifts = tuple(coset[0] for coset in self.cosets)
+        self.shift_inverses = tuple(shift.inverse() for shift in self.shifts)
+        self.shift_powers = tuple(shift.pow(BLSFieldElement(coset_size)) for shift in self.shifts)
+
+
+class KzgDomain:
+    """
+    Precomputed tables of the domain of the ``size``-th roots of unity, with ``size`` a power of two.
+
+    Holds the roots of unity, the bit-reversal permutation of the indices, the bit-reversed roots and
+    the powers of ``PRIMITIVE_ROOT_OF_UNITY`` and of its inverse that shift the domain to its coset.
+    The tables are shared by every caller, and must not be mutated.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.roots_of_unity = tuple(_compute_roots_of_unity(uint64(size)))
+        self.bit_reversed_indices = tuple(reverse_bits(i, size) for i in range(size))
+        self.roots_of_unity_brp = tuple(self.roots_of_unity[i] for i in self.bit_reversed_indices)
+        self.coset_shift_powers = tuple(pow(PRIMITIVE_ROOT_OF_UNITY, i, BLS_MODULUS) for i in range(size))
+        inverse_shift = pow(PRIMITIVE_ROOT_OF_UNITY, BLS_MODULUS - 2, BLS_MODULUS)
+        self.coset_shift_inverse_powers = tuple(pow(inverse_shift, i, BLS_MODULUS) for i in range(size))
+        self.cosets: dict[int, DomainCosets] = {}
+
+    def get_cosets(self, coset_size: int) -> DomainCosets:
+        if coset_size not in self.cosets:
+            self.cosets[coset_size] = DomainCosets(self.roots_of_unity_brp, coset_size)
+        return self.cosets[coset_size]
+
+
+# Built lazily, once per domain size
+KZG_DOMAINS: dict[int, KzgDomain] = {}
+
+
+def get_kzg_domain(size: int) -> KzgDomain:
+    if size not in KZG_DOMAINS:
+        KZG_DOMAINS[size] = KzgDomain(size)
+    return KZG_DOMAINS[size]
+
+
+def _compute_roots_of_unity_from_domain(order: uint64) -> Sequence[BLSFieldElement]:
+    if not is_power_of_two(int(order)):
+        return _compute_roots_of_unity(order)
+    return get_kzg_domain(int(order)).roots_of_unity
+
+
+def _bit_reversal_permutation_from_domain(sequence: Sequence[T]) -> Sequence[T]:
+    if not is_power_of_two(len(sequence)):
+        return _bit_reversal_permutation(sequence)
+    domain = get_kzg_domain(len(sequence))
+    if sequence is domain.roots_of_unity:
+        return list(domain.roots_of_unity_brp)
+    return [sequence[i] for i in domain.bit_reversed_indices]
+
+
+_compute_roots_of_unity = compute_roots_of_unity
+compute_roots_of_unity = _compute_roots_of_unity_from_domain
+_bit_reversal_permutation = bit_reversal_permutation
+bit_reversal_permutation = _bit_reversal_permutation_from_domain
 '''
 
     @classmethod
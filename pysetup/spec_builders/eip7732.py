@@ -1,3 +1,4 @@
+import re
 from typing import Dict, Set
 
 from .base import BaseSpecBuilder
@@ -13,6 +14,16 @@ class EIP7732SpecBuilder(BaseSpecBuilder):
 from eth2spec.electra import {preset_name} as electra
 '''
 
+    @classmethod
+    def implement_optimizations(cls, functions: Dict[str, str]) -> Dict[str, str]:
+        # Look the children of the best child up in the children index instead of scanning the blocks
+        functions['get_head'] = re.sub(
+            r' for \(root, block\) in blocks\.items\(\)(\s*)if block\.parent_root == ([\w.]+)',
+            r'\1for (root, block) in get_child_blocks(store, blocks, \2)\1if block.parent_root == \2',
+            functions['get_head'],
+        )
+        return functions
+
     @classmethod
     def sundry_functions(cls) -> str:
         return '''
@@ -20,7 +31,42 @@ def concat_generalized_indices(*indices: GeneralizedIndex) -> GeneralizedIndex:
     o = GeneralizedIndex(1)
     for i in indices:
         o = GeneralizedIndex(o * bit_floor(i) + (i - bit_floor(i)))
-    return o'''
+    return o
+
+
+def get_child_blocks(store: Store,
+                     blocks: Dict[Root, BeaconBlock],
+                     root: Root) -> Sequence[Tuple[Root, BeaconBlock]]:
+    return [(child, blocks[child]) for child in get_block_children(store).get(root) if child in blocks]
+
+
+# The head is a (root, slot, payload status) node weighted by payload-aware votes, not covered by the proto-array,
+# so latest message changes are not recorded for it either
+get_head = _get_head
+update_latest_messages = _update_latest_messages
+on_attester_slashing = _on_attester_slashing
+
+# Payload states and PTC votes are also kept per block root
+STORE_BLOCK_ROOT_FIELDS = STORE_BLOCK_ROOT_FIELDS + ('execution_payload_states', 'ptc_vote')
+
+# Block states are built on the parent payload state, so they cannot be replayed from the parent block state
+LAZY_BLOCK_STATES = False
+
+
+def _get_attesting_indices_from_committees_eip7732(
+        state: BeaconState,
+        attestation: Attestation,
+        committees: Dict[Tuple[Slot, CommitteeIndex], Sequence[ValidatorIndex]]) -> Set[ValidatorIndex]:
+    output = _get_attesting_indices_from_committees(state, attestation, committees)
+    if compute_epoch_at_slot(attestation.data.slot) < config.EIP7732_FORK_EPOCH:
+        return output
+    # PTC votes are ignored
+    ptc = get_ptc(state, attestation.data.slot)
+    return set(i for i in output if i not in ptc)
+
+
+_get_attesting_indices_from_committees = get_attesting_indices_from_committees
+get_attesting_indices_from_committees = _get_attesting_indices_from_committees_eip7732'''
 
 
     @classmethod
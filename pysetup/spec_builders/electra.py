@@ -21,6 +21,75 @@ from eth2spec.utils.ssz.ssz_impl import ssz_serialize, ssz_deserialize
             'NEXT_SYNC_COMMITTEE_GINDEX_ELECTRA': 'GeneralizedIndex(87)',
         }
 
+    @classmethod
+    def sundry_functions(cls) -> str:
+        return '''
+def _process_registry_updates_fused_electra(state: BeaconState, columns: EpochColumns) -> None:
+    current_epoch = get_current_epoch(state)
+    activation_epoch = compute_activation_exit_epoch(current_epoch)
+
+    # Process activation eligibility, ejections, and activations
+    queue_eligible = (
+        (columns.activation_eligibility_epoch == int(FAR_FUTURE_EPOCH))
+        & (columns.effective_balance >= int(MIN_ACTIVATION_BALANCE))
+    )
+    ejected = (
+        ~queue_eligible
+        & columns.is_active(current_epoch)
+        & (columns.effective_balance <= int(config.EJECTION_BALANCE))
+    )
+    activated = (
+        ~queue_eligible
+        & ~ejected
+        & (columns.activation_eligibility_epoch <= int(state.finalized_checkpoint.epoch))
+        & (columns.activation_epoch == int(FAR_FUTURE_EPOCH))
+    )
+    if _registry_updates_drop_ejections(ejected, queue_eligible | activated):
+        return _process_registry_updates(state)
+    for index in numpy.flatnonzero(queue_eligible | ejected | activated).tolist():
+        validator = state.validators[index]
+        if queue_eligible[index]:
+            validator.activation_eligibility_epoch = current_epoch + 1
+            columns.activation_eligibility_epoch[index] = int(current_epoch) + 1
+        elif ejected[index]:
+            initiate_validator_exit(state, ValidatorIndex(index))
+            validator = state.validators[index]
+            columns.exit_epoch[index] = int(validator.exit_epoch)
+            columns.withdrawable_epoch[index] = int(validator.withdrawable_epoch)
+        else:
+            validator.activation_epoch = activation_epoch
+            columns.activation_epoch[index] = int(activation_epoch)
+
+
+def _get_max_effective_balance_column_electra(columns: ValidatorColumns) -> Any:
+    is_compounding = columns.withdrawal_prefix == COMPOUNDING_WITHDRAWAL_PREFIX[0]
+    return numpy.where(is_compounding, int(MAX_EFFECTIVE_BALANCE_ELECTRA), int(MIN_ACTIVATION_BALANCE)).astype('<u8')
+
+
+def _get_slashing_penalty_electra(effective_balance: Gwei,
+                                  adjusted_total_slashing_balance: Gwei,
+                                  total_balance: Gwei) -> Gwei:
+    increment = EFFECTIVE_BALANCE_INCREMENT  # Factored out from total balance to avoid uint64 overflow
+    penalty_per_effective_balance_increment = adjusted_total_slashing_balance // (total_balance // increment)
+    return penalty_per_effective_balance_increment * (effective_balance // increment)
+
+
+process_registry_updates_fused = _process_registry_updates_fused_electra
+get_max_effective_balance_column = _get_max_effective_balance_column_electra
+get_slashing_penalty = _get_slashing_penalty_electra
+
+
+SAMPLING_RANDOM_VALUE_BYTES = 2
+SAMPLING_MAX_EFFECTIVE_BALANCE = MAX_EFFECTIVE_BALANCE_ELECTRA
+
+
+def _get_attestation_committee_indices_electra(attestation: Attestation) -> Sequence[CommitteeIndex]:
+    return get_committee_indices(attestation.committee_bits)
+
+
+_get_attestation_committee_indices = get_attestation_committee_indices
+get_attestation_committee_indices = _get_attestation_committee_indices_electra'''
+
 
     @classmethod
     def execution_engine_cls(cls) -> str:
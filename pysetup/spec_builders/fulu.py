@@ -10,6 +10,8 @@ class FuluSpecBuilder(BaseSpecBuilder):
     @classmethod
     def imports(cls, preset_name: str):
         return f'''
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 from eth2spec.electra import {preset_name} as electra
 '''
 
@@ -44,11 +46,512 @@ class CosetEvals(list):
 
     @classmethod
     def sundry_functions(cls) -> str:
-        return """
+        return '''
 def retrieve_column_sidecars(beacon_block_root: Root) -> Sequence[DataColumnSidecar]:
     # pylint: disable=unused-argument
     return []
-"""
+
+
+def _get_validators_custody_requirement_from_columns(state: BeaconState,
+                                                     validator_indices: Sequence[ValidatorIndex]) -> uint64:
+    if not NUMPY_AVAILABLE:
+        return _get_validators_custody_requirement(state, validator_indices)
+    balances = VALIDATOR_COLUMNS_CACHE.get_balances(state.balances)
+    total_node_balance = _sum_uint64_array(balances[numpy.array(validator_indices, dtype=numpy.int64)])
+    count = total_node_balance // config.BALANCE_PER_ADDITIONAL_CUSTODY_GROUP
+    return uint64(min(max(count, config.VALIDATOR_CUSTODY_REQUIREMENT), config.NUMBER_OF_CUSTODY_GROUPS))
+
+
+_get_validators_custody_requirement = get_validators_custody_requirement
+get_validators_custody_requirement = _get_validators_custody_requirement_from_columns
+
+
+# Run the field FFTs as an iterative NTT over integers
+ITERATIVE_NTT = True
+
+
+class NttDomain:
+    """
+    Twiddle tables of an iterative, in-place radix-2 NTT over the roots of unity ``roots_of_unity``.
+
+    The transform reads its input in bit-reversed order and runs one round of butterflies per stage,
+    with the powers of ``roots_of_unity[1]`` as twiddle factors. Values are integers modulo ``BLS_MODULUS``.
+    """
+
+    def __init__(self, roots_of_unity: Sequence[int]) -> None:
+        self.size = len(roots_of_unity)
+        self.bit_reversed_indices = [reverse_bits(i, self.size) for i in range(self.size)]
+        self.stage_twiddles: list[list[int]] = []
+        half = 1
+        while half < self.size:
+            self.stage_twiddles.append(list(roots_of_unity[::self.size // (2 * half)][:half]))
+            half *= 2
+
+    def transform(self, vals: Sequence[int]) -> list[int]:
+        assert len(vals) == self.size
+        modulus = BLS_MODULUS
+        values = [vals[i] for i in self.bit_reversed_indices]
+        half = 1
+        for twiddles in self.stage_twiddles:
+            step = 2 * half
+            if half < self.size // step:
+                # Many short blocks: take each twiddle in turn, over every block at once
+                for j, twiddle in enumerate(twiddles):
+                    lows = values[j::step]
+                    products = [x * twiddle % modulus for x in values[j + half::step]]
+                    values[j::step] = [(x + y) % modulus for x, y in zip(lows, products)]
+                    values[j + half::step] = [(x - y) % modulus for x, y in zip(lows, products)]
+            else:
+                # Few long blocks: take each block in turn, with all twiddles at once
+                for start in range(0, self.size, step):
+                    lows = values[start:start + half]
+                    highs = values[start + half:start + step]
+                    products = [x * y % modulus for x, y in zip(highs, twiddles)]
+                    values[start:start + half] = [(x + y) % modulus for x, y in zip(lows, products)]
+                    values[start + half:start + step] = [(x - y) % modulus for x, y in zip(lows, products)]
+            half = step
+        return values
+
+
+NTT_DOMAINS: Any = LRU(size=8)
+
+
+def get_ntt_domain(roots_of_unity: Sequence[BLSFieldElement]) -> NttDomain:
+    # The roots are the powers of ``roots_of_unity[1]``, which identifies the domain with its size
+    key = (len(roots_of_unity), int(roots_of_unity[1]))
+    if key not in NTT_DOMAINS:
+        NTT_DOMAINS[key] = NttDomain([int(root) for root in roots_of_unity])
+    return NTT_DOMAINS[key]
+
+
+def _field_elements_from_ints(values: Sequence[int]) -> Sequence[BLSFieldElement]:
+    # Arkworks scalars are built much faster from bytes than from large integers
+    from_le_bytes = getattr(BLSFieldElement, 'from_le_bytes', None)
+    if from_le_bytes is None:
+        return [BLSFieldElement(value) for value in values]
+    return [from_le_bytes(value.to_bytes(32, 'little')) for value in values]
+
+
+def ntt(values: Sequence[int], roots_of_unity: Sequence[BLSFieldElement], inv: bool=False) -> list[int]:
+    """
+    FFT of integers modulo ``BLS_MODULUS`` over the roots of unity, as ``fft_field`` does on field elements.
+    """
+    if not inv:
+        return get_ntt_domain(roots_of_unity).transform(values)
+    domain = get_ntt_domain(list(roots_of_unity[0:1]) + list(roots_of_unity[:0:-1]))
+    invlen = pow(len(values), BLS_MODULUS - 2, BLS_MODULUS)
+    return [x * invlen % BLS_MODULUS for x in domain.transform(values)]
+
+
+def coset_ntt(values: Sequence[int], roots_of_unity: Sequence[BLSFieldElement], inv: bool=False) -> list[int]:
+    """
+    FFT of integers modulo ``BLS_MODULUS`` over the coset of the roots of unity,
+    as ``coset_fft_field`` does on field elements.
+    """
+    domain = get_kzg_domain(len(values))
+    if inv:
+        return [
+            x * y % BLS_MODULUS
+            for x, y in zip(ntt(values, roots_of_unity, inv=True), domain.coset_shift_inverse_powers)
+        ]
+    return ntt([x * y % BLS_MODULUS for x, y in zip(values, domain.coset_shift_powers)], roots_of_unity)
+
+
+def _fft_field_iterative(vals: Sequence[BLSFieldElement],
+                         roots_of_unity: Sequence[BLSFieldElement]) -> Sequence[BLSFieldElement]:
+    if not ITERATIVE_NTT or len(vals) != len(roots_of_unity) or len(vals) == 1:
+        return _fft_field_recursive(vals, roots_of_unity)
+    return _field_elements_from_ints(ntt([int(v) for v in vals], roots_of_unity))
+
+
+_fft_field_recursive = _fft_field
+_fft_field = _fft_field_iterative
+
+
+def _coset_fft_field_iterative(vals: Sequence[BLSFieldElement],
+                               roots_of_unity: Sequence[BLSFieldElement],
+                               inv: bool=False) -> Sequence[BLSFieldElement]:
+    size = len(vals)
+    if not ITERATIVE_NTT or size != len(roots_of_unity) or size == 1 or not is_power_of_two(size):
+        return _coset_fft_field(vals, roots_of_unity, inv)
+    return _field_elements_from_ints(coset_ntt([int(v) for v in vals], roots_of_unity, inv))
+
+
+_coset_fft_field = coset_fft_field
+coset_fft_field = _coset_fft_field_iterative
+
+
+def get_cell_cosets() -> DomainCosets:
+    return get_kzg_domain(FIELD_ELEMENTS_PER_EXT_BLOB).get_cosets(FIELD_ELEMENTS_PER_CELL)
+
+
+def _coset_shift_for_cell_from_domain(cell_index: CellIndex) -> BLSFieldElement:
+    assert cell_index < CELLS_PER_EXT_BLOB
+    return get_cell_cosets().shifts[cell_index]
+
+
+def _coset_for_cell_from_domain(cell_index: CellIndex) -> Coset:
+    assert cell_index < CELLS_PER_EXT_BLOB
+    return Coset(get_cell_cosets().cosets[cell_index])
+
+
+_coset_shift_for_cell = coset_shift_for_cell
+coset_shift_for_cell = _coset_shift_for_cell_from_domain
+_coset_for_cell = coset_for_cell
+coset_for_cell = _coset_for_cell_from_domain
+
+
+# Compute all the cell proofs together, with the FK20 multi-proof algorithm
+FK20_CELL_PROOFS = True
+
+
+def fft_g1(points: Sequence[Any],
+           roots_of_unity: Sequence[BLSFieldElement],
+           inv: bool=False) -> Sequence[Any]:
+    """
+    FFT of G1 points over the roots of unity, run as an iterative radix-2 transform on the ``NttDomain`` tables.
+    """
+    if inv:
+        roots_of_unity = list(roots_of_unity[0:1]) + list(roots_of_unity[:0:-1])
+    domain = get_ntt_domain(roots_of_unity)
+    values = [points[i] for i in domain.bit_reversed_indices]
+    half = 1
+    for twiddles in domain.stage_twiddles:
+        step = 2 * half
+        twiddle_elements = _field_elements_from_ints(twiddles)
+        for start in range(0, len(values), step):
+            for j in range(half):
+                low = values[start + j]
+                high = values[start + j + half]
+                if j > 0:
+                    high = bls.multiply(high, twiddle_elements[j])
+                values[start + j] = bls.add(low, high)
+                values[start + j + half] = bls.add(low, bls.neg(high))
+        half = step
+    if inv:
+        invlen = BLSFieldElement(len(values)).inverse()
+        values = [bls.multiply(value, invlen) for value in values]
+    return values
+
+
+def compute_fk20_setup(setup_g1_monomial: Sequence[G1Point]) -> Sequence[Sequence[Any]]:
+    """
+    Return the points of the trusted setup that the FK20 computation of the cell proofs multiplies with.
+
+    The quotient of the blob polynomial by the vanishing polynomial of a cell is the sum, over the
+    offsets ``r`` within a cell, of Toeplitz products with the setup points ``[s^(FIELD_ELEMENTS_PER_CELL * u + r)]``.
+    Each product is computed as a circular convolution of size ``2 * m``, with ``m`` the number of cells of a blob.
+    This returns the FFTs of the setup points of every offset, with a row per evaluation point.
+    """
+    cell_size = FIELD_ELEMENTS_PER_CELL
+    chunk_count = FIELD_ELEMENTS_PER_BLOB // cell_size
+    roots_of_unity = compute_roots_of_unity(2 * chunk_count)
+    points = [bls.bytes48_to_G1(point) for point in setup_g1_monomial]
+    columns = []
+    for offset in range(cell_size):
+        reversed_points = [points[cell_size * (chunk_count - 1 - i) + offset] for i in range(chunk_count)]
+        columns.append(fft_g1(reversed_points + [bls.Z1()] * chunk_count, roots_of_unity))
+    return [[column[i] for column in columns] for i in range(2 * chunk_count)]
+
+
+get_fk20_setup = cache_this(
+    lambda setup_g1_monomial: hash_tree_root(setup_g1_monomial),
+    compute_fk20_setup,
+    lru_size=2)
+
+
+def compute_cells_polynomialcoeff(polynomial_coeff: PolynomialCoeff) -> Vector[Cell, CELLS_PER_EXT_BLOB]:
+    """
+    Compute the cells of a polynomial in coefficient form, from its evaluations over the extended domain.
+    """
+    padding = [BLSFieldElement(0)] * (FIELD_ELEMENTS_PER_EXT_BLOB - len(polynomial_coeff))
+    extended_coeff = list(polynomial_coeff) + padding
+    extended_evaluation = fft_field(extended_coeff, compute_roots_of_unity(FIELD_ELEMENTS_PER_EXT_BLOB))
+    extended_evaluation_rbo = bit_reversal_permutation(extended_evaluation)
+    return [
+        coset_evals_to_cell(CosetEvals(extended_evaluation_rbo[start:start + FIELD_ELEMENTS_PER_CELL]))
+        for start in range(0, FIELD_ELEMENTS_PER_EXT_BLOB, FIELD_ELEMENTS_PER_CELL)
+    ]
+
+
+def compute_fk20_cell_proofs(polynomial_coeff: PolynomialCoeff) -> Vector[KZGProof, CELLS_PER_EXT_BLOB]:
+    """
+    Compute the proofs of all the cells of a polynomial in coefficient form of degree below ``FIELD_ELEMENTS_PER_BLOB``.
+
+    The proof of the cell with coset shift ``h`` is the commitment to the quotient of the polynomial by
+    ``X^FIELD_ELEMENTS_PER_CELL - h^FIELD_ELEMENTS_PER_CELL``, which is ``sum_k h^(FIELD_ELEMENTS_PER_CELL * k) C_k``
+    for commitments ``C_k`` that do not depend on the cell. The ``C_k`` are computed together from the FK20 setup,
+    and the proofs of all cells as a single FFT of them.
+    """
+    cell_size = FIELD_ELEMENTS_PER_CELL
+    chunk_count = FIELD_ELEMENTS_PER_BLOB // cell_size
+    coeffs = list(polynomial_coeff) + [BLSFieldElement(0)] * (FIELD_ELEMENTS_PER_BLOB - len(polynomial_coeff))
+    roots_of_unity = compute_roots_of_unity(2 * chunk_count)
+    setup_rows = get_fk20_setup(KZG_SETUP_G1_MONOMIAL)
+
+    # The Toeplitz products of the coefficients of every offset, summed in evaluation form
+    coeff_ffts = [
+        fft_field(coeffs[offset::cell_size] + [BLSFieldElement(0)] * chunk_count, roots_of_unity)
+        for offset in range(cell_size)
+    ]
+    product_evaluations = [
+        bls.multi_exp(setup_rows[i], [coeff_fft[i] for coeff_fft in coeff_ffts])
+        for i in range(2 * chunk_count)
+    ]
+    commitments = list(fft_g1(product_evaluations, roots_of_unity, inv=True)[chunk_count:])
+
+    # The cell proofs, in the bit-reversed order of the cells
+    proofs = fft_g1(commitments + [bls.Z1()] * chunk_count, roots_of_unity)
+    return [KZGProof(bls.G1_to_bytes48(proof)) for proof in bit_reversal_permutation(proofs)]
+
+
+def _compute_cells_and_kzg_proofs_polynomialcoeff_fk20(polynomial_coeff: PolynomialCoeff) -> Tuple[
+        Vector[Cell, CELLS_PER_EXT_BLOB],
+        Vector[KZGProof, CELLS_PER_EXT_BLOB]]:
+    if not FK20_CELL_PROOFS or len(polynomial_coeff) > FIELD_ELEMENTS_PER_BLOB:
+        return _compute_cells_and_kzg_proofs_polynomialcoeff(polynomial_coeff)
+    return compute_cells_polynomialcoeff(polynomial_coeff), compute_fk20_cell_proofs(polynomial_coeff)
+
+
+_compute_cells_and_kzg_proofs_polynomialcoeff = compute_cells_and_kzg_proofs_polynomialcoeff
+compute_cells_and_kzg_proofs_polynomialcoeff = _compute_cells_and_kzg_proofs_polynomialcoeff_fk20
+
+
+# Build vanishing polynomials and interpolations on subproduct trees
+SUBPRODUCT_TREE_POLYNOMIALS = True
+# The shortest factor length from which polynomials are multiplied with NTTs instead of the schoolbook method
+NTT_MULTIPLICATION_THRESHOLD = 128
+
+
+def _multiply_ints(a: Sequence[int], b: Sequence[int]) -> list[int]:
+    """
+    Multiply two non-empty coefficient form polynomials with integer coefficients modulo ``BLS_MODULUS``.
+    """
+    length = len(a) + len(b) - 1
+    if min(len(a), len(b)) < NTT_MULTIPLICATION_THRESHOLD:
+        products = [0] * length
+        for i, x in enumerate(a):
+            products[i:i + len(b)] = [p + x * y for p, y in zip(products[i:i + len(b)], b)]
+        return [p % BLS_MODULUS for p in products]
+    size = 1 << (length - 1).bit_length()
+    roots_of_unity = compute_roots_of_unity(size)
+    a_evals = ntt(list(a) + [0] * (size - len(a)), roots_of_unity)
+    b_evals = ntt(list(b) + [0] * (size - len(b)), roots_of_unity)
+    products = [x * y % BLS_MODULUS for x, y in zip(a_evals, b_evals)]
+    return ntt(products, roots_of_unity, inv=True)[:length]
+
+
+def _build_subproduct_tree(xs: Sequence[int]) -> Tuple[list[int], Any, Any]:
+    """
+    Return the tree of the vanishing polynomials of halves of ``xs``, as ``(polynomial, left, right)`` nodes.
+    """
+    if len(xs) == 1:
+        return [-xs[0] % BLS_MODULUS, 1], None, None
+    left = _build_subproduct_tree(xs[:len(xs) // 2])
+    right = _build_subproduct_tree(xs[len(xs) // 2:])
+    return _multiply_ints(left[0], right[0]), left, right
+
+
+def _interpolate_on_subproduct_tree(node: Tuple[list[int], Any, Any], weights: Sequence[int]) -> list[int]:
+    # Sum of weights[i] * Z(X) / (X - xs[i]) over the leaves of the node, for the vanishing polynomial Z of the node
+    _, left, right = node
+    if left is None:
+        return [weights[0]]
+    left_size = len(left[0]) - 1
+    left_sum = _interpolate_on_subproduct_tree(left, weights[:left_size])
+    right_sum = _interpolate_on_subproduct_tree(right, weights[left_size:])
+    return [
+        (x + y) % BLS_MODULUS
+        for x, y in zip(_multiply_ints(left_sum, right[0]), _multiply_ints(right_sum, left[0]))
+    ]
+
+
+def _multiply_polynomialcoeff_ntt(a: PolynomialCoeff, b: PolynomialCoeff) -> PolynomialCoeff:
+    if not SUBPRODUCT_TREE_POLYNOMIALS or min(len(a), len(b)) < NTT_MULTIPLICATION_THRESHOLD:
+        return _multiply_polynomialcoeff(a, b)
+    assert len(a) + len(b) <= FIELD_ELEMENTS_PER_EXT_BLOB
+    return PolynomialCoeff(_field_elements_from_ints(_multiply_ints([int(x) for x in a], [int(x) for x in b])))
+
+
+def _vanishing_polynomialcoeff_from_tree(xs: Sequence[BLSFieldElement]) -> PolynomialCoeff:
+    if not SUBPRODUCT_TREE_POLYNOMIALS or len(xs) == 0:
+        return _vanishing_polynomialcoeff(xs)
+    # As the last multiplication of the reference
+    assert len(xs) + 2 <= FIELD_ELEMENTS_PER_EXT_BLOB
+    return PolynomialCoeff(_field_elements_from_ints(_build_subproduct_tree([int(x) for x in xs])[0]))
+
+
+def _interpolate_polynomialcoeff_from_tree(xs: Sequence[BLSFieldElement],
+                                           ys: Sequence[BLSFieldElement]) -> PolynomialCoeff:
+    """
+    Lagrange interpolation on the subproduct tree of ``xs``.
+
+    The interpolation is ``sum_i ys[i] / Z'(xs[i]) * Z(X) / (X - xs[i])`` for the vanishing polynomial ``Z`` of ``xs``,
+    summed up the tree. ``Z'`` is evaluated at each point with Horner's method.
+    """
+    assert len(xs) == len(ys)
+    if not SUBPRODUCT_TREE_POLYNOMIALS or len(xs) == 0:
+        return _interpolate_polynomialcoeff(xs, ys)
+    assert len(xs) < FIELD_ELEMENTS_PER_EXT_BLOB
+    points = [int(x) for x in xs]
+    tree = _build_subproduct_tree(points)
+    vanishing_polynomial = tree[0]
+    derivative_evals = [0] * len(points)
+    for power in range(len(vanishing_polynomial) - 1, 0, -1):
+        coeff = power * vanishing_polynomial[power] % BLS_MODULUS
+        derivative_evals = [(value * x + coeff) % BLS_MODULUS for value, x in zip(derivative_evals, points)]
+    if 0 in derivative_evals:
+        # Repeated points
+        return _interpolate_polynomialcoeff(xs, ys)
+    weights = [
+        int(y) * pow(derivative_eval, BLS_MODULUS - 2, BLS_MODULUS) % BLS_MODULUS
+        for y, derivative_eval in zip(ys, derivative_evals)
+    ]
+    return PolynomialCoeff(_field_elements_from_ints(_interpolate_on_subproduct_tree(tree, weights)))
+
+
+_multiply_polynomialcoeff = multiply_polynomialcoeff
+multiply_polynomialcoeff = _multiply_polynomialcoeff_ntt
+_vanishing_polynomialcoeff = vanishing_polynomialcoeff
+vanishing_polynomialcoeff = _vanishing_polynomialcoeff_from_tree
+_interpolate_polynomialcoeff = interpolate_polynomialcoeff
+interpolate_polynomialcoeff = _interpolate_polynomialcoeff_from_tree
+
+# Recovery reuses the missing cells of a block for each of its blobs
+_construct_vanishing_polynomial = construct_vanishing_polynomial
+construct_vanishing_polynomial = cache_this(
+    lambda missing_cell_indices: tuple(missing_cell_indices),
+    lambda missing_cell_indices: tuple(_construct_vanishing_polynomial(missing_cell_indices)),
+    lru_size=4)
+
+
+# Recover the rows of a matrix together, sharing the work on their available cells
+BATCHED_RECOVER_MATRIX = True
+# The number of processes that recover the rows, or 0 to recover them in this process
+RECOVER_MATRIX_PROCESSES = 0
+
+
+def _batch_inverse_ints(values: Sequence[int]) -> list[int]:
+    # Montgomery's trick: a single modular inversion for all the values, which must not be zero
+    prefix_products = [1]
+    for value in values:
+        prefix_products.append(prefix_products[-1] * value % BLS_MODULUS)
+    inverse = pow(prefix_products[-1], BLS_MODULUS - 2, BLS_MODULUS)
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        inverses[i] = inverse * prefix_products[i] % BLS_MODULUS
+        inverse = inverse * values[i] % BLS_MODULUS
+    return inverses
+
+
+def _cell_to_ints(cell: bytes) -> list[int]:
+    values = [
+        int.from_bytes(cell[i * BYTES_PER_FIELD_ELEMENT:(i + 1) * BYTES_PER_FIELD_ELEMENT], KZG_ENDIANNESS)
+        for i in range(FIELD_ELEMENTS_PER_CELL)
+    ]
+    assert all(value < BLS_MODULUS for value in values)
+    return values
+
+
+class CellRecovery:
+    """
+    The recovery of the polynomials of the rows with the same available cells.
+
+    Holds what ``recover_polynomialcoeff`` computes from the available cell indices alone: the evaluations of
+    the vanishing polynomial of the missing cells over the extended domain, and the inverses of its evaluations
+    over the coset of the domain. Values are integers modulo ``BLS_MODULUS``.
+    """
+
+    def __init__(self, cell_indices: Sequence[CellIndex]) -> None:
+        self.cell_indices = list(cell_indices)
+        self.roots_of_unity_extended = compute_roots_of_unity(FIELD_ELEMENTS_PER_EXT_BLOB)
+        missing_cell_indices = [CellIndex(cell_index) for cell_index in range(CELLS_PER_EXT_BLOB)
+                                if cell_index not in cell_indices]
+        zero_poly_coeff = [int(coeff) for coeff in construct_vanishing_polynomial(missing_cell_indices)]
+        self.zero_poly_eval = ntt(zero_poly_coeff, self.roots_of_unity_extended)
+        self.zero_poly_over_coset_inverses = _batch_inverse_ints(
+            coset_ntt(zero_poly_coeff, self.roots_of_unity_extended))
+
+    def recover_polynomialcoeff(self, cells: Sequence[bytes]) -> PolynomialCoeff:
+        extended_evaluation_rbo = [0] * FIELD_ELEMENTS_PER_EXT_BLOB
+        for cell_index, cell in zip(self.cell_indices, cells):
+            start = cell_index * FIELD_ELEMENTS_PER_CELL
+            extended_evaluation_rbo[start:start + FIELD_ELEMENTS_PER_CELL] = _cell_to_ints(cell)
+        bit_reversed_indices = get_kzg_domain(FIELD_ELEMENTS_PER_EXT_BLOB).bit_reversed_indices
+        extended_evaluation_times_zero = [
+            extended_evaluation_rbo[i] * zero_eval % BLS_MODULUS
+            for i, zero_eval in zip(bit_reversed_indices, self.zero_poly_eval)
+        ]
+        extended_evaluation_times_zero_coeffs = ntt(
+            extended_evaluation_times_zero, self.roots_of_unity_extended, inv=True)
+        extended_evaluations_over_coset = coset_ntt(extended_evaluation_times_zero_coeffs, self.roots_of_unity_extended)
+        reconstructed_poly_over_coset = [
+            a * b % BLS_MODULUS for a, b in zip(extended_evaluations_over_coset, self.zero_poly_over_coset_inverses)
+        ]
+        reconstructed_poly_coeff = coset_ntt(reconstructed_poly_over_coset, self.roots_of_unity_extended, inv=True)
+        return PolynomialCoeff(_field_elements_from_ints(reconstructed_poly_coeff[:FIELD_ELEMENTS_PER_BLOB]))
+
+
+get_cell_recovery = cache_this(
+    lambda cell_indices: tuple(cell_indices),
+    CellRecovery,
+    lru_size=4)
+
+
+def _check_cells_to_recover(cell_indices: Sequence[int], cells: Sequence[bytes]) -> None:
+    # The checks of recover_cells_and_kzg_proofs
+    assert len(cell_indices) == len(cells)
+    assert CELLS_PER_EXT_BLOB // 2 <= len(cell_indices) <= CELLS_PER_EXT_BLOB
+    assert len(cell_indices) == len(set(cell_indices))
+    for cell_index in cell_indices:
+        assert cell_index < CELLS_PER_EXT_BLOB
+    for cell in cells:
+        assert len(cell) == BYTES_PER_CELL
+
+
+def _recover_row(cell_indices: Sequence[int], cells: Sequence[bytes]) -> Tuple[list[bytes], list[bytes]]:
+    # Takes and returns plain values, so that rows can be recovered in other processes
+    recovery = get_cell_recovery([CellIndex(cell_index) for cell_index in cell_indices])
+    polynomial_coeff = recovery.recover_polynomialcoeff(cells)
+    recovered_cells, recovered_proofs = compute_cells_and_kzg_proofs_polynomialcoeff(polynomial_coeff)
+    return [bytes(cell) for cell in recovered_cells], [bytes(proof) for proof in recovered_proofs]
+
+
+def _recover_matrix_batched(partial_matrix: Sequence[MatrixEntry], blob_count: uint64) -> Sequence[MatrixEntry]:
+    if not BATCHED_RECOVER_MATRIX:
+        return _recover_matrix(partial_matrix, blob_count)
+    rows: list[Tuple[list[int], list[bytes]]] = [([], []) for _ in range(blob_count)]
+    for e in partial_matrix:
+        if e.row_index < blob_count:
+            rows[e.row_index][0].append(int(e.column_index))
+            rows[e.row_index][1].append(bytes(e.cell))
+    for cell_indices, cells in rows:
+        _check_cells_to_recover(cell_indices, cells)
+
+    if RECOVER_MATRIX_PROCESSES > 0 and blob_count > 1:
+        # Forked processes would inherit the state of the native BLS thread pools, so workers are spawned.
+        # Each worker builds its own FK20 setup and recovery structures.
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=RECOVER_MATRIX_PROCESSES, mp_context=context) as executor:
+            recovered_rows = list(executor.map(_recover_row, *zip(*rows)))
+    else:
+        recovered_rows = [_recover_row(cell_indices, cells) for cell_indices, cells in rows]
+
+    matrix = []
+    for blob_index, (recovered_cells, recovered_proofs) in enumerate(recovered_rows):
+        for cell_index, (cell, proof) in enumerate(zip(recovered_cells, recovered_proofs)):
+            matrix.append(MatrixEntry(
+                cell=Cell(cell),
+                kzg_proof=KZGProof(proof),
+                row_index=blob_index,
+                column_index=cell_index,
+            ))
+    return matrix
+
+
+_recover_matrix = recover_matrix
+recover_matrix = _recover_matrix_batched
+'''
 
     @classmethod
     def hardcoded_custom_type_dep_constants(cls, spec_object) -> str:
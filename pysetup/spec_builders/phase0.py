@@ -1,3 +1,6 @@
+import re
+from typing import Dict
+
 from .base import BaseSpecBuilder
 from ..constants import PHASE0
 
@@ -12,17 +15,26 @@ from dataclasses import (
     dataclass,
     field,
 )
+from collections.abc import MutableMapping
 from typing import (
-    Any, Callable, Dict, Set, Sequence, Tuple, Optional, TypeVar, NamedTuple, Final
+    Any, Callable, Dict, Iterator, Set, Sequence, Tuple, Optional, TypeVar, NamedTuple, Final
 )
 
 from eth2spec.utils.ssz.ssz_impl import hash_tree_root, copy, uint_to_bytes
+from eth2spec.utils.ssz.ssz_impl import (  # noqa: F401
+    get_element_nodes, get_container_field_nodes, get_container_field_roots, packed_list_from_bytes)
 from eth2spec.utils.ssz.ssz_typing import (
     View, boolean, Container, List, Vector, uint8, uint32, uint64, uint256,
     Bytes1, Bytes4, Bytes32, Bytes48, Bytes96, Bitlist)
 from eth2spec.utils.ssz.ssz_typing import Bitvector  # noqa: F401
 from eth2spec.utils import bls
 from eth2spec.utils.hash_function import hash
+
+try:
+    import numpy  # noqa: F401
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 '''
 
     @classmethod
@@ -31,6 +43,33 @@ from eth2spec.utils.hash_function import hash
 SSZObject = TypeVar('SSZObject', bound=View)
 '''
 
+    @classmethod
+    def implement_optimizations(cls, functions: Dict[str, str]) -> Dict[str, str]:
+        for name, source in functions.items():
+            # Look pubkeys up through the pubkey index cache instead of listing the pubkeys of the whole registry
+            source = source.replace('[v.pubkey for v in state.validators]', 'get_validator_pubkeys(state)')
+            # Look the children of a block up in the children index instead of scanning the blocks
+            source = re.sub(
+                r'\[\s*root for root in ((?:store\.)?blocks)\.keys\(\)\s*if \1\[root\]\.parent_root == (\w+)\s*\]',
+                r'[root for root in get_block_children(store).get(\2) if root in \1]',
+                source,
+            )
+            functions[name] = source
+        if 'compute_pulled_up_tip' in functions:
+            # Read the pulled-up checkpoints of the block state from the cache instead of processing a copy of it
+            functions['compute_pulled_up_tip'] = functions['compute_pulled_up_tip'].replace(
+                '    state = store.block_states[block_root].copy()\n',
+                '',
+            ).replace(
+                '    process_justification_and_finalization(state)\n',
+                '    pulled_up = get_pulled_up_checkpoints(store.block_states[block_root])\n',
+            ).replace(
+                'state.current_justified_checkpoint', 'pulled_up.current_justified_checkpoint',
+            ).replace(
+                'state.finalized_checkpoint', 'pulled_up.finalized_checkpoint',
+            )
+        return functions
+
     @classmethod
     def sundry_functions(cls) -> str:
         return '''
@@ -61,30 +100,745 @@ compute_shuffled_index = cache_this(
     lambda index, index_count, seed: (index, index_count, seed),
     _compute_shuffled_index, lru_size=SLOTS_PER_EPOCH * 3)
 
-_get_total_active_balance = get_total_active_balance
-get_total_active_balance = cache_this(
-    lambda state: (state.validators.hash_tree_root(), compute_epoch_at_slot(state.slot)),
-    _get_total_active_balance, lru_size=10)
 
-_get_base_reward = get_base_reward
-get_base_reward = cache_this(
-    lambda state, index: (state.validators.hash_tree_root(), state.slot, index),
-    _get_base_reward, lru_size=2048)
+def _compute_shuffled_indices(index_count: uint64, seed: Bytes32) -> Sequence[uint64]:
+    """
+    Return ``[compute_shuffled_index(i, index_count, seed) for i in range(index_count)]`` in a single pass.
+    Each round hashes its pivot and source blocks once and swaps every pair of positions in place.
+    Rounds are applied in reverse so that position ``i`` ends up holding the shuffled index of ``i``.
+    """
+    count = int(index_count)
+    shuffled = list(range(count))
+    if count <= 1:
+        return [uint64(index) for index in shuffled]
+
+    for current_round in reversed(range(SHUFFLE_ROUND_COUNT)):
+        round_bytes = uint_to_bytes(uint8(current_round))
+        pivot = int(bytes_to_uint64(hash(seed + round_bytes)[0:8])) % count
+        source = b"".join(
+            hash(seed + round_bytes + uint_to_bytes(uint32(block)))
+            for block in range((count + 255) // 256)
+        )
+        # Visit each pair ``(index, flip)`` with ``index < flip`` once; the bit is read at ``max(index, flip)``
+        for index in range(0, (pivot + 1) // 2):
+            flip = pivot - index
+            if (source[flip // 8] >> (flip % 8)) & 1:
+                shuffled[index], shuffled[flip] = shuffled[flip], shuffled[index]
+        for index in range(pivot + 1, (pivot + count + 1) // 2):
+            flip = pivot + count - index
+            if (source[flip // 8] >> (flip % 8)) & 1:
+                shuffled[index], shuffled[flip] = shuffled[flip], shuffled[index]
+
+    return [uint64(index) for index in shuffled]
+
+
+compute_shuffled_indices = cache_this(
+    lambda index_count, seed: (index_count, seed),
+    _compute_shuffled_indices, lru_size=4)
+
+
+def _compute_committee_from_shuffled_indices(indices: Sequence[ValidatorIndex],
+                                             seed: Bytes32,
+                                             index: uint64,
+                                             count: uint64) -> Sequence[ValidatorIndex]:
+    """
+    Shuffle the whole of ``indices`` once per ``seed`` instead of calling ``compute_shuffled_index`` per position.
+    """
+    start = (len(indices) * index) // count
+    end = (len(indices) * uint64(index + 1)) // count
+    shuffled_indices = compute_shuffled_indices(uint64(len(indices)), seed)
+    return [indices[shuffled_indices[i]] for i in range(start, end)]
+
+
+_compute_committee = compute_committee
+compute_committee = _compute_committee_from_shuffled_indices
+
+
+@dataclass
+class ValidatorColumns(object):
+    """
+    Per-validator columns of a validator registry, gathered from its tree backing in one pass.
+    The columns are ``numpy`` arrays indexed by validator index.
+    """
+    effective_balance: Any
+    slashed: Any
+    activation_eligibility_epoch: Any
+    activation_epoch: Any
+    exit_epoch: Any
+    withdrawable_epoch: Any
+    withdrawal_prefix: Any
+
+    def is_active(self, epoch: Epoch) -> Any:
+        return (self.activation_epoch <= int(epoch)) & (int(epoch) < self.exit_epoch)
+
+    def is_eligible(self, previous_epoch: Epoch) -> Any:
+        return self.is_active(previous_epoch) | (self.slashed & (int(previous_epoch) + 1 < self.withdrawable_epoch))
+
+
+VALIDATOR_COLUMNS_UINT64_FIELDS = [
+    'effective_balance', 'activation_eligibility_epoch', 'activation_epoch', 'exit_epoch', 'withdrawable_epoch',
+]
+
+
+def compute_validator_columns(validators: Sequence[Validator]) -> ValidatorColumns:
+    roots = get_container_field_roots(
+        get_element_nodes(validators),
+        Validator,
+        VALIDATOR_COLUMNS_UINT64_FIELDS + ['slashed', 'withdrawal_credentials'],
+    )
+    # Each field root is a 32-byte chunk holding the little-endian value
+    uint64_columns = {
+        name: numpy.frombuffer(roots[name], dtype='<u8')[::4].copy()
+        for name in VALIDATOR_COLUMNS_UINT64_FIELDS
+    }
+    return ValidatorColumns(
+        slashed=numpy.frombuffer(roots['slashed'], dtype='u1')[::32].astype(bool),
+        withdrawal_prefix=numpy.frombuffer(roots['withdrawal_credentials'], dtype='u1')[::32].copy(),
+        **uint64_columns,
+    )
+
+
+class ValidatorColumnsCache:
+    """
+    Cache of ``ValidatorColumns`` snapshots, and of balance columns.
+
+    Snapshots are keyed by the backing node of ``state.validators``, so copies of a state share a snapshot and any
+    change to the registry subtree gathers a new one. Cached columns are shared and made read-only.
+    Balance columns are keyed by the backing node of ``state.balances`` in the same way.
+    Both tables evict their least recently used entry once ``size`` entries are held.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.columns: Any = LRU(size=size)
+        self.balances: Any = LRU(size=size)
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        self.columns.clear()
+        self.balances.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_columns(self, validators: Sequence[Validator]) -> ValidatorColumns:
+        backing = validators.get_backing()  # type: ignore
+        columns = self.columns.get(backing)
+        if columns is None:
+            self.misses += 1
+            columns = compute_validator_columns(validators)
+            for value in columns.__dict__.values():
+                value.flags.writeable = False
+            self.columns[backing] = columns
+        else:
+            self.hits += 1
+        return columns
+
+    def get_balances(self, balances: Sequence[Gwei]) -> Any:
+        backing = balances.get_backing()  # type: ignore
+        column = self.balances.get(backing)
+        if column is None:
+            column = numpy.frombuffer(balances.encode_bytes(), dtype='<u8')  # type: ignore
+            self.balances[backing] = column
+        return column
+
+
+VALIDATOR_COLUMNS_CACHE = ValidatorColumnsCache(size=4)
+
+
+def get_validator_columns(state: BeaconState) -> ValidatorColumns:
+    return VALIDATOR_COLUMNS_CACHE.get_columns(state.validators)
+
+
+def _get_eligible_validator_indices_from_columns(state: BeaconState) -> Sequence[ValidatorIndex]:
+    if not NUMPY_AVAILABLE:
+        return _get_eligible_validator_indices(state)
+    eligible = get_validator_columns(state).is_eligible(get_previous_epoch(state))
+    return [ValidatorIndex(index) for index in numpy.flatnonzero(eligible).tolist()]
+
+
+_get_eligible_validator_indices = get_eligible_validator_indices
+get_eligible_validator_indices = _get_eligible_validator_indices_from_columns
+
+
+# Select the array-backed ``process_effective_balance_updates``; requires NumPy
+VECTORIZED_EFFECTIVE_BALANCE_UPDATES = False
+
+
+def _get_max_effective_balance_column_phase0(columns: ValidatorColumns) -> Any:
+    return numpy.full(len(columns.effective_balance), int(MAX_EFFECTIVE_BALANCE), dtype='<u8')
+
+
+# The maximum effective balances of the current fork, over a columnar snapshot
+get_max_effective_balance_column = _get_max_effective_balance_column_phase0
+
+
+def compute_effective_balance_column(balances: Any, columns: ValidatorColumns) -> Optional[Any]:
+    """
+    Return the effective balances of ``columns`` updated with hysteresis against ``balances``,
+    or ``None`` if the uint64 arithmetic could overflow.
+    """
+    effective_balances = columns.effective_balance
+    HYSTERESIS_INCREMENT = int(EFFECTIVE_BALANCE_INCREMENT // HYSTERESIS_QUOTIENT)
+    DOWNWARD_THRESHOLD = HYSTERESIS_INCREMENT * int(HYSTERESIS_DOWNWARD_MULTIPLIER)
+    UPWARD_THRESHOLD = HYSTERESIS_INCREMENT * int(HYSTERESIS_UPWARD_MULTIPLIER)
+    if (
+        int(balances.max(initial=0)) + DOWNWARD_THRESHOLD >= 2**64
+        or int(effective_balances.max(initial=0)) + UPWARD_THRESHOLD >= 2**64
+    ):
+        return None
+
+    updated = (
+        (balances + DOWNWARD_THRESHOLD < effective_balances)
+        | (effective_balances + UPWARD_THRESHOLD < balances)
+    )
+    new_effective_balances = numpy.minimum(
+        balances - balances % int(EFFECTIVE_BALANCE_INCREMENT), get_max_effective_balance_column(columns))
+    return numpy.where(updated, new_effective_balances, effective_balances).astype('<u8')
+
+
+def write_effective_balance_column(state: BeaconState, previous_effective_balances: Any,
+                                   effective_balances: Any) -> int:
+    """
+    Write back the effective balances that differ from ``previous_effective_balances``,
+    and return the number of validators rewritten.
+    """
+    dirty = numpy.flatnonzero(effective_balances != previous_effective_balances).tolist()
+    for index in dirty:
+        state.validators[index].effective_balance = Gwei(int(effective_balances[index]))
+    return len(dirty)
+
+
+def process_effective_balance_updates_vectorized(state: BeaconState) -> int:
+    """
+    Run ``process_effective_balance_updates`` over the registry snapshot of ``state``,
+    and return the number of validators whose effective balance was rewritten.
+    """
+    columns = get_validator_columns(state)
+    effective_balances = compute_effective_balance_column(
+        VALIDATOR_COLUMNS_CACHE.get_balances(state.balances), columns)
+    if effective_balances is None:
+        _process_effective_balance_updates(state)
+        return int((get_validator_columns(state).effective_balance != columns.effective_balance).sum())
+    return write_effective_balance_column(state, columns.effective_balance, effective_balances)
+
+
+def _process_effective_balance_updates_selected(state: BeaconState) -> None:
+    if VECTORIZED_EFFECTIVE_BALANCE_UPDATES and NUMPY_AVAILABLE:
+        process_effective_balance_updates_vectorized(state)
+    else:
+        _process_effective_balance_updates(state)
+
+
+_process_effective_balance_updates = process_effective_balance_updates
+process_effective_balance_updates = _process_effective_balance_updates_selected
+
+
+class ShufflingCache:
+    """
+    Epoch-scoped cache of committee shufflings.
+
+    Active validator indices are memoized per ``(registry backing node, epoch)``. Tree nodes are immutable,
+    so an unchanged registry is recognized without merkleizing it. With NumPy, the indices are read from the
+    registry's ``ValidatorColumns`` snapshot.
+    Shufflings are memoized per ``(epoch, seed, active indices digest)``, so registry changes that keep the
+    active set intact (e.g. effective balance updates) reuse the existing shuffling.
+    Both tables evict their least recently used entry once ``size`` entries are held.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.active_indices: Any = LRU(size=size)
+        self.shufflings: Any = LRU(size=size)
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        self.active_indices.clear()
+        self.shufflings.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_active_indices_and_digest(self, state: BeaconState,
+                                      epoch: Epoch) -> Tuple[Sequence[ValidatorIndex], Bytes32]:
+        key = (state.validators.get_backing(), epoch)
+        if key not in self.active_indices:
+            if NUMPY_AVAILABLE:
+                active = numpy.flatnonzero(get_validator_columns(state).is_active(epoch)).astype('<u8')
+                indices: Sequence[ValidatorIndex] = [ValidatorIndex(index) for index in active.tolist()]
+                digest = hash(active.tobytes())
+            else:
+                indices = _get_active_validator_indices(state, epoch)
+                digest = hash(b"".join(uint_to_bytes(index) for index in indices))
+            self.active_indices[key] = (indices, digest)
+        return self.active_indices[key]
+
+    def get_shuffling(self, state: BeaconState, epoch: Epoch) -> Sequence[ValidatorIndex]:
+        """
+        Return the active validator indices at ``epoch`` in attester shuffling order.
+        """
+        indices, digest = self.get_active_indices_and_digest(state, epoch)
+        seed = get_seed(state, epoch, DOMAIN_BEACON_ATTESTER)
+        key = (epoch, seed, digest)
+        if key in self.shufflings:
+            self.hits += 1
+        else:
+            self.misses += 1
+            shuffled_indices = compute_shuffled_indices(uint64(len(indices)), seed)
+            self.shufflings[key] = [indices[i] for i in shuffled_indices]
+        return self.shufflings[key]
+
+
+SHUFFLING_CACHE = ShufflingCache(size=4)
+
+
+def _get_active_validator_indices_from_cache(state: BeaconState, epoch: Epoch) -> Sequence[ValidatorIndex]:
+    return SHUFFLING_CACHE.get_active_indices_and_digest(state, epoch)[0]
+
+
+def _get_beacon_committee_from_shuffling(state: BeaconState,
+                                         slot: Slot,
+                                         index: CommitteeIndex) -> Sequence[ValidatorIndex]:
+    """
+    Slice the committee out of the cached shuffling of ``compute_epoch_at_slot(slot)``.
+    """
+    epoch = compute_epoch_at_slot(slot)
+    committees_per_slot = get_committee_count_per_slot(state, epoch)
+    shuffling = SHUFFLING_CACHE.get_shuffling(state, epoch)
+    committee_index = (slot % SLOTS_PER_EPOCH) * committees_per_slot + index
+    count = committees_per_slot * SLOTS_PER_EPOCH
+    start = (len(shuffling) * committee_index) // count
+    end = (len(shuffling) * uint64(committee_index + 1)) // count
+    return shuffling[start:end]
 
-_get_committee_count_per_slot = get_committee_count_per_slot
-get_committee_count_per_slot = cache_this(
-    lambda state, epoch: (state.validators.hash_tree_root(), epoch),
-    _get_committee_count_per_slot, lru_size=SLOTS_PER_EPOCH * 3)
 
 _get_active_validator_indices = get_active_validator_indices
-get_active_validator_indices = cache_this(
-    lambda state, epoch: (state.validators.hash_tree_root(), epoch),
-    _get_active_validator_indices, lru_size=3)
+get_active_validator_indices = _get_active_validator_indices_from_cache
 
 _get_beacon_committee = get_beacon_committee
-get_beacon_committee = cache_this(
-    lambda state, slot, index: (state.validators.hash_tree_root(), state.randao_mixes.hash_tree_root(), slot, index),
-    _get_beacon_committee, lru_size=SLOTS_PER_EPOCH * MAX_COMMITTEES_PER_SLOT * 3)
+get_beacon_committee = _get_beacon_committee_from_shuffling
+
+
+class SwapOrNotShuffle:
+    """
+    ``compute_shuffled_index`` over ``index_count`` indices for a fixed ``seed``.
+
+    The round pivots are hashed once up front and each source block is hashed on first use, so shuffling
+    many indices with the same ``seed`` costs one hash per distinct ``(round, position // 256)`` instead of
+    two hashes per index and round.
+    """
+
+    def __init__(self, index_count: uint64, seed: Bytes32) -> None:
+        self.index_count = int(index_count)
+        self.seed = seed
+        self.pivots = [
+            int(bytes_to_uint64(hash(seed + uint_to_bytes(uint8(current_round)))[0:8])) % self.index_count
+            for current_round in range(SHUFFLE_ROUND_COUNT)
+        ] if self.index_count > 0 else []
+        self.sources: dict[Tuple[int, int], bytes] = {}
+
+    def get_source(self, current_round: int, block: int) -> bytes:
+        key = (current_round, block)
+        if key not in self.sources:
+            self.sources[key] = hash(self.seed + uint_to_bytes(uint8(current_round)) + uint_to_bytes(uint32(block)))
+        return self.sources[key]
+
+    def get(self, index: uint64) -> uint64:
+        assert index < self.index_count
+        position = int(index)
+        for current_round, pivot in enumerate(self.pivots):
+            flip = (pivot + self.index_count - position) % self.index_count
+            highest = max(position, flip)
+            source = self.get_source(current_round, highest // 256)
+            if (source[(highest % 256) // 8] >> (highest % 8)) & 1:
+                position = flip
+        return uint64(position)
+
+
+get_swap_or_not_shuffle = cache_this(
+    lambda index_count, seed: (index_count, seed),
+    SwapOrNotShuffle, lru_size=SLOTS_PER_EPOCH * 3)
+
+# Width of the random values drawn by ``compute_balance_weighted_sample`` and the balance they are scaled to
+SAMPLING_RANDOM_VALUE_BYTES = 1
+SAMPLING_MAX_EFFECTIVE_BALANCE = MAX_EFFECTIVE_BALANCE
+
+
+def _compute_balance_weighted_sample(state: BeaconState,
+                                     indices: Sequence[ValidatorIndex],
+                                     seed: Bytes32,
+                                     count: int) -> Tuple[list[ValidatorIndex], dict[ValidatorIndex, int]]:
+    """
+    Return the sample along with the effective balance of every candidate the rejection loop visited.
+    """
+    assert len(indices) > 0
+    total = uint64(len(indices))
+    shuffle = get_swap_or_not_shuffle(total, seed)
+    values_per_block = 32 // SAMPLING_RANDOM_VALUE_BYTES
+    max_random_value = 2**(8 * SAMPLING_RANDOM_VALUE_BYTES) - 1
+    max_effective_balance = int(SAMPLING_MAX_EFFECTIVE_BALANCE)
+    sample: list[ValidatorIndex] = []
+    effective_balances: dict[ValidatorIndex, int] = {}
+    random_bytes = b""
+    i = 0
+    while len(sample) < count:
+        offset = i % values_per_block
+        if offset == 0:
+            random_bytes = hash(seed + uint_to_bytes(uint64(i // values_per_block)))
+        random_value = int.from_bytes(
+            random_bytes[offset * SAMPLING_RANDOM_VALUE_BYTES:(offset + 1) * SAMPLING_RANDOM_VALUE_BYTES], "little")
+        candidate_index = indices[shuffle.get(uint64(i % total))]
+        if candidate_index not in effective_balances:
+            effective_balances[candidate_index] = int(state.validators[candidate_index].effective_balance)
+        if effective_balances[candidate_index] * max_random_value >= max_effective_balance * random_value:
+            sample.append(candidate_index)
+        i += 1
+    return sample, effective_balances
+
+
+def compute_balance_weighted_sample(state: BeaconState,
+                                    indices: Sequence[ValidatorIndex],
+                                    seed: Bytes32,
+                                    count: int) -> Sequence[ValidatorIndex]:
+    """
+    Return ``count`` indices, with possible duplicates, sampled from ``indices`` by effective balance.
+
+    Candidates and acceptance tests follow the rejection loop of ``compute_proposer_index``. The shuffle is
+    shared across draws and each random block is hashed once for all the values it holds.
+    """
+    return _compute_balance_weighted_sample(state, indices, seed, count)[0]
+
+
+def _compute_proposer_index_from_sample(state: BeaconState,
+                                        indices: Sequence[ValidatorIndex],
+                                        seed: Bytes32) -> ValidatorIndex:
+    return compute_balance_weighted_sample(state, indices, seed, 1)[0]
+
+
+_compute_proposer_index = compute_proposer_index
+compute_proposer_index = _compute_proposer_index_from_sample
+
+
+class ProposerCache:
+    """
+    Bounded cache of epoch-wide proposer tables.
+
+    Tables are keyed on ``(epoch, seed, active indices digest)`` and evict their least recently used entry once
+    ``size`` entries are held. Each slot keeps the effective balances its rejection loop read, and is sampled
+    again if any of them differ in the queried state.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.tables: Any = LRU(size=size)
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        self.tables.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_table(self, state: BeaconState,
+                  epoch: Epoch) -> Tuple[list[Any], Sequence[ValidatorIndex], Bytes32]:
+        indices, digest = SHUFFLING_CACHE.get_active_indices_and_digest(state, epoch)
+        seed = get_seed(state, epoch, DOMAIN_BEACON_PROPOSER)
+        key = (epoch, seed, digest)
+        if key in self.tables:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.tables[key] = [None] * SLOTS_PER_EPOCH
+        return self.tables[key], indices, seed
+
+    def get_proposer_index(self, state: BeaconState, slot: Slot) -> ValidatorIndex:
+        epoch = compute_epoch_at_slot(slot)
+        table, indices, seed = self.get_table(state, epoch)
+        position = slot % SLOTS_PER_EPOCH
+        entry = table[position]
+        if entry is None or any(
+            state.validators[index].effective_balance != effective_balance
+            for index, effective_balance in entry[1].items()
+        ):
+            proposer_seed = hash(seed + uint_to_bytes(slot))
+            sample, effective_balances = _compute_balance_weighted_sample(state, indices, proposer_seed, 1)
+            entry = table[position] = (sample[0], effective_balances)
+        return entry[0]
+
+
+PROPOSER_CACHE = ProposerCache(size=4)
+
+
+def get_beacon_proposer_indices(state: BeaconState, epoch: Epoch) -> Sequence[ValidatorIndex]:
+    """
+    Return the beacon proposer index of every slot of ``epoch``, from the current epoch up to
+    ``MIN_SEED_LOOKAHEAD`` epochs ahead, whose proposer seed is already determined.
+    Effective balances are read from ``state``, so the proposers of a later epoch only hold while
+    the epoch transitions in between leave the effective balances unchanged.
+    """
+    current_epoch = get_current_epoch(state)
+    assert current_epoch <= epoch <= current_epoch + MIN_SEED_LOOKAHEAD
+    start_slot = compute_start_slot_at_epoch(epoch)
+    return [PROPOSER_CACHE.get_proposer_index(state, Slot(start_slot + i)) for i in range(SLOTS_PER_EPOCH)]
+
+
+def _get_beacon_proposer_index_from_cache(state: BeaconState) -> ValidatorIndex:
+    return PROPOSER_CACHE.get_proposer_index(state, state.slot)
+
+
+_get_beacon_proposer_index = get_beacon_proposer_index
+get_beacon_proposer_index = _get_beacon_proposer_index_from_cache
+
+
+class PubkeyIndex:
+    """
+    Append-only map from validator pubkey to the lowest validator index holding it.
+    """
+
+    def __init__(self, pubkeys: Sequence[bytes]) -> None:
+        self.pubkeys: list[bytes] = []
+        self.indices: dict[bytes, ValidatorIndex] = {}
+        self.extend(pubkeys)
+
+    def extend(self, pubkeys: Sequence[bytes]) -> None:
+        for pubkey in pubkeys:
+            self.indices.setdefault(pubkey, ValidatorIndex(len(self.pubkeys)))
+            self.pubkeys.append(pubkey)
+
+
+def _get_validator_pubkeys(nodes: Sequence[Any]) -> list[bytes]:
+    return [bytes(BLSPubkey.view_from_backing(node)) for node in get_container_field_nodes(nodes, Validator, 'pubkey')]
+
+
+def _collect_changed_nodes(node: Any, base: Any, depth: int, offset: int, count: int, out: list[Any]) -> None:
+    # Walk two registry trees side by side, skipping the subtrees they share
+    if node is base or offset >= count:
+        return
+    if depth == 0:
+        out.append((offset, node))
+        return
+    pivot = 1 << (depth - 1)
+    _collect_changed_nodes(node.get_left(), base.get_left(), depth - 1, offset, count, out)
+    _collect_changed_nodes(node.get_right(), base.get_right(), depth - 1, offset + pivot, count, out)
+
+
+class PubkeyIndexCache:
+    """
+    Cache of pubkey to validator index lookups.
+
+    Registries are recognized by the backing node of ``state.validators``, so copies of a state share an entry.
+    An entry is a ``PubkeyIndex`` together with the number of validators of the registry it covers,
+    and registries that extend one another share the same ``PubkeyIndex``.
+    A registry that is not cached yet is derived from the most recently used one by walking only the subtrees
+    the two registries do not share: the pubkeys of changed validators are checked, and the validators past the
+    longest matching prefix, e.g. those appended by ``add_validator_to_registry``, are indexed.
+    The index is rebuilt from scratch only if the registries share no prefix.
+    The registry table evicts its least recently used entry once ``size`` entries are held.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.registries: Any = LRU(size=size)
+        self.latest: Optional[Tuple[Any, Tuple[PubkeyIndex, int]]] = None
+        self.hits = 0
+        self.derivations = 0
+        self.rebuilds = 0
+
+    def clear(self) -> None:
+        self.registries.clear()
+        self.latest = None
+        self.hits = 0
+        self.derivations = 0
+        self.rebuilds = 0
+
+    def get_registry_index(self, validators: Sequence[Validator]) -> Tuple[PubkeyIndex, int]:
+        backing = validators.get_backing()  # type: ignore
+        entry = self.registries.get(backing)
+        if entry is None:
+            entry = self._derive_registry_index(validators)
+            self.registries[backing] = entry
+        else:
+            self.hits += 1
+        self.latest = (backing, entry)
+        return entry
+
+    def _derive_registry_index(self, validators: Sequence[Validator]) -> Tuple[PubkeyIndex, int]:
+        count = len(validators)
+        prefix = 0
+        if self.latest is not None:
+            base_backing, (pubkey_index, base_count) = self.latest
+            # Find the longest prefix of validators whose pubkeys match the most recently used registry
+            changed: list[Any] = []
+            _collect_changed_nodes(
+                validators.get_backing().get_left(),  # type: ignore
+                base_backing.get_left(),
+                validators.__class__.contents_depth(),  # type: ignore
+                0, min(count, base_count), changed,
+            )
+            changed_pubkeys = _get_validator_pubkeys([node for _, node in changed])
+            prefix = min(
+                [index for (index, _), pubkey in zip(changed, changed_pubkeys) if pubkey_index.pubkeys[index] != pubkey]
+                + [min(count, base_count)]
+            )
+        if prefix == 0:
+            self.rebuilds += 1
+            return PubkeyIndex(_get_validator_pubkeys(get_element_nodes(validators))), count
+
+        self.derivations += 1
+        if prefix < count:
+            if len(pubkey_index.pubkeys) != prefix:
+                # The index holds pubkeys of another registry past the shared prefix
+                pubkey_index = PubkeyIndex(pubkey_index.pubkeys[:prefix])
+            pubkey_index.extend(_get_validator_pubkeys(get_element_nodes(validators, start=prefix)))
+        return pubkey_index, count
+
+    def get_validator_index(self, state: BeaconState, pubkey: BLSPubkey) -> Optional[ValidatorIndex]:
+        """
+        Return the lowest index of a validator of ``state`` with ``pubkey``, if any.
+        """
+        pubkey_index, count = self.get_registry_index(state.validators)
+        index = pubkey_index.indices.get(bytes(pubkey))
+        if index is None or index >= count:
+            return None
+        return index
+
+
+PUBKEY_INDEX_CACHE = PubkeyIndexCache(size=8)
+
+
+def get_validator_index_by_pubkey(state: BeaconState, pubkey: BLSPubkey) -> Optional[ValidatorIndex]:
+    return PUBKEY_INDEX_CACHE.get_validator_index(state, pubkey)
+
+
+class ValidatorPubkeys:
+    """
+    The pubkeys of the validators of ``state``, standing in for ``[v.pubkey for v in state.validators]``.
+    Membership and ``index`` are answered from the ``PUBKEY_INDEX_CACHE`` entry of the registry at construction.
+    """
+
+    def __init__(self, state: BeaconState) -> None:
+        self.pubkey_index, self.count = PUBKEY_INDEX_CACHE.get_registry_index(state.validators)
+
+    def __contains__(self, pubkey: object) -> bool:
+        index = self.pubkey_index.indices.get(bytes(pubkey))  # type: ignore
+        return index is not None and index < self.count
+
+    def index(self, pubkey: BLSPubkey) -> int:
+        index = self.pubkey_index.indices.get(bytes(pubkey))
+        if index is None or index >= self.count:
+            raise ValueError(f"{pubkey.hex()} is not in the registry")
+        return int(index)
+
+
+def get_validator_pubkeys(state: BeaconState) -> ValidatorPubkeys:
+    return ValidatorPubkeys(state)
+
+
+def _add_validator_to_registry_indexing_pubkey(state: BeaconState,
+                                               pubkey: BLSPubkey,
+                                               withdrawal_credentials: Bytes32,
+                                               amount: uint64) -> None:
+    _add_validator_to_registry(state, pubkey, withdrawal_credentials, amount)
+    # Index the new validator on top of the registry it was appended to
+    PUBKEY_INDEX_CACHE.get_registry_index(state.validators)
+
+
+_add_validator_to_registry = add_validator_to_registry
+add_validator_to_registry = _add_validator_to_registry_indexing_pubkey
+
+
+class TotalActiveBalanceCache:
+    """
+    Incrementally maintained ``get_total_active_balance``.
+
+    Totals are kept per ``(registry backing node, epoch)``, so copies of a state share an entry.
+    A registry that is not cached yet is derived from the most recently used total of the same epoch by walking
+    only the subtrees the two registries do not share, and adjusting the total by the active balance of the
+    changed and appended validators. Activations, exits and effective balance updates are thus followed without
+    merkleizing the registry. The total is summed from scratch at the first query of an epoch, or if the
+    registry is shorter than the one it would be derived from.
+    With ``debug`` set, every total is checked against the reference ``get_total_active_balance``.
+    The total table evicts its least recently used entry once ``size`` entries are held.
+    """
+
+    def __init__(self, size: int, debug: bool = False) -> None:
+        self.size = size
+        self.debug = debug
+        self.totals: Any = LRU(size=size)
+        self.latest: Optional[Tuple[Any, Epoch, int]] = None
+        self.hits = 0
+        self.derivations = 0
+        self.rebuilds = 0
+
+    def clear(self) -> None:
+        self.totals.clear()
+        self.latest = None
+        self.hits = 0
+        self.derivations = 0
+        self.rebuilds = 0
+
+    def _derive_total(self, state: BeaconState, epoch: Epoch) -> int:
+        validators = state.validators
+        count = len(validators)
+        if self.latest is not None:
+            base_backing, base_epoch, total = self.latest
+            base_validators = validators.__class__.view_from_backing(base_backing)
+            base_count = len(base_validators)
+            if base_epoch == epoch and base_count <= count:
+                self.derivations += 1
+                changed: list[Any] = []
+                _collect_changed_nodes(
+                    validators.get_backing().get_left(),
+                    base_backing.get_left(),
+                    validators.__class__.contents_depth(),
+                    0, base_count, changed,
+                )
+                for index, node in changed:
+                    validator = Validator.view_from_backing(node)
+                    if is_active_validator(validator, epoch):
+                        total += int(validator.effective_balance)
+                    if is_active_validator(base_validators[index], epoch):
+                        total -= int(base_validators[index].effective_balance)
+                for node in get_element_nodes(validators, start=base_count):
+                    validator = Validator.view_from_backing(node)
+                    if is_active_validator(validator, epoch):
+                        total += int(validator.effective_balance)
+                return total
+
+        self.rebuilds += 1
+        return sum(int(validators[index].effective_balance) for index in get_active_validator_indices(state, epoch))
+
+    def get_total_active_balance(self, state: BeaconState) -> Gwei:
+        epoch = get_current_epoch(state)
+        backing = state.validators.get_backing()
+        key = (backing, epoch)
+        total = self.totals.get(key)
+        if total is None:
+            total = self._derive_total(state, epoch)
+            self.totals[key] = total
+        else:
+            self.hits += 1
+        self.latest = (backing, epoch, total)
+        total_active_balance = Gwei(max(EFFECTIVE_BALANCE_INCREMENT, total))
+        if self.debug:
+            assert total_active_balance == _get_total_active_balance(state)
+        return total_active_balance
+
+
+TOTAL_ACTIVE_BALANCE_CACHE = TotalActiveBalanceCache(size=8)
+
+
+def _get_total_active_balance_from_cache(state: BeaconState) -> Gwei:
+    return TOTAL_ACTIVE_BALANCE_CACHE.get_total_active_balance(state)
+
+
+_get_total_active_balance = get_total_active_balance
+get_total_active_balance = _get_total_active_balance_from_cache
+
+_get_base_reward = get_base_reward
+get_base_reward = cache_this(
+    lambda state, index: (state.validators.get_backing(), state.slot, index),
+    _get_base_reward, lru_size=2048)
 
 _get_matching_target_attestations = get_matching_target_attestations
 get_matching_target_attestations = cache_this(
@@ -96,10 +850,911 @@ get_matching_head_attestations = cache_this(
     lambda state, epoch: (state.hash_tree_root(), epoch),
     _get_matching_head_attestations, lru_size=10)
 
-_get_attesting_indices = get_attesting_indices
-get_attesting_indices = cache_this(
-    lambda state, attestation: (
-        state.randao_mixes.hash_tree_root(),
-        state.validators.hash_tree_root(), attestation.hash_tree_root()
-    ),
-    _get_attesting_indices, lru_size=SLOTS_PER_EPOCH * MAX_COMMITTEES_PER_SLOT * 3)'''
+
+class BlockChildren:
+    """
+    Index from the block roots of a ``Store`` to the roots of their children.
+
+    ``on_block`` adds each new block, and the index is pruned of blocks that left ``store.blocks`` when the
+    finalized checkpoint advances. ``sync`` brings the index back to the roots of ``store.blocks``, picking up
+    blocks inserted into or removed from ``store.blocks`` by other means. Traversals sync once and then read the
+    index with ``get``.
+    """
+
+    def __init__(self) -> None:
+        self.children: dict[Root, list[Root]] = {}
+        self.parents: dict[Root, Root] = {}
+        self.finalized_checkpoint: Optional[Checkpoint] = None
+
+    def add(self, root: Root, parent_root: Root) -> None:
+        if root in self.parents:
+            return
+        self.parents[root] = parent_root
+        self.children.setdefault(parent_root, []).append(root)
+
+    def prune(self, store: Store) -> None:
+        for root in [root for root in self.parents.keys() if root not in store.blocks]:
+            parent_root = self.parents.pop(root)
+            self.children.pop(root, None)
+            siblings = self.children.get(parent_root)
+            if siblings is not None:
+                siblings.remove(root)
+                if len(siblings) == 0:
+                    del self.children[parent_root]
+
+    def sync(self, store: Store) -> None:
+        if self.parents.keys() == store.blocks.keys():
+            return
+        self.prune(store)
+        for root, block in store.blocks.items():
+            self.add(root, block.parent_root)
+
+    def get(self, root: Root) -> Sequence[Root]:
+        return self.children.get(root, [])
+
+
+def get_block_children(store: Store) -> BlockChildren:
+    block_children = store.__dict__.get('block_children')
+    if block_children is None:
+        block_children = store.__dict__['block_children'] = BlockChildren()
+    return block_children
+
+
+def get_children(store: Store, root: Root) -> Sequence[Root]:
+    block_children = get_block_children(store)
+    block_children.sync(store)
+    return block_children.get(root)
+
+
+def _on_block_indexing_children(store: Store, signed_block: SignedBeaconBlock) -> None:
+    block_children = get_block_children(store)
+    _on_block(store, signed_block)
+    block_children.add(hash_tree_root(signed_block.message), signed_block.message.parent_root)
+    if block_children.finalized_checkpoint != store.finalized_checkpoint:
+        block_children.finalized_checkpoint = store.finalized_checkpoint
+        block_children.prune(store)
+
+
+def _get_filtered_block_tree_syncing_children(store: Store) -> Dict[Root, BeaconBlock]:
+    # ``filter_block_tree`` reads the children index, synced once for the whole traversal
+    get_block_children(store).sync(store)
+    return _get_filtered_block_tree(store)
+
+
+_on_block = on_block
+on_block = _on_block_indexing_children
+_get_filtered_block_tree = get_filtered_block_tree
+get_filtered_block_tree = _get_filtered_block_tree_syncing_children
+
+
+class AncestryIndex:
+    """
+    Binary-lifting jump pointers over the blocks of a ``Store``.
+
+    ``jumps[root][k]`` is the ancestor ``2**k`` blocks above ``root``. The jumps of a block are derived from those
+    of its parent, so the index grows incrementally as blocks enter the store and are queried.
+    """
+
+    def __init__(self) -> None:
+        self.jumps: dict[Root, list[Root]] = {}
+
+    def get_jumps(self, store: Store, root: Root) -> list[Root]:
+        if root in self.jumps:
+            return self.jumps[root]
+        # Collect the blocks that are not indexed yet, from ``root`` up to an indexed or anchor block
+        chain = [root]
+        parent_root = store.blocks[root].parent_root
+        while parent_root in store.blocks and parent_root not in self.jumps:
+            chain.append(parent_root)
+            parent_root = store.blocks[parent_root].parent_root
+        for block_root in reversed(chain):
+            parent_root = store.blocks[block_root].parent_root
+            jumps = []
+            if parent_root in store.blocks:
+                jumps.append(parent_root)
+                while jumps[-1] in self.jumps and len(self.jumps[jumps[-1]]) >= len(jumps):
+                    jumps.append(self.jumps[jumps[-1]][len(jumps) - 1])
+            self.jumps[block_root] = jumps
+        return self.jumps[root]
+
+    def prune(self, store: Store) -> None:
+        for root in [root for root in self.jumps.keys() if root not in store.blocks]:
+            del self.jumps[root]
+
+
+def get_ancestry_index(store: Store) -> AncestryIndex:
+    ancestry_index = store.__dict__.get('ancestry_index')
+    if ancestry_index is None:
+        ancestry_index = store.__dict__['ancestry_index'] = AncestryIndex()
+    return ancestry_index
+
+
+def get_oldest_ancestor_after_slot(store: Store, root: Root, slot: Slot) -> Root:
+    """
+    Return the oldest block in the chain of ``root`` with a slot greater than ``slot``,
+    or ``root`` itself if its slot is not greater than ``slot``.
+    """
+    if store.blocks[root].slot <= slot:
+        return root
+    ancestry_index = get_ancestry_index(store)
+    for k in reversed(range(len(ancestry_index.get_jumps(store, root)))):
+        jumps = ancestry_index.get_jumps(store, root)
+        # Jumps to blocks that left the store are not taken
+        if k < len(jumps) and jumps[k] in store.blocks and store.blocks[jumps[k]].slot > slot:
+            root = jumps[k]
+    return root
+
+
+def use_ancestry_index(reference_get_ancestor):  # type: ignore
+    def wrapper(store, root, slot):  # type: ignore
+        # The reference takes the last step, from the oldest block after ``slot`` to its parent
+        return reference_get_ancestor(store, get_oldest_ancestor_after_slot(store, root, slot), slot)
+    return wrapper
+
+
+_get_ancestor = get_ancestor
+get_ancestor = use_ancestry_index(_get_ancestor)
+
+
+# Select the proto-array ``get_head``
+PROTO_ARRAY_FORK_CHOICE = False
+
+# Cross-check the proto-array weights against ``get_weight`` after every fork-choice operation
+PROTO_ARRAY_DEBUG = False
+
+
+def get_fork_choice_balances(state: BeaconState) -> list[int]:
+    """
+    Return the effective balance each validator of ``state`` votes with in ``get_weight``,
+    zero for validators that are slashed or inactive at the current epoch of ``state``.
+    """
+    epoch = get_current_epoch(state)
+    if NUMPY_AVAILABLE:
+        columns = get_validator_columns(state)
+        return numpy.where(columns.is_active(epoch) & ~columns.slashed, columns.effective_balance, 0).tolist()
+    balances = [0] * len(state.validators)
+    for index in get_active_validator_indices(state, epoch):
+        validator = state.validators[index]
+        if not validator.slashed:
+            balances[index] = int(validator.effective_balance)
+    return balances
+
+
+class ProtoArray:
+    """
+    Block tree of a fork-choice ``Store`` held as an index-ordered array.
+
+    Blocks are appended as they enter ``store.blocks``, parents before children, and the array is rebuilt from the
+    latest messages if blocks leave ``store.blocks`` other than through ``prune``. ``weights[i]`` is the total
+    balance of the latest messages for block ``i`` or its descendants, using the balances of the justified
+    checkpoint state. Latest message changes from ``update_latest_messages`` and ``on_attester_slashing`` are
+    recorded as per-node ``deltas``, which are propagated to the ancestors by the next sweep. When the justified
+    checkpoint changes, only the votes of validators whose balance changed are moved.
+    """
+
+    def __init__(self) -> None:
+        self.roots: list[Root] = []
+        self.indices: dict[Root, int] = {}
+        self.parents: list[Optional[int]] = []
+        self.weights: list[int] = []
+        self.deltas: list[int] = []
+        self.balances_checkpoint: Optional[Checkpoint] = None
+        self.balances: list[int] = []
+        # The node and balance each validator vote is applied with
+        self.votes: dict[ValidatorIndex, Tuple[int, int]] = {}
+        # Validators whose latest message changed while the justified checkpoint state was not available
+        self.queued_votes: Set[ValidatorIndex] = set()
+
+    def reset(self, store: Store) -> None:
+        """
+        Drop every node and vote, and queue the latest messages of ``store`` to be applied again.
+        """
+        self.roots = []
+        self.indices = {}
+        self.parents = []
+        self.weights = []
+        self.deltas = []
+        self.balances_checkpoint = None
+        self.balances = []
+        self.votes = {}
+        self.queued_votes = set(store.latest_messages.keys())
+
+    def sync_blocks(self, store: Store) -> None:
+        if self.indices.keys() == store.blocks.keys():
+            return
+        # Blocks that left ``store.blocks`` other than through ``prune`` may still carry votes: start over
+        if any(root not in store.blocks for root in self.roots):
+            self.reset(store)
+        missing = [root for root in store.blocks.keys() if root not in self.indices]
+        while len(missing) > 0:
+            deferred = []
+            for root in missing:
+                parent_root = store.blocks[root].parent_root
+                if parent_root in store.blocks and parent_root not in self.indices:
+                    deferred.append(root)
+                    continue
+                self.indices[root] = len(self.roots)
+                self.roots.append(root)
+                self.parents.append(self.indices.get(parent_root))
+                self.weights.append(0)
+                self.deltas.append(0)
+            missing = deferred
+
+    def prune(self, store: Store) -> None:
+        """
+        Drop the nodes of blocks that left ``store.blocks``, with the votes applied to them.
+        """
+        kept = [index for index, root in enumerate(self.roots) if root in store.blocks]
+        if len(kept) == len(self.roots):
+            return
+        # Withdraw the votes of the dropped nodes, and carry the pending deltas of the dropped nodes up to the
+        # first kept ancestor, children first
+        is_kept = [False] * len(self.roots)
+        for index in kept:
+            is_kept[index] = True
+        for node, balance in self.votes.values():
+            if not is_kept[node]:
+                self.deltas[node] -= balance
+        for index in reversed(range(len(self.roots))):
+            parent = self.parents[index]
+            if not is_kept[index] and parent is not None:
+                self.deltas[parent] += self.deltas[index]
+        new_indices = {index: new_index for new_index, index in enumerate(kept)}
+        parents: list[Optional[int]] = []
+        for index in kept:
+            parent = self.parents[index]
+            parents.append(new_indices.get(parent) if parent is not None else None)
+        self.roots = [self.roots[index] for index in kept]
+        self.indices = {root: index for index, root in enumerate(self.roots)}
+        self.parents = parents
+        self.weights = [self.weights[index] for index in kept]
+        self.deltas = [self.deltas[index] for index in kept]
+        self.votes = {
+            validator_index: (new_indices[node], balance)
+            for validator_index, (node, balance) in self.votes.items() if node in new_indices
+        }
+
+    def sync_balances(self, store: Store) -> bool:
+        """
+        Move the votes to the balances of the justified checkpoint state, and return whether they are available.
+        """
+        if self.balances_checkpoint == store.justified_checkpoint:
+            return True
+        if store.justified_checkpoint not in store.checkpoint_states:
+            return False
+        self.balances_checkpoint = store.justified_checkpoint
+        self.balances = get_fork_choice_balances(store.checkpoint_states[store.justified_checkpoint])
+        for index, (node, balance) in self.votes.items():
+            new_balance = self.balances[index] if index < len(self.balances) else 0
+            if new_balance != balance:
+                self.deltas[node] += new_balance - balance
+                self.votes[index] = (node, new_balance)
+        queued_votes, self.queued_votes = self.queued_votes, set()
+        self.update_votes(store, list(queued_votes))
+        return True
+
+    def update_votes(self, store: Store, indices: Sequence[ValidatorIndex]) -> None:
+        """
+        Record the weight changes from the latest messages of ``indices``.
+        """
+        self.sync_blocks(store)
+        if not self.sync_balances(store):
+            self.queued_votes.update(indices)
+            return
+        for index in indices:
+            if index in self.votes:
+                node, balance = self.votes.pop(index)
+                self.deltas[node] -= balance
+            if index not in store.latest_messages or index in store.equivocating_indices:
+                continue
+            message_root = store.latest_messages[index].root
+            if message_root in self.indices:
+                node = self.indices[message_root]
+                balance = self.balances[index] if index < len(self.balances) else 0
+                self.deltas[node] += balance
+                self.votes[index] = (node, balance)
+
+    def apply_deltas(self, store: Store) -> bool:
+        """
+        Propagate the recorded deltas into ``weights``, and return whether the weights are up to date.
+        """
+        self.sync_blocks(store)
+        if not self.sync_balances(store):
+            return False
+        for index in reversed(range(len(self.roots))):
+            delta = self.deltas[index]
+            if delta != 0:
+                self.weights[index] += delta
+                self.deltas[index] = 0
+                parent = self.parents[index]
+                if parent is not None:
+                    self.deltas[parent] += delta
+        return True
+
+    def get_weight(self, store: Store, root: Root) -> Gwei:
+        """
+        Return the weight of ``root`` as in ``get_weight``, once ``apply_deltas`` has propagated the deltas.
+        """
+        weight = self.weights[self.indices[root]]
+        if store.proposer_boost_root != Root():
+            if get_ancestor(store, store.proposer_boost_root, store.blocks[root].slot) == root:
+                weight += get_proposer_score(store)
+        return Gwei(weight)
+
+    def find_head(self, store: Store) -> Root:
+        self.sync_blocks(store)
+        if not self.sync_balances(store):
+            return _get_head(store)
+        get_block_children(store).sync(store)
+        count = len(self.roots)
+        justified_index = self.indices[store.justified_checkpoint.root]
+
+        # Mark the blocks filtered by ``filter_block_tree``, i.e. the justified block and its descendants
+        is_candidate = [False] * count
+        is_candidate[justified_index] = True
+        for index in range(justified_index + 1, count):
+            parent = self.parents[index]
+            is_candidate[index] = parent is not None and is_candidate[parent]
+
+        # Proposer boost applies to the boosted block and its ancestors
+        is_boosted = [False] * count
+        proposer_score = 0
+        if store.proposer_boost_root != Root() and store.proposer_boost_root in self.indices:
+            proposer_score = int(get_proposer_score(store))
+            boosted: Optional[int] = self.indices[store.proposer_boost_root]
+            while boosted is not None:
+                is_boosted[boosted] = True
+                boosted = self.parents[boosted]
+
+        # Single backward sweep: children are final before their parent is visited
+        has_children = [False] * count
+        best_child: list[Optional[Tuple[Tuple[int, Root], int]]] = [None] * count
+        best_descendant: list[Optional[int]] = [None] * count
+        for index in reversed(range(count)):
+            parent = self.parents[index]
+            delta = self.deltas[index]
+            if delta != 0:
+                self.weights[index] += delta
+                self.deltas[index] = 0
+                if parent is not None:
+                    self.deltas[parent] += delta
+            if not is_candidate[index]:
+                continue
+            if has_children[index]:
+                entry = best_child[index]
+                best_descendant[index] = entry[1] if entry is not None else None
+            # A leaf is viable for head exactly when ``filter_block_tree`` keeps it
+            elif filter_block_tree(store, self.roots[index], {}):
+                best_descendant[index] = index
+            if index == justified_index or parent is None:
+                continue
+            has_children[parent] = True
+            descendant = best_descendant[index]
+            if descendant is not None:
+                # Ties are broken by favoring the block with the lexicographically higher root
+                key = (self.weights[index] + (proposer_score if is_boosted[index] else 0), self.roots[index])
+                parent_entry = best_child[parent]
+                if parent_entry is None or key > parent_entry[0]:
+                    best_child[parent] = (key, descendant)
+
+        head = best_descendant[justified_index]
+        return self.roots[head if head is not None else justified_index]
+
+
+def get_proto_array(store: Store) -> ProtoArray:
+    proto_array = store.__dict__.get('proto_array')
+    if proto_array is None:
+        proto_array = store.__dict__['proto_array'] = ProtoArray()
+        proto_array.reset(store)
+    return proto_array
+
+
+def check_proto_array_weights(store):  # type: ignore
+    """
+    Assert that the proto-array weight of every block matches ``get_weight``.
+    """
+    proto_array = get_proto_array(store)
+    if proto_array.apply_deltas(store):
+        for root in proto_array.roots:
+            assert proto_array.get_weight(store, root) == get_weight(store, root)
+
+
+def get_head_proto_array(store: Store) -> Root:
+    head = get_proto_array(store).find_head(store)
+    if PROTO_ARRAY_DEBUG:
+        check_proto_array_weights(store)
+    return head
+
+
+def select_proto_array_head(reference_get_head):  # type: ignore
+    def wrapper(store):  # type: ignore
+        if PROTO_ARRAY_FORK_CHOICE:
+            return get_head_proto_array(store)
+        return reference_get_head(store)
+    return wrapper
+
+
+def record_proto_array_votes(store: Store, indices: Sequence[ValidatorIndex]) -> None:
+    """
+    Record the latest message changes of ``indices`` in the proto-array of ``store``, if it is selected.
+    Otherwise the proto-array is dropped, and rebuilt from the latest messages once selected again.
+    """
+    if not PROTO_ARRAY_FORK_CHOICE:
+        store.__dict__.pop('proto_array', None)
+        return
+    get_proto_array(store).update_votes(store, indices)
+    if PROTO_ARRAY_DEBUG:
+        check_proto_array_weights(store)
+
+
+def _update_latest_messages_recording_votes(store: Store,
+                                            attesting_indices: Sequence[ValidatorIndex],
+                                            attestation: Attestation) -> None:
+    _update_latest_messages(store, attesting_indices, attestation)
+    record_proto_array_votes(store, attesting_indices)
+
+
+def _on_attester_slashing_recording_votes(store: Store, attester_slashing: AttesterSlashing) -> None:
+    _on_attester_slashing(store, attester_slashing)
+    indices = set(attester_slashing.attestation_1.attesting_indices).intersection(
+        attester_slashing.attestation_2.attesting_indices)
+    record_proto_array_votes(store, [ValidatorIndex(index) for index in sorted(indices)])
+
+
+_get_head = get_head
+get_head = select_proto_array_head(_get_head)
+_update_latest_messages = update_latest_messages
+update_latest_messages = _update_latest_messages_recording_votes
+_on_attester_slashing = on_attester_slashing
+on_attester_slashing = _on_attester_slashing_recording_votes
+
+# Prune the store when ``update_checkpoints`` advances finality
+PRUNE_STORE_ON_FINALIZATION = True
+
+# The ``Store`` fields keyed by block root
+STORE_BLOCK_ROOT_FIELDS: Tuple[str, ...] = ('blocks', 'block_states', 'block_timeliness', 'unrealized_justifications')
+
+
+@dataclass
+class StorePruneMetrics(object):
+    """
+    Entries dropped from a ``Store`` by ``prune_store``, per field, over every pruning.
+    """
+    prunes: int = 0
+    # Prunings put off because a checkpoint or the proposer boost still referenced a conflicting block
+    deferred: int = 0
+    reclaimed: dict[str, int] = field(default_factory=dict)
+
+
+def get_store_prune_metrics(store: Store) -> StorePruneMetrics:
+    metrics = store.__dict__.get('prune_metrics')
+    if metrics is None:
+        metrics = store.__dict__['prune_metrics'] = StorePruneMetrics()
+    return metrics
+
+
+def get_finalized_descendants(store: Store) -> Set[Root]:
+    block_children = get_block_children(store)
+    block_children.sync(store)
+    descendants: Set[Root] = set()
+    pending = [store.finalized_checkpoint.root]
+    while len(pending) > 0:
+        root = pending.pop()
+        descendants.add(root)
+        pending.extend(block_children.get(root))
+    return descendants
+
+
+def get_prune_references(store: Store) -> Sequence[Root]:
+    """
+    Return the roots that the justified checkpoint, the unrealized checkpoints ahead of finality and the proposer
+    boost reference. Pruning is put off while any of them does not descend from the finalized block.
+    """
+    referenced = [store.justified_checkpoint.root]
+    for checkpoint in (store.unrealized_justified_checkpoint, store.unrealized_finalized_checkpoint):
+        if checkpoint.epoch > store.finalized_checkpoint.epoch:
+            referenced.append(checkpoint.root)
+    if store.proposer_boost_root != Root():
+        referenced.append(store.proposer_boost_root)
+    return referenced
+
+
+def prune_store(store: Store) -> dict[str, int]:
+    """
+    Drop the blocks that are neither ancestors nor descendants of the finalized block, along with their states,
+    checkpoint states, unrealized justifications and the latest messages voting for them. The chain from the anchor
+    of the store to the finalized block is kept, so that ``get_ancestor`` and ``get_weight`` below the finalized slot
+    resolve as they do without pruning. Return the number of entries dropped per ``Store`` field.
+    """
+    if store.finalized_checkpoint.root not in store.blocks:
+        return {}
+    metrics = get_store_prune_metrics(store)
+    kept = get_finalized_descendants(store)
+    root = store.blocks[store.finalized_checkpoint.root].parent_root
+    while root in store.blocks:
+        kept.add(root)
+        root = store.blocks[root].parent_root
+    referenced = get_prune_references(store)
+    if any(root not in kept for root in referenced):
+        # Retried by ``retry_deferred_prune`` once the references change
+        store.__dict__['prune_deferred_by'] = referenced
+        metrics.deferred += 1
+        return {}
+    store.__dict__.pop('prune_deferred_by', None)
+
+    reclaimed: dict[str, int] = {}
+    for name in STORE_BLOCK_ROOT_FIELDS:
+        entries = getattr(store, name)
+        stale_roots = [root for root in entries if root not in kept]
+        # Children first, so that no kept block state is replayed on top of a dropped one
+        for root in reversed(stale_roots):
+            del entries[root]
+        reclaimed[name] = len(stale_roots)
+    stale_checkpoints = [checkpoint for checkpoint in store.checkpoint_states.keys() if checkpoint.root not in kept]
+    for checkpoint in stale_checkpoints:
+        del store.checkpoint_states[checkpoint]
+    reclaimed['checkpoint_states'] = len(stale_checkpoints)
+    stale_messages = [index for index, message in store.latest_messages.items() if message.root not in kept]
+    for index in stale_messages:
+        del store.latest_messages[index]
+    reclaimed['latest_messages'] = len(stale_messages)
+
+    get_block_children(store).prune(store)
+    get_ancestry_index(store).prune(store)
+    proto_array = store.__dict__.get('proto_array')
+    if proto_array is not None:
+        proto_array.prune(store)
+
+    metrics.prunes += 1
+    for name, count in reclaimed.items():
+        metrics.reclaimed[name] = metrics.reclaimed.get(name, 0) + count
+    return reclaimed
+
+
+def retry_deferred_prune(store: Store) -> None:
+    """
+    Prune the store again if a pruning was put off and the roots that blocked it have changed since.
+    """
+    deferred_by = store.__dict__.get('prune_deferred_by')
+    if PRUNE_STORE_ON_FINALIZATION and deferred_by is not None and get_prune_references(store) != deferred_by:
+        prune_store(store)
+
+
+def _update_checkpoints_pruning_store(store: Store,
+                                      justified_checkpoint: Checkpoint,
+                                      finalized_checkpoint: Checkpoint) -> None:
+    finalized_epoch = store.finalized_checkpoint.epoch
+    _update_checkpoints(store, justified_checkpoint, finalized_checkpoint)
+    if PRUNE_STORE_ON_FINALIZATION and store.finalized_checkpoint.epoch > finalized_epoch:
+        prune_store(store)
+    else:
+        retry_deferred_prune(store)
+
+
+def _update_unrealized_checkpoints_pruning_store(store: Store,
+                                                 unrealized_justified_checkpoint: Checkpoint,
+                                                 unrealized_finalized_checkpoint: Checkpoint) -> None:
+    _update_unrealized_checkpoints(store, unrealized_justified_checkpoint, unrealized_finalized_checkpoint)
+    retry_deferred_prune(store)
+
+
+def _on_tick_per_slot_pruning_store(store: Store, time: uint64) -> None:
+    _on_tick_per_slot(store, time)
+    # A new slot resets the proposer boost
+    retry_deferred_prune(store)
+
+
+_update_checkpoints = update_checkpoints
+update_checkpoints = _update_checkpoints_pruning_store
+_update_unrealized_checkpoints = update_unrealized_checkpoints
+update_unrealized_checkpoints = _update_unrealized_checkpoints_pruning_store
+_on_tick_per_slot = on_tick_per_slot
+on_tick_per_slot = _on_tick_per_slot_pruning_store
+
+
+# Keep full block states only at the first block of each epoch, and replay the others on access
+LAZY_BLOCK_STATES = True
+
+
+def _replay_block_phase0(state: BeaconState, block: BeaconBlock) -> None:
+    process_slots(state, block.slot)
+    process_block(state, block)
+
+
+# Replay an imported block on top of the state of its parent, in ``LazyBlockStates`` of the current fork
+replay_block = _replay_block_phase0
+
+
+class LazyBlockStates(MutableMapping[Root, BeaconState]):
+    """
+    ``store.block_states`` keeping full states only for the anchor and the first block of each epoch.
+
+    The state of any other block is kept as a reference to its parent, and is materialized on access by
+    replaying the block on top of the parent state. Recently stored and materialized states are held in a
+    bounded LRU. Every read of the mapping sees every block root.
+    """
+
+    def __init__(self, store: Store, states: Dict[Root, BeaconState], lru_size: int) -> None:
+        self.store = store
+        # The states kept in full
+        self.states: dict[Root, BeaconState] = dict(states)
+        self.parents: dict[Root, Root] = {}
+        self.dependents: dict[Root, Set[Root]] = {}
+        self.materialized = LRU(size=lru_size)
+        self.replays = 0
+
+    def __setitem__(self, root: Root, state: BeaconState) -> None:
+        if root in self:
+            del self[root]
+        block = self.store.blocks.get(root)
+        if (
+            block is None
+            or block.parent_root not in self.store.blocks
+            or block.parent_root not in self
+            or compute_epoch_at_slot(block.slot) > compute_epoch_at_slot(self.store.blocks[block.parent_root].slot)
+        ):
+            self.states[root] = state
+            return
+        self.parents[root] = block.parent_root
+        self.dependents.setdefault(block.parent_root, set()).add(root)
+        self.materialized[root] = state
+
+    def __getitem__(self, root: Root) -> BeaconState:
+        if root in self.states:
+            return self.states[root]
+        if root not in self.parents:
+            raise KeyError(root)
+        if root in self.materialized:
+            return self.materialized[root]
+        # Replay the blocks since the closest full or materialized state
+        replayed = [root]
+        while replayed[-1] in self.parents and replayed[-1] not in self.materialized:
+            replayed.append(self.parents[replayed[-1]])
+        state = self[replayed.pop()]
+        for block_root in reversed(replayed):
+            state = state.copy()
+            replay_block(state, self.store.blocks[block_root])
+            self.materialized[block_root] = state
+            self.replays += 1
+        return state
+
+    def __contains__(self, root: object) -> bool:
+        return root in self.states or root in self.parents
+
+    def __delitem__(self, root: Root) -> None:
+        # The states replayed on top of ``root`` are kept in full from now on
+        for dependent_root in self.dependents.pop(root, set()):
+            state = self[dependent_root]
+            del self.parents[dependent_root]
+            self.states[dependent_root] = state
+        if root in self.parents:
+            self.dependents[self.parents.pop(root)].discard(root)
+            if root in self.materialized:
+                del self.materialized[root]
+        else:
+            del self.states[root]
+
+    def __iter__(self) -> Iterator[Root]:
+        yield from self.states
+        yield from self.parents
+
+    def __len__(self) -> int:
+        return len(self.states) + len(self.parents)
+
+    def copy(self) -> Dict[Root, BeaconState]:
+        return dict(self.items())
+
+
+def _get_forkchoice_store_with_lazy_block_states(anchor_state: BeaconState, anchor_block: BeaconBlock) -> Store:
+    store = _get_forkchoice_store(anchor_state, anchor_block)
+    if LAZY_BLOCK_STATES:
+        store.block_states = LazyBlockStates(  # type: ignore
+            store, store.block_states, lru_size=SLOTS_PER_EPOCH)
+    return store
+
+
+_get_forkchoice_store = get_forkchoice_store
+get_forkchoice_store = _get_forkchoice_store_with_lazy_block_states
+
+
+# Reuse the state of a checkpoint root already advanced to an earlier epoch when storing a target checkpoint state
+REUSE_ADVANCED_CHECKPOINT_STATES = True
+
+
+@dataclass
+class CheckpointStateCacheStats(object):
+    hits: int = 0
+    misses: int = 0
+    reuses: int = 0
+
+
+def get_checkpoint_state_cache_stats(store: Store) -> CheckpointStateCacheStats:
+    if 'checkpoint_state_cache_stats' not in store.__dict__:
+        store.__dict__['checkpoint_state_cache_stats'] = CheckpointStateCacheStats()
+    return store.__dict__['checkpoint_state_cache_stats']
+
+
+def get_advanced_checkpoint_state(store: Store, target: Checkpoint) -> Optional[BeaconState]:
+    """
+    Return the stored state of ``target.root`` advanced to the latest epoch before ``target.epoch``, if any.
+    Only the epochs after the epoch of the block can hold a state advanced past the block state.
+    """
+    if target.root not in store.blocks:
+        return None
+    block_epoch = compute_epoch_at_slot(store.blocks[target.root].slot)
+    for epoch in range(target.epoch - 1, block_epoch, -1):
+        checkpoint = Checkpoint(epoch=epoch, root=target.root)
+        if checkpoint in store.checkpoint_states:
+            return store.checkpoint_states[checkpoint]
+    return None
+
+
+def _store_target_checkpoint_state_reusing_advanced_states(store: Store, target: Checkpoint) -> None:
+    stats = get_checkpoint_state_cache_stats(store)
+    if target in store.checkpoint_states:
+        stats.hits += 1
+        return
+    stats.misses += 1
+    advanced_state = get_advanced_checkpoint_state(store, target) if REUSE_ADVANCED_CHECKPOINT_STATES else None
+    if advanced_state is None:
+        _store_target_checkpoint_state(store, target)
+        return
+    stats.reuses += 1
+    base_state = copy(advanced_state)
+    process_slots(base_state, compute_start_slot_at_epoch(target.epoch))
+    store.checkpoint_states[target] = base_state
+
+
+_store_target_checkpoint_state = store_target_checkpoint_state
+store_target_checkpoint_state = _store_target_checkpoint_state_reusing_advanced_states
+
+
+def get_attestation_committee_indices(attestation: Attestation) -> Sequence[CommitteeIndex]:
+    return [attestation.data.index]
+
+
+def get_attesting_indices_from_committees(
+        state: BeaconState,
+        attestation: Attestation,
+        committees: Dict[Tuple[Slot, CommitteeIndex], Sequence[ValidatorIndex]]) -> Set[ValidatorIndex]:
+    """
+    ``get_attesting_indices`` resolving each beacon committee once per ``(slot, index)`` in ``committees``.
+    """
+    output: Set[ValidatorIndex] = set()
+    committee_offset = 0
+    for index in get_attestation_committee_indices(attestation):
+        key = (attestation.data.slot, index)
+        if key not in committees:
+            committees[key] = get_beacon_committee(state, attestation.data.slot, index)
+        committee = committees[key]
+        output.update(
+            validator_index for i, validator_index in enumerate(committee)
+            if attestation.aggregation_bits[committee_offset + i]
+        )
+        committee_offset += len(committee)
+    return output
+
+
+def on_attestations(store: Store, attestations: Sequence[Attestation], is_from_block: bool=False) -> Sequence[bool]:
+    """
+    Run ``on_attestation`` upon receiving a batch of ``attestations``, and return whether each one is accepted.
+
+    Attestations are grouped by target checkpoint, so each target state is stored once and each beacon committee
+    is resolved once per ``(slot, index)``. Aggregate signatures are verified together, and one by one only if the
+    batch fails. Latest messages are then updated in a single pass, in the order of ``attestations``.
+    An attestation that fails with any error, e.g. an ``IndexError`` on malformed aggregation bits, is rejected
+    on its own.
+    """
+    targets: dict[Checkpoint, list[int]] = {}
+    for i, attestation in enumerate(attestations):
+        try:
+            validate_on_attestation(store, attestation, is_from_block)
+        except Exception:
+            continue
+        targets.setdefault(attestation.data.target, []).append(i)
+
+    indexed_attestations: dict[int, IndexedAttestation] = {}
+    signature_sets: dict[int, Tuple[Sequence[BLSPubkey], Root, BLSSignature]] = {}
+    for target, target_indices in targets.items():
+        store_target_checkpoint_state(store, target)
+        target_state = store.checkpoint_states[target]
+        domain = get_domain(target_state, DOMAIN_BEACON_ATTESTER, target.epoch)
+        committees: dict[Tuple[Slot, CommitteeIndex], Sequence[ValidatorIndex]] = {}
+        for i in target_indices:
+            attestation = attestations[i]
+            try:
+                attesting_indices = sorted(get_attesting_indices_from_committees(target_state, attestation, committees))
+                if len(attesting_indices) == 0:
+                    continue
+                indexed_attestation = IndexedAttestation(
+                    attesting_indices=attesting_indices,
+                    data=attestation.data,
+                    signature=attestation.signature,
+                )
+                signature_set = (
+                    [target_state.validators[index].pubkey for index in attesting_indices],
+                    compute_signing_root(attestation.data, domain),
+                    attestation.signature,
+                )
+            except Exception:
+                continue
+            indexed_attestations[i] = indexed_attestation
+            signature_sets[i] = signature_set
+
+    if bls.BatchFastAggregateVerify(list(signature_sets.values())):
+        accepted = set(signature_sets.keys())
+    else:
+        accepted = set(i for i, signature_set in signature_sets.items() if bls.FastAggregateVerify(*signature_set))
+
+    for i in sorted(accepted):
+        update_latest_messages(store, indexed_attestations[i].attesting_indices, attestations[i])
+    return [i in accepted for i in range(len(attestations))]
+
+
+class PulledUpCheckpoints(NamedTuple):
+    current_justified_checkpoint: Checkpoint
+    finalized_checkpoint: Checkpoint
+
+
+def _get_justification_target_balances_phase0(state: BeaconState) -> Tuple[Gwei, Gwei]:
+    previous_attestations = get_matching_target_attestations(state, get_previous_epoch(state))
+    current_attestations = get_matching_target_attestations(state, get_current_epoch(state))
+    return get_attesting_balance(state, previous_attestations), get_attesting_balance(state, current_attestations)
+
+
+# The previous and current epoch target balances of ``process_justification_and_finalization`` of the current fork
+get_justification_target_balances = _get_justification_target_balances_phase0
+
+
+def compute_justification_and_finalization(state: BeaconState,
+                                           total_active_balance: Gwei,
+                                           previous_epoch_target_balance: Gwei,
+                                           current_epoch_target_balance: Gwei) -> PulledUpCheckpoints:
+    """
+    Return the justified and finalized checkpoints that ``weigh_justification_and_finalization`` leaves in ``state``,
+    without modifying ``state``.
+    """
+    previous_epoch = get_previous_epoch(state)
+    current_epoch = get_current_epoch(state)
+    old_previous_justified_checkpoint = state.previous_justified_checkpoint
+    old_current_justified_checkpoint = state.current_justified_checkpoint
+    current_justified_checkpoint = state.current_justified_checkpoint
+    finalized_checkpoint = state.finalized_checkpoint
+
+    # Process justifications
+    bits = [False] + [bool(bit) for bit in state.justification_bits[:JUSTIFICATION_BITS_LENGTH - 1]]
+    if previous_epoch_target_balance * 3 >= total_active_balance * 2:
+        current_justified_checkpoint = Checkpoint(epoch=previous_epoch, root=get_block_root(state, previous_epoch))
+        bits[1] = True
+    if current_epoch_target_balance * 3 >= total_active_balance * 2:
+        current_justified_checkpoint = Checkpoint(epoch=current_epoch, root=get_block_root(state, current_epoch))
+        bits[0] = True
+
+    # Process finalizations
+    if all(bits[1:4]) and old_previous_justified_checkpoint.epoch + 3 == current_epoch:
+        finalized_checkpoint = old_previous_justified_checkpoint
+    if all(bits[1:3]) and old_previous_justified_checkpoint.epoch + 2 == current_epoch:
+        finalized_checkpoint = old_previous_justified_checkpoint
+    if all(bits[0:3]) and old_current_justified_checkpoint.epoch + 2 == current_epoch:
+        finalized_checkpoint = old_current_justified_checkpoint
+    if all(bits[0:2]) and old_current_justified_checkpoint.epoch + 1 == current_epoch:
+        finalized_checkpoint = old_current_justified_checkpoint
+    return PulledUpCheckpoints(current_justified_checkpoint, finalized_checkpoint)
+
+
+def compute_pulled_up_checkpoints(state: BeaconState) -> PulledUpCheckpoints:
+    """
+    Return the justified and finalized checkpoints of ``state`` pulled up to the next epoch boundary,
+    as ``process_justification_and_finalization`` would leave them, without copying ``state``.
+    """
+    # Skip FFG updates in the first two epochs, as ``process_justification_and_finalization`` does
+    if get_current_epoch(state) <= GENESIS_EPOCH + 1:
+        return PulledUpCheckpoints(state.current_justified_checkpoint, state.finalized_checkpoint)
+    previous_target_balance, current_target_balance = get_justification_target_balances(state)
+    return compute_justification_and_finalization(
+        state, get_total_active_balance(state), previous_target_balance, current_target_balance)
+
+
+get_pulled_up_checkpoints = cache_this(
+    lambda state: (state.hash_tree_root(), get_current_epoch(state)),
+    lambda state: compute_pulled_up_checkpoints(state), lru_size=SLOTS_PER_EPOCH * 2)'''
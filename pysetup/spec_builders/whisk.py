@@ -14,6 +14,14 @@ import curdleproofs
 import json
 '''
 
+    @classmethod
+    def sundry_functions(cls) -> str:
+        return '''
+# Whisk proposers are revealed by the block header rather than sampled by effective balance
+get_beacon_proposer_index = _get_beacon_proposer_index
+# Nor can they be looked ahead: the proposers of an epoch are only known once their block headers are processed
+del get_beacon_proposer_indices'''
+
     @classmethod
     def hardcoded_custom_type_dep_constants(cls, spec_object) -> str:
         # Necessary for custom types `WhiskShuffleProof` and `WhiskTrackerProof`
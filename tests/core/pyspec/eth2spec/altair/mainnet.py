@@ -0,0 +1,5364 @@
+from lru import LRU
+from dataclasses import (
+    dataclass,
+    field,
+)
+from collections.abc import MutableMapping
+from typing import (
+    Any, Callable, Dict, Iterator, Set, Sequence, Tuple, Optional, TypeVar, NamedTuple, Final
+)
+
+from eth2spec.utils.ssz.ssz_impl import hash_tree_root, copy, uint_to_bytes
+from eth2spec.utils.ssz.ssz_impl import (  # noqa: F401
+    get_element_nodes, get_container_field_nodes, get_container_field_roots, packed_list_from_bytes)
+from eth2spec.utils.ssz.ssz_typing import (
+    View, boolean, Container, List, Vector, uint8, uint32, uint64, uint256,
+    Bytes1, Bytes4, Bytes32, Bytes48, Bytes96, Bitlist)
+from eth2spec.utils.ssz.ssz_typing import Bitvector  # noqa: F401
+from eth2spec.utils import bls
+from eth2spec.utils.hash_function import hash
+
+try:
+    import numpy  # noqa: F401
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+from typing import NewType, Union as PyUnion
+
+from eth2spec.phase0 import mainnet as phase0
+from eth2spec.test.helpers.merkle import build_proof
+from eth2spec.utils.ssz.ssz_typing import Path
+
+
+SSZObject = TypeVar('SSZObject', bound=View)
+
+
+SSZVariableName = str
+GeneralizedIndex = NewType('GeneralizedIndex', int)
+
+
+fork = 'altair'
+
+
+def ceillog2(x: int) -> uint64:
+    if x < 1:
+        raise ValueError(f"ceillog2 accepts only positive values, x={x}")
+    return uint64((x - 1).bit_length())
+
+
+def floorlog2(x: int) -> uint64:
+    if x < 1:
+        raise ValueError(f"floorlog2 accepts only positive values, x={x}")
+    return uint64(x.bit_length() - 1)
+
+
+FINALIZED_ROOT_GINDEX = GeneralizedIndex(105)
+CURRENT_SYNC_COMMITTEE_GINDEX = GeneralizedIndex(54)
+NEXT_SYNC_COMMITTEE_GINDEX = GeneralizedIndex(55)
+
+
+class Slot(uint64):
+    pass
+
+
+class Epoch(uint64):
+    pass
+
+
+class CommitteeIndex(uint64):
+    pass
+
+
+class ValidatorIndex(uint64):
+    pass
+
+
+class Gwei(uint64):
+    pass
+
+
+class Root(Bytes32):
+    pass
+
+
+class Hash32(Bytes32):
+    pass
+
+
+class Version(Bytes4):
+    pass
+
+
+class DomainType(Bytes4):
+    pass
+
+
+class ForkDigest(Bytes4):
+    pass
+
+
+class Domain(Bytes32):
+    pass
+
+
+class BLSPubkey(Bytes48):
+    pass
+
+
+class BLSSignature(Bytes96):
+    pass
+
+
+class NodeID(uint256):
+    pass
+
+
+class SubnetID(uint64):
+    pass
+
+
+class Ether(uint64):
+    pass
+
+
+class ParticipationFlags(uint8):
+    pass
+
+
+class FinalityBranch(Vector[Bytes32, floorlog2(FINALIZED_ROOT_GINDEX)]):  # type: ignore
+    pass
+
+
+class CurrentSyncCommitteeBranch(Vector[Bytes32, floorlog2(CURRENT_SYNC_COMMITTEE_GINDEX)]):  # type: ignore
+    pass
+
+
+class NextSyncCommitteeBranch(Vector[Bytes32, floorlog2(NEXT_SYNC_COMMITTEE_GINDEX)]):  # type: ignore
+    pass
+
+
+# Constant vars
+UINT64_MAX = uint64(2**64 - 1)
+UINT64_MAX_SQRT = uint64(4294967295)
+GENESIS_SLOT = Slot(0)
+GENESIS_EPOCH = Epoch(0)
+FAR_FUTURE_EPOCH = Epoch(2**64 - 1)
+BASE_REWARDS_PER_EPOCH = uint64(4)
+DEPOSIT_CONTRACT_TREE_DEPTH = uint64(2**5)
+JUSTIFICATION_BITS_LENGTH = uint64(4)
+ENDIANNESS: Final = 'little'
+BLS_WITHDRAWAL_PREFIX = Bytes1('0x00')
+ETH1_ADDRESS_WITHDRAWAL_PREFIX = Bytes1('0x01')
+DOMAIN_BEACON_PROPOSER = DomainType('0x00000000')
+DOMAIN_BEACON_ATTESTER = DomainType('0x01000000')
+DOMAIN_RANDAO = DomainType('0x02000000')
+DOMAIN_DEPOSIT = DomainType('0x03000000')
+DOMAIN_VOLUNTARY_EXIT = DomainType('0x04000000')
+DOMAIN_SELECTION_PROOF = DomainType('0x05000000')
+DOMAIN_AGGREGATE_AND_PROOF = DomainType('0x06000000')
+DOMAIN_APPLICATION_MASK = DomainType('0x00000001')
+INTERVALS_PER_SLOT = uint64(3)
+NODE_ID_BITS = 256
+MAX_CONCURRENT_REQUESTS = 2
+TARGET_AGGREGATORS_PER_COMMITTEE = 2**4
+ETH_TO_GWEI = uint64(10**9)
+SAFETY_DECAY = uint64(10)
+TIMELY_SOURCE_FLAG_INDEX = 0
+TIMELY_TARGET_FLAG_INDEX = 1
+TIMELY_HEAD_FLAG_INDEX = 2
+TIMELY_SOURCE_WEIGHT = uint64(14)
+TIMELY_TARGET_WEIGHT = uint64(26)
+TIMELY_HEAD_WEIGHT = uint64(14)
+SYNC_REWARD_WEIGHT = uint64(2)
+PROPOSER_WEIGHT = uint64(8)
+WEIGHT_DENOMINATOR = uint64(64)
+DOMAIN_SYNC_COMMITTEE = DomainType('0x07000000')
+DOMAIN_SYNC_COMMITTEE_SELECTION_PROOF = DomainType('0x08000000')
+DOMAIN_CONTRIBUTION_AND_PROOF = DomainType('0x09000000')
+PARTICIPATION_FLAG_WEIGHTS = [TIMELY_SOURCE_WEIGHT, TIMELY_TARGET_WEIGHT, TIMELY_HEAD_WEIGHT]
+G2_POINT_AT_INFINITY = BLSSignature(b'\xc0' + b'\x00' * 95)
+TARGET_AGGREGATORS_PER_SYNC_SUBCOMMITTEE = 2**4
+SYNC_COMMITTEE_SUBNET_COUNT = 4
+MAX_REQUEST_LIGHT_CLIENT_UPDATES = 2**7
+
+
+# Preset vars
+MAX_COMMITTEES_PER_SLOT = uint64(64)
+TARGET_COMMITTEE_SIZE = uint64(128)
+MAX_VALIDATORS_PER_COMMITTEE = uint64(2048)
+SHUFFLE_ROUND_COUNT = uint64(90)
+HYSTERESIS_QUOTIENT = uint64(4)
+HYSTERESIS_DOWNWARD_MULTIPLIER = uint64(1)
+HYSTERESIS_UPWARD_MULTIPLIER = uint64(5)
+MIN_DEPOSIT_AMOUNT = Gwei(1000000000)
+MAX_EFFECTIVE_BALANCE = Gwei(32000000000)
+EFFECTIVE_BALANCE_INCREMENT = Gwei(1000000000)
+MIN_ATTESTATION_INCLUSION_DELAY = uint64(1)
+SLOTS_PER_EPOCH = uint64(32)
+MIN_SEED_LOOKAHEAD = uint64(1)
+MAX_SEED_LOOKAHEAD = uint64(4)
+MIN_EPOCHS_TO_INACTIVITY_PENALTY = uint64(4)
+EPOCHS_PER_ETH1_VOTING_PERIOD = uint64(64)
+SLOTS_PER_HISTORICAL_ROOT = uint64(8192)
+EPOCHS_PER_HISTORICAL_VECTOR = uint64(65536)
+EPOCHS_PER_SLASHINGS_VECTOR = uint64(8192)
+HISTORICAL_ROOTS_LIMIT = uint64(16777216)
+VALIDATOR_REGISTRY_LIMIT = uint64(1099511627776)
+BASE_REWARD_FACTOR = uint64(64)
+WHISTLEBLOWER_REWARD_QUOTIENT = uint64(512)
+PROPOSER_REWARD_QUOTIENT = uint64(8)
+INACTIVITY_PENALTY_QUOTIENT = uint64(67108864)
+MIN_SLASHING_PENALTY_QUOTIENT = uint64(128)
+PROPORTIONAL_SLASHING_MULTIPLIER = uint64(1)
+MAX_PROPOSER_SLASHINGS = 16
+MAX_ATTESTER_SLASHINGS = 2
+MAX_ATTESTATIONS = 128
+MAX_DEPOSITS = 16
+MAX_VOLUNTARY_EXITS = 16
+INACTIVITY_PENALTY_QUOTIENT_ALTAIR = uint64(50331648)
+MIN_SLASHING_PENALTY_QUOTIENT_ALTAIR = uint64(64)
+PROPORTIONAL_SLASHING_MULTIPLIER_ALTAIR = uint64(2)
+SYNC_COMMITTEE_SIZE = uint64(512)
+EPOCHS_PER_SYNC_COMMITTEE_PERIOD = uint64(256)
+MIN_SYNC_COMMITTEE_PARTICIPANTS = 1
+UPDATE_TIMEOUT = 8192
+
+
+class Configuration(NamedTuple):
+    PRESET_BASE: str
+    MIN_GENESIS_ACTIVE_VALIDATOR_COUNT: uint64
+    MIN_GENESIS_TIME: uint64
+    GENESIS_FORK_VERSION: Version
+    GENESIS_DELAY: uint64
+    SECONDS_PER_SLOT: uint64
+    SECONDS_PER_ETH1_BLOCK: uint64
+    MIN_VALIDATOR_WITHDRAWABILITY_DELAY: uint64
+    SHARD_COMMITTEE_PERIOD: uint64
+    ETH1_FOLLOW_DISTANCE: uint64
+    EJECTION_BALANCE: Gwei
+    MIN_PER_EPOCH_CHURN_LIMIT: uint64
+    CHURN_LIMIT_QUOTIENT: uint64
+    PROPOSER_SCORE_BOOST: uint64
+    REORG_HEAD_WEIGHT_THRESHOLD: uint64
+    REORG_PARENT_WEIGHT_THRESHOLD: uint64
+    REORG_MAX_EPOCHS_SINCE_FINALIZATION: Epoch
+    MAX_PAYLOAD_SIZE: int
+    MAX_REQUEST_BLOCKS: int
+    EPOCHS_PER_SUBNET_SUBSCRIPTION: int
+    MIN_EPOCHS_FOR_BLOCK_REQUESTS: int
+    ATTESTATION_PROPAGATION_SLOT_RANGE: int
+    MAXIMUM_GOSSIP_CLOCK_DISPARITY: int
+    MESSAGE_DOMAIN_INVALID_SNAPPY: DomainType
+    MESSAGE_DOMAIN_VALID_SNAPPY: DomainType
+    SUBNETS_PER_NODE: int
+    ATTESTATION_SUBNET_COUNT: int
+    ATTESTATION_SUBNET_EXTRA_BITS: int
+    ATTESTATION_SUBNET_PREFIX_BITS: int
+    INACTIVITY_SCORE_BIAS: uint64
+    INACTIVITY_SCORE_RECOVERY_RATE: uint64
+    ALTAIR_FORK_VERSION: Version
+    ALTAIR_FORK_EPOCH: Epoch
+
+
+config = Configuration(
+    PRESET_BASE="mainnet",
+    MIN_GENESIS_ACTIVE_VALIDATOR_COUNT=uint64(16384),
+    MIN_GENESIS_TIME=uint64(1606824000),
+    GENESIS_FORK_VERSION=Version('0x00000000'),
+    GENESIS_DELAY=uint64(604800),
+    SECONDS_PER_SLOT=uint64(12),
+    SECONDS_PER_ETH1_BLOCK=uint64(14),
+    MIN_VALIDATOR_WITHDRAWABILITY_DELAY=uint64(256),
+    SHARD_COMMITTEE_PERIOD=uint64(256),
+    ETH1_FOLLOW_DISTANCE=uint64(2048),
+    EJECTION_BALANCE=Gwei(16000000000),
+    MIN_PER_EPOCH_CHURN_LIMIT=uint64(4),
+    CHURN_LIMIT_QUOTIENT=uint64(65536),
+    PROPOSER_SCORE_BOOST=uint64(40),
+    REORG_HEAD_WEIGHT_THRESHOLD=uint64(20),
+    REORG_PARENT_WEIGHT_THRESHOLD=uint64(160),
+    REORG_MAX_EPOCHS_SINCE_FINALIZATION=Epoch(2),
+    MAX_PAYLOAD_SIZE=10485760,
+    MAX_REQUEST_BLOCKS=1024,
+    EPOCHS_PER_SUBNET_SUBSCRIPTION=256,
+    MIN_EPOCHS_FOR_BLOCK_REQUESTS=33024,
+    ATTESTATION_PROPAGATION_SLOT_RANGE=32,
+    MAXIMUM_GOSSIP_CLOCK_DISPARITY=500,
+    MESSAGE_DOMAIN_INVALID_SNAPPY=DomainType('0x00000000'),
+    MESSAGE_DOMAIN_VALID_SNAPPY=DomainType('0x01000000'),
+    SUBNETS_PER_NODE=2,
+    ATTESTATION_SUBNET_COUNT=64,
+    ATTESTATION_SUBNET_EXTRA_BITS=0,
+    ATTESTATION_SUBNET_PREFIX_BITS=int(6),
+    INACTIVITY_SCORE_BIAS=uint64(4),
+    INACTIVITY_SCORE_RECOVERY_RATE=uint64(16),
+    ALTAIR_FORK_VERSION=Version('0x01000000'),
+    ALTAIR_FORK_EPOCH=Epoch(74240),
+)
+
+
+class Fork(Container):
+    previous_version: Version
+    current_version: Version
+    epoch: Epoch  # Epoch of latest fork
+
+
+class ForkData(Container):
+    current_version: Version
+    genesis_validators_root: Root
+
+
+class Checkpoint(Container):
+    epoch: Epoch
+    root: Root
+
+
+class Validator(Container):
+    pubkey: BLSPubkey
+    withdrawal_credentials: Bytes32  # Commitment to pubkey for withdrawals
+    effective_balance: Gwei  # Balance at stake
+    slashed: boolean
+    # Status epochs
+    activation_eligibility_epoch: Epoch  # When criteria for activation were met
+    activation_epoch: Epoch
+    exit_epoch: Epoch
+    withdrawable_epoch: Epoch  # When validator can withdraw funds
+
+
+class AttestationData(Container):
+    slot: Slot
+    index: CommitteeIndex
+    # LMD GHOST vote
+    beacon_block_root: Root
+    # FFG vote
+    source: Checkpoint
+    target: Checkpoint
+
+
+class IndexedAttestation(Container):
+    attesting_indices: List[ValidatorIndex, MAX_VALIDATORS_PER_COMMITTEE]
+    data: AttestationData
+    signature: BLSSignature
+
+
+class PendingAttestation(Container):
+    aggregation_bits: Bitlist[MAX_VALIDATORS_PER_COMMITTEE]
+    data: AttestationData
+    inclusion_delay: Slot
+    proposer_index: ValidatorIndex
+
+
+class Eth1Data(Container):
+    deposit_root: Root
+    deposit_count: uint64
+    block_hash: Hash32
+
+
+class HistoricalBatch(Container):
+    block_roots: Vector[Root, SLOTS_PER_HISTORICAL_ROOT]
+    state_roots: Vector[Root, SLOTS_PER_HISTORICAL_ROOT]
+
+
+class DepositMessage(Container):
+    pubkey: BLSPubkey
+    withdrawal_credentials: Bytes32
+    amount: Gwei
+
+
+class DepositData(Container):
+    pubkey: BLSPubkey
+    withdrawal_credentials: Bytes32
+    amount: Gwei
+    signature: BLSSignature  # Signing over DepositMessage
+
+
+class BeaconBlockHeader(Container):
+    slot: Slot
+    proposer_index: ValidatorIndex
+    parent_root: Root
+    state_root: Root
+    body_root: Root
+
+
+class SigningData(Container):
+    object_root: Root
+    domain: Domain
+
+
+class AttesterSlashing(Container):
+    attestation_1: IndexedAttestation
+    attestation_2: IndexedAttestation
+
+
+class Attestation(Container):
+    aggregation_bits: Bitlist[MAX_VALIDATORS_PER_COMMITTEE]
+    data: AttestationData
+    signature: BLSSignature
+
+
+class Deposit(Container):
+    proof: Vector[Bytes32, DEPOSIT_CONTRACT_TREE_DEPTH + 1]  # Merkle path to deposit root
+    data: DepositData
+
+
+class VoluntaryExit(Container):
+    epoch: Epoch  # Earliest epoch when voluntary exit can be processed
+    validator_index: ValidatorIndex
+
+
+class SignedVoluntaryExit(Container):
+    message: VoluntaryExit
+    signature: BLSSignature
+
+
+class SignedBeaconBlockHeader(Container):
+    message: BeaconBlockHeader
+    signature: BLSSignature
+
+
+class ProposerSlashing(Container):
+    signed_header_1: SignedBeaconBlockHeader
+    signed_header_2: SignedBeaconBlockHeader
+
+
+class Eth1Block(Container):
+    timestamp: uint64
+    deposit_root: Root
+    deposit_count: uint64
+    # All other eth1 block fields
+
+
+class AggregateAndProof(Container):
+    aggregator_index: ValidatorIndex
+    aggregate: Attestation
+    selection_proof: BLSSignature
+
+
+class SignedAggregateAndProof(Container):
+    message: AggregateAndProof
+    signature: BLSSignature
+
+
+class SyncAggregate(Container):
+    sync_committee_bits: Bitvector[SYNC_COMMITTEE_SIZE]
+    sync_committee_signature: BLSSignature
+
+
+class BeaconBlockBody(Container):
+    randao_reveal: BLSSignature
+    eth1_data: Eth1Data  # Eth1 data vote
+    graffiti: Bytes32  # Arbitrary data
+    # Operations
+    proposer_slashings: List[ProposerSlashing, MAX_PROPOSER_SLASHINGS]
+    attester_slashings: List[AttesterSlashing, MAX_ATTESTER_SLASHINGS]
+    attestations: List[Attestation, MAX_ATTESTATIONS]
+    deposits: List[Deposit, MAX_DEPOSITS]
+    voluntary_exits: List[SignedVoluntaryExit, MAX_VOLUNTARY_EXITS]
+    sync_aggregate: SyncAggregate  # [New in Altair]
+
+
+class BeaconBlock(Container):
+    slot: Slot
+    proposer_index: ValidatorIndex
+    parent_root: Root
+    state_root: Root
+    body: BeaconBlockBody
+
+
+class SignedBeaconBlock(Container):
+    message: BeaconBlock
+    signature: BLSSignature
+
+
+class SyncCommittee(Container):
+    pubkeys: Vector[BLSPubkey, SYNC_COMMITTEE_SIZE]
+    aggregate_pubkey: BLSPubkey
+
+
+class BeaconState(Container):
+    # Versioning
+    genesis_time: uint64
+    genesis_validators_root: Root
+    slot: Slot
+    fork: Fork
+    # History
+    latest_block_header: BeaconBlockHeader
+    block_roots: Vector[Root, SLOTS_PER_HISTORICAL_ROOT]
+    state_roots: Vector[Root, SLOTS_PER_HISTORICAL_ROOT]
+    historical_roots: List[Root, HISTORICAL_ROOTS_LIMIT]
+    # Eth1
+    eth1_data: Eth1Data
+    eth1_data_votes: List[Eth1Data, EPOCHS_PER_ETH1_VOTING_PERIOD * SLOTS_PER_EPOCH]
+    eth1_deposit_index: uint64
+    # Registry
+    validators: List[Validator, VALIDATOR_REGISTRY_LIMIT]
+    balances: List[Gwei, VALIDATOR_REGISTRY_LIMIT]
+    # Randomness
+    randao_mixes: Vector[Bytes32, EPOCHS_PER_HISTORICAL_VECTOR]
+    # Slashings
+    slashings: Vector[Gwei, EPOCHS_PER_SLASHINGS_VECTOR]  # Per-epoch sums of slashed effective balances
+    # Participation
+    previous_epoch_participation: List[ParticipationFlags, VALIDATOR_REGISTRY_LIMIT]  # [Modified in Altair]
+    current_epoch_participation: List[ParticipationFlags, VALIDATOR_REGISTRY_LIMIT]  # [Modified in Altair]
+    # Finality
+    justification_bits: Bitvector[JUSTIFICATION_BITS_LENGTH]  # Bit set for every recent justified epoch
+    previous_justified_checkpoint: Checkpoint
+    current_justified_checkpoint: Checkpoint
+    finalized_checkpoint: Checkpoint
+    # Inactivity
+    inactivity_scores: List[uint64, VALIDATOR_REGISTRY_LIMIT]  # [New in Altair]
+    # Sync
+    current_sync_committee: SyncCommittee  # [New in Altair]
+    next_sync_committee: SyncCommittee  # [New in Altair]
+
+
+class SyncCommitteeMessage(Container):
+    # Slot to which this contribution pertains
+    slot: Slot
+    # Block root for this signature
+    beacon_block_root: Root
+    # Index of the validator that produced this signature
+    validator_index: ValidatorIndex
+    # Signature by the validator over the block root of `slot`
+    signature: BLSSignature
+
+
+class SyncCommitteeContribution(Container):
+    # Slot to which this contribution pertains
+    slot: Slot
+    # Block root for this contribution
+    beacon_block_root: Root
+    # The subcommittee this contribution pertains to out of the broader sync committee
+    subcommittee_index: uint64
+    # A bit is set if a signature from the validator at the corresponding
+    # index in the subcommittee is present in the aggregate `signature`.
+    aggregation_bits: Bitvector[SYNC_COMMITTEE_SIZE // SYNC_COMMITTEE_SUBNET_COUNT]
+    # Signature by the validator(s) over the block root of `slot`
+    signature: BLSSignature
+
+
+class ContributionAndProof(Container):
+    aggregator_index: ValidatorIndex
+    contribution: SyncCommitteeContribution
+    selection_proof: BLSSignature
+
+
+class SignedContributionAndProof(Container):
+    message: ContributionAndProof
+    signature: BLSSignature
+
+
+class SyncAggregatorSelectionData(Container):
+    slot: Slot
+    subcommittee_index: uint64
+
+
+class LightClientHeader(Container):
+    # Beacon block header
+    beacon: BeaconBlockHeader
+
+
+class LightClientBootstrap(Container):
+    # Header matching the requested beacon block root
+    header: LightClientHeader
+    # Current sync committee corresponding to `header.beacon.state_root`
+    current_sync_committee: SyncCommittee
+    current_sync_committee_branch: CurrentSyncCommitteeBranch
+
+
+class LightClientUpdate(Container):
+    # Header attested to by the sync committee
+    attested_header: LightClientHeader
+    # Next sync committee corresponding to `attested_header.beacon.state_root`
+    next_sync_committee: SyncCommittee
+    next_sync_committee_branch: NextSyncCommitteeBranch
+    # Finalized header corresponding to `attested_header.beacon.state_root`
+    finalized_header: LightClientHeader
+    finality_branch: FinalityBranch
+    # Sync committee aggregate signature
+    sync_aggregate: SyncAggregate
+    # Slot at which the aggregate signature was created (untrusted)
+    signature_slot: Slot
+
+
+class LightClientFinalityUpdate(Container):
+    # Header attested to by the sync committee
+    attested_header: LightClientHeader
+    # Finalized header corresponding to `attested_header.beacon.state_root`
+    finalized_header: LightClientHeader
+    finality_branch: FinalityBranch
+    # Sync committee aggregate signature
+    sync_aggregate: SyncAggregate
+    # Slot at which the aggregate signature was created (untrusted)
+    signature_slot: Slot
+
+
+class LightClientOptimisticUpdate(Container):
+    # Header attested to by the sync committee
+    attested_header: LightClientHeader
+    # Sync committee aggregate signature
+    sync_aggregate: SyncAggregate
+    # Slot at which the aggregate signature was created (untrusted)
+    signature_slot: Slot
+
+
+@dataclass(eq=True, frozen=True)
+class LatestMessage(object):
+    epoch: Epoch
+    root: Root
+
+
+@dataclass
+class Store(object):
+    time: uint64
+    genesis_time: uint64
+    justified_checkpoint: Checkpoint
+    finalized_checkpoint: Checkpoint
+    unrealized_justified_checkpoint: Checkpoint
+    unrealized_finalized_checkpoint: Checkpoint
+    proposer_boost_root: Root
+    equivocating_indices: Set[ValidatorIndex]
+    blocks: Dict[Root, BeaconBlock] = field(default_factory=dict)
+    block_states: Dict[Root, BeaconState] = field(default_factory=dict)
+    block_timeliness: Dict[Root, boolean] = field(default_factory=dict)
+    checkpoint_states: Dict[Checkpoint, BeaconState] = field(default_factory=dict)
+    latest_messages: Dict[ValidatorIndex, LatestMessage] = field(default_factory=dict)
+    unrealized_justifications: Dict[Root, Checkpoint] = field(default_factory=dict)
+
+
+@dataclass
+class LightClientStore(object):
+    # Header that is finalized
+    finalized_header: LightClientHeader
+    # Sync committees corresponding to the finalized header
+    current_sync_committee: SyncCommittee
+    next_sync_committee: SyncCommittee
+    # Best available header to switch finalized head to if we see nothing else
+    best_valid_update: Optional[LightClientUpdate]
+    # Most recent available reasonably-safe header
+    optimistic_header: LightClientHeader
+    # Max number of active participants in a sync committee (used to calculate safety threshold)
+    previous_max_active_participants: uint64
+    current_max_active_participants: uint64
+
+
+def integer_squareroot(n: uint64) -> uint64:
+    """
+    Return the largest integer ``x`` such that ``x**2 <= n``.
+    """
+    if n == UINT64_MAX:
+        return UINT64_MAX_SQRT
+    x = n
+    y = (x + 1) // 2
+    while y < x:
+        x = y
+        y = (x + n // x) // 2
+    return x
+
+
+def xor(bytes_1: Bytes32, bytes_2: Bytes32) -> Bytes32:
+    """
+    Return the exclusive-or of two 32-byte strings.
+    """
+    return Bytes32(a ^ b for a, b in zip(bytes_1, bytes_2))
+
+
+def bytes_to_uint64(data: bytes) -> uint64:
+    """
+    Return the integer deserialization of ``data`` interpreted as ``ENDIANNESS``-endian.
+    """
+    return uint64(int.from_bytes(data, ENDIANNESS))
+
+
+def saturating_sub(a: int, b: int) -> int:
+    """
+    Computes a - b, saturating at numeric bounds.
+    """
+    return a - b if a > b else 0
+
+
+def is_active_validator(validator: Validator, epoch: Epoch) -> bool:
+    """
+    Check if ``validator`` is active.
+    """
+    return validator.activation_epoch <= epoch < validator.exit_epoch
+
+
+def is_eligible_for_activation_queue(validator: Validator) -> bool:
+    """
+    Check if ``validator`` is eligible to be placed into the activation queue.
+    """
+    return (
+        validator.activation_eligibility_epoch == FAR_FUTURE_EPOCH
+        and validator.effective_balance == MAX_EFFECTIVE_BALANCE
+    )
+
+
+def is_eligible_for_activation(state: BeaconState, validator: Validator) -> bool:
+    """
+    Check if ``validator`` is eligible for activation.
+    """
+    return (
+        # Placement in queue is finalized
+        validator.activation_eligibility_epoch <= state.finalized_checkpoint.epoch
+        # Has not yet been activated
+        and validator.activation_epoch == FAR_FUTURE_EPOCH
+    )
+
+
+def is_slashable_validator(validator: Validator, epoch: Epoch) -> bool:
+    """
+    Check if ``validator`` is slashable.
+    """
+    return (not validator.slashed) and (validator.activation_epoch <= epoch < validator.withdrawable_epoch)
+
+
+def is_slashable_attestation_data(data_1: AttestationData, data_2: AttestationData) -> bool:
+    """
+    Check if ``data_1`` and ``data_2`` are slashable according to Casper FFG rules.
+    """
+    return (
+        # Double vote
+        (data_1 != data_2 and data_1.target.epoch == data_2.target.epoch) or
+        # Surround vote
+        (data_1.source.epoch < data_2.source.epoch and data_2.target.epoch < data_1.target.epoch)
+    )
+
+
+def is_valid_indexed_attestation(state: BeaconState, indexed_attestation: IndexedAttestation) -> bool:
+    """
+    Check if ``indexed_attestation`` is not empty, has sorted and unique indices and has a valid aggregate signature.
+    """
+    # Verify indices are sorted and unique
+    indices = indexed_attestation.attesting_indices
+    if len(indices) == 0 or not indices == sorted(set(indices)):
+        return False
+    # Verify aggregate signature
+    pubkeys = [state.validators[i].pubkey for i in indices]
+    domain = get_domain(state, DOMAIN_BEACON_ATTESTER, indexed_attestation.data.target.epoch)
+    signing_root = compute_signing_root(indexed_attestation.data, domain)
+    return bls.FastAggregateVerify(pubkeys, signing_root, indexed_attestation.signature)
+
+
+def is_valid_merkle_branch(leaf: Bytes32, branch: Sequence[Bytes32], depth: uint64, index: uint64, root: Root) -> bool:
+    """
+    Check if ``leaf`` at ``index`` verifies against the Merkle ``root`` and ``branch``.
+    """
+    value = leaf
+    for i in range(depth):
+        if index // (2**i) % 2:
+            value = hash(branch[i] + value)
+        else:
+            value = hash(value + branch[i])
+    return value == root
+
+
+def compute_shuffled_index(index: uint64, index_count: uint64, seed: Bytes32) -> uint64:
+    """
+    Return the shuffled index corresponding to ``seed`` (and ``index_count``).
+    """
+    assert index < index_count
+
+    # Swap or not (https://link.springer.com/content/pdf/10.1007%2F978-3-642-32009-5_1.pdf)
+    # See the 'generalized domain' algorithm on page 3
+    for current_round in range(SHUFFLE_ROUND_COUNT):
+        pivot = bytes_to_uint64(hash(seed + uint_to_bytes(uint8(current_round)))[0:8]) % index_count
+        flip = (pivot + index_count - index) % index_count
+        position = max(index, flip)
+        source = hash(
+            seed
+            + uint_to_bytes(uint8(current_round))
+            + uint_to_bytes(uint32(position // 256))
+        )
+        byte = uint8(source[(position % 256) // 8])
+        bit = (byte >> (position % 8)) % 2
+        index = flip if bit else index
+
+    return index
+
+
+def compute_proposer_index(state: BeaconState, indices: Sequence[ValidatorIndex], seed: Bytes32) -> ValidatorIndex:
+    """
+    Return from ``indices`` a random index sampled by effective balance.
+    """
+    assert len(indices) > 0
+    MAX_RANDOM_BYTE = 2**8 - 1
+    i = uint64(0)
+    total = uint64(len(indices))
+    while True:
+        candidate_index = indices[compute_shuffled_index(i % total, total, seed)]
+        random_byte = hash(seed + uint_to_bytes(uint64(i // 32)))[i % 32]
+        effective_balance = state.validators[candidate_index].effective_balance
+        if effective_balance * MAX_RANDOM_BYTE >= MAX_EFFECTIVE_BALANCE * random_byte:
+            return candidate_index
+        i += 1
+
+
+def compute_committee(indices: Sequence[ValidatorIndex],
+                      seed: Bytes32,
+                      index: uint64,
+                      count: uint64) -> Sequence[ValidatorIndex]:
+    """
+    Return the committee corresponding to ``indices``, ``seed``, ``index``, and committee ``count``.
+    """
+    start = (len(indices) * index) // count
+    end = (len(indices) * uint64(index + 1)) // count
+    return [indices[compute_shuffled_index(uint64(i), uint64(len(indices)), seed)] for i in range(start, end)]
+
+
+def compute_epoch_at_slot(slot: Slot) -> Epoch:
+    """
+    Return the epoch number at ``slot``.
+    """
+    return Epoch(slot // SLOTS_PER_EPOCH)
+
+
+def compute_start_slot_at_epoch(epoch: Epoch) -> Slot:
+    """
+    Return the start slot of ``epoch``.
+    """
+    return Slot(epoch * SLOTS_PER_EPOCH)
+
+
+def compute_activation_exit_epoch(epoch: Epoch) -> Epoch:
+    """
+    Return the epoch during which validator activations and exits initiated in ``epoch`` take effect.
+    """
+    return Epoch(epoch + 1 + MAX_SEED_LOOKAHEAD)
+
+
+def compute_fork_data_root(current_version: Version, genesis_validators_root: Root) -> Root:
+    """
+    Return the 32-byte fork data root for the ``current_version`` and ``genesis_validators_root``.
+    This is used primarily in signature domains to avoid collisions across forks/chains.
+    """
+    return hash_tree_root(ForkData(
+        current_version=current_version,
+        genesis_validators_root=genesis_validators_root,
+    ))
+
+
+def compute_fork_digest(current_version: Version, genesis_validators_root: Root) -> ForkDigest:
+    """
+    Return the 4-byte fork digest for the ``current_version`` and ``genesis_validators_root``.
+    This is a digest primarily used for domain separation on the p2p layer.
+    4-bytes suffices for practical separation of forks/chains.
+    """
+    return ForkDigest(compute_fork_data_root(current_version, genesis_validators_root)[:4])
+
+
+def compute_domain(domain_type: DomainType, fork_version: Version=None, genesis_validators_root: Root=None) -> Domain:
+    """
+    Return the domain for the ``domain_type`` and ``fork_version``.
+    """
+    if fork_version is None:
+        fork_version = config.GENESIS_FORK_VERSION
+    if genesis_validators_root is None:
+        genesis_validators_root = Root()  # all bytes zero by default
+    fork_data_root = compute_fork_data_root(fork_version, genesis_validators_root)
+    return Domain(domain_type + fork_data_root[:28])
+
+
+def compute_signing_root(ssz_object: SSZObject, domain: Domain) -> Root:
+    """
+    Return the signing root for the corresponding signing data.
+    """
+    return hash_tree_root(SigningData(
+        object_root=hash_tree_root(ssz_object),
+        domain=domain,
+    ))
+
+
+def get_current_epoch(state: BeaconState) -> Epoch:
+    """
+    Return the current epoch.
+    """
+    return compute_epoch_at_slot(state.slot)
+
+
+def get_previous_epoch(state: BeaconState) -> Epoch:
+    """`
+    Return the previous epoch (unless the current epoch is ``GENESIS_EPOCH``).
+    """
+    current_epoch = get_current_epoch(state)
+    return GENESIS_EPOCH if current_epoch == GENESIS_EPOCH else Epoch(current_epoch - 1)
+
+
+def get_block_root(state: BeaconState, epoch: Epoch) -> Root:
+    """
+    Return the block root at the start of a recent ``epoch``.
+    """
+    return get_block_root_at_slot(state, compute_start_slot_at_epoch(epoch))
+
+
+def get_block_root_at_slot(state: BeaconState, slot: Slot) -> Root:
+    """
+    Return the block root at a recent ``slot``.
+    """
+    assert slot < state.slot <= slot + SLOTS_PER_HISTORICAL_ROOT
+    return state.block_roots[slot % SLOTS_PER_HISTORICAL_ROOT]
+
+
+def get_randao_mix(state: BeaconState, epoch: Epoch) -> Bytes32:
+    """
+    Return the randao mix at a recent ``epoch``.
+    """
+    return state.randao_mixes[epoch % EPOCHS_PER_HISTORICAL_VECTOR]
+
+
+def get_active_validator_indices(state: BeaconState, epoch: Epoch) -> Sequence[ValidatorIndex]:
+    """
+    Return the sequence of active validator indices at ``epoch``.
+    """
+    return [ValidatorIndex(i) for i, v in enumerate(state.validators) if is_active_validator(v, epoch)]
+
+
+def get_validator_churn_limit(state: BeaconState) -> uint64:
+    """
+    Return the validator churn limit for the current epoch.
+    """
+    active_validator_indices = get_active_validator_indices(state, get_current_epoch(state))
+    return max(config.MIN_PER_EPOCH_CHURN_LIMIT, uint64(len(active_validator_indices)) // config.CHURN_LIMIT_QUOTIENT)
+
+
+def get_seed(state: BeaconState, epoch: Epoch, domain_type: DomainType) -> Bytes32:
+    """
+    Return the seed at ``epoch``.
+    """
+    mix = get_randao_mix(state, Epoch(epoch + EPOCHS_PER_HISTORICAL_VECTOR - MIN_SEED_LOOKAHEAD - 1))  # Avoid underflow
+    return hash(domain_type + uint_to_bytes(epoch) + mix)
+
+
+def get_committee_count_per_slot(state: BeaconState, epoch: Epoch) -> uint64:
+    """
+    Return the number of committees in each slot for the given ``epoch``.
+    """
+    return max(uint64(1), min(
+        MAX_COMMITTEES_PER_SLOT,
+        uint64(len(get_active_validator_indices(state, epoch))) // SLOTS_PER_EPOCH // TARGET_COMMITTEE_SIZE,
+    ))
+
+
+def get_beacon_committee(state: BeaconState, slot: Slot, index: CommitteeIndex) -> Sequence[ValidatorIndex]:
+    """
+    Return the beacon committee at ``slot`` for ``index``.
+    """
+    epoch = compute_epoch_at_slot(slot)
+    committees_per_slot = get_committee_count_per_slot(state, epoch)
+    return compute_committee(
+        indices=get_active_validator_indices(state, epoch),
+        seed=get_seed(state, epoch, DOMAIN_BEACON_ATTESTER),
+        index=(slot % SLOTS_PER_EPOCH) * committees_per_slot + index,
+        count=committees_per_slot * SLOTS_PER_EPOCH,
+    )
+
+
+def get_beacon_proposer_index(state: BeaconState) -> ValidatorIndex:
+    """
+    Return the beacon proposer index at the current slot.
+    """
+    epoch = get_current_epoch(state)
+    seed = hash(get_seed(state, epoch, DOMAIN_BEACON_PROPOSER) + uint_to_bytes(state.slot))
+    indices = get_active_validator_indices(state, epoch)
+    return compute_proposer_index(state, indices, seed)
+
+
+def get_total_balance(state: BeaconState, indices: Set[ValidatorIndex]) -> Gwei:
+    """
+    Return the combined effective balance of the ``indices``.
+    ``EFFECTIVE_BALANCE_INCREMENT`` Gwei minimum to avoid divisions by zero.
+    Math safe up to ~10B ETH, after which this overflows uint64.
+    """
+    return Gwei(max(EFFECTIVE_BALANCE_INCREMENT, sum([state.validators[index].effective_balance for index in indices])))
+
+
+def get_total_active_balance(state: BeaconState) -> Gwei:
+    """
+    Return the combined effective balance of the active validators.
+    Note: ``get_total_balance`` returns ``EFFECTIVE_BALANCE_INCREMENT`` Gwei minimum to avoid divisions by zero.
+    """
+    return get_total_balance(state, set(get_active_validator_indices(state, get_current_epoch(state))))
+
+
+def get_domain(state: BeaconState, domain_type: DomainType, epoch: Epoch=None) -> Domain:
+    """
+    Return the signature domain (fork version concatenated with domain type) of a message.
+    """
+    epoch = get_current_epoch(state) if epoch is None else epoch
+    fork_version = state.fork.previous_version if epoch < state.fork.epoch else state.fork.current_version
+    return compute_domain(domain_type, fork_version, state.genesis_validators_root)
+
+
+def get_indexed_attestation(state: BeaconState, attestation: Attestation) -> IndexedAttestation:
+    """
+    Return the indexed attestation corresponding to ``attestation``.
+    """
+    attesting_indices = get_attesting_indices(state, attestation)
+
+    return IndexedAttestation(
+        attesting_indices=sorted(attesting_indices),
+        data=attestation.data,
+        signature=attestation.signature,
+    )
+
+
+def get_attesting_indices(state: BeaconState, attestation: Attestation) -> Set[ValidatorIndex]:
+    """
+    Return the set of attesting indices corresponding to ``data`` and ``bits``.
+    """
+    committee = get_beacon_committee(state, attestation.data.slot, attestation.data.index)
+    return set(index for i, index in enumerate(committee) if attestation.aggregation_bits[i])
+
+
+def increase_balance(state: BeaconState, index: ValidatorIndex, delta: Gwei) -> None:
+    """
+    Increase the validator balance at index ``index`` by ``delta``.
+    """
+    state.balances[index] += delta
+
+
+def decrease_balance(state: BeaconState, index: ValidatorIndex, delta: Gwei) -> None:
+    """
+    Decrease the validator balance at index ``index`` by ``delta``, with underflow protection.
+    """
+    state.balances[index] = 0 if delta > state.balances[index] else state.balances[index] - delta
+
+
+def initiate_validator_exit(state: BeaconState, index: ValidatorIndex) -> None:
+    """
+    Initiate the exit of the validator with index ``index``.
+    """
+    # Return if validator already initiated exit
+    validator = state.validators[index]
+    if validator.exit_epoch != FAR_FUTURE_EPOCH:
+        return
+
+    # Compute exit queue epoch
+    exit_epochs = [v.exit_epoch for v in state.validators if v.exit_epoch != FAR_FUTURE_EPOCH]
+    exit_queue_epoch = max(exit_epochs + [compute_activation_exit_epoch(get_current_epoch(state))])
+    exit_queue_churn = len([v for v in state.validators if v.exit_epoch == exit_queue_epoch])
+    if exit_queue_churn >= get_validator_churn_limit(state):
+        exit_queue_epoch += Epoch(1)
+
+    # Set validator exit epoch and withdrawable epoch
+    validator.exit_epoch = exit_queue_epoch
+    validator.withdrawable_epoch = Epoch(validator.exit_epoch + config.MIN_VALIDATOR_WITHDRAWABILITY_DELAY)
+
+
+def slash_validator(state: BeaconState,
+                    slashed_index: ValidatorIndex,
+                    whistleblower_index: ValidatorIndex=None) -> None:
+    """
+    Slash the validator with index ``slashed_index``.
+    """
+    epoch = get_current_epoch(state)
+    initiate_validator_exit(state, slashed_index)
+    validator = state.validators[slashed_index]
+    validator.slashed = True
+    validator.withdrawable_epoch = max(validator.withdrawable_epoch, Epoch(epoch + EPOCHS_PER_SLASHINGS_VECTOR))
+    state.slashings[epoch % EPOCHS_PER_SLASHINGS_VECTOR] += validator.effective_balance
+    decrease_balance(state, slashed_index, validator.effective_balance // MIN_SLASHING_PENALTY_QUOTIENT_ALTAIR)
+
+    # Apply proposer and whistleblower rewards
+    proposer_index = get_beacon_proposer_index(state)
+    if whistleblower_index is None:
+        whistleblower_index = proposer_index
+    whistleblower_reward = Gwei(validator.effective_balance // WHISTLEBLOWER_REWARD_QUOTIENT)
+    proposer_reward = Gwei(whistleblower_reward * PROPOSER_WEIGHT // WEIGHT_DENOMINATOR)
+    increase_balance(state, proposer_index, proposer_reward)
+    increase_balance(state, whistleblower_index, Gwei(whistleblower_reward - proposer_reward))
+
+
+def initialize_beacon_state_from_eth1(eth1_block_hash: Hash32,
+                                      eth1_timestamp: uint64,
+                                      deposits: Sequence[Deposit]) -> BeaconState:
+    fork = Fork(
+        previous_version=config.GENESIS_FORK_VERSION,
+        current_version=config.GENESIS_FORK_VERSION,
+        epoch=GENESIS_EPOCH,
+    )
+    state = BeaconState(
+        genesis_time=eth1_timestamp + config.GENESIS_DELAY,
+        fork=fork,
+        eth1_data=Eth1Data(block_hash=eth1_block_hash, deposit_count=uint64(len(deposits))),
+        latest_block_header=BeaconBlockHeader(body_root=hash_tree_root(BeaconBlockBody())),
+        randao_mixes=[eth1_block_hash] * EPOCHS_PER_HISTORICAL_VECTOR,  # Seed RANDAO with Eth1 entropy
+    )
+
+    # Process deposits
+    leaves = list(map(lambda deposit: deposit.data, deposits))
+    for index, deposit in enumerate(deposits):
+        deposit_data_list = List[DepositData, 2**DEPOSIT_CONTRACT_TREE_DEPTH](*leaves[:index + 1])
+        state.eth1_data.deposit_root = hash_tree_root(deposit_data_list)
+        process_deposit(state, deposit)
+
+    # Process activations
+    for index, validator in enumerate(state.validators):
+        balance = state.balances[index]
+        validator.effective_balance = min(balance - balance % EFFECTIVE_BALANCE_INCREMENT, MAX_EFFECTIVE_BALANCE)
+        if validator.effective_balance == MAX_EFFECTIVE_BALANCE:
+            validator.activation_eligibility_epoch = GENESIS_EPOCH
+            validator.activation_epoch = GENESIS_EPOCH
+
+    # Set genesis validators root for domain separation and chain versioning
+    state.genesis_validators_root = hash_tree_root(state.validators)
+
+    return state
+
+
+def is_valid_genesis_state(state: BeaconState) -> bool:
+    if state.genesis_time < config.MIN_GENESIS_TIME:
+        return False
+    if len(get_active_validator_indices(state, GENESIS_EPOCH)) < config.MIN_GENESIS_ACTIVE_VALIDATOR_COUNT:
+        return False
+    return True
+
+
+def state_transition(state: BeaconState, signed_block: SignedBeaconBlock, validate_result: bool=True) -> None:
+    block = signed_block.message
+    # Process slots (including those with no blocks) since block
+    process_slots(state, block.slot)
+    # Verify signature
+    if validate_result:
+        assert verify_block_signature(state, signed_block)
+    # Process block
+    process_block(state, block)
+    # Verify state root
+    if validate_result:
+        assert block.state_root == hash_tree_root(state)
+
+
+def verify_block_signature(state: BeaconState, signed_block: SignedBeaconBlock) -> bool:
+    proposer = state.validators[signed_block.message.proposer_index]
+    signing_root = compute_signing_root(signed_block.message, get_domain(state, DOMAIN_BEACON_PROPOSER))
+    return bls.Verify(proposer.pubkey, signing_root, signed_block.signature)
+
+
+def process_slots(state: BeaconState, slot: Slot) -> None:
+    assert state.slot < slot
+    while state.slot < slot:
+        process_slot(state)
+        # Process epoch on the start slot of the next epoch
+        if (state.slot + 1) % SLOTS_PER_EPOCH == 0:
+            process_epoch(state)
+        state.slot = Slot(state.slot + 1)
+
+
+def process_slot(state: BeaconState) -> None:
+    # Cache state root
+    previous_state_root = hash_tree_root(state)
+    state.state_roots[state.slot % SLOTS_PER_HISTORICAL_ROOT] = previous_state_root
+    # Cache latest block header state root
+    if state.latest_block_header.state_root == Bytes32():
+        state.latest_block_header.state_root = previous_state_root
+    # Cache block root
+    previous_block_root = hash_tree_root(state.latest_block_header)
+    state.block_roots[state.slot % SLOTS_PER_HISTORICAL_ROOT] = previous_block_root
+
+
+def process_epoch(state: BeaconState) -> None:
+    process_justification_and_finalization(state)  # [Modified in Altair]
+    process_inactivity_updates(state)  # [New in Altair]
+    process_rewards_and_penalties(state)  # [Modified in Altair]
+    process_registry_updates(state)
+    process_slashings(state)  # [Modified in Altair]
+    process_eth1_data_reset(state)
+    process_effective_balance_updates(state)
+    process_slashings_reset(state)
+    process_randao_mixes_reset(state)
+    process_historical_roots_update(state)
+    process_participation_flag_updates(state)  # [New in Altair]
+    process_sync_committee_updates(state)  # [New in Altair]
+
+
+def get_matching_source_attestations(state: BeaconState, epoch: Epoch) -> Sequence[PendingAttestation]:
+    assert epoch in (get_previous_epoch(state), get_current_epoch(state))
+    return state.current_epoch_attestations if epoch == get_current_epoch(state) else state.previous_epoch_attestations
+
+
+def get_matching_target_attestations(state: BeaconState, epoch: Epoch) -> Sequence[PendingAttestation]:
+    return [
+        a for a in get_matching_source_attestations(state, epoch)
+        if a.data.target.root == get_block_root(state, epoch)
+    ]
+
+
+def get_matching_head_attestations(state: BeaconState, epoch: Epoch) -> Sequence[PendingAttestation]:
+    return [
+        a for a in get_matching_target_attestations(state, epoch)
+        if a.data.beacon_block_root == get_block_root_at_slot(state, a.data.slot)
+    ]
+
+
+def get_unslashed_attesting_indices(state: BeaconState,
+                                    attestations: Sequence[PendingAttestation]) -> Set[ValidatorIndex]:
+    output = set()  # type: Set[ValidatorIndex]
+    for a in attestations:
+        output = output.union(get_attesting_indices(state, a))
+    return set(filter(lambda index: not state.validators[index].slashed, output))
+
+
+def get_attesting_balance(state: BeaconState, attestations: Sequence[PendingAttestation]) -> Gwei:
+    """
+    Return the combined effective balance of the set of unslashed validators participating in ``attestations``.
+    Note: ``get_total_balance`` returns ``EFFECTIVE_BALANCE_INCREMENT`` Gwei minimum to avoid divisions by zero.
+    """
+    return get_total_balance(state, get_unslashed_attesting_indices(state, attestations))
+
+
+def process_justification_and_finalization(state: BeaconState) -> None:
+    # Initial FFG checkpoint values have a `0x00` stub for `root`.
+    # Skip FFG updates in the first two epochs to avoid corner cases that might result in modifying this stub.
+    if get_current_epoch(state) <= GENESIS_EPOCH + 1:
+        return
+    previous_indices = get_unslashed_participating_indices(state, TIMELY_TARGET_FLAG_INDEX, get_previous_epoch(state))
+    current_indices = get_unslashed_participating_indices(state, TIMELY_TARGET_FLAG_INDEX, get_current_epoch(state))
+    total_active_balance = get_total_active_balance(state)
+    previous_target_balance = get_total_balance(state, previous_indices)
+    current_target_balance = get_total_balance(state, current_indices)
+    weigh_justification_and_finalization(state, total_active_balance, previous_target_balance, current_target_balance)
+
+
+def weigh_justification_and_finalization(state: BeaconState,
+                                         total_active_balance: Gwei,
+                                         previous_epoch_target_balance: Gwei,
+                                         current_epoch_target_balance: Gwei) -> None:
+    previous_epoch = get_previous_epoch(state)
+    current_epoch = get_current_epoch(state)
+    old_previous_justified_checkpoint = state.previous_justified_checkpoint
+    old_current_justified_checkpoint = state.current_justified_checkpoint
+
+    # Process justifications
+    state.previous_justified_checkpoint = state.current_justified_checkpoint
+    state.justification_bits[1:] = state.justification_bits[:JUSTIFICATION_BITS_LENGTH - 1]
+    state.justification_bits[0] = 0b0
+    if previous_epoch_target_balance * 3 >= total_active_balance * 2:
+        state.current_justified_checkpoint = Checkpoint(epoch=previous_epoch,
+                                                        root=get_block_root(state, previous_epoch))
+        state.justification_bits[1] = 0b1
+    if current_epoch_target_balance * 3 >= total_active_balance * 2:
+        state.current_justified_checkpoint = Checkpoint(epoch=current_epoch,
+                                                        root=get_block_root(state, current_epoch))
+        state.justification_bits[0] = 0b1
+
+    # Process finalizations
+    bits = state.justification_bits
+    # The 2nd/3rd/4th most recent epochs are justified, the 2nd using the 4th as source
+    if all(bits[1:4]) and old_previous_justified_checkpoint.epoch + 3 == current_epoch:
+        state.finalized_checkpoint = old_previous_justified_checkpoint
+    # The 2nd/3rd most recent epochs are justified, the 2nd using the 3rd as source
+    if all(bits[1:3]) and old_previous_justified_checkpoint.epoch + 2 == current_epoch:
+        state.finalized_checkpoint = old_previous_justified_checkpoint
+    # The 1st/2nd/3rd most recent epochs are justified, the 1st using the 3rd as source
+    if all(bits[0:3]) and old_current_justified_checkpoint.epoch + 2 == current_epoch:
+        state.finalized_checkpoint = old_current_justified_checkpoint
+    # The 1st/2nd most recent epochs are justified, the 1st using the 2nd as source
+    if all(bits[0:2]) and old_current_justified_checkpoint.epoch + 1 == current_epoch:
+        state.finalized_checkpoint = old_current_justified_checkpoint
+
+
+def get_base_reward(state: BeaconState, index: ValidatorIndex) -> Gwei:
+    """
+    Return the base reward for the validator defined by ``index`` with respect to the current ``state``.
+    """
+    increments = state.validators[index].effective_balance // EFFECTIVE_BALANCE_INCREMENT
+    return Gwei(increments * get_base_reward_per_increment(state))
+
+
+def get_proposer_reward(state: BeaconState, attesting_index: ValidatorIndex) -> Gwei:
+    return Gwei(get_base_reward(state, attesting_index) // PROPOSER_REWARD_QUOTIENT)
+
+
+def get_finality_delay(state: BeaconState) -> uint64:
+    return get_previous_epoch(state) - state.finalized_checkpoint.epoch
+
+
+def is_in_inactivity_leak(state: BeaconState) -> bool:
+    return get_finality_delay(state) > MIN_EPOCHS_TO_INACTIVITY_PENALTY
+
+
+def get_eligible_validator_indices(state: BeaconState) -> Sequence[ValidatorIndex]:
+    previous_epoch = get_previous_epoch(state)
+    return [
+        ValidatorIndex(index) for index, v in enumerate(state.validators)
+        if is_active_validator(v, previous_epoch) or (v.slashed and previous_epoch + 1 < v.withdrawable_epoch)
+    ]
+
+
+def get_attestation_component_deltas(state: BeaconState,
+                                     attestations: Sequence[PendingAttestation]
+                                     ) -> Tuple[Sequence[Gwei], Sequence[Gwei]]:
+    """
+    Helper with shared logic for use by get source, target, and head deltas functions
+    """
+    rewards = [Gwei(0)] * len(state.validators)
+    penalties = [Gwei(0)] * len(state.validators)
+    total_balance = get_total_active_balance(state)
+    unslashed_attesting_indices = get_unslashed_attesting_indices(state, attestations)
+    attesting_balance = get_total_balance(state, unslashed_attesting_indices)
+    for index in get_eligible_validator_indices(state):
+        if index in unslashed_attesting_indices:
+            increment = EFFECTIVE_BALANCE_INCREMENT  # Factored out from balance totals to avoid uint64 overflow
+            if is_in_inactivity_leak(state):
+                # Since full base reward will be canceled out by inactivity penalty deltas,
+                # optimal participation receives full base reward compensation here.
+                rewards[index] += get_base_reward(state, index)
+            else:
+                reward_numerator = get_base_reward(state, index) * (attesting_balance // increment)
+                rewards[index] += reward_numerator // (total_balance // increment)
+        else:
+            penalties[index] += get_base_reward(state, index)
+    return rewards, penalties
+
+
+def get_source_deltas(state: BeaconState) -> Tuple[Sequence[Gwei], Sequence[Gwei]]:
+    """
+    Return attester micro-rewards/penalties for source-vote for each validator.
+    """
+    matching_source_attestations = get_matching_source_attestations(state, get_previous_epoch(state))
+    return get_attestation_component_deltas(state, matching_source_attestations)
+
+
+def get_target_deltas(state: BeaconState) -> Tuple[Sequence[Gwei], Sequence[Gwei]]:
+    """
+    Return attester micro-rewards/penalties for target-vote for each validator.
+    """
+    matching_target_attestations = get_matching_target_attestations(state, get_previous_epoch(state))
+    return get_attestation_component_deltas(state, matching_target_attestations)
+
+
+def get_head_deltas(state: BeaconState) -> Tuple[Sequence[Gwei], Sequence[Gwei]]:
+    """
+    Return attester micro-rewards/penalties for head-vote for each validator.
+    """
+    matching_head_attestations = get_matching_head_attestations(state, get_previous_epoch(state))
+    return get_attestation_component_deltas(state, matching_head_attestations)
+
+
+def get_inclusion_delay_deltas(state: BeaconState) -> Tuple[Sequence[Gwei], Sequence[Gwei]]:
+    """
+    Return proposer and inclusion delay micro-rewards/penalties for each validator.
+    """
+    rewards = [Gwei(0) for _ in range(len(state.validators))]
+    matching_source_attestations = get_matching_source_attestations(state, get_previous_epoch(state))
+    for index in get_unslashed_attesting_indices(state, matching_source_attestations):
+        attestation = min([
+            a for a in matching_source_attestations
+            if index in get_attesting_indices(state, a)
+        ], key=lambda a: a.inclusion_delay)
+        rewards[attestation.proposer_index] += get_proposer_reward(state, index)
+        max_attester_reward = Gwei(get_base_reward(state, index) - get_proposer_reward(state, index))
+        rewards[index] += Gwei(max_attester_reward // attestation.inclusion_delay)
+
+    # No penalties associated with inclusion delay
+    penalties = [Gwei(0) for _ in range(len(state.validators))]
+    return rewards, penalties
+
+
+def get_inactivity_penalty_deltas(state: BeaconState) -> Tuple[Sequence[Gwei], Sequence[Gwei]]:
+    """
+    Return the inactivity penalty deltas by considering timely target participation flags and inactivity scores.
+    """
+    rewards = [Gwei(0) for _ in range(len(state.validators))]
+    penalties = [Gwei(0) for _ in range(len(state.validators))]
+    previous_epoch = get_previous_epoch(state)
+    matching_target_indices = get_unslashed_participating_indices(state, TIMELY_TARGET_FLAG_INDEX, previous_epoch)
+    for index in get_eligible_validator_indices(state):
+        if index not in matching_target_indices:
+            penalty_numerator = state.validators[index].effective_balance * state.inactivity_scores[index]
+            penalty_denominator = config.INACTIVITY_SCORE_BIAS * INACTIVITY_PENALTY_QUOTIENT_ALTAIR
+            penalties[index] += Gwei(penalty_numerator // penalty_denominator)
+    return rewards, penalties
+
+
+def get_attestation_deltas(state: BeaconState) -> Tuple[Sequence[Gwei], Sequence[Gwei]]:
+    """
+    Return attestation reward/penalty deltas for each validator.
+    """
+    source_rewards, source_penalties = get_source_deltas(state)
+    target_rewards, target_penalties = get_target_deltas(state)
+    head_rewards, head_penalties = get_head_deltas(state)
+    inclusion_delay_rewards, _ = get_inclusion_delay_deltas(state)
+    _, inactivity_penalties = get_inactivity_penalty_deltas(state)
+
+    rewards = [
+        source_rewards[i] + target_rewards[i] + head_rewards[i] + inclusion_delay_rewards[i]
+        for i in range(len(state.validators))
+    ]
+
+    penalties = [
+        source_penalties[i] + target_penalties[i] + head_penalties[i] + inactivity_penalties[i]
+        for i in range(len(state.validators))
+    ]
+
+    return rewards, penalties
+
+
+def process_rewards_and_penalties(state: BeaconState) -> None:
+    # No rewards are applied at the end of `GENESIS_EPOCH` because rewards are for work done in the previous epoch
+    if get_current_epoch(state) == GENESIS_EPOCH:
+        return
+
+    flag_deltas = [get_flag_index_deltas(state, flag_index) for flag_index in range(len(PARTICIPATION_FLAG_WEIGHTS))]
+    deltas = flag_deltas + [get_inactivity_penalty_deltas(state)]
+    for (rewards, penalties) in deltas:
+        for index in range(len(state.validators)):
+            increase_balance(state, ValidatorIndex(index), rewards[index])
+            decrease_balance(state, ValidatorIndex(index), penalties[index])
+
+
+def process_registry_updates(state: BeaconState) -> None:
+    # Process activation eligibility and ejections
+    for index, validator in enumerate(state.validators):
+        if is_eligible_for_activation_queue(validator):
+            validator.activation_eligibility_epoch = get_current_epoch(state) + 1
+
+        if (
+            is_active_validator(validator, get_current_epoch(state))
+            and validator.effective_balance <= config.EJECTION_BALANCE
+        ):
+            initiate_validator_exit(state, ValidatorIndex(index))
+
+    # Queue validators eligible for activation and not yet dequeued for activation
+    activation_queue = sorted([
+        index for index, validator in enumerate(state.validators)
+        if is_eligible_for_activation(state, validator)
+        # Order by the sequence of activation_eligibility_epoch setting and then index
+    ], key=lambda index: (state.validators[index].activation_eligibility_epoch, index))
+    # Dequeued validators for activation up to churn limit
+    for index in activation_queue[:get_validator_churn_limit(state)]:
+        validator = state.validators[index]
+        validator.activation_epoch = compute_activation_exit_epoch(get_current_epoch(state))
+
+
+def process_slashings(state: BeaconState) -> None:
+    epoch = get_current_epoch(state)
+    total_balance = get_total_active_balance(state)
+    adjusted_total_slashing_balance = min(sum(state.slashings) * PROPORTIONAL_SLASHING_MULTIPLIER_ALTAIR, total_balance)
+    for index, validator in enumerate(state.validators):
+        if validator.slashed and epoch + EPOCHS_PER_SLASHINGS_VECTOR // 2 == validator.withdrawable_epoch:
+            increment = EFFECTIVE_BALANCE_INCREMENT  # Factored out from penalty numerator to avoid uint64 overflow
+            penalty_numerator = validator.effective_balance // increment * adjusted_total_slashing_balance
+            penalty = penalty_numerator // total_balance * increment
+            decrease_balance(state, ValidatorIndex(index), penalty)
+
+
+def process_eth1_data_reset(state: BeaconState) -> None:
+    next_epoch = Epoch(get_current_epoch(state) + 1)
+    # Reset eth1 data votes
+    if next_epoch % EPOCHS_PER_ETH1_VOTING_PERIOD == 0:
+        state.eth1_data_votes = []
+
+
+def process_effective_balance_updates(state: BeaconState) -> None:
+    # Update effective balances with hysteresis
+    for index, validator in enumerate(state.validators):
+        balance = state.balances[index]
+        HYSTERESIS_INCREMENT = uint64(EFFECTIVE_BALANCE_INCREMENT // HYSTERESIS_QUOTIENT)
+        DOWNWARD_THRESHOLD = HYSTERESIS_INCREMENT * HYSTERESIS_DOWNWARD_MULTIPLIER
+        UPWARD_THRESHOLD = HYSTERESIS_INCREMENT * HYSTERESIS_UPWARD_MULTIPLIER
+        if (
+            balance + DOWNWARD_THRESHOLD < validator.effective_balance
+            or validator.effective_balance + UPWARD_THRESHOLD < balance
+        ):
+            validator.effective_balance = min(balance - balance % EFFECTIVE_BALANCE_INCREMENT, MAX_EFFECTIVE_BALANCE)
+
+
+def process_slashings_reset(state: BeaconState) -> None:
+    next_epoch = Epoch(get_current_epoch(state) + 1)
+    # Reset slashings
+    state.slashings[next_epoch % EPOCHS_PER_SLASHINGS_VECTOR] = Gwei(0)
+
+
+def process_randao_mixes_reset(state: BeaconState) -> None:
+    current_epoch = get_current_epoch(state)
+    next_epoch = Epoch(current_epoch + 1)
+    # Set randao mix
+    state.randao_mixes[next_epoch % EPOCHS_PER_HISTORICAL_VECTOR] = get_randao_mix(state, current_epoch)
+
+
+def process_historical_roots_update(state: BeaconState) -> None:
+    # Set historical root accumulator
+    next_epoch = Epoch(get_current_epoch(state) + 1)
+    if next_epoch % (SLOTS_PER_HISTORICAL_ROOT // SLOTS_PER_EPOCH) == 0:
+        historical_batch = HistoricalBatch(block_roots=state.block_roots, state_roots=state.state_roots)
+        state.historical_roots.append(hash_tree_root(historical_batch))
+
+
+def process_participation_record_updates(state: BeaconState) -> None:
+    # Rotate current/previous epoch attestations
+    state.previous_epoch_attestations = state.current_epoch_attestations
+    state.current_epoch_attestations = []
+
+
+def process_block(state: BeaconState, block: BeaconBlock) -> None:
+    process_block_header(state, block)
+    process_randao(state, block.body)
+    process_eth1_data(state, block.body)
+    process_operations(state, block.body)  # [Modified in Altair]
+    process_sync_aggregate(state, block.body.sync_aggregate)  # [New in Altair]
+
+
+def process_block_header(state: BeaconState, block: BeaconBlock) -> None:
+    # Verify that the slots match
+    assert block.slot == state.slot
+    # Verify that the block is newer than latest block header
+    assert block.slot > state.latest_block_header.slot
+    # Verify that proposer index is the correct index
+    assert block.proposer_index == get_beacon_proposer_index(state)
+    # Verify that the parent matches
+    assert block.parent_root == hash_tree_root(state.latest_block_header)
+    # Cache current block as the new latest block
+    state.latest_block_header = BeaconBlockHeader(
+        slot=block.slot,
+        proposer_index=block.proposer_index,
+        parent_root=block.parent_root,
+        state_root=Bytes32(),  # Overwritten in the next process_slot call
+        body_root=hash_tree_root(block.body),
+    )
+
+    # Verify proposer is not slashed
+    proposer = state.validators[block.proposer_index]
+    assert not proposer.slashed
+
+
+def process_randao(state: BeaconState, body: BeaconBlockBody) -> None:
+    epoch = get_current_epoch(state)
+    # Verify RANDAO reveal
+    proposer = state.validators[get_beacon_proposer_index(state)]
+    signing_root = compute_signing_root(epoch, get_domain(state, DOMAIN_RANDAO))
+    assert bls.Verify(proposer.pubkey, signing_root, body.randao_reveal)
+    # Mix in RANDAO reveal
+    mix = xor(get_randao_mix(state, epoch), hash(body.randao_reveal))
+    state.randao_mixes[epoch % EPOCHS_PER_HISTORICAL_VECTOR] = mix
+
+
+def process_eth1_data(state: BeaconState, body: BeaconBlockBody) -> None:
+    state.eth1_data_votes.append(body.eth1_data)
+    if state.eth1_data_votes.count(body.eth1_data) * 2 > EPOCHS_PER_ETH1_VOTING_PERIOD * SLOTS_PER_EPOCH:
+        state.eth1_data = body.eth1_data
+
+
+def process_operations(state: BeaconState, body: BeaconBlockBody) -> None:
+    # Verify that outstanding deposits are processed up to the maximum number of deposits
+    assert len(body.deposits) == min(MAX_DEPOSITS, state.eth1_data.deposit_count - state.eth1_deposit_index)
+
+    def for_ops(operations: Sequence[Any], fn: Callable[[BeaconState, Any], None]) -> None:
+        for operation in operations:
+            fn(state, operation)
+
+    for_ops(body.proposer_slashings, process_proposer_slashing)
+    for_ops(body.attester_slashings, process_attester_slashing)
+    for_ops(body.attestations, process_attestation)
+    for_ops(body.deposits, process_deposit)
+    for_ops(body.voluntary_exits, process_voluntary_exit)
+
+
+def process_proposer_slashing(state: BeaconState, proposer_slashing: ProposerSlashing) -> None:
+    header_1 = proposer_slashing.signed_header_1.message
+    header_2 = proposer_slashing.signed_header_2.message
+
+    # Verify header slots match
+    assert header_1.slot == header_2.slot
+    # Verify header proposer indices match
+    assert header_1.proposer_index == header_2.proposer_index
+    # Verify the headers are different
+    assert header_1 != header_2
+    # Verify the proposer is slashable
+    proposer = state.validators[header_1.proposer_index]
+    assert is_slashable_validator(proposer, get_current_epoch(state))
+    # Verify signatures
+    for signed_header in (proposer_slashing.signed_header_1, proposer_slashing.signed_header_2):
+        domain = get_domain(state, DOMAIN_BEACON_PROPOSER, compute_epoch_at_slot(signed_header.message.slot))
+        signing_root = compute_signing_root(signed_header.message, domain)
+        assert bls.Verify(proposer.pubkey, signing_root, signed_header.signature)
+
+    slash_validator(state, header_1.proposer_index)
+
+
+def process_attester_slashing(state: BeaconState, attester_slashing: AttesterSlashing) -> None:
+    attestation_1 = attester_slashing.attestation_1
+    attestation_2 = attester_slashing.attestation_2
+    assert is_slashable_attestation_data(attestation_1.data, attestation_2.data)
+    assert is_valid_indexed_attestation(state, attestation_1)
+    assert is_valid_indexed_attestation(state, attestation_2)
+
+    slashed_any = False
+    indices = set(attestation_1.attesting_indices).intersection(attestation_2.attesting_indices)
+    for index in sorted(indices):
+        if is_slashable_validator(state.validators[index], get_current_epoch(state)):
+            slash_validator(state, index)
+            slashed_any = True
+    assert slashed_any
+
+
+def process_attestation(state: BeaconState, attestation: Attestation) -> None:
+    data = attestation.data
+    assert data.target.epoch in (get_previous_epoch(state), get_current_epoch(state))
+    assert data.target.epoch == compute_epoch_at_slot(data.slot)
+    assert data.slot + MIN_ATTESTATION_INCLUSION_DELAY <= state.slot <= data.slot + SLOTS_PER_EPOCH
+    assert data.index < get_committee_count_per_slot(state, data.target.epoch)
+
+    committee = get_beacon_committee(state, data.slot, data.index)
+    assert len(attestation.aggregation_bits) == len(committee)
+
+    # Participation flag indices
+    participation_flag_indices = get_attestation_participation_flag_indices(state, data, state.slot - data.slot)
+
+    # Verify signature
+    assert is_valid_indexed_attestation(state, get_indexed_attestation(state, attestation))
+
+    # Update epoch participation flags
+    if data.target.epoch == get_current_epoch(state):
+        epoch_participation = state.current_epoch_participation
+    else:
+        epoch_participation = state.previous_epoch_participation
+
+    proposer_reward_numerator = 0
+    for index in get_attesting_indices(state, attestation):
+        for flag_index, weight in enumerate(PARTICIPATION_FLAG_WEIGHTS):
+            if flag_index in participation_flag_indices and not has_flag(epoch_participation[index], flag_index):
+                epoch_participation[index] = add_flag(epoch_participation[index], flag_index)
+                proposer_reward_numerator += get_base_reward(state, index) * weight
+
+    # Reward proposer
+    proposer_reward_denominator = (WEIGHT_DENOMINATOR - PROPOSER_WEIGHT) * WEIGHT_DENOMINATOR // PROPOSER_WEIGHT
+    proposer_reward = Gwei(proposer_reward_numerator // proposer_reward_denominator)
+    increase_balance(state, get_beacon_proposer_index(state), proposer_reward)
+
+
+def get_validator_from_deposit(pubkey: BLSPubkey, withdrawal_credentials: Bytes32, amount: uint64) -> Validator:
+    effective_balance = min(amount - amount % EFFECTIVE_BALANCE_INCREMENT, MAX_EFFECTIVE_BALANCE)
+
+    return Validator(
+        pubkey=pubkey,
+        withdrawal_credentials=withdrawal_credentials,
+        effective_balance=effective_balance,
+        slashed=False,
+        activation_eligibility_epoch=FAR_FUTURE_EPOCH,
+        activation_epoch=FAR_FUTURE_EPOCH,
+        exit_epoch=FAR_FUTURE_EPOCH,
+        withdrawable_epoch=FAR_FUTURE_EPOCH,
+    )
+
+
+def add_validator_to_registry(state: BeaconState,
+                              pubkey: BLSPubkey,
+                              withdrawal_credentials: Bytes32,
+                              amount: uint64) -> None:
+    index = get_index_for_new_validator(state)
+    validator = get_validator_from_deposit(pubkey, withdrawal_credentials, amount)
+    set_or_append_list(state.validators, index, validator)
+    set_or_append_list(state.balances, index, amount)
+    # [New in Altair]
+    set_or_append_list(state.previous_epoch_participation, index, ParticipationFlags(0b0000_0000))
+    set_or_append_list(state.current_epoch_participation, index, ParticipationFlags(0b0000_0000))
+    set_or_append_list(state.inactivity_scores, index, uint64(0))
+
+
+def apply_deposit(state: BeaconState,
+                  pubkey: BLSPubkey,
+                  withdrawal_credentials: Bytes32,
+                  amount: uint64,
+                  signature: BLSSignature) -> None:
+    validator_pubkeys = get_validator_pubkeys(state)
+    if pubkey not in validator_pubkeys:
+        # Verify the deposit signature (proof of possession) which is not checked by the deposit contract
+        deposit_message = DepositMessage(
+            pubkey=pubkey,
+            withdrawal_credentials=withdrawal_credentials,
+            amount=amount,
+        )
+        domain = compute_domain(DOMAIN_DEPOSIT)  # Fork-agnostic domain since deposits are valid across forks
+        signing_root = compute_signing_root(deposit_message, domain)
+        if bls.Verify(pubkey, signing_root, signature):
+            add_validator_to_registry(state, pubkey, withdrawal_credentials, amount)
+    else:
+        # Increase balance by deposit amount
+        index = ValidatorIndex(validator_pubkeys.index(pubkey))
+        increase_balance(state, index, amount)
+
+
+def process_deposit(state: BeaconState, deposit: Deposit) -> None:
+    # Verify the Merkle branch
+    assert is_valid_merkle_branch(
+        leaf=hash_tree_root(deposit.data),
+        branch=deposit.proof,
+        depth=DEPOSIT_CONTRACT_TREE_DEPTH + 1,  # Add 1 for the List length mix-in
+        index=state.eth1_deposit_index,
+        root=state.eth1_data.deposit_root,
+    )
+
+    # Deposits must be processed in order
+    state.eth1_deposit_index += 1
+
+    apply_deposit(
+        state=state,
+        pubkey=deposit.data.pubkey,
+        withdrawal_credentials=deposit.data.withdrawal_credentials,
+        amount=deposit.data.amount,
+        signature=deposit.data.signature,
+    )
+
+
+def process_voluntary_exit(state: BeaconState, signed_voluntary_exit: SignedVoluntaryExit) -> None:
+    voluntary_exit = signed_voluntary_exit.message
+    validator = state.validators[voluntary_exit.validator_index]
+    # Verify the validator is active
+    assert is_active_validator(validator, get_current_epoch(state))
+    # Verify exit has not been initiated
+    assert validator.exit_epoch == FAR_FUTURE_EPOCH
+    # Exits must specify an epoch when they become valid; they are not valid before then
+    assert get_current_epoch(state) >= voluntary_exit.epoch
+    # Verify the validator has been active long enough
+    assert get_current_epoch(state) >= validator.activation_epoch + config.SHARD_COMMITTEE_PERIOD
+    # Verify signature
+    domain = get_domain(state, DOMAIN_VOLUNTARY_EXIT, voluntary_exit.epoch)
+    signing_root = compute_signing_root(voluntary_exit, domain)
+    assert bls.Verify(validator.pubkey, signing_root, signed_voluntary_exit.signature)
+    # Initiate exit
+    initiate_validator_exit(state, voluntary_exit.validator_index)
+
+
+def is_previous_epoch_justified(store: Store) -> bool:
+    current_epoch = get_current_store_epoch(store)
+    return store.justified_checkpoint.epoch + 1 == current_epoch
+
+
+def get_forkchoice_store(anchor_state: BeaconState, anchor_block: BeaconBlock) -> Store:
+    assert anchor_block.state_root == hash_tree_root(anchor_state)
+    anchor_root = hash_tree_root(anchor_block)
+    anchor_epoch = get_current_epoch(anchor_state)
+    justified_checkpoint = Checkpoint(epoch=anchor_epoch, root=anchor_root)
+    finalized_checkpoint = Checkpoint(epoch=anchor_epoch, root=anchor_root)
+    proposer_boost_root = Root()
+    return Store(
+        time=uint64(anchor_state.genesis_time + config.SECONDS_PER_SLOT * anchor_state.slot),
+        genesis_time=anchor_state.genesis_time,
+        justified_checkpoint=justified_checkpoint,
+        finalized_checkpoint=finalized_checkpoint,
+        unrealized_justified_checkpoint=justified_checkpoint,
+        unrealized_finalized_checkpoint=finalized_checkpoint,
+        proposer_boost_root=proposer_boost_root,
+        equivocating_indices=set(),
+        blocks={anchor_root: copy(anchor_block)},
+        block_states={anchor_root: copy(anchor_state)},
+        checkpoint_states={justified_checkpoint: copy(anchor_state)},
+        unrealized_justifications={anchor_root: justified_checkpoint}
+    )
+
+
+def get_slots_since_genesis(store: Store) -> int:
+    return (store.time - store.genesis_time) // config.SECONDS_PER_SLOT
+
+
+def get_current_slot(store: Store) -> Slot:
+    return Slot(GENESIS_SLOT + get_slots_since_genesis(store))
+
+
+def get_current_store_epoch(store: Store) -> Epoch:
+    return compute_epoch_at_slot(get_current_slot(store))
+
+
+def compute_slots_since_epoch_start(slot: Slot) -> int:
+    return slot - compute_start_slot_at_epoch(compute_epoch_at_slot(slot))
+
+
+def get_ancestor(store: Store, root: Root, slot: Slot) -> Root:
+    block = store.blocks[root]
+    if block.slot > slot:
+        return get_ancestor(store, block.parent_root, slot)
+    return root
+
+
+def calculate_committee_fraction(state: BeaconState, committee_percent: uint64) -> Gwei:
+    committee_weight = get_total_active_balance(state) // SLOTS_PER_EPOCH
+    return Gwei((committee_weight * committee_percent) // 100)
+
+
+def get_checkpoint_block(store: Store, root: Root, epoch: Epoch) -> Root:
+    """
+    Compute the checkpoint block for epoch ``epoch`` in the chain of block ``root``
+    """
+    epoch_first_slot = compute_start_slot_at_epoch(epoch)
+    return get_ancestor(store, root, epoch_first_slot)
+
+
+def get_proposer_score(store: Store) -> Gwei:
+    justified_checkpoint_state = store.checkpoint_states[store.justified_checkpoint]
+    committee_weight = get_total_active_balance(justified_checkpoint_state) // SLOTS_PER_EPOCH
+    return (committee_weight * config.PROPOSER_SCORE_BOOST) // 100
+
+
+def get_weight(store: Store, root: Root) -> Gwei:
+    state = store.checkpoint_states[store.justified_checkpoint]
+    unslashed_and_active_indices = [
+        i for i in get_active_validator_indices(state, get_current_epoch(state))
+        if not state.validators[i].slashed
+    ]
+    attestation_score = Gwei(sum(
+        state.validators[i].effective_balance for i in unslashed_and_active_indices
+        if (i in store.latest_messages
+            and i not in store.equivocating_indices
+            and get_ancestor(store, store.latest_messages[i].root, store.blocks[root].slot) == root)
+    ))
+    if store.proposer_boost_root == Root():
+        # Return only attestation score if ``proposer_boost_root`` is not set
+        return attestation_score
+
+    # Calculate proposer score if ``proposer_boost_root`` is set
+    proposer_score = Gwei(0)
+    # Boost is applied if ``root`` is an ancestor of ``proposer_boost_root``
+    if get_ancestor(store, store.proposer_boost_root, store.blocks[root].slot) == root:
+        proposer_score = get_proposer_score(store)
+    return attestation_score + proposer_score
+
+
+def get_voting_source(store: Store, block_root: Root) -> Checkpoint:
+    """
+    Compute the voting source checkpoint in event that block with root ``block_root`` is the head block
+    """
+    block = store.blocks[block_root]
+    current_epoch = get_current_store_epoch(store)
+    block_epoch = compute_epoch_at_slot(block.slot)
+    if current_epoch > block_epoch:
+        # The block is from a prior epoch, the voting source will be pulled-up
+        return store.unrealized_justifications[block_root]
+    else:
+        # The block is not from a prior epoch, therefore the voting source is not pulled up
+        head_state = store.block_states[block_root]
+        return head_state.current_justified_checkpoint
+
+
+def filter_block_tree(store: Store, block_root: Root, blocks: Dict[Root, BeaconBlock]) -> bool:
+    block = store.blocks[block_root]
+    children = [root for root in get_block_children(store).get(block_root) if root in store.blocks]
+
+    # If any children branches contain expected finalized/justified checkpoints,
+    # add to filtered block-tree and signal viability to parent.
+    if any(children):
+        filter_block_tree_result = [filter_block_tree(store, child, blocks) for child in children]
+        if any(filter_block_tree_result):
+            blocks[block_root] = block
+            return True
+        return False
+
+    current_epoch = get_current_store_epoch(store)
+    voting_source = get_voting_source(store, block_root)
+
+    # The voting source should be either at the same height as the store's justified checkpoint or
+    # not more than two epochs ago
+    correct_justified = (
+        store.justified_checkpoint.epoch == GENESIS_EPOCH
+        or voting_source.epoch == store.justified_checkpoint.epoch
+        or voting_source.epoch + 2 >= current_epoch
+    )
+
+    finalized_checkpoint_block = get_checkpoint_block(
+        store,
+        block_root,
+        store.finalized_checkpoint.epoch,
+    )
+
+    correct_finalized = (
+        store.finalized_checkpoint.epoch == GENESIS_EPOCH
+        or store.finalized_checkpoint.root == finalized_checkpoint_block
+    )
+
+    # If expected finalized/justified, add to viable block-tree and signal viability to parent.
+    if correct_justified and correct_finalized:
+        blocks[block_root] = block
+        return True
+
+    # Otherwise, branch not viable
+    return False
+
+
+def get_filtered_block_tree(store: Store) -> Dict[Root, BeaconBlock]:
+    """
+    Retrieve a filtered block tree from ``store``, only returning branches
+    whose leaf state's justified/finalized info agrees with that in ``store``.
+    """
+    base = store.justified_checkpoint.root
+    blocks: Dict[Root, BeaconBlock] = {}
+    filter_block_tree(store, base, blocks)
+    return blocks
+
+
+def get_head(store: Store) -> Root:
+    # Get filtered block tree that only includes viable branches
+    blocks = get_filtered_block_tree(store)
+    # Execute the LMD-GHOST fork choice
+    head = store.justified_checkpoint.root
+    while True:
+        children = [root for root in get_block_children(store).get(head) if root in blocks]
+        if len(children) == 0:
+            return head
+        # Sort by latest attesting balance with ties broken lexicographically
+        # Ties broken by favoring block with lexicographically higher root
+        head = max(children, key=lambda root: (get_weight(store, root), root))
+
+
+def update_checkpoints(store: Store, justified_checkpoint: Checkpoint, finalized_checkpoint: Checkpoint) -> None:
+    """
+    Update checkpoints in store if necessary
+    """
+    # Update justified checkpoint
+    if justified_checkpoint.epoch > store.justified_checkpoint.epoch:
+        store.justified_checkpoint = justified_checkpoint
+
+    # Update finalized checkpoint
+    if finalized_checkpoint.epoch > store.finalized_checkpoint.epoch:
+        store.finalized_checkpoint = finalized_checkpoint
+
+
+def update_unrealized_checkpoints(store: Store, unrealized_justified_checkpoint: Checkpoint,
+                                  unrealized_finalized_checkpoint: Checkpoint) -> None:
+    """
+    Update unrealized checkpoints in store if necessary
+    """
+    # Update unrealized justified checkpoint
+    if unrealized_justified_checkpoint.epoch > store.unrealized_justified_checkpoint.epoch:
+        store.unrealized_justified_checkpoint = unrealized_justified_checkpoint
+
+    # Update unrealized finalized checkpoint
+    if unrealized_finalized_checkpoint.epoch > store.unrealized_finalized_checkpoint.epoch:
+        store.unrealized_finalized_checkpoint = unrealized_finalized_checkpoint
+
+
+def is_head_late(store: Store, head_root: Root) -> bool:
+    return not store.block_timeliness[head_root]
+
+
+def is_shuffling_stable(slot: Slot) -> bool:
+    return slot % SLOTS_PER_EPOCH != 0
+
+
+def is_ffg_competitive(store: Store, head_root: Root, parent_root: Root) -> bool:
+    return (store.unrealized_justifications[head_root] == store.unrealized_justifications[parent_root])
+
+
+def is_finalization_ok(store: Store, slot: Slot) -> bool:
+    epochs_since_finalization = compute_epoch_at_slot(slot) - store.finalized_checkpoint.epoch
+    return epochs_since_finalization <= config.REORG_MAX_EPOCHS_SINCE_FINALIZATION
+
+
+def is_proposing_on_time(store: Store) -> bool:
+    # Use half `config.SECONDS_PER_SLOT // INTERVALS_PER_SLOT` as the proposer reorg deadline
+    time_into_slot = (store.time - store.genesis_time) % config.SECONDS_PER_SLOT
+    proposer_reorg_cutoff = config.SECONDS_PER_SLOT // INTERVALS_PER_SLOT // 2
+    return time_into_slot <= proposer_reorg_cutoff
+
+
+def is_head_weak(store: Store, head_root: Root) -> bool:
+    justified_state = store.checkpoint_states[store.justified_checkpoint]
+    reorg_threshold = calculate_committee_fraction(justified_state, config.REORG_HEAD_WEIGHT_THRESHOLD)
+    head_weight = get_weight(store, head_root)
+    return head_weight < reorg_threshold
+
+
+def is_parent_strong(store: Store, parent_root: Root) -> bool:
+    justified_state = store.checkpoint_states[store.justified_checkpoint]
+    parent_threshold = calculate_committee_fraction(justified_state, config.REORG_PARENT_WEIGHT_THRESHOLD)
+    parent_weight = get_weight(store, parent_root)
+    return parent_weight > parent_threshold
+
+
+def get_proposer_head(store: Store, head_root: Root, slot: Slot) -> Root:
+    head_block = store.blocks[head_root]
+    parent_root = head_block.parent_root
+    parent_block = store.blocks[parent_root]
+
+    # Only re-org the head block if it arrived later than the attestation deadline.
+    head_late = is_head_late(store, head_root)
+
+    # Do not re-org on an epoch boundary where the proposer shuffling could change.
+    shuffling_stable = is_shuffling_stable(slot)
+
+    # Ensure that the FFG information of the new head will be competitive with the current head.
+    ffg_competitive = is_ffg_competitive(store, head_root, parent_root)
+
+    # Do not re-org if the chain is not finalizing with acceptable frequency.
+    finalization_ok = is_finalization_ok(store, slot)
+
+    # Only re-org if we are proposing on-time.
+    proposing_on_time = is_proposing_on_time(store)
+
+    # Only re-org a single slot at most.
+    parent_slot_ok = parent_block.slot + 1 == head_block.slot
+    current_time_ok = head_block.slot + 1 == slot
+    single_slot_reorg = parent_slot_ok and current_time_ok
+
+    # Check that the head has few enough votes to be overpowered by our proposer boost.
+    assert store.proposer_boost_root != head_root  # ensure boost has worn off
+    head_weak = is_head_weak(store, head_root)
+
+    # Check that the missing votes are assigned to the parent and not being hoarded.
+    parent_strong = is_parent_strong(store, parent_root)
+
+    if all([head_late, shuffling_stable, ffg_competitive, finalization_ok,
+            proposing_on_time, single_slot_reorg, head_weak, parent_strong]):
+        # We can re-org the current head by building upon its parent block.
+        return parent_root
+    else:
+        return head_root
+
+
+def compute_pulled_up_tip(store: Store, block_root: Root) -> None:
+    # Pull up the post-state of the block to the next epoch boundary
+    pulled_up = get_pulled_up_checkpoints(store.block_states[block_root])
+
+    store.unrealized_justifications[block_root] = pulled_up.current_justified_checkpoint
+    update_unrealized_checkpoints(store, pulled_up.current_justified_checkpoint, pulled_up.finalized_checkpoint)
+
+    # If the block is from a prior epoch, apply the realized values
+    block_epoch = compute_epoch_at_slot(store.blocks[block_root].slot)
+    current_epoch = get_current_store_epoch(store)
+    if block_epoch < current_epoch:
+        update_checkpoints(store, pulled_up.current_justified_checkpoint, pulled_up.finalized_checkpoint)
+
+
+def on_tick_per_slot(store: Store, time: uint64) -> None:
+    previous_slot = get_current_slot(store)
+
+    # Update store time
+    store.time = time
+
+    current_slot = get_current_slot(store)
+
+    # If this is a new slot, reset store.proposer_boost_root
+    if current_slot > previous_slot:
+        store.proposer_boost_root = Root()
+
+    # If a new epoch, pull-up justification and finalization from previous epoch
+    if current_slot > previous_slot and compute_slots_since_epoch_start(current_slot) == 0:
+        update_checkpoints(store, store.unrealized_justified_checkpoint, store.unrealized_finalized_checkpoint)
+
+
+def validate_target_epoch_against_current_time(store: Store, attestation: Attestation) -> None:
+    target = attestation.data.target
+
+    # Attestations must be from the current or previous epoch
+    current_epoch = get_current_store_epoch(store)
+    # Use GENESIS_EPOCH for previous when genesis to avoid underflow
+    previous_epoch = current_epoch - 1 if current_epoch > GENESIS_EPOCH else GENESIS_EPOCH
+    # If attestation target is from a future epoch, delay consideration until the epoch arrives
+    assert target.epoch in [current_epoch, previous_epoch]
+
+
+def validate_on_attestation(store: Store, attestation: Attestation, is_from_block: bool) -> None:
+    target = attestation.data.target
+
+    # If the given attestation is not from a beacon block message, we have to check the target epoch scope.
+    if not is_from_block:
+        validate_target_epoch_against_current_time(store, attestation)
+
+    # Check that the epoch number and slot number are matching
+    assert target.epoch == compute_epoch_at_slot(attestation.data.slot)
+
+    # Attestation target must be for a known block. If target block is unknown, delay consideration until block is found
+    assert target.root in store.blocks
+
+    # Attestations must be for a known block. If block is unknown, delay consideration until the block is found
+    assert attestation.data.beacon_block_root in store.blocks
+    # Attestations must not be for blocks in the future. If not, the attestation should not be considered
+    assert store.blocks[attestation.data.beacon_block_root].slot <= attestation.data.slot
+
+    # LMD vote must be consistent with FFG vote target
+    assert target.root == get_checkpoint_block(store, attestation.data.beacon_block_root, target.epoch)
+
+    # Attestations can only affect the fork choice of subsequent slots.
+    # Delay consideration in the fork choice until their slot is in the past.
+    assert get_current_slot(store) >= attestation.data.slot + 1
+
+
+def store_target_checkpoint_state(store: Store, target: Checkpoint) -> None:
+    # Store target checkpoint state if not yet seen
+    if target not in store.checkpoint_states:
+        base_state = copy(store.block_states[target.root])
+        if base_state.slot < compute_start_slot_at_epoch(target.epoch):
+            process_slots(base_state, compute_start_slot_at_epoch(target.epoch))
+        store.checkpoint_states[target] = base_state
+
+
+def update_latest_messages(store: Store, attesting_indices: Sequence[ValidatorIndex], attestation: Attestation) -> None:
+    target = attestation.data.target
+    beacon_block_root = attestation.data.beacon_block_root
+    non_equivocating_attesting_indices = [i for i in attesting_indices if i not in store.equivocating_indices]
+    for i in non_equivocating_attesting_indices:
+        if i not in store.latest_messages or target.epoch > store.latest_messages[i].epoch:
+            store.latest_messages[i] = LatestMessage(epoch=target.epoch, root=beacon_block_root)
+
+
+def on_tick(store: Store, time: uint64) -> None:
+    # If the ``store.time`` falls behind, while loop catches up slot by slot
+    # to ensure that every previous slot is processed with ``on_tick_per_slot``
+    tick_slot = (time - store.genesis_time) // config.SECONDS_PER_SLOT
+    while get_current_slot(store) < tick_slot:
+        previous_time = store.genesis_time + (get_current_slot(store) + 1) * config.SECONDS_PER_SLOT
+        on_tick_per_slot(store, previous_time)
+    on_tick_per_slot(store, time)
+
+
+def on_block(store: Store, signed_block: SignedBeaconBlock) -> None:
+    block = signed_block.message
+    # Parent block must be known
+    assert block.parent_root in store.block_states
+    # Make a copy of the state to avoid mutability issues
+    pre_state = copy(store.block_states[block.parent_root])
+    # Blocks cannot be in the future. If they are, their consideration must be delayed until they are in the past.
+    assert get_current_slot(store) >= block.slot
+
+    # Check that block is later than the finalized epoch slot (optimization to reduce calls to get_ancestor)
+    finalized_slot = compute_start_slot_at_epoch(store.finalized_checkpoint.epoch)
+    assert block.slot > finalized_slot
+    # Check block is a descendant of the finalized block at the checkpoint finalized slot
+    finalized_checkpoint_block = get_checkpoint_block(
+        store,
+        block.parent_root,
+        store.finalized_checkpoint.epoch,
+    )
+    assert store.finalized_checkpoint.root == finalized_checkpoint_block
+
+    # Check the block is valid and compute the post-state
+    state = pre_state.copy()
+    block_root = hash_tree_root(block)
+    state_transition(state, signed_block, True)
+    # Add new block to the store
+    store.blocks[block_root] = block
+    # Add new state for this block to the store
+    store.block_states[block_root] = state
+
+    # Add block timeliness to the store
+    time_into_slot = (store.time - store.genesis_time) % config.SECONDS_PER_SLOT
+    is_before_attesting_interval = time_into_slot < config.SECONDS_PER_SLOT // INTERVALS_PER_SLOT
+    is_timely = get_current_slot(store) == block.slot and is_before_attesting_interval
+    store.block_timeliness[hash_tree_root(block)] = is_timely
+
+    # Add proposer score boost if the block is timely and not conflicting with an existing block
+    is_first_block = store.proposer_boost_root == Root()
+    if is_timely and is_first_block:
+        store.proposer_boost_root = hash_tree_root(block)
+
+    # Update checkpoints in store if necessary
+    update_checkpoints(store, state.current_justified_checkpoint, state.finalized_checkpoint)
+
+    # Eagerly compute unrealized justification and finality
+    compute_pulled_up_tip(store, block_root)
+
+
+def on_attestation(store: Store, attestation: Attestation, is_from_block: bool=False) -> None:
+    """
+    Run ``on_attestation`` upon receiving a new ``attestation`` from either within a block or directly on the wire.
+
+    An ``attestation`` that is asserted as invalid may be valid at a later time,
+    consider scheduling it for later processing in such case.
+    """
+    validate_on_attestation(store, attestation, is_from_block)
+
+    store_target_checkpoint_state(store, attestation.data.target)
+
+    # Get state at the `target` to fully validate attestation
+    target_state = store.checkpoint_states[attestation.data.target]
+    indexed_attestation = get_indexed_attestation(target_state, attestation)
+    assert is_valid_indexed_attestation(target_state, indexed_attestation)
+
+    # Update latest messages for attesting indices
+    update_latest_messages(store, indexed_attestation.attesting_indices, attestation)
+
+
+def on_attester_slashing(store: Store, attester_slashing: AttesterSlashing) -> None:
+    """
+    Run ``on_attester_slashing`` immediately upon receiving a new ``AttesterSlashing``
+    from either within a block or directly on the wire.
+    """
+    attestation_1 = attester_slashing.attestation_1
+    attestation_2 = attester_slashing.attestation_2
+    assert is_slashable_attestation_data(attestation_1.data, attestation_2.data)
+    state = store.block_states[store.justified_checkpoint.root]
+    assert is_valid_indexed_attestation(state, attestation_1)
+    assert is_valid_indexed_attestation(state, attestation_2)
+
+    indices = set(attestation_1.attesting_indices).intersection(attestation_2.attesting_indices)
+    for index in indices:
+        store.equivocating_indices.add(index)
+
+
+def max_compressed_len(n: uint64) -> uint64:
+    # Worst-case compressed length for a given payload of size n when using snappy:
+    # https://github.com/google/snappy/blob/32ded457c0b1fe78ceb8397632c416568d6714a0/snappy.cc#L218C1-L218C47
+    return uint64(32 + n + n / 6)
+
+
+def max_message_size() -> uint64:
+    # Allow 1024 bytes for framing and encoding overhead but at least 1MiB in case config.MAX_PAYLOAD_SIZE is small.
+    return max(max_compressed_len(config.MAX_PAYLOAD_SIZE) + 1024, 1024 * 1024)
+
+
+def compute_subscribed_subnet(node_id: NodeID, epoch: Epoch, index: int) -> SubnetID:
+    node_id_prefix = node_id >> (NODE_ID_BITS - config.ATTESTATION_SUBNET_PREFIX_BITS)
+    node_offset = node_id % config.EPOCHS_PER_SUBNET_SUBSCRIPTION
+    permutation_seed = hash(uint_to_bytes(uint64((epoch + node_offset) // config.EPOCHS_PER_SUBNET_SUBSCRIPTION)))
+    permutated_prefix = compute_shuffled_index(
+        node_id_prefix,
+        1 << config.ATTESTATION_SUBNET_PREFIX_BITS,
+        permutation_seed,
+    )
+    return SubnetID((permutated_prefix + index) % config.ATTESTATION_SUBNET_COUNT)
+
+
+def compute_subscribed_subnets(node_id: NodeID, epoch: Epoch) -> Sequence[SubnetID]:
+    return [compute_subscribed_subnet(node_id, epoch, index) for index in range(config.SUBNETS_PER_NODE)]
+
+
+def check_if_validator_active(state: BeaconState, validator_index: ValidatorIndex) -> bool:
+    validator = state.validators[validator_index]
+    return is_active_validator(validator, get_current_epoch(state))
+
+
+def get_committee_assignment(state: BeaconState,
+                             epoch: Epoch,
+                             validator_index: ValidatorIndex
+                             ) -> Optional[Tuple[Sequence[ValidatorIndex], CommitteeIndex, Slot]]:
+    """
+    Return the committee assignment in the ``epoch`` for ``validator_index``.
+    ``assignment`` returned is a tuple of the following form:
+        * ``assignment[0]`` is the list of validators in the committee
+        * ``assignment[1]`` is the index to which the committee is assigned
+        * ``assignment[2]`` is the slot at which the committee is assigned
+    Return None if no assignment.
+    """
+    next_epoch = Epoch(get_current_epoch(state) + 1)
+    assert epoch <= next_epoch
+
+    start_slot = compute_start_slot_at_epoch(epoch)
+    committee_count_per_slot = get_committee_count_per_slot(state, epoch)
+    for slot in range(start_slot, start_slot + SLOTS_PER_EPOCH):
+        for index in range(committee_count_per_slot):
+            committee = get_beacon_committee(state, Slot(slot), CommitteeIndex(index))
+            if validator_index in committee:
+                return committee, CommitteeIndex(index), Slot(slot)
+    return None
+
+
+def is_proposer(state: BeaconState, validator_index: ValidatorIndex) -> bool:
+    return get_beacon_proposer_index(state) == validator_index
+
+
+def get_epoch_signature(state: BeaconState, block: BeaconBlock, privkey: int) -> BLSSignature:
+    domain = get_domain(state, DOMAIN_RANDAO, compute_epoch_at_slot(block.slot))
+    signing_root = compute_signing_root(compute_epoch_at_slot(block.slot), domain)
+    return bls.Sign(privkey, signing_root)
+
+
+def compute_time_at_slot(state: BeaconState, slot: Slot) -> uint64:
+    return uint64(state.genesis_time + slot * config.SECONDS_PER_SLOT)
+
+
+def voting_period_start_time(state: BeaconState) -> uint64:
+    eth1_voting_period_start_slot = Slot(state.slot - state.slot % (EPOCHS_PER_ETH1_VOTING_PERIOD * SLOTS_PER_EPOCH))
+    return compute_time_at_slot(state, eth1_voting_period_start_slot)
+
+
+def is_candidate_block(block: Eth1Block, period_start: uint64) -> bool:
+    return (
+        block.timestamp + config.SECONDS_PER_ETH1_BLOCK * config.ETH1_FOLLOW_DISTANCE <= period_start
+        and block.timestamp + config.SECONDS_PER_ETH1_BLOCK * config.ETH1_FOLLOW_DISTANCE * 2 >= period_start
+    )
+
+
+def get_eth1_vote(state: BeaconState, eth1_chain: Sequence[Eth1Block]) -> Eth1Data:
+    period_start = voting_period_start_time(state)
+    # `eth1_chain` abstractly represents all blocks in the eth1 chain sorted by ascending block height
+    votes_to_consider = [
+        get_eth1_data(block) for block in eth1_chain
+        if (
+            is_candidate_block(block, period_start)
+            # Ensure cannot move back to earlier deposit contract states
+            and get_eth1_data(block).deposit_count >= state.eth1_data.deposit_count
+        )
+    ]
+
+    # Valid votes already cast during this period
+    valid_votes = [vote for vote in state.eth1_data_votes if vote in votes_to_consider]
+
+    # Default vote on latest eth1 block data in the period range unless eth1 chain is not live
+    # Non-substantive casting for linter
+    state_eth1_data: Eth1Data = state.eth1_data
+    default_vote = votes_to_consider[len(votes_to_consider) - 1] if any(votes_to_consider) else state_eth1_data
+
+    return max(
+        valid_votes,
+        key=lambda v: (valid_votes.count(v), -valid_votes.index(v)),  # Tiebreak by smallest distance
+        default=default_vote
+    )
+
+
+def compute_new_state_root(state: BeaconState, block: BeaconBlock) -> Root:
+    temp_state: BeaconState = state.copy()
+    signed_block = SignedBeaconBlock(message=block)
+    state_transition(temp_state, signed_block, validate_result=False)
+    return hash_tree_root(temp_state)
+
+
+def get_block_signature(state: BeaconState, block: BeaconBlock, privkey: int) -> BLSSignature:
+    domain = get_domain(state, DOMAIN_BEACON_PROPOSER, compute_epoch_at_slot(block.slot))
+    signing_root = compute_signing_root(block, domain)
+    return bls.Sign(privkey, signing_root)
+
+
+def get_attestation_signature(state: BeaconState, attestation_data: AttestationData, privkey: int) -> BLSSignature:
+    domain = get_domain(state, DOMAIN_BEACON_ATTESTER, attestation_data.target.epoch)
+    signing_root = compute_signing_root(attestation_data, domain)
+    return bls.Sign(privkey, signing_root)
+
+
+def compute_subnet_for_attestation(committees_per_slot: uint64,
+                                   slot: Slot,
+                                   committee_index: CommitteeIndex) -> SubnetID:
+    """
+    Compute the correct subnet for an attestation for Phase 0.
+    Note, this mimics expected future behavior where attestations will be mapped to their shard subnet.
+    """
+    slots_since_epoch_start = uint64(slot % SLOTS_PER_EPOCH)
+    committees_since_epoch_start = committees_per_slot * slots_since_epoch_start
+
+    return SubnetID((committees_since_epoch_start + committee_index) % config.ATTESTATION_SUBNET_COUNT)
+
+
+def get_slot_signature(state: BeaconState, slot: Slot, privkey: int) -> BLSSignature:
+    domain = get_domain(state, DOMAIN_SELECTION_PROOF, compute_epoch_at_slot(slot))
+    signing_root = compute_signing_root(slot, domain)
+    return bls.Sign(privkey, signing_root)
+
+
+def is_aggregator(state: BeaconState, slot: Slot, index: CommitteeIndex, slot_signature: BLSSignature) -> bool:
+    committee = get_beacon_committee(state, slot, index)
+    modulo = max(1, len(committee) // TARGET_AGGREGATORS_PER_COMMITTEE)
+    return bytes_to_uint64(hash(slot_signature)[0:8]) % modulo == 0
+
+
+def get_aggregate_signature(attestations: Sequence[Attestation]) -> BLSSignature:
+    signatures = [attestation.signature for attestation in attestations]
+    return bls.Aggregate(signatures)
+
+
+def get_aggregate_and_proof(state: BeaconState,
+                            aggregator_index: ValidatorIndex,
+                            aggregate: Attestation,
+                            privkey: int) -> AggregateAndProof:
+    return AggregateAndProof(
+        aggregator_index=aggregator_index,
+        aggregate=aggregate,
+        selection_proof=get_slot_signature(state, aggregate.data.slot, privkey),
+    )
+
+
+def get_aggregate_and_proof_signature(state: BeaconState,
+                                      aggregate_and_proof: AggregateAndProof,
+                                      privkey: int) -> BLSSignature:
+    aggregate = aggregate_and_proof.aggregate
+    domain = get_domain(state, DOMAIN_AGGREGATE_AND_PROOF, compute_epoch_at_slot(aggregate.data.slot))
+    signing_root = compute_signing_root(aggregate_and_proof, domain)
+    return bls.Sign(privkey, signing_root)
+
+
+def compute_weak_subjectivity_period(state: BeaconState) -> uint64:
+    """
+    Returns the weak subjectivity period for the current ``state``.
+    This computation takes into account the effect of:
+        - validator set churn (bounded by ``get_validator_churn_limit()`` per epoch), and
+        - validator balance top-ups (bounded by ``MAX_DEPOSITS * SLOTS_PER_EPOCH`` per epoch).
+    A detailed calculation can be found at:
+    https://github.com/runtimeverification/beacon-chain-verification/blob/master/weak-subjectivity/weak-subjectivity-analysis.pdf
+    """
+    ws_period = config.MIN_VALIDATOR_WITHDRAWABILITY_DELAY
+    N = len(get_active_validator_indices(state, get_current_epoch(state)))
+    t = get_total_active_balance(state) // N // ETH_TO_GWEI
+    T = MAX_EFFECTIVE_BALANCE // ETH_TO_GWEI
+    delta = get_validator_churn_limit(state)
+    Delta = MAX_DEPOSITS * SLOTS_PER_EPOCH
+    D = SAFETY_DECAY
+
+    if T * (200 + 3 * D) < t * (200 + 12 * D):
+        epochs_for_validator_set_churn = (
+            N * (t * (200 + 12 * D) - T * (200 + 3 * D)) // (600 * delta * (2 * t + T))
+        )
+        epochs_for_balance_top_ups = (
+            N * (200 + 3 * D) // (600 * Delta)
+        )
+        ws_period += max(epochs_for_validator_set_churn, epochs_for_balance_top_ups)
+    else:
+        ws_period += (
+            3 * N * D * t // (200 * Delta * (T - t))
+        )
+
+    return ws_period
+
+
+def is_within_weak_subjectivity_period(store: Store, ws_state: BeaconState, ws_checkpoint: Checkpoint) -> bool:
+    # Clients may choose to validate the input state against the input Weak Subjectivity Checkpoint
+    assert ws_state.latest_block_header.state_root == ws_checkpoint.root
+    assert compute_epoch_at_slot(ws_state.slot) == ws_checkpoint.epoch
+
+    ws_period = compute_weak_subjectivity_period(ws_state)
+    ws_state_epoch = compute_epoch_at_slot(ws_state.slot)
+    current_epoch = compute_epoch_at_slot(get_current_slot(store))
+    return current_epoch <= ws_state_epoch + ws_period
+
+
+def add_flag(flags: ParticipationFlags, flag_index: int) -> ParticipationFlags:
+    """
+    Return a new ``ParticipationFlags`` adding ``flag_index`` to ``flags``.
+    """
+    flag = ParticipationFlags(2**flag_index)
+    return flags | flag
+
+
+def has_flag(flags: ParticipationFlags, flag_index: int) -> bool:
+    """
+    Return whether ``flags`` has ``flag_index`` set.
+    """
+    flag = ParticipationFlags(2**flag_index)
+    return flags & flag == flag
+
+
+def get_index_for_new_validator(state: BeaconState) -> ValidatorIndex:
+    return ValidatorIndex(len(state.validators))
+
+
+def set_or_append_list(list: List, index: ValidatorIndex, value: Any) -> None:
+    if index == len(list):
+        list.append(value)
+    else:
+        list[index] = value
+
+
+def get_next_sync_committee_indices(state: BeaconState) -> Sequence[ValidatorIndex]:
+    """
+    Return the sync committee indices, with possible duplicates, for the next sync committee.
+    """
+    epoch = Epoch(get_current_epoch(state) + 1)
+
+    MAX_RANDOM_BYTE = 2**8 - 1
+    active_validator_indices = get_active_validator_indices(state, epoch)
+    active_validator_count = uint64(len(active_validator_indices))
+    seed = get_seed(state, epoch, DOMAIN_SYNC_COMMITTEE)
+    i = 0
+    sync_committee_indices: List[ValidatorIndex] = []
+    while len(sync_committee_indices) < SYNC_COMMITTEE_SIZE:
+        shuffled_index = compute_shuffled_index(uint64(i % active_validator_count), active_validator_count, seed)
+        candidate_index = active_validator_indices[shuffled_index]
+        random_byte = hash(seed + uint_to_bytes(uint64(i // 32)))[i % 32]
+        effective_balance = state.validators[candidate_index].effective_balance
+        if effective_balance * MAX_RANDOM_BYTE >= MAX_EFFECTIVE_BALANCE * random_byte:
+            sync_committee_indices.append(candidate_index)
+        i += 1
+    return sync_committee_indices
+
+
+def get_next_sync_committee(state: BeaconState) -> SyncCommittee:
+    """
+    Return the next sync committee, with possible pubkey duplicates.
+    """
+    indices = get_next_sync_committee_indices(state)
+    pubkeys = [state.validators[index].pubkey for index in indices]
+    aggregate_pubkey = eth_aggregate_pubkeys(pubkeys)
+    return SyncCommittee(pubkeys=pubkeys, aggregate_pubkey=aggregate_pubkey)
+
+
+def get_base_reward_per_increment(state: BeaconState) -> Gwei:
+    return Gwei(EFFECTIVE_BALANCE_INCREMENT * BASE_REWARD_FACTOR // integer_squareroot(get_total_active_balance(state)))
+
+
+def get_unslashed_participating_indices(state: BeaconState, flag_index: int, epoch: Epoch) -> Set[ValidatorIndex]:
+    """
+    Return the set of validator indices that are both active and unslashed for the given ``flag_index`` and ``epoch``.
+    """
+    assert epoch in (get_previous_epoch(state), get_current_epoch(state))
+    if epoch == get_current_epoch(state):
+        epoch_participation = state.current_epoch_participation
+    else:
+        epoch_participation = state.previous_epoch_participation
+    active_validator_indices = get_active_validator_indices(state, epoch)
+    participating_indices = [i for i in active_validator_indices if has_flag(epoch_participation[i], flag_index)]
+    return set(filter(lambda index: not state.validators[index].slashed, participating_indices))
+
+
+def get_attestation_participation_flag_indices(state: BeaconState,
+                                               data: AttestationData,
+                                               inclusion_delay: uint64) -> Sequence[int]:
+    """
+    Return the flag indices that are satisfied by an attestation.
+    """
+    if data.target.epoch == get_current_epoch(state):
+        justified_checkpoint = state.current_justified_checkpoint
+    else:
+        justified_checkpoint = state.previous_justified_checkpoint
+
+    # Matching roots
+    is_matching_source = data.source == justified_checkpoint
+    is_matching_target = is_matching_source and data.target.root == get_block_root(state, data.target.epoch)
+    is_matching_head = is_matching_target and data.beacon_block_root == get_block_root_at_slot(state, data.slot)
+    assert is_matching_source
+
+    participation_flag_indices = []
+    if is_matching_source and inclusion_delay <= integer_squareroot(SLOTS_PER_EPOCH):
+        participation_flag_indices.append(TIMELY_SOURCE_FLAG_INDEX)
+    if is_matching_target and inclusion_delay <= SLOTS_PER_EPOCH:
+        participation_flag_indices.append(TIMELY_TARGET_FLAG_INDEX)
+    if is_matching_head and inclusion_delay == MIN_ATTESTATION_INCLUSION_DELAY:
+        participation_flag_indices.append(TIMELY_HEAD_FLAG_INDEX)
+
+    return participation_flag_indices
+
+
+def get_flag_index_deltas(state: BeaconState, flag_index: int) -> Tuple[Sequence[Gwei], Sequence[Gwei]]:
+    """
+    Return the deltas for a given ``flag_index`` by scanning through the participation flags.
+    """
+    rewards = [Gwei(0)] * len(state.validators)
+    penalties = [Gwei(0)] * len(state.validators)
+    previous_epoch = get_previous_epoch(state)
+    unslashed_participating_indices = get_unslashed_participating_indices(state, flag_index, previous_epoch)
+    weight = PARTICIPATION_FLAG_WEIGHTS[flag_index]
+    unslashed_participating_balance = get_total_balance(state, unslashed_participating_indices)
+    unslashed_participating_increments = unslashed_participating_balance // EFFECTIVE_BALANCE_INCREMENT
+    active_increments = get_total_active_balance(state) // EFFECTIVE_BALANCE_INCREMENT
+    for index in get_eligible_validator_indices(state):
+        base_reward = get_base_reward(state, index)
+        if index in unslashed_participating_indices:
+            if not is_in_inactivity_leak(state):
+                reward_numerator = base_reward * weight * unslashed_participating_increments
+                rewards[index] += Gwei(reward_numerator // (active_increments * WEIGHT_DENOMINATOR))
+        elif flag_index != TIMELY_HEAD_FLAG_INDEX:
+            penalties[index] += Gwei(base_reward * weight // WEIGHT_DENOMINATOR)
+    return rewards, penalties
+
+
+def process_sync_aggregate(state: BeaconState, sync_aggregate: SyncAggregate) -> None:
+    # Verify sync committee aggregate signature signing over the previous slot block root
+    committee_pubkeys = state.current_sync_committee.pubkeys
+    participant_pubkeys = [pubkey for pubkey, bit in zip(committee_pubkeys, sync_aggregate.sync_committee_bits) if bit]
+    previous_slot = max(state.slot, Slot(1)) - Slot(1)
+    domain = get_domain(state, DOMAIN_SYNC_COMMITTEE, compute_epoch_at_slot(previous_slot))
+    signing_root = compute_signing_root(get_block_root_at_slot(state, previous_slot), domain)
+    assert eth_fast_aggregate_verify(participant_pubkeys, signing_root, sync_aggregate.sync_committee_signature)
+
+    # Compute participant and proposer rewards
+    total_active_increments = get_total_active_balance(state) // EFFECTIVE_BALANCE_INCREMENT
+    total_base_rewards = Gwei(get_base_reward_per_increment(state) * total_active_increments)
+    max_participant_rewards = Gwei(total_base_rewards * SYNC_REWARD_WEIGHT // WEIGHT_DENOMINATOR // SLOTS_PER_EPOCH)
+    participant_reward = Gwei(max_participant_rewards // SYNC_COMMITTEE_SIZE)
+    proposer_reward = Gwei(participant_reward * PROPOSER_WEIGHT // (WEIGHT_DENOMINATOR - PROPOSER_WEIGHT))
+
+    # Apply participant and proposer rewards
+    all_pubkeys = get_validator_pubkeys(state)
+    committee_indices = [ValidatorIndex(all_pubkeys.index(pubkey)) for pubkey in state.current_sync_committee.pubkeys]
+    for participant_index, participation_bit in zip(committee_indices, sync_aggregate.sync_committee_bits):
+        if participation_bit:
+            increase_balance(state, participant_index, participant_reward)
+            increase_balance(state, get_beacon_proposer_index(state), proposer_reward)
+        else:
+            decrease_balance(state, participant_index, participant_reward)
+
+
+def process_inactivity_updates(state: BeaconState) -> None:
+    # Skip the genesis epoch as score updates are based on the previous epoch participation
+    if get_current_epoch(state) == GENESIS_EPOCH:
+        return
+
+    for index in get_eligible_validator_indices(state):
+        # Increase the inactivity score of inactive validators
+        if index in get_unslashed_participating_indices(state, TIMELY_TARGET_FLAG_INDEX, get_previous_epoch(state)):
+            state.inactivity_scores[index] -= min(1, state.inactivity_scores[index])
+        else:
+            state.inactivity_scores[index] += config.INACTIVITY_SCORE_BIAS
+        # Decrease the inactivity score of all eligible validators during a leak-free epoch
+        if not is_in_inactivity_leak(state):
+            state.inactivity_scores[index] -= min(config.INACTIVITY_SCORE_RECOVERY_RATE, state.inactivity_scores[index])
+
+
+def process_participation_flag_updates(state: BeaconState) -> None:
+    state.previous_epoch_participation = state.current_epoch_participation
+    state.current_epoch_participation = [ParticipationFlags(0b0000_0000) for _ in range(len(state.validators))]
+
+
+def process_sync_committee_updates(state: BeaconState) -> None:
+    next_epoch = get_current_epoch(state) + Epoch(1)
+    if next_epoch % EPOCHS_PER_SYNC_COMMITTEE_PERIOD == 0:
+        state.current_sync_committee = state.next_sync_committee
+        state.next_sync_committee = get_next_sync_committee(state)
+
+
+def eth_aggregate_pubkeys(pubkeys: Sequence[BLSPubkey]) -> BLSPubkey:
+    return bls.AggregatePKs(pubkeys)
+
+
+def eth_fast_aggregate_verify(pubkeys: Sequence[BLSPubkey], message: Bytes32, signature: BLSSignature) -> bool:
+    """
+    Wrapper to ``bls.FastAggregateVerify`` accepting the ``G2_POINT_AT_INFINITY`` signature when ``pubkeys`` is empty.
+    """
+    if len(pubkeys) == 0 and signature == G2_POINT_AT_INFINITY:
+        return True
+    return bls.FastAggregateVerify(pubkeys, message, signature)
+
+
+def compute_fork_version(epoch: Epoch) -> Version:
+    """
+    Return the fork version at the given ``epoch``.
+    """
+    if epoch >= config.ALTAIR_FORK_EPOCH:
+        return config.ALTAIR_FORK_VERSION
+    return config.GENESIS_FORK_VERSION
+
+
+def translate_participation(state: BeaconState, pending_attestations: Sequence[phase0.PendingAttestation]) -> None:
+    for attestation in pending_attestations:
+        data = attestation.data
+        inclusion_delay = attestation.inclusion_delay
+        # Translate attestation inclusion info to flag indices
+        participation_flag_indices = get_attestation_participation_flag_indices(state, data, inclusion_delay)
+
+        # Apply flags to all attesting validators
+        epoch_participation = state.previous_epoch_participation
+        for index in get_attesting_indices(state, attestation):
+            for flag_index in participation_flag_indices:
+                epoch_participation[index] = add_flag(epoch_participation[index], flag_index)
+
+
+def upgrade_to_altair(pre: phase0.BeaconState) -> BeaconState:
+    epoch = phase0.get_current_epoch(pre)
+    post = BeaconState(
+        # Versioning
+        genesis_time=pre.genesis_time,
+        genesis_validators_root=pre.genesis_validators_root,
+        slot=pre.slot,
+        fork=Fork(
+            previous_version=pre.fork.current_version,
+            current_version=config.ALTAIR_FORK_VERSION,
+            epoch=epoch,
+        ),
+        # History
+        latest_block_header=pre.latest_block_header,
+        block_roots=pre.block_roots,
+        state_roots=pre.state_roots,
+        historical_roots=pre.historical_roots,
+        # Eth1
+        eth1_data=pre.eth1_data,
+        eth1_data_votes=pre.eth1_data_votes,
+        eth1_deposit_index=pre.eth1_deposit_index,
+        # Registry
+        validators=pre.validators,
+        balances=pre.balances,
+        # Randomness
+        randao_mixes=pre.randao_mixes,
+        # Slashings
+        slashings=pre.slashings,
+        # Participation
+        previous_epoch_participation=[ParticipationFlags(0b0000_0000) for _ in range(len(pre.validators))],
+        current_epoch_participation=[ParticipationFlags(0b0000_0000) for _ in range(len(pre.validators))],
+        # Finality
+        justification_bits=pre.justification_bits,
+        previous_justified_checkpoint=pre.previous_justified_checkpoint,
+        current_justified_checkpoint=pre.current_justified_checkpoint,
+        finalized_checkpoint=pre.finalized_checkpoint,
+        # Inactivity
+        inactivity_scores=[uint64(0) for _ in range(len(pre.validators))],
+    )
+    # Fill in previous epoch participation from the pre state's pending attestations
+    translate_participation(post, pre.previous_epoch_attestations)
+
+    # Fill in sync committees
+    # Note: A duplicate committee is assigned for the current and next committee at the fork boundary
+    post.current_sync_committee = get_next_sync_committee(post)
+    post.next_sync_committee = get_next_sync_committee(post)
+    return post
+
+
+def get_sync_subcommittee_pubkeys(state: BeaconState, subcommittee_index: uint64) -> Sequence[BLSPubkey]:
+    # Committees assigned to `slot` sign for `slot - 1`
+    # This creates the exceptional logic below when transitioning between sync committee periods
+    next_slot_epoch = compute_epoch_at_slot(Slot(state.slot + 1))
+    if compute_sync_committee_period(get_current_epoch(state)) == compute_sync_committee_period(next_slot_epoch):
+        sync_committee = state.current_sync_committee
+    else:
+        sync_committee = state.next_sync_committee
+
+    # Return pubkeys for the subcommittee index
+    sync_subcommittee_size = SYNC_COMMITTEE_SIZE // SYNC_COMMITTEE_SUBNET_COUNT
+    i = subcommittee_index * sync_subcommittee_size
+    return sync_committee.pubkeys[i:i + sync_subcommittee_size]
+
+
+def compute_sync_committee_period(epoch: Epoch) -> uint64:
+    return epoch // EPOCHS_PER_SYNC_COMMITTEE_PERIOD
+
+
+def is_assigned_to_sync_committee(state: BeaconState,
+                                  epoch: Epoch,
+                                  validator_index: ValidatorIndex) -> bool:
+    sync_committee_period = compute_sync_committee_period(epoch)
+    current_epoch = get_current_epoch(state)
+    current_sync_committee_period = compute_sync_committee_period(current_epoch)
+    next_sync_committee_period = current_sync_committee_period + 1
+    assert sync_committee_period in (current_sync_committee_period, next_sync_committee_period)
+
+    pubkey = state.validators[validator_index].pubkey
+    if sync_committee_period == current_sync_committee_period:
+        return pubkey in state.current_sync_committee.pubkeys
+    else:  # sync_committee_period == next_sync_committee_period
+        return pubkey in state.next_sync_committee.pubkeys
+
+
+def process_sync_committee_contributions(block: BeaconBlock,
+                                         contributions: Set[SyncCommitteeContribution]) -> None:
+    sync_aggregate = SyncAggregate()
+    signatures = []
+    sync_subcommittee_size = SYNC_COMMITTEE_SIZE // SYNC_COMMITTEE_SUBNET_COUNT
+
+    for contribution in contributions:
+        subcommittee_index = contribution.subcommittee_index
+        for index, participated in enumerate(contribution.aggregation_bits):
+            if participated:
+                participant_index = sync_subcommittee_size * subcommittee_index + index
+                sync_aggregate.sync_committee_bits[participant_index] = True
+        signatures.append(contribution.signature)
+
+    sync_aggregate.sync_committee_signature = bls.Aggregate(signatures)
+
+    block.body.sync_aggregate = sync_aggregate
+
+
+def get_sync_committee_message(state: BeaconState,
+                               block_root: Root,
+                               validator_index: ValidatorIndex,
+                               privkey: int) -> SyncCommitteeMessage:
+    epoch = get_current_epoch(state)
+    domain = get_domain(state, DOMAIN_SYNC_COMMITTEE, epoch)
+    signing_root = compute_signing_root(block_root, domain)
+    signature = bls.Sign(privkey, signing_root)
+
+    return SyncCommitteeMessage(
+        slot=state.slot,
+        beacon_block_root=block_root,
+        validator_index=validator_index,
+        signature=signature,
+    )
+
+
+def compute_subnets_for_sync_committee(state: BeaconState, validator_index: ValidatorIndex) -> Set[SubnetID]:
+    next_slot_epoch = compute_epoch_at_slot(Slot(state.slot + 1))
+    if compute_sync_committee_period(get_current_epoch(state)) == compute_sync_committee_period(next_slot_epoch):
+        sync_committee = state.current_sync_committee
+    else:
+        sync_committee = state.next_sync_committee
+
+    target_pubkey = state.validators[validator_index].pubkey
+    sync_committee_indices = [index for index, pubkey in enumerate(sync_committee.pubkeys) if pubkey == target_pubkey]
+    return set([
+        SubnetID(index // (SYNC_COMMITTEE_SIZE // SYNC_COMMITTEE_SUBNET_COUNT))
+        for index in sync_committee_indices
+    ])
+
+
+def get_sync_committee_selection_proof(state: BeaconState,
+                                       slot: Slot,
+                                       subcommittee_index: uint64,
+                                       privkey: int) -> BLSSignature:
+    domain = get_domain(state, DOMAIN_SYNC_COMMITTEE_SELECTION_PROOF, compute_epoch_at_slot(slot))
+    signing_data = SyncAggregatorSelectionData(
+        slot=slot,
+        subcommittee_index=subcommittee_index,
+    )
+    signing_root = compute_signing_root(signing_data, domain)
+    return bls.Sign(privkey, signing_root)
+
+
+def is_sync_committee_aggregator(signature: BLSSignature) -> bool:
+    modulo = max(1, SYNC_COMMITTEE_SIZE // SYNC_COMMITTEE_SUBNET_COUNT // TARGET_AGGREGATORS_PER_SYNC_SUBCOMMITTEE)
+    return bytes_to_uint64(hash(signature)[0:8]) % modulo == 0
+
+
+def get_contribution_and_proof(state: BeaconState,
+                               aggregator_index: ValidatorIndex,
+                               contribution: SyncCommitteeContribution,
+                               privkey: int) -> ContributionAndProof:
+    selection_proof = get_sync_committee_selection_proof(
+        state,
+        contribution.slot,
+        contribution.subcommittee_index,
+        privkey,
+    )
+    return ContributionAndProof(
+        aggregator_index=aggregator_index,
+        contribution=contribution,
+        selection_proof=selection_proof,
+    )
+
+
+def get_contribution_and_proof_signature(state: BeaconState,
+                                         contribution_and_proof: ContributionAndProof,
+                                         privkey: int) -> BLSSignature:
+    contribution = contribution_and_proof.contribution
+    domain = get_domain(state, DOMAIN_CONTRIBUTION_AND_PROOF, compute_epoch_at_slot(contribution.slot))
+    signing_root = compute_signing_root(contribution_and_proof, domain)
+    return bls.Sign(privkey, signing_root)
+
+
+def block_to_light_client_header(block: SignedBeaconBlock) -> LightClientHeader:
+    return LightClientHeader(
+        beacon=BeaconBlockHeader(
+            slot=block.message.slot,
+            proposer_index=block.message.proposer_index,
+            parent_root=block.message.parent_root,
+            state_root=block.message.state_root,
+            body_root=hash_tree_root(block.message.body),
+        ),
+    )
+
+
+def create_light_client_bootstrap(state: BeaconState,
+                                  block: SignedBeaconBlock) -> LightClientBootstrap:
+    assert compute_epoch_at_slot(state.slot) >= config.ALTAIR_FORK_EPOCH
+
+    assert state.slot == state.latest_block_header.slot
+    header = state.latest_block_header.copy()
+    header.state_root = hash_tree_root(state)
+    assert hash_tree_root(header) == hash_tree_root(block.message)
+
+    return LightClientBootstrap(
+        header=block_to_light_client_header(block),
+        current_sync_committee=state.current_sync_committee,
+        current_sync_committee_branch=CurrentSyncCommitteeBranch(
+            compute_merkle_proof(state, current_sync_committee_gindex_at_slot(state.slot))),
+    )
+
+
+def create_light_client_update(state: BeaconState,
+                               block: SignedBeaconBlock,
+                               attested_state: BeaconState,
+                               attested_block: SignedBeaconBlock,
+                               finalized_block: Optional[SignedBeaconBlock]) -> LightClientUpdate:
+    assert compute_epoch_at_slot(attested_state.slot) >= config.ALTAIR_FORK_EPOCH
+    assert sum(block.message.body.sync_aggregate.sync_committee_bits) >= MIN_SYNC_COMMITTEE_PARTICIPANTS
+
+    assert state.slot == state.latest_block_header.slot
+    header = state.latest_block_header.copy()
+    header.state_root = hash_tree_root(state)
+    assert hash_tree_root(header) == hash_tree_root(block.message)
+    update_signature_period = compute_sync_committee_period_at_slot(block.message.slot)
+
+    assert attested_state.slot == attested_state.latest_block_header.slot
+    attested_header = attested_state.latest_block_header.copy()
+    attested_header.state_root = hash_tree_root(attested_state)
+    assert hash_tree_root(attested_header) == hash_tree_root(attested_block.message) == block.message.parent_root
+    update_attested_period = compute_sync_committee_period_at_slot(attested_block.message.slot)
+
+    update = LightClientUpdate()
+
+    update.attested_header = block_to_light_client_header(attested_block)
+
+    # `next_sync_committee` is only useful if the message is signed by the current sync committee
+    if update_attested_period == update_signature_period:
+        update.next_sync_committee = attested_state.next_sync_committee
+        update.next_sync_committee_branch = NextSyncCommitteeBranch(
+            compute_merkle_proof(attested_state, next_sync_committee_gindex_at_slot(attested_state.slot)))
+
+    # Indicate finality whenever possible
+    if finalized_block is not None:
+        if finalized_block.message.slot != GENESIS_SLOT:
+            update.finalized_header = block_to_light_client_header(finalized_block)
+            assert hash_tree_root(update.finalized_header.beacon) == attested_state.finalized_checkpoint.root
+        else:
+            assert attested_state.finalized_checkpoint.root == Bytes32()
+        update.finality_branch = FinalityBranch(
+            compute_merkle_proof(attested_state, finalized_root_gindex_at_slot(attested_state.slot)))
+
+    update.sync_aggregate = block.message.body.sync_aggregate
+    update.signature_slot = block.message.slot
+
+    return update
+
+
+def create_light_client_finality_update(update: LightClientUpdate) -> LightClientFinalityUpdate:
+    return LightClientFinalityUpdate(
+        attested_header=update.attested_header,
+        finalized_header=update.finalized_header,
+        finality_branch=update.finality_branch,
+        sync_aggregate=update.sync_aggregate,
+        signature_slot=update.signature_slot,
+    )
+
+
+def create_light_client_optimistic_update(update: LightClientUpdate) -> LightClientOptimisticUpdate:
+    return LightClientOptimisticUpdate(
+        attested_header=update.attested_header,
+        sync_aggregate=update.sync_aggregate,
+        signature_slot=update.signature_slot,
+    )
+
+
+def finalized_root_gindex_at_slot(slot: Slot) -> GeneralizedIndex:
+    # pylint: disable=unused-argument
+    return FINALIZED_ROOT_GINDEX
+
+
+def current_sync_committee_gindex_at_slot(slot: Slot) -> GeneralizedIndex:
+    # pylint: disable=unused-argument
+    return CURRENT_SYNC_COMMITTEE_GINDEX
+
+
+def next_sync_committee_gindex_at_slot(slot: Slot) -> GeneralizedIndex:
+    # pylint: disable=unused-argument
+    return NEXT_SYNC_COMMITTEE_GINDEX
+
+
+def is_valid_light_client_header(header: LightClientHeader) -> bool:
+    # pylint: disable=unused-argument
+    return True
+
+
+def is_sync_committee_update(update: LightClientUpdate) -> bool:
+    return update.next_sync_committee_branch != NextSyncCommitteeBranch()
+
+
+def is_finality_update(update: LightClientUpdate) -> bool:
+    return update.finality_branch != FinalityBranch()
+
+
+def is_better_update(new_update: LightClientUpdate, old_update: LightClientUpdate) -> bool:
+    # Compare supermajority (> 2/3) sync committee participation
+    max_active_participants = len(new_update.sync_aggregate.sync_committee_bits)
+    new_num_active_participants = sum(new_update.sync_aggregate.sync_committee_bits)
+    old_num_active_participants = sum(old_update.sync_aggregate.sync_committee_bits)
+    new_has_supermajority = new_num_active_participants * 3 >= max_active_participants * 2
+    old_has_supermajority = old_num_active_participants * 3 >= max_active_participants * 2
+    if new_has_supermajority != old_has_supermajority:
+        return new_has_supermajority
+    if not new_has_supermajority and new_num_active_participants != old_num_active_participants:
+        return new_num_active_participants > old_num_active_participants
+
+    # Compare presence of relevant sync committee
+    new_has_relevant_sync_committee = is_sync_committee_update(new_update) and (
+        compute_sync_committee_period_at_slot(new_update.attested_header.beacon.slot)
+        == compute_sync_committee_period_at_slot(new_update.signature_slot)
+    )
+    old_has_relevant_sync_committee = is_sync_committee_update(old_update) and (
+        compute_sync_committee_period_at_slot(old_update.attested_header.beacon.slot)
+        == compute_sync_committee_period_at_slot(old_update.signature_slot)
+    )
+    if new_has_relevant_sync_committee != old_has_relevant_sync_committee:
+        return new_has_relevant_sync_committee
+
+    # Compare indication of any finality
+    new_has_finality = is_finality_update(new_update)
+    old_has_finality = is_finality_update(old_update)
+    if new_has_finality != old_has_finality:
+        return new_has_finality
+
+    # Compare sync committee finality
+    if new_has_finality:
+        new_has_sync_committee_finality = (
+            compute_sync_committee_period_at_slot(new_update.finalized_header.beacon.slot)
+            == compute_sync_committee_period_at_slot(new_update.attested_header.beacon.slot)
+        )
+        old_has_sync_committee_finality = (
+            compute_sync_committee_period_at_slot(old_update.finalized_header.beacon.slot)
+            == compute_sync_committee_period_at_slot(old_update.attested_header.beacon.slot)
+        )
+        if new_has_sync_committee_finality != old_has_sync_committee_finality:
+            return new_has_sync_committee_finality
+
+    # Tiebreaker 1: Sync committee participation beyond supermajority
+    if new_num_active_participants != old_num_active_participants:
+        return new_num_active_participants > old_num_active_participants
+
+    # Tiebreaker 2: Prefer older data (fewer changes to best)
+    if new_update.attested_header.beacon.slot != old_update.attested_header.beacon.slot:
+        return new_update.attested_header.beacon.slot < old_update.attested_header.beacon.slot
+
+    # Tiebreaker 3: Prefer updates with earlier signature slots
+    return new_update.signature_slot < old_update.signature_slot
+
+
+def is_next_sync_committee_known(store: LightClientStore) -> bool:
+    return store.next_sync_committee != SyncCommittee()
+
+
+def get_safety_threshold(store: LightClientStore) -> uint64:
+    return max(
+        store.previous_max_active_participants,
+        store.current_max_active_participants,
+    ) // 2
+
+
+def get_subtree_index(generalized_index: GeneralizedIndex) -> uint64:
+    return uint64(generalized_index % 2**(floorlog2(generalized_index)))
+
+
+def is_valid_normalized_merkle_branch(leaf: Bytes32,
+                                      branch: Sequence[Bytes32],
+                                      gindex: GeneralizedIndex,
+                                      root: Root) -> bool:
+    depth = floorlog2(gindex)
+    index = get_subtree_index(gindex)
+    num_extra = len(branch) - depth
+    for i in range(num_extra):
+        if branch[i] != Bytes32():
+            return False
+    return is_valid_merkle_branch(leaf, branch[num_extra:], depth, index, root)
+
+
+def compute_sync_committee_period_at_slot(slot: Slot) -> uint64:
+    return compute_sync_committee_period(compute_epoch_at_slot(slot))
+
+
+def initialize_light_client_store(trusted_block_root: Root,
+                                  bootstrap: LightClientBootstrap) -> LightClientStore:
+    assert is_valid_light_client_header(bootstrap.header)
+    assert hash_tree_root(bootstrap.header.beacon) == trusted_block_root
+
+    assert is_valid_normalized_merkle_branch(
+        leaf=hash_tree_root(bootstrap.current_sync_committee),
+        branch=bootstrap.current_sync_committee_branch,
+        gindex=current_sync_committee_gindex_at_slot(bootstrap.header.beacon.slot),
+        root=bootstrap.header.beacon.state_root,
+    )
+
+    return LightClientStore(
+        finalized_header=bootstrap.header,
+        current_sync_committee=bootstrap.current_sync_committee,
+        next_sync_committee=SyncCommittee(),
+        best_valid_update=None,
+        optimistic_header=bootstrap.header,
+        previous_max_active_participants=0,
+        current_max_active_participants=0,
+    )
+
+
+def validate_light_client_update(store: LightClientStore,
+                                 update: LightClientUpdate,
+                                 current_slot: Slot,
+                                 genesis_validators_root: Root) -> None:
+    # Verify sync committee has sufficient participants
+    sync_aggregate = update.sync_aggregate
+    assert sum(sync_aggregate.sync_committee_bits) >= MIN_SYNC_COMMITTEE_PARTICIPANTS
+
+    # Verify update does not skip a sync committee period
+    assert is_valid_light_client_header(update.attested_header)
+    update_attested_slot = update.attested_header.beacon.slot
+    update_finalized_slot = update.finalized_header.beacon.slot
+    assert current_slot >= update.signature_slot > update_attested_slot >= update_finalized_slot
+    store_period = compute_sync_committee_period_at_slot(store.finalized_header.beacon.slot)
+    update_signature_period = compute_sync_committee_period_at_slot(update.signature_slot)
+    if is_next_sync_committee_known(store):
+        assert update_signature_period in (store_period, store_period + 1)
+    else:
+        assert update_signature_period == store_period
+
+    # Verify update is relevant
+    update_attested_period = compute_sync_committee_period_at_slot(update_attested_slot)
+    update_has_next_sync_committee = not is_next_sync_committee_known(store) and (
+        is_sync_committee_update(update) and update_attested_period == store_period
+    )
+    assert (
+        update_attested_slot > store.finalized_header.beacon.slot
+        or update_has_next_sync_committee
+    )
+
+    # Verify that the `finality_branch`, if present, confirms `finalized_header`
+    # to match the finalized checkpoint root saved in the state of `attested_header`.
+    # Note that the genesis finalized checkpoint root is represented as a zero hash.
+    if not is_finality_update(update):
+        assert update.finalized_header == LightClientHeader()
+    else:
+        if update_finalized_slot == GENESIS_SLOT:
+            assert update.finalized_header == LightClientHeader()
+            finalized_root = Bytes32()
+        else:
+            assert is_valid_light_client_header(update.finalized_header)
+            finalized_root = hash_tree_root(update.finalized_header.beacon)
+        assert is_valid_normalized_merkle_branch(
+            leaf=finalized_root,
+            branch=update.finality_branch,
+            gindex=finalized_root_gindex_at_slot(update.attested_header.beacon.slot),
+            root=update.attested_header.beacon.state_root,
+        )
+
+    # Verify that the `next_sync_committee`, if present, actually is the next sync committee saved in the
+    # state of the `attested_header`
+    if not is_sync_committee_update(update):
+        assert update.next_sync_committee == SyncCommittee()
+    else:
+        if update_attested_period == store_period and is_next_sync_committee_known(store):
+            assert update.next_sync_committee == store.next_sync_committee
+        assert is_valid_normalized_merkle_branch(
+            leaf=hash_tree_root(update.next_sync_committee),
+            branch=update.next_sync_committee_branch,
+            gindex=next_sync_committee_gindex_at_slot(update.attested_header.beacon.slot),
+            root=update.attested_header.beacon.state_root,
+        )
+
+    # Verify sync committee aggregate signature
+    if update_signature_period == store_period:
+        sync_committee = store.current_sync_committee
+    else:
+        sync_committee = store.next_sync_committee
+    participant_pubkeys = [
+        pubkey for (bit, pubkey) in zip(sync_aggregate.sync_committee_bits, sync_committee.pubkeys)
+        if bit
+    ]
+    fork_version_slot = max(update.signature_slot, Slot(1)) - Slot(1)
+    fork_version = compute_fork_version(compute_epoch_at_slot(fork_version_slot))
+    domain = compute_domain(DOMAIN_SYNC_COMMITTEE, fork_version, genesis_validators_root)
+    signing_root = compute_signing_root(update.attested_header.beacon, domain)
+    assert bls.FastAggregateVerify(participant_pubkeys, signing_root, sync_aggregate.sync_committee_signature)
+
+
+def apply_light_client_update(store: LightClientStore, update: LightClientUpdate) -> None:
+    store_period = compute_sync_committee_period_at_slot(store.finalized_header.beacon.slot)
+    update_finalized_period = compute_sync_committee_period_at_slot(update.finalized_header.beacon.slot)
+    if not is_next_sync_committee_known(store):
+        assert update_finalized_period == store_period
+        store.next_sync_committee = update.next_sync_committee
+    elif update_finalized_period == store_period + 1:
+        store.current_sync_committee = store.next_sync_committee
+        store.next_sync_committee = update.next_sync_committee
+        store.previous_max_active_participants = store.current_max_active_participants
+        store.current_max_active_participants = 0
+    if update.finalized_header.beacon.slot > store.finalized_header.beacon.slot:
+        store.finalized_header = update.finalized_header
+        if store.finalized_header.beacon.slot > store.optimistic_header.beacon.slot:
+            store.optimistic_header = store.finalized_header
+
+
+def process_light_client_store_force_update(store: LightClientStore, current_slot: Slot) -> None:
+    if (
+        current_slot > store.finalized_header.beacon.slot + UPDATE_TIMEOUT
+        and store.best_valid_update is not None
+    ):
+        # Forced best update when the update timeout has elapsed.
+        # Because the apply logic waits for `finalized_header.beacon.slot` to indicate sync committee finality,
+        # the `attested_header` may be treated as `finalized_header` in extended periods of non-finality
+        # to guarantee progression into later sync committee periods according to `is_better_update`.
+        if store.best_valid_update.finalized_header.beacon.slot <= store.finalized_header.beacon.slot:
+            store.best_valid_update.finalized_header = store.best_valid_update.attested_header
+        apply_light_client_update(store, store.best_valid_update)
+        store.best_valid_update = None
+
+
+def process_light_client_update(store: LightClientStore,
+                                update: LightClientUpdate,
+                                current_slot: Slot,
+                                genesis_validators_root: Root) -> None:
+    validate_light_client_update(store, update, current_slot, genesis_validators_root)
+
+    sync_committee_bits = update.sync_aggregate.sync_committee_bits
+
+    # Update the best update in case we have to force-update to it if the timeout elapses
+    if (
+        store.best_valid_update is None
+        or is_better_update(update, store.best_valid_update)
+    ):
+        store.best_valid_update = update
+
+    # Track the maximum number of active participants in the committee signatures
+    store.current_max_active_participants = max(
+        store.current_max_active_participants,
+        sum(sync_committee_bits),
+    )
+
+    # Update the optimistic header
+    if (
+        sum(sync_committee_bits) > get_safety_threshold(store)
+        and update.attested_header.beacon.slot > store.optimistic_header.beacon.slot
+    ):
+        store.optimistic_header = update.attested_header
+
+    # Update finalized header
+    update_has_finalized_next_sync_committee = (
+        not is_next_sync_committee_known(store)
+        and is_sync_committee_update(update) and is_finality_update(update) and (
+            compute_sync_committee_period_at_slot(update.finalized_header.beacon.slot)
+            == compute_sync_committee_period_at_slot(update.attested_header.beacon.slot)
+        )
+    )
+    if (
+        sum(sync_committee_bits) * 3 >= len(sync_committee_bits) * 2
+        and (
+            update.finalized_header.beacon.slot > store.finalized_header.beacon.slot
+            or update_has_finalized_next_sync_committee
+        )
+    ):
+        # Normal update through 2/3 threshold
+        apply_light_client_update(store, update)
+        store.best_valid_update = None
+
+
+def process_light_client_finality_update(store: LightClientStore,
+                                         finality_update: LightClientFinalityUpdate,
+                                         current_slot: Slot,
+                                         genesis_validators_root: Root) -> None:
+    update = LightClientUpdate(
+        attested_header=finality_update.attested_header,
+        next_sync_committee=SyncCommittee(),
+        next_sync_committee_branch=NextSyncCommitteeBranch(),
+        finalized_header=finality_update.finalized_header,
+        finality_branch=finality_update.finality_branch,
+        sync_aggregate=finality_update.sync_aggregate,
+        signature_slot=finality_update.signature_slot,
+    )
+    process_light_client_update(store, update, current_slot, genesis_validators_root)
+
+
+def process_light_client_optimistic_update(store: LightClientStore,
+                                           optimistic_update: LightClientOptimisticUpdate,
+                                           current_slot: Slot,
+                                           genesis_validators_root: Root) -> None:
+    update = LightClientUpdate(
+        attested_header=optimistic_update.attested_header,
+        next_sync_committee=SyncCommittee(),
+        next_sync_committee_branch=NextSyncCommitteeBranch(),
+        finalized_header=LightClientHeader(),
+        finality_branch=FinalityBranch(),
+        sync_aggregate=optimistic_update.sync_aggregate,
+        signature_slot=optimistic_update.signature_slot,
+    )
+    process_light_client_update(store, update, current_slot, genesis_validators_root)
+
+
+def get_eth1_data(block: Eth1Block) -> Eth1Data:
+    """
+    A stub function return mocking Eth1Data.
+    """
+    return Eth1Data(
+        deposit_root=block.deposit_root,
+        deposit_count=block.deposit_count,
+        block_hash=hash_tree_root(block))
+
+
+def cache_this(key_fn, value_fn, lru_size):  # type: ignore
+    cache_dict = LRU(size=lru_size)
+
+    def wrapper(*args, **kw):  # type: ignore
+        key = key_fn(*args, **kw)
+        nonlocal cache_dict
+        if key not in cache_dict:
+            cache_dict[key] = value_fn(*args, **kw)
+        return cache_dict[key]
+    return wrapper
+
+
+_compute_shuffled_index = compute_shuffled_index
+compute_shuffled_index = cache_this(
+    lambda index, index_count, seed: (index, index_count, seed),
+    _compute_shuffled_index, lru_size=SLOTS_PER_EPOCH * 3)
+
+
+def _compute_shuffled_indices(index_count: uint64, seed: Bytes32) -> Sequence[uint64]:
+    """
+    Return ``[compute_shuffled_index(i, index_count, seed) for i in range(index_count)]`` in a single pass.
+    Each round hashes its pivot and source blocks once and swaps every pair of positions in place.
+    Rounds are applied in reverse so that position ``i`` ends up holding the shuffled index of ``i``.
+    """
+    count = int(index_count)
+    shuffled = list(range(count))
+    if count <= 1:
+        return [uint64(index) for index in shuffled]
+
+    for current_round in reversed(range(SHUFFLE_ROUND_COUNT)):
+        round_bytes = uint_to_bytes(uint8(current_round))
+        pivot = int(bytes_to_uint64(hash(seed + round_bytes)[0:8])) % count
+        source = b"".join(
+            hash(seed + round_bytes + uint_to_bytes(uint32(block)))
+            for block in range((count + 255) // 256)
+        )
+        # Visit each pair ``(index, flip)`` with ``index < flip`` once; the bit is read at ``max(index, flip)``
+        for index in range(0, (pivot + 1) // 2):
+            flip = pivot - index
+            if (source[flip // 8] >> (flip % 8)) & 1:
+                shuffled[index], shuffled[flip] = shuffled[flip], shuffled[index]
+        for index in range(pivot + 1, (pivot + count + 1) // 2):
+            flip = pivot + count - index
+            if (source[flip // 8] >> (flip % 8)) & 1:
+                shuffled[index], shuffled[flip] = shuffled[flip], shuffled[index]
+
+    return [uint64(index) for index in shuffled]
+
+
+compute_shuffled_indices = cache_this(
+    lambda index_count, seed: (index_count, seed),
+    _compute_shuffled_indices, lru_size=4)
+
+
+def _compute_committee_from_shuffled_indices(indices: Sequence[ValidatorIndex],
+                                             seed: Bytes32,
+                                             index: uint64,
+                                             count: uint64) -> Sequence[ValidatorIndex]:
+    """
+    Shuffle the whole of ``indices`` once per ``seed`` instead of calling ``compute_shuffled_index`` per position.
+    """
+    start = (len(indices) * index) // count
+    end = (len(indices) * uint64(index + 1)) // count
+    shuffled_indices = compute_shuffled_indices(uint64(len(indices)), seed)
+    return [indices[shuffled_indices[i]] for i in range(start, end)]
+
+
+_compute_committee = compute_committee
+compute_committee = _compute_committee_from_shuffled_indices
+
+
+@dataclass
+class ValidatorColumns(object):
+    """
+    Per-validator columns of a validator registry, gathered from its tree backing in one pass.
+    The columns are ``numpy`` arrays indexed by validator index.
+    """
+    effective_balance: Any
+    slashed: Any
+    activation_eligibility_epoch: Any
+    activation_epoch: Any
+    exit_epoch: Any
+    withdrawable_epoch: Any
+    withdrawal_prefix: Any
+
+    def is_active(self, epoch: Epoch) -> Any:
+        return (self.activation_epoch <= int(epoch)) & (int(epoch) < self.exit_epoch)
+
+    def is_eligible(self, previous_epoch: Epoch) -> Any:
+        return self.is_active(previous_epoch) | (self.slashed & (int(previous_epoch) + 1 < self.withdrawable_epoch))
+
+
+VALIDATOR_COLUMNS_UINT64_FIELDS = [
+    'effective_balance', 'activation_eligibility_epoch', 'activation_epoch', 'exit_epoch', 'withdrawable_epoch',
+]
+
+
+def compute_validator_columns(validators: Sequence[Validator]) -> ValidatorColumns:
+    roots = get_container_field_roots(
+        get_element_nodes(validators),
+        Validator,
+        VALIDATOR_COLUMNS_UINT64_FIELDS + ['slashed', 'withdrawal_credentials'],
+    )
+    # Each field root is a 32-byte chunk holding the little-endian value
+    uint64_columns = {
+        name: numpy.frombuffer(roots[name], dtype='<u8')[::4].copy()
+        for name in VALIDATOR_COLUMNS_UINT64_FIELDS
+    }
+    return ValidatorColumns(
+        slashed=numpy.frombuffer(roots['slashed'], dtype='u1')[::32].astype(bool),
+        withdrawal_prefix=numpy.frombuffer(roots['withdrawal_credentials'], dtype='u1')[::32].copy(),
+        **uint64_columns,
+    )
+
+
+class ValidatorColumnsCache:
+    """
+    Cache of ``ValidatorColumns`` snapshots, and of balance columns.
+
+    Snapshots are keyed by the backing node of ``state.validators``, so copies of a state share a snapshot and any
+    change to the registry subtree gathers a new one. Cached columns are shared and made read-only.
+    Balance columns are keyed by the backing node of ``state.balances`` in the same way.
+    Both tables evict their least recently used entry once ``size`` entries are held.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.columns: Any = LRU(size=size)
+        self.balances: Any = LRU(size=size)
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        self.columns.clear()
+        self.balances.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_columns(self, validators: Sequence[Validator]) -> ValidatorColumns:
+        backing = validators.get_backing()  # type: ignore
+        columns = self.columns.get(backing)
+        if columns is None:
+            self.misses += 1
+            columns = compute_validator_columns(validators)
+            for value in columns.__dict__.values():
+                value.flags.writeable = False
+            self.columns[backing] = columns
+        else:
+            self.hits += 1
+        return columns
+
+    def get_balances(self, balances: Sequence[Gwei]) -> Any:
+        backing = balances.get_backing()  # type: ignore
+        column = self.balances.get(backing)
+        if column is None:
+            column = numpy.frombuffer(balances.encode_bytes(), dtype='<u8')  # type: ignore
+            self.balances[backing] = column
+        return column
+
+
+VALIDATOR_COLUMNS_CACHE = ValidatorColumnsCache(size=4)
+
+
+def get_validator_columns(state: BeaconState) -> ValidatorColumns:
+    return VALIDATOR_COLUMNS_CACHE.get_columns(state.validators)
+
+
+def _get_eligible_validator_indices_from_columns(state: BeaconState) -> Sequence[ValidatorIndex]:
+    if not NUMPY_AVAILABLE:
+        return _get_eligible_validator_indices(state)
+    eligible = get_validator_columns(state).is_eligible(get_previous_epoch(state))
+    return [ValidatorIndex(index) for index in numpy.flatnonzero(eligible).tolist()]
+
+
+_get_eligible_validator_indices = get_eligible_validator_indices
+get_eligible_validator_indices = _get_eligible_validator_indices_from_columns
+
+
+# Select the array-backed ``process_effective_balance_updates``; requires NumPy
+VECTORIZED_EFFECTIVE_BALANCE_UPDATES = False
+
+
+def _get_max_effective_balance_column_phase0(columns: ValidatorColumns) -> Any:
+    return numpy.full(len(columns.effective_balance), int(MAX_EFFECTIVE_BALANCE), dtype='<u8')
+
+
+# The maximum effective balances of the current fork, over a columnar snapshot
+get_max_effective_balance_column = _get_max_effective_balance_column_phase0
+
+
+def compute_effective_balance_column(balances: Any, columns: ValidatorColumns) -> Optional[Any]:
+    """
+    Return the effective balances of ``columns`` updated with hysteresis against ``balances``,
+    or ``None`` if the uint64 arithmetic could overflow.
+    """
+    effective_balances = columns.effective_balance
+    HYSTERESIS_INCREMENT = int(EFFECTIVE_BALANCE_INCREMENT // HYSTERESIS_QUOTIENT)
+    DOWNWARD_THRESHOLD = HYSTERESIS_INCREMENT * int(HYSTERESIS_DOWNWARD_MULTIPLIER)
+    UPWARD_THRESHOLD = HYSTERESIS_INCREMENT * int(HYSTERESIS_UPWARD_MULTIPLIER)
+    if (
+        int(balances.max(initial=0)) + DOWNWARD_THRESHOLD >= 2**64
+        or int(effective_balances.max(initial=0)) + UPWARD_THRESHOLD >= 2**64
+    ):
+        return None
+
+    updated = (
+        (balances + DOWNWARD_THRESHOLD < effective_balances)
+        | (effective_balances + UPWARD_THRESHOLD < balances)
+    )
+    new_effective_balances = numpy.minimum(
+        balances - balances % int(EFFECTIVE_BALANCE_INCREMENT), get_max_effective_balance_column(columns))
+    return numpy.where(updated, new_effective_balances, effective_balances).astype('<u8')
+
+
+def write_effective_balance_column(state: BeaconState, previous_effective_balances: Any,
+                                   effective_balances: Any) -> int:
+    """
+    Write back the effective balances that differ from ``previous_effective_balances``,
+    and return the number of validators rewritten.
+    """
+    dirty = numpy.flatnonzero(effective_balances != previous_effective_balances).tolist()
+    for index in dirty:
+        state.validators[index].effective_balance = Gwei(int(effective_balances[index]))
+    return len(dirty)
+
+
+def process_effective_balance_updates_vectorized(state: BeaconState) -> int:
+    """
+    Run ``process_effective_balance_updates`` over the registry snapshot of ``state``,
+    and return the number of validators whose effective balance was rewritten.
+    """
+    columns = get_validator_columns(state)
+    effective_balances = compute_effective_balance_column(
+        VALIDATOR_COLUMNS_CACHE.get_balances(state.balances), columns)
+    if effective_balances is None:
+        _process_effective_balance_updates(state)
+        return int((get_validator_columns(state).effective_balance != columns.effective_balance).sum())
+    return write_effective_balance_column(state, columns.effective_balance, effective_balances)
+
+
+def _process_effective_balance_updates_selected(state: BeaconState) -> None:
+    if VECTORIZED_EFFECTIVE_BALANCE_UPDATES and NUMPY_AVAILABLE:
+        process_effective_balance_updates_vectorized(state)
+    else:
+        _process_effective_balance_updates(state)
+
+
+_process_effective_balance_updates = process_effective_balance_updates
+process_effective_balance_updates = _process_effective_balance_updates_selected
+
+
+class ShufflingCache:
+    """
+    Epoch-scoped cache of committee shufflings.
+
+    Active validator indices are memoized per ``(registry backing node, epoch)``. Tree nodes are immutable,
+    so an unchanged registry is recognized without merkleizing it. With NumPy, the indices are read from the
+    registry's ``ValidatorColumns`` snapshot.
+    Shufflings are memoized per ``(epoch, seed, active indices digest)``, so registry changes that keep the
+    active set intact (e.g. effective balance updates) reuse the existing shuffling.
+    Both tables evict their least recently used entry once ``size`` entries are held.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.active_indices: Any = LRU(size=size)
+        self.shufflings: Any = LRU(size=size)
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        self.active_indices.clear()
+        self.shufflings.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_active_indices_and_digest(self, state: BeaconState,
+                                      epoch: Epoch) -> Tuple[Sequence[ValidatorIndex], Bytes32]:
+        key = (state.validators.get_backing(), epoch)
+        if key not in self.active_indices:
+            if NUMPY_AVAILABLE:
+                active = numpy.flatnonzero(get_validator_columns(state).is_active(epoch)).astype('<u8')
+                indices: Sequence[ValidatorIndex] = [ValidatorIndex(index) for index in active.tolist()]
+                digest = hash(active.tobytes())
+            else:
+                indices = _get_active_validator_indices(state, epoch)
+                digest = hash(b"".join(uint_to_bytes(index) for index in indices))
+            self.active_indices[key] = (indices, digest)
+        return self.active_indices[key]
+
+    def get_shuffling(self, state: BeaconState, epoch: Epoch) -> Sequence[ValidatorIndex]:
+        """
+        Return the active validator indices at ``epoch`` in attester shuffling order.
+        """
+        indices, digest = self.get_active_indices_and_digest(state, epoch)
+        seed = get_seed(state, epoch, DOMAIN_BEACON_ATTESTER)
+        key = (epoch, seed, digest)
+        if key in self.shufflings:
+            self.hits += 1
+        else:
+            self.misses += 1
+            shuffled_indices = compute_shuffled_indices(uint64(len(indices)), seed)
+            self.shufflings[key] = [indices[i] for i in shuffled_indices]
+        return self.shufflings[key]
+
+
+SHUFFLING_CACHE = ShufflingCache(size=4)
+
+
+def _get_active_validator_indices_from_cache(state: BeaconState, epoch: Epoch) -> Sequence[ValidatorIndex]:
+    return SHUFFLING_CACHE.get_active_indices_and_digest(state, epoch)[0]
+
+
+def _get_beacon_committee_from_shuffling(state: BeaconState,
+                                         slot: Slot,
+                                         index: CommitteeIndex) -> Sequence[ValidatorIndex]:
+    """
+    Slice the committee out of the cached shuffling of ``compute_epoch_at_slot(slot)``.
+    """
+    epoch = compute_epoch_at_slot(slot)
+    committees_per_slot = get_committee_count_per_slot(state, epoch)
+    shuffling = SHUFFLING_CACHE.get_shuffling(state, epoch)
+    committee_index = (slot % SLOTS_PER_EPOCH) * committees_per_slot + index
+    count = committees_per_slot * SLOTS_PER_EPOCH
+    start = (len(shuffling) * committee_index) // count
+    end = (len(shuffling) * uint64(committee_index + 1)) // count
+    return shuffling[start:end]
+
+
+_get_active_validator_indices = get_active_validator_indices
+get_active_validator_indices = _get_active_validator_indices_from_cache
+
+_get_beacon_committee = get_beacon_committee
+get_beacon_committee = _get_beacon_committee_from_shuffling
+
+
+class SwapOrNotShuffle:
+    """
+    ``compute_shuffled_index`` over ``index_count`` indices for a fixed ``seed``.
+
+    The round pivots are hashed once up front and each source block is hashed on first use, so shuffling
+    many indices with the same ``seed`` costs one hash per distinct ``(round, position // 256)`` instead of
+    two hashes per index and round.
+    """
+
+    def __init__(self, index_count: uint64, seed: Bytes32) -> None:
+        self.index_count = int(index_count)
+        self.seed = seed
+        self.pivots = [
+            int(bytes_to_uint64(hash(seed + uint_to_bytes(uint8(current_round)))[0:8])) % self.index_count
+            for current_round in range(SHUFFLE_ROUND_COUNT)
+        ] if self.index_count > 0 else []
+        self.sources: dict[Tuple[int, int], bytes] = {}
+
+    def get_source(self, current_round: int, block: int) -> bytes:
+        key = (current_round, block)
+        if key not in self.sources:
+            self.sources[key] = hash(self.seed + uint_to_bytes(uint8(current_round)) + uint_to_bytes(uint32(block)))
+        return self.sources[key]
+
+    def get(self, index: uint64) -> uint64:
+        assert index < self.index_count
+        position = int(index)
+        for current_round, pivot in enumerate(self.pivots):
+            flip = (pivot + self.index_count - position) % self.index_count
+            highest = max(position, flip)
+            source = self.get_source(current_round, highest // 256)
+            if (source[(highest % 256) // 8] >> (highest % 8)) & 1:
+                position = flip
+        return uint64(position)
+
+
+get_swap_or_not_shuffle = cache_this(
+    lambda index_count, seed: (index_count, seed),
+    SwapOrNotShuffle, lru_size=SLOTS_PER_EPOCH * 3)
+
+# Width of the random values drawn by ``compute_balance_weighted_sample`` and the balance they are scaled to
+SAMPLING_RANDOM_VALUE_BYTES = 1
+SAMPLING_MAX_EFFECTIVE_BALANCE = MAX_EFFECTIVE_BALANCE
+
+
+def _compute_balance_weighted_sample(state: BeaconState,
+                                     indices: Sequence[ValidatorIndex],
+                                     seed: Bytes32,
+                                     count: int) -> Tuple[list[ValidatorIndex], dict[ValidatorIndex, int]]:
+    """
+    Return the sample along with the effective balance of every candidate the rejection loop visited.
+    """
+    assert len(indices) > 0
+    total = uint64(len(indices))
+    shuffle = get_swap_or_not_shuffle(total, seed)
+    values_per_block = 32 // SAMPLING_RANDOM_VALUE_BYTES
+    max_random_value = 2**(8 * SAMPLING_RANDOM_VALUE_BYTES) - 1
+    max_effective_balance = int(SAMPLING_MAX_EFFECTIVE_BALANCE)
+    sample: list[ValidatorIndex] = []
+    effective_balances: dict[ValidatorIndex, int] = {}
+    random_bytes = b""
+    i = 0
+    while len(sample) < count:
+        offset = i % values_per_block
+        if offset == 0:
+            random_bytes = hash(seed + uint_to_bytes(uint64(i // values_per_block)))
+        random_value = int.from_bytes(
+            random_bytes[offset * SAMPLING_RANDOM_VALUE_BYTES:(offset + 1) * SAMPLING_RANDOM_VALUE_BYTES], "little")
+        candidate_index = indices[shuffle.get(uint64(i % total))]
+        if candidate_index not in effective_balances:
+            effective_balances[candidate_index] = int(state.validators[candidate_index].effective_balance)
+        if effective_balances[candidate_index] * max_random_value >= max_effective_balance * random_value:
+            sample.append(candidate_index)
+        i += 1
+    return sample, effective_balances
+
+
+def compute_balance_weighted_sample(state: BeaconState,
+                                    indices: Sequence[ValidatorIndex],
+                                    seed: Bytes32,
+                                    count: int) -> Sequence[ValidatorIndex]:
+    """
+    Return ``count`` indices, with possible duplicates, sampled from ``indices`` by effective balance.
+
+    Candidates and acceptance tests follow the rejection loop of ``compute_proposer_index``. The shuffle is
+    shared across draws and each random block is hashed once for all the values it holds.
+    """
+    return _compute_balance_weighted_sample(state, indices, seed, count)[0]
+
+
+def _compute_proposer_index_from_sample(state: BeaconState,
+                                        indices: Sequence[ValidatorIndex],
+                                        seed: Bytes32) -> ValidatorIndex:
+    return compute_balance_weighted_sample(state, indices, seed, 1)[0]
+
+
+_compute_proposer_index = compute_proposer_index
+compute_proposer_index = _compute_proposer_index_from_sample
+
+
+class ProposerCache:
+    """
+    Bounded cache of epoch-wide proposer tables.
+
+    Tables are keyed on ``(epoch, seed, active indices digest)`` and evict their least recently used entry once
+    ``size`` entries are held. Each slot keeps the effective balances its rejection loop read, and is sampled
+    again if any of them differ in the queried state.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.tables: Any = LRU(size=size)
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        self.tables.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_table(self, state: BeaconState,
+                  epoch: Epoch) -> Tuple[list[Any], Sequence[ValidatorIndex], Bytes32]:
+        indices, digest = SHUFFLING_CACHE.get_active_indices_and_digest(state, epoch)
+        seed = get_seed(state, epoch, DOMAIN_BEACON_PROPOSER)
+        key = (epoch, seed, digest)
+        if key in self.tables:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.tables[key] = [None] * SLOTS_PER_EPOCH
+        return self.tables[key], indices, seed
+
+    def get_proposer_index(self, state: BeaconState, slot: Slot) -> ValidatorIndex:
+        epoch = compute_epoch_at_slot(slot)
+        table, indices, seed = self.get_table(state, epoch)
+        position = slot % SLOTS_PER_EPOCH
+        entry = table[position]
+        if entry is None or any(
+            state.validators[index].effective_balance != effective_balance
+            for index, effective_balance in entry[1].items()
+        ):
+            proposer_seed = hash(seed + uint_to_bytes(slot))
+            sample, effective_balances = _compute_balance_weighted_sample(state, indices, proposer_seed, 1)
+            entry = table[position] = (sample[0], effective_balances)
+        return entry[0]
+
+
+PROPOSER_CACHE = ProposerCache(size=4)
+
+
+def get_beacon_proposer_indices(state: BeaconState, epoch: Epoch) -> Sequence[ValidatorIndex]:
+    """
+    Return the beacon proposer index of every slot of ``epoch``, from the current epoch up to
+    ``MIN_SEED_LOOKAHEAD`` epochs ahead, whose proposer seed is already determined.
+    Effective balances are read from ``state``, so the proposers of a later epoch only hold while
+    the epoch transitions in between leave the effective balances unchanged.
+    """
+    current_epoch = get_current_epoch(state)
+    assert current_epoch <= epoch <= current_epoch + MIN_SEED_LOOKAHEAD
+    start_slot = compute_start_slot_at_epoch(epoch)
+    return [PROPOSER_CACHE.get_proposer_index(state, Slot(start_slot + i)) for i in range(SLOTS_PER_EPOCH)]
+
+
+def _get_beacon_proposer_index_from_cache(state: BeaconState) -> ValidatorIndex:
+    return PROPOSER_CACHE.get_proposer_index(state, state.slot)
+
+
+_get_beacon_proposer_index = get_beacon_proposer_index
+get_beacon_proposer_index = _get_beacon_proposer_index_from_cache
+
+
+class PubkeyIndex:
+    """
+    Append-only map from validator pubkey to the lowest validator index holding it.
+    """
+
+    def __init__(self, pubkeys: Sequence[bytes]) -> None:
+        self.pubkeys: list[bytes] = []
+        self.indices: dict[bytes, ValidatorIndex] = {}
+        self.extend(pubkeys)
+
+    def extend(self, pubkeys: Sequence[bytes]) -> None:
+        for pubkey in pubkeys:
+            self.indices.setdefault(pubkey, ValidatorIndex(len(self.pubkeys)))
+            self.pubkeys.append(pubkey)
+
+
+def _get_validator_pubkeys(nodes: Sequence[Any]) -> list[bytes]:
+    return [bytes(BLSPubkey.view_from_backing(node)) for node in get_container_field_nodes(nodes, Validator, 'pubkey')]
+
+
+def _collect_changed_nodes(node: Any, base: Any, depth: int, offset: int, count: int, out: list[Any]) -> None:
+    # Walk two registry trees side by side, skipping the subtrees they share
+    if node is base or offset >= count:
+        return
+    if depth == 0:
+        out.append((offset, node))
+        return
+    pivot = 1 << (depth - 1)
+    _collect_changed_nodes(node.get_left(), base.get_left(), depth - 1, offset, count, out)
+    _collect_changed_nodes(node.get_right(), base.get_right(), depth - 1, offset + pivot, count, out)
+
+
+class PubkeyIndexCache:
+    """
+    Cache of pubkey to validator index lookups.
+
+    Registries are recognized by the backing node of ``state.validators``, so copies of a state share an entry.
+    An entry is a ``PubkeyIndex`` together with the number of validators of the registry it covers,
+    and registries that extend one another share the same ``PubkeyIndex``.
+    A registry that is not cached yet is derived from the most recently used one by walking only the subtrees
+    the two registries do not share: the pubkeys of changed validators are checked, and the validators past the
+    longest matching prefix, e.g. those appended by ``add_validator_to_registry``, are indexed.
+    The index is rebuilt from scratch only if the registries share no prefix.
+    The registry table evicts its least recently used entry once ``size`` entries are held.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.registries: Any = LRU(size=size)
+        self.latest: Optional[Tuple[Any, Tuple[PubkeyIndex, int]]] = None
+        self.hits = 0
+        self.derivations = 0
+        self.rebuilds = 0
+
+    def clear(self) -> None:
+        self.registries.clear()
+        self.latest = None
+        self.hits = 0
+        self.derivations = 0
+        self.rebuilds = 0
+
+    def get_registry_index(self, validators: Sequence[Validator]) -> Tuple[PubkeyIndex, int]:
+        backing = validators.get_backing()  # type: ignore
+        entry = self.registries.get(backing)
+        if entry is None:
+            entry = self._derive_registry_index(validators)
+            self.registries[backing] = entry
+        else:
+            self.hits += 1
+        self.latest = (backing, entry)
+        return entry
+
+    def _derive_registry_index(self, validators: Sequence[Validator]) -> Tuple[PubkeyIndex, int]:
+        count = len(validators)
+        prefix = 0
+        if self.latest is not None:
+            base_backing, (pubkey_index, base_count) = self.latest
+            # Find the longest prefix of validators whose pubkeys match the most recently used registry
+            changed: list[Any] = []
+            _collect_changed_nodes(
+                validators.get_backing().get_left(),  # type: ignore
+                base_backing.get_left(),
+                validators.__class__.contents_depth(),  # type: ignore
+                0, min(count, base_count), changed,
+            )
+            changed_pubkeys = _get_validator_pubkeys([node for _, node in changed])
+            prefix = min(
+                [index for (index, _), pubkey in zip(changed, changed_pubkeys) if pubkey_index.pubkeys[index] != pubkey]
+                + [min(count, base_count)]
+            )
+        if prefix == 0:
+            self.rebuilds += 1
+            return PubkeyIndex(_get_validator_pubkeys(get_element_nodes(validators))), count
+
+        self.derivations += 1
+        if prefix < count:
+            if len(pubkey_index.pubkeys) != prefix:
+                # The index holds pubkeys of another registry past the shared prefix
+                pubkey_index = PubkeyIndex(pubkey_index.pubkeys[:prefix])
+            pubkey_index.extend(_get_validator_pubkeys(get_element_nodes(validators, start=prefix)))
+        return pubkey_index, count
+
+    def get_validator_index(self, state: BeaconState, pubkey: BLSPubkey) -> Optional[ValidatorIndex]:
+        """
+        Return the lowest index of a validator of ``state`` with ``pubkey``, if any.
+        """
+        pubkey_index, count = self.get_registry_index(state.validators)
+        index = pubkey_index.indices.get(bytes(pubkey))
+        if index is None or index >= count:
+            return None
+        return index
+
+
+PUBKEY_INDEX_CACHE = PubkeyIndexCache(size=8)
+
+
+def get_validator_index_by_pubkey(state: BeaconState, pubkey: BLSPubkey) -> Optional[ValidatorIndex]:
+    return PUBKEY_INDEX_CACHE.get_validator_index(state, pubkey)
+
+
+class ValidatorPubkeys:
+    """
+    The pubkeys of the validators of ``state``, standing in for ``[v.pubkey for v in state.validators]``.
+    Membership and ``index`` are answered from the ``PUBKEY_INDEX_CACHE`` entry of the registry at construction.
+    """
+
+    def __init__(self, state: BeaconState) -> None:
+        self.pubkey_index, self.count = PUBKEY_INDEX_CACHE.get_registry_index(state.validators)
+
+    def __contains__(self, pubkey: object) -> bool:
+        index = self.pubkey_index.indices.get(bytes(pubkey))  # type: ignore
+        return index is not None and index < self.count
+
+    def index(self, pubkey: BLSPubkey) -> int:
+        index = self.pubkey_index.indices.get(bytes(pubkey))
+        if index is None or index >= self.count:
+            raise ValueError(f"{pubkey.hex()} is not in the registry")
+        return int(index)
+
+
+def get_validator_pubkeys(state: BeaconState) -> ValidatorPubkeys:
+    return ValidatorPubkeys(state)
+
+
+def _add_validator_to_registry_indexing_pubkey(state: BeaconState,
+                                               pubkey: BLSPubkey,
+                                               withdrawal_credentials: Bytes32,
+                                               amount: uint64) -> None:
+    _add_validator_to_registry(state, pubkey, withdrawal_credentials, amount)
+    # Index the new validator on top of the registry it was appended to
+    PUBKEY_INDEX_CACHE.get_registry_index(state.validators)
+
+
+_add_validator_to_registry = add_validator_to_registry
+add_validator_to_registry = _add_validator_to_registry_indexing_pubkey
+
+
+class TotalActiveBalanceCache:
+    """
+    Incrementally maintained ``get_total_active_balance``.
+
+    Totals are kept per ``(registry backing node, epoch)``, so copies of a state share an entry.
+    A registry that is not cached yet is derived from the most recently used total of the same epoch by walking
+    only the subtrees the two registries do not share, and adjusting the total by the active balance of the
+    changed and appended validators. Activations, exits and effective balance updates are thus followed without
+    merkleizing the registry. The total is summed from scratch at the first query of an epoch, or if the
+    registry is shorter than the one it would be derived from.
+    With ``debug`` set, every total is checked against the reference ``get_total_active_balance``.
+    The total table evicts its least recently used entry once ``size`` entries are held.
+    """
+
+    def __init__(self, size: int, debug: bool = False) -> None:
+        self.size = size
+        self.debug = debug
+        self.totals: Any = LRU(size=size)
+        self.latest: Optional[Tuple[Any, Epoch, int]] = None
+        self.hits = 0
+        self.derivations = 0
+        self.rebuilds = 0
+
+    def clear(self) -> None:
+        self.totals.clear()
+        self.latest = None
+        self.hits = 0
+        self.derivations = 0
+        self.rebuilds = 0
+
+    def _derive_total(self, state: BeaconState, epoch: Epoch) -> int:
+        validators = state.validators
+        count = len(validators)
+        if self.latest is not None:
+            base_backing, base_epoch, total = self.latest
+            base_validators = validators.__class__.view_from_backing(base_backing)
+            base_count = len(base_validators)
+            if base_epoch == epoch and base_count <= count:
+                self.derivations += 1
+                changed: list[Any] = []
+                _collect_changed_nodes(
+                    validators.get_backing().get_left(),
+                    base_backing.get_left(),
+                    validators.__class__.contents_depth(),
+                    0, base_count, changed,
+                )
+                for index, node in changed:
+                    validator = Validator.view_from_backing(node)
+                    if is_active_validator(validator, epoch):
+                        total += int(validator.effective_balance)
+                    if is_active_validator(base_validators[index], epoch):
+                        total -= int(base_validators[index].effective_balance)
+                for node in get_element_nodes(validators, start=base_count):
+                    validator = Validator.view_from_backing(node)
+                    if is_active_validator(validator, epoch):
+                        total += int(validator.effective_balance)
+                return total
+
+        self.rebuilds += 1
+        return sum(int(validators[index].effective_balance) for index in get_active_validator_indices(state, epoch))
+
+    def get_total_active_balance(self, state: BeaconState) -> Gwei:
+        epoch = get_current_epoch(state)
+        backing = state.validators.get_backing()
+        key = (backing, epoch)
+        total = self.totals.get(key)
+        if total is None:
+            total = self._derive_total(state, epoch)
+            self.totals[key] = total
+        else:
+            self.hits += 1
+        self.latest = (backing, epoch, total)
+        total_active_balance = Gwei(max(EFFECTIVE_BALANCE_INCREMENT, total))
+        if self.debug:
+            assert total_active_balance == _get_total_active_balance(state)
+        return total_active_balance
+
+
+TOTAL_ACTIVE_BALANCE_CACHE = TotalActiveBalanceCache(size=8)
+
+
+def _get_total_active_balance_from_cache(state: BeaconState) -> Gwei:
+    return TOTAL_ACTIVE_BALANCE_CACHE.get_total_active_balance(state)
+
+
+_get_total_active_balance = get_total_active_balance
+get_total_active_balance = _get_total_active_balance_from_cache
+
+_get_base_reward = get_base_reward
+get_base_reward = cache_this(
+    lambda state, index: (state.validators.get_backing(), state.slot, index),
+    _get_base_reward, lru_size=2048)
+
+_get_matching_target_attestations = get_matching_target_attestations
+get_matching_target_attestations = cache_this(
+    lambda state, epoch: (state.hash_tree_root(), epoch),
+    _get_matching_target_attestations, lru_size=10)
+
+_get_matching_head_attestations = get_matching_head_attestations
+get_matching_head_attestations = cache_this(
+    lambda state, epoch: (state.hash_tree_root(), epoch),
+    _get_matching_head_attestations, lru_size=10)
+
+
+class BlockChildren:
+    """
+    Index from the block roots of a ``Store`` to the roots of their children.
+
+    ``on_block`` adds each new block, and the index is pruned of blocks that left ``store.blocks`` when the
+    finalized checkpoint advances. ``sync`` brings the index back to the roots of ``store.blocks``, picking up
+    blocks inserted into or removed from ``store.blocks`` by other means. Traversals sync once and then read the
+    index with ``get``.
+    """
+
+    def __init__(self) -> None:
+        self.children: dict[Root, list[Root]] = {}
+        self.parents: dict[Root, Root] = {}
+        self.finalized_checkpoint: Optional[Checkpoint] = None
+
+    def add(self, root: Root, parent_root: Root) -> None:
+        if root in self.parents:
+            return
+        self.parents[root] = parent_root
+        self.children.setdefault(parent_root, []).append(root)
+
+    def prune(self, store: Store) -> None:
+        for root in [root for root in self.parents.keys() if root not in store.blocks]:
+            parent_root = self.parents.pop(root)
+            self.children.pop(root, None)
+            siblings = self.children.get(parent_root)
+            if siblings is not None:
+                siblings.remove(root)
+                if len(siblings) == 0:
+                    del self.children[parent_root]
+
+    def sync(self, store: Store) -> None:
+        if self.parents.keys() == store.blocks.keys():
+            return
+        self.prune(store)
+        for root, block in store.blocks.items():
+            self.add(root, block.parent_root)
+
+    def get(self, root: Root) -> Sequence[Root]:
+        return self.children.get(root, [])
+
+
+def get_block_children(store: Store) -> BlockChildren:
+    block_children = store.__dict__.get('block_children')
+    if block_children is None:
+        block_children = store.__dict__['block_children'] = BlockChildren()
+    return block_children
+
+
+def get_children(store: Store, root: Root) -> Sequence[Root]:
+    block_children = get_block_children(store)
+    block_children.sync(store)
+    return block_children.get(root)
+
+
+def _on_block_indexing_children(store: Store, signed_block: SignedBeaconBlock) -> None:
+    block_children = get_block_children(store)
+    _on_block(store, signed_block)
+    block_children.add(hash_tree_root(signed_block.message), signed_block.message.parent_root)
+    if block_children.finalized_checkpoint != store.finalized_checkpoint:
+        block_children.finalized_checkpoint = store.finalized_checkpoint
+        block_children.prune(store)
+
+
+def _get_filtered_block_tree_syncing_children(store: Store) -> Dict[Root, BeaconBlock]:
+    # ``filter_block_tree`` reads the children index, synced once for the whole traversal
+    get_block_children(store).sync(store)
+    return _get_filtered_block_tree(store)
+
+
+_on_block = on_block
+on_block = _on_block_indexing_children
+_get_filtered_block_tree = get_filtered_block_tree
+get_filtered_block_tree = _get_filtered_block_tree_syncing_children
+
+
+class AncestryIndex:
+    """
+    Binary-lifting jump pointers over the blocks of a ``Store``.
+
+    ``jumps[root][k]`` is the ancestor ``2**k`` blocks above ``root``. The jumps of a block are derived from those
+    of its parent, so the index grows incrementally as blocks enter the store and are queried.
+    """
+
+    def __init__(self) -> None:
+        self.jumps: dict[Root, list[Root]] = {}
+
+    def get_jumps(self, store: Store, root: Root) -> list[Root]:
+        if root in self.jumps:
+            return self.jumps[root]
+        # Collect the blocks that are not indexed yet, from ``root`` up to an indexed or anchor block
+        chain = [root]
+        parent_root = store.blocks[root].parent_root
+        while parent_root in store.blocks and parent_root not in self.jumps:
+            chain.append(parent_root)
+            parent_root = store.blocks[parent_root].parent_root
+        for block_root in reversed(chain):
+            parent_root = store.blocks[block_root].parent_root
+            jumps = []
+            if parent_root in store.blocks:
+                jumps.append(parent_root)
+                while jumps[-1] in self.jumps and len(self.jumps[jumps[-1]]) >= len(jumps):
+                    jumps.append(self.jumps[jumps[-1]][len(jumps) - 1])
+            self.jumps[block_root] = jumps
+        return self.jumps[root]
+
+    def prune(self, store: Store) -> None:
+        for root in [root for root in self.jumps.keys() if root not in store.blocks]:
+            del self.jumps[root]
+
+
+def get_ancestry_index(store: Store) -> AncestryIndex:
+    ancestry_index = store.__dict__.get('ancestry_index')
+    if ancestry_index is None:
+        ancestry_index = store.__dict__['ancestry_index'] = AncestryIndex()
+    return ancestry_index
+
+
+def get_oldest_ancestor_after_slot(store: Store, root: Root, slot: Slot) -> Root:
+    """
+    Return the oldest block in the chain of ``root`` with a slot greater than ``slot``,
+    or ``root`` itself if its slot is not greater than ``slot``.
+    """
+    if store.blocks[root].slot <= slot:
+        return root
+    ancestry_index = get_ancestry_index(store)
+    for k in reversed(range(len(ancestry_index.get_jumps(store, root)))):
+        jumps = ancestry_index.get_jumps(store, root)
+        # Jumps to blocks that left the store are not taken
+        if k < len(jumps) and jumps[k] in store.blocks and store.blocks[jumps[k]].slot > slot:
+            root = jumps[k]
+    return root
+
+
+def use_ancestry_index(reference_get_ancestor):  # type: ignore
+    def wrapper(store, root, slot):  # type: ignore
+        # The reference takes the last step, from the oldest block after ``slot`` to its parent
+        return reference_get_ancestor(store, get_oldest_ancestor_after_slot(store, root, slot), slot)
+    return wrapper
+
+
+_get_ancestor = get_ancestor
+get_ancestor = use_ancestry_index(_get_ancestor)
+
+
+# Select the proto-array ``get_head``
+PROTO_ARRAY_FORK_CHOICE = False
+
+# Cross-check the proto-array weights against ``get_weight`` after every fork-choice operation
+PROTO_ARRAY_DEBUG = False
+
+
+def get_fork_choice_balances(state: BeaconState) -> list[int]:
+    """
+    Return the effective balance each validator of ``state`` votes with in ``get_weight``,
+    zero for validators that are slashed or inactive at the current epoch of ``state``.
+    """
+    epoch = get_current_epoch(state)
+    if NUMPY_AVAILABLE:
+        columns = get_validator_columns(state)
+        return numpy.where(columns.is_active(epoch) & ~columns.slashed, columns.effective_balance, 0).tolist()
+    balances = [0] * len(state.validators)
+    for index in get_active_validator_indices(state, epoch):
+        validator = state.validators[index]
+        if not validator.slashed:
+            balances[index] = int(validator.effective_balance)
+    return balances
+
+
+class ProtoArray:
+    """
+    Block tree of a fork-choice ``Store`` held as an index-ordered array.
+
+    Blocks are appended as they enter ``store.blocks``, parents before children, and the array is rebuilt from the
+    latest messages if blocks leave ``store.blocks`` other than through ``prune``. ``weights[i]`` is the total
+    balance of the latest messages for block ``i`` or its descendants, using the balances of the justified
+    checkpoint state. Latest message changes from ``update_latest_messages`` and ``on_attester_slashing`` are
+    recorded as per-node ``deltas``, which are propagated to the ancestors by the next sweep. When the justified
+    checkpoint changes, only the votes of validators whose balance changed are moved.
+    """
+
+    def __init__(self) -> None:
+        self.roots: list[Root] = []
+        self.indices: dict[Root, int] = {}
+        self.parents: list[Optional[int]] = []
+        self.weights: list[int] = []
+        self.deltas: list[int] = []
+        self.balances_checkpoint: Optional[Checkpoint] = None
+        self.balances: list[int] = []
+        # The node and balance each validator vote is applied with
+        self.votes: dict[ValidatorIndex, Tuple[int, int]] = {}
+        # Validators whose latest message changed while the justified checkpoint state was not available
+        self.queued_votes: Set[ValidatorIndex] = set()
+
+    def reset(self, store: Store) -> None:
+        """
+        Drop every node and vote, and queue the latest messages of ``store`` to be applied again.
+        """
+        self.roots = []
+        self.indices = {}
+        self.parents = []
+        self.weights = []
+        self.deltas = []
+        self.balances_checkpoint = None
+        self.balances = []
+        self.votes = {}
+        self.queued_votes = set(store.latest_messages.keys())
+
+    def sync_blocks(self, store: Store) -> None:
+        if self.indices.keys() == store.blocks.keys():
+            return
+        # Blocks that left ``store.blocks`` other than through ``prune`` may still carry votes: start over
+        if any(root not in store.blocks for root in self.roots):
+            self.reset(store)
+        missing = [root for root in store.blocks.keys() if root not in self.indices]
+        while len(missing) > 0:
+            deferred = []
+            for root in missing:
+                parent_root = store.blocks[root].parent_root
+                if parent_root in store.blocks and parent_root not in self.indices:
+                    deferred.append(root)
+                    continue
+                self.indices[root] = len(self.roots)
+                self.roots.append(root)
+                self.parents.append(self.indices.get(parent_root))
+                self.weights.append(0)
+                self.deltas.append(0)
+            missing = deferred
+
+    def prune(self, store: Store) -> None:
+        """
+        Drop the nodes of blocks that left ``store.blocks``, with the votes applied to them.
+        """
+        kept = [index for index, root in enumerate(self.roots) if root in store.blocks]
+        if len(kept) == len(self.roots):
+            return
+        # Withdraw the votes of the dropped nodes, and carry the pending deltas of the dropped nodes up to the
+        # first kept ancestor, children first
+        is_kept = [False] * len(self.roots)
+        for index in kept:
+            is_kept[index] = True
+        for node, balance in self.votes.values():
+            if not is_kept[node]:
+                self.deltas[node] -= balance
+        for index in reversed(range(len(self.roots))):
+            parent = self.parents[index]
+            if not is_kept[index] and parent is not None:
+                self.deltas[parent] += self.deltas[index]
+        new_indices = {index: new_index for new_index, index in enumerate(kept)}
+        parents: list[Optional[int]] = []
+        for index in kept:
+            parent = self.parents[index]
+            parents.append(new_indices.get(parent) if parent is not None else None)
+        self.roots = [self.roots[index] for index in kept]
+        self.indices = {root: index for index, root in enumerate(self.roots)}
+        self.parents = parents
+        self.weights = [self.weights[index] for index in kept]
+        self.deltas = [self.deltas[index] for index in kept]
+        self.votes = {
+            validator_index: (new_indices[node], balance)
+            for validator_index, (node, balance) in self.votes.items() if node in new_indices
+        }
+
+    def sync_balances(self, store: Store) -> bool:
+        """
+        Move the votes to the balances of the justified checkpoint state, and return whether they are available.
+        """
+        if self.balances_checkpoint == store.justified_checkpoint:
+            return True
+        if store.justified_checkpoint not in store.checkpoint_states:
+            return False
+        self.balances_checkpoint = store.justified_checkpoint
+        self.balances = get_fork_choice_balances(store.checkpoint_states[store.justified_checkpoint])
+        for index, (node, balance) in self.votes.items():
+            new_balance = self.balances[index] if index < len(self.balances) else 0
+            if new_balance != balance:
+                self.deltas[node] += new_balance - balance
+                self.votes[index] = (node, new_balance)
+        queued_votes, self.queued_votes = self.queued_votes, set()
+        self.update_votes(store, list(queued_votes))
+        return True
+
+    def update_votes(self, store: Store, indices: Sequence[ValidatorIndex]) -> None:
+        """
+        Record the weight changes from the latest messages of ``indices``.
+        """
+        self.sync_blocks(store)
+        if not self.sync_balances(store):
+            self.queued_votes.update(indices)
+            return
+        for index in indices:
+            if index in self.votes:
+                node, balance = self.votes.pop(index)
+                self.deltas[node] -= balance
+            if index not in store.latest_messages or index in store.equivocating_indices:
+                continue
+            message_root = store.latest_messages[index].root
+            if message_root in self.indices:
+                node = self.indices[message_root]
+                balance = self.balances[index] if index < len(self.balances) else 0
+                self.deltas[node] += balance
+                self.votes[index] = (node, balance)
+
+    def apply_deltas(self, store: Store) -> bool:
+        """
+        Propagate the recorded deltas into ``weights``, and return whether the weights are up to date.
+        """
+        self.sync_blocks(store)
+        if not self.sync_balances(store):
+            return False
+        for index in reversed(range(len(self.roots))):
+            delta = self.deltas[index]
+            if delta != 0:
+                self.weights[index] += delta
+                self.deltas[index] = 0
+                parent = self.parents[index]
+                if parent is not None:
+                    self.deltas[parent] += delta
+        return True
+
+    def get_weight(self, store: Store, root: Root) -> Gwei:
+        """
+        Return the weight of ``root`` as in ``get_weight``, once ``apply_deltas`` has propagated the deltas.
+        """
+        weight = self.weights[self.indices[root]]
+        if store.proposer_boost_root != Root():
+            if get_ancestor(store, store.proposer_boost_root, store.blocks[root].slot) == root:
+                weight += get_proposer_score(store)
+        return Gwei(weight)
+
+    def find_head(self, store: Store) -> Root:
+        self.sync_blocks(store)
+        if not self.sync_balances(store):
+            return _get_head(store)
+        get_block_children(store).sync(store)
+        count = len(self.roots)
+        justified_index = self.indices[store.justified_checkpoint.root]
+
+        # Mark the blocks filtered by ``filter_block_tree``, i.e. the justified block and its descendants
+        is_candidate = [False] * count
+        is_candidate[justified_index] = True
+        for index in range(justified_index + 1, count):
+            parent = self.parents[index]
+            is_candidate[index] = parent is not None and is_candidate[parent]
+
+        # Proposer boost applies to the boosted block and its ancestors
+        is_boosted = [False] * count
+        proposer_score = 0
+        if store.proposer_boost_root != Root() and store.proposer_boost_root in self.indices:
+            proposer_score = int(get_proposer_score(store))
+            boosted: Optional[int] = self.indices[store.proposer_boost_root]
+            while boosted is not None:
+                is_boosted[boosted] = True
+                boosted = self.parents[boosted]
+
+        # Single backward sweep: children are final before their parent is visited
+        has_children = [False] * count
+        best_child: list[Optional[Tuple[Tuple[int, Root], int]]] = [None] * count
+        best_descendant: list[Optional[int]] = [None] * count
+        for index in reversed(range(count)):
+            parent = self.parents[index]
+            delta = self.deltas[index]
+            if delta != 0:
+                self.weights[index] += delta
+                self.deltas[index] = 0
+                if parent is not None:
+                    self.deltas[parent] += delta
+            if not is_candidate[index]:
+                continue
+            if has_children[index]:
+                entry = best_child[index]
+                best_descendant[index] = entry[1] if entry is not None else None
+            # A leaf is viable for head exactly when ``filter_block_tree`` keeps it
+            elif filter_block_tree(store, self.roots[index], {}):
+                best_descendant[index] = index
+            if index == justified_index or parent is None:
+                continue
+            has_children[parent] = True
+            descendant = best_descendant[index]
+            if descendant is not None:
+                # Ties are broken by favoring the block with the lexicographically higher root
+                key = (self.weights[index] + (proposer_score if is_boosted[index] else 0), self.roots[index])
+                parent_entry = best_child[parent]
+                if parent_entry is None or key > parent_entry[0]:
+                    best_child[parent] = (key, descendant)
+
+        head = best_descendant[justified_index]
+        return self.roots[head if head is not None else justified_index]
+
+
+def get_proto_array(store: Store) -> ProtoArray:
+    proto_array = store.__dict__.get('proto_array')
+    if proto_array is None:
+        proto_array = store.__dict__['proto_array'] = ProtoArray()
+        proto_array.reset(store)
+    return proto_array
+
+
+def check_proto_array_weights(store):  # type: ignore
+    """
+    Assert that the proto-array weight of every block matches ``get_weight``.
+    """
+    proto_array = get_proto_array(store)
+    if proto_array.apply_deltas(store):
+        for root in proto_array.roots:
+            assert proto_array.get_weight(store, root) == get_weight(store, root)
+
+
+def get_head_proto_array(store: Store) -> Root:
+    head = get_proto_array(store).find_head(store)
+    if PROTO_ARRAY_DEBUG:
+        check_proto_array_weights(store)
+    return head
+
+
+def select_proto_array_head(reference_get_head):  # type: ignore
+    def wrapper(store):  # type: ignore
+        if PROTO_ARRAY_FORK_CHOICE:
+            return get_head_proto_array(store)
+        return reference_get_head(store)
+    return wrapper
+
+
+def record_proto_array_votes(store: Store, indices: Sequence[ValidatorIndex]) -> None:
+    """
+    Record the latest message changes of ``indices`` in the proto-array of ``store``, if it is selected.
+    Otherwise the proto-array is dropped, and rebuilt from the latest messages once selected again.
+    """
+    if not PROTO_ARRAY_FORK_CHOICE:
+        store.__dict__.pop('proto_array', None)
+        return
+    get_proto_array(store).update_votes(store, indices)
+    if PROTO_ARRAY_DEBUG:
+        check_proto_array_weights(store)
+
+
+def _update_latest_messages_recording_votes(store: Store,
+                                            attesting_indices: Sequence[ValidatorIndex],
+                                            attestation: Attestation) -> None:
+    _update_latest_messages(store, attesting_indices, attestation)
+    record_proto_array_votes(store, attesting_indices)
+
+
+def _on_attester_slashing_recording_votes(store: Store, attester_slashing: AttesterSlashing) -> None:
+    _on_attester_slashing(store, attester_slashing)
+    indices = set(attester_slashing.attestation_1.attesting_indices).intersection(
+        attester_slashing.attestation_2.attesting_indices)
+    record_proto_array_votes(store, [ValidatorIndex(index) for index in sorted(indices)])
+
+
+_get_head = get_head
+get_head = select_proto_array_head(_get_head)
+_update_latest_messages = update_latest_messages
+update_latest_messages = _update_latest_messages_recording_votes
+_on_attester_slashing = on_attester_slashing
+on_attester_slashing = _on_attester_slashing_recording_votes
+
+# Prune the store when ``update_checkpoints`` advances finality
+PRUNE_STORE_ON_FINALIZATION = True
+
+# The ``Store`` fields keyed by block root
+STORE_BLOCK_ROOT_FIELDS: Tuple[str, ...] = ('blocks', 'block_states', 'block_timeliness', 'unrealized_justifications')
+
+
+@dataclass
+class StorePruneMetrics(object):
+    """
+    Entries dropped from a ``Store`` by ``prune_store``, per field, over every pruning.
+    """
+    prunes: int = 0
+    # Prunings put off because a checkpoint or the proposer boost still referenced a conflicting block
+    deferred: int = 0
+    reclaimed: dict[str, int] = field(default_factory=dict)
+
+
+def get_store_prune_metrics(store: Store) -> StorePruneMetrics:
+    metrics = store.__dict__.get('prune_metrics')
+    if metrics is None:
+        metrics = store.__dict__['prune_metrics'] = StorePruneMetrics()
+    return metrics
+
+
+def get_finalized_descendants(store: Store) -> Set[Root]:
+    block_children = get_block_children(store)
+    block_children.sync(store)
+    descendants: Set[Root] = set()
+    pending = [store.finalized_checkpoint.root]
+    while len(pending) > 0:
+        root = pending.pop()
+        descendants.add(root)
+        pending.extend(block_children.get(root))
+    return descendants
+
+
+def get_prune_references(store: Store) -> Sequence[Root]:
+    """
+    Return the roots that the justified checkpoint, the unrealized checkpoints ahead of finality and the proposer
+    boost reference. Pruning is put off while any of them does not descend from the finalized block.
+    """
+    referenced = [store.justified_checkpoint.root]
+    for checkpoint in (store.unrealized_justified_checkpoint, store.unrealized_finalized_checkpoint):
+        if checkpoint.epoch > store.finalized_checkpoint.epoch:
+            referenced.append(checkpoint.root)
+    if store.proposer_boost_root != Root():
+        referenced.append(store.proposer_boost_root)
+    return referenced
+
+
+def prune_store(store: Store) -> dict[str, int]:
+    """
+    Drop the blocks that are neither ancestors nor descendants of the finalized block, along with their states,
+    checkpoint states, unrealized justifications and the latest messages voting for them. The chain from the anchor
+    of the store to the finalized block is kept, so that ``get_ancestor`` and ``get_weight`` below the finalized slot
+    resolve as they do without pruning. Return the number of entries dropped per ``Store`` field.
+    """
+    if store.finalized_checkpoint.root not in store.blocks:
+        return {}
+    metrics = get_store_prune_metrics(store)
+    kept = get_finalized_descendants(store)
+    root = store.blocks[store.finalized_checkpoint.root].parent_root
+    while root in store.blocks:
+        kept.add(root)
+        root = store.blocks[root].parent_root
+    referenced = get_prune_references(store)
+    if any(root not in kept for root in referenced):
+        # Retried by ``retry_deferred_prune`` once the references change
+        store.__dict__['prune_deferred_by'] = referenced
+        metrics.deferred += 1
+        return {}
+    store.__dict__.pop('prune_deferred_by', None)
+
+    reclaimed: dict[str, int] = {}
+    for name in STORE_BLOCK_ROOT_FIELDS:
+        entries = getattr(store, name)
+        stale_roots = [root for root in entries if root not in kept]
+        # Children first, so that no kept block state is replayed on top of a dropped one
+        for root in reversed(stale_roots):
+            del entries[root]
+        reclaimed[name] = len(stale_roots)
+    stale_checkpoints = [checkpoint for checkpoint in store.checkpoint_states.keys() if checkpoint.root not in kept]
+    for checkpoint in stale_checkpoints:
+        del store.checkpoint_states[checkpoint]
+    reclaimed['checkpoint_states'] = len(stale_checkpoints)
+    stale_messages = [index for index, message in store.latest_messages.items() if message.root not in kept]
+    for index in stale_messages:
+        del store.latest_messages[index]
+    reclaimed['latest_messages'] = len(stale_messages)
+
+    get_block_children(store).prune(store)
+    get_ancestry_index(store).prune(store)
+    proto_array = store.__dict__.get('proto_array')
+    if proto_array is not None:
+        proto_array.prune(store)
+
+    metrics.prunes += 1
+    for name, count in reclaimed.items():
+        metrics.reclaimed[name] = metrics.reclaimed.get(name, 0) + count
+    return reclaimed
+
+
+def retry_deferred_prune(store: Store) -> None:
+    """
+    Prune the store again if a pruning was put off and the roots that blocked it have changed since.
+    """
+    deferred_by = store.__dict__.get('prune_deferred_by')
+    if PRUNE_STORE_ON_FINALIZATION and deferred_by is not None and get_prune_references(store) != deferred_by:
+        prune_store(store)
+
+
+def _update_checkpoints_pruning_store(store: Store,
+                                      justified_checkpoint: Checkpoint,
+                                      finalized_checkpoint: Checkpoint) -> None:
+    finalized_epoch = store.finalized_checkpoint.epoch
+    _update_checkpoints(store, justified_checkpoint, finalized_checkpoint)
+    if PRUNE_STORE_ON_FINALIZATION and store.finalized_checkpoint.epoch > finalized_epoch:
+        prune_store(store)
+    else:
+        retry_deferred_prune(store)
+
+
+def _update_unrealized_checkpoints_pruning_store(store: Store,
+                                                 unrealized_justified_checkpoint: Checkpoint,
+                                                 unrealized_finalized_checkpoint: Checkpoint) -> None:
+    _update_unrealized_checkpoints(store, unrealized_justified_checkpoint, unrealized_finalized_checkpoint)
+    retry_deferred_prune(store)
+
+
+def _on_tick_per_slot_pruning_store(store: Store, time: uint64) -> None:
+    _on_tick_per_slot(store, time)
+    # A new slot resets the proposer boost
+    retry_deferred_prune(store)
+
+
+_update_checkpoints = update_checkpoints
+update_checkpoints = _update_checkpoints_pruning_store
+_update_unrealized_checkpoints = update_unrealized_checkpoints
+update_unrealized_checkpoints = _update_unrealized_checkpoints_pruning_store
+_on_tick_per_slot = on_tick_per_slot
+on_tick_per_slot = _on_tick_per_slot_pruning_store
+
+
+# Keep full block states only at the first block of each epoch, and replay the others on access
+LAZY_BLOCK_STATES = True
+
+
+def _replay_block_phase0(state: BeaconState, block: BeaconBlock) -> None:
+    process_slots(state, block.slot)
+    process_block(state, block)
+
+
+# Replay an imported block on top of the state of its parent, in ``LazyBlockStates`` of the current fork
+replay_block = _replay_block_phase0
+
+
+class LazyBlockStates(MutableMapping[Root, BeaconState]):
+    """
+    ``store.block_states`` keeping full states only for the anchor and the first block of each epoch.
+
+    The state of any other block is kept as a reference to its parent, and is materialized on access by
+    replaying the block on top of the parent state. Recently stored and materialized states are held in a
+    bounded LRU. Every read of the mapping sees every block root.
+    """
+
+    def __init__(self, store: Store, states: Dict[Root, BeaconState], lru_size: int) -> None:
+        self.store = store
+        # The states kept in full
+        self.states: dict[Root, BeaconState] = dict(states)
+        self.parents: dict[Root, Root] = {}
+        self.dependents: dict[Root, Set[Root]] = {}
+        self.materialized = LRU(size=lru_size)
+        self.replays = 0
+
+    def __setitem__(self, root: Root, state: BeaconState) -> None:
+        if root in self:
+            del self[root]
+        block = self.store.blocks.get(root)
+        if (
+            block is None
+            or block.parent_root not in self.store.blocks
+            or block.parent_root not in self
+            or compute_epoch_at_slot(block.slot) > compute_epoch_at_slot(self.store.blocks[block.parent_root].slot)
+        ):
+            self.states[root] = state
+            return
+        self.parents[root] = block.parent_root
+        self.dependents.setdefault(block.parent_root, set()).add(root)
+        self.materialized[root] = state
+
+    def __getitem__(self, root: Root) -> BeaconState:
+        if root in self.states:
+            return self.states[root]
+        if root not in self.parents:
+            raise KeyError(root)
+        if root in self.materialized:
+            return self.materialized[root]
+        # Replay the blocks since the closest full or materialized state
+        replayed = [root]
+        while replayed[-1] in self.parents and replayed[-1] not in self.materialized:
+            replayed.append(self.parents[replayed[-1]])
+        state = self[replayed.pop()]
+        for block_root in reversed(replayed):
+            state = state.copy()
+            replay_block(state, self.store.blocks[block_root])
+            self.materialized[block_root] = state
+            self.replays += 1
+        return state
+
+    def __contains__(self, root: object) -> bool:
+        return root in self.states or root in self.parents
+
+    def __delitem__(self, root: Root) -> None:
+        # The states replayed on top of ``root`` are kept in full from now on
+        for dependent_root in self.dependents.pop(root, set()):
+            state = self[dependent_root]
+            del self.parents[dependent_root]
+            self.states[dependent_root] = state
+        if root in self.parents:
+            self.dependents[self.parents.pop(root)].discard(root)
+            if root in self.materialized:
+                del self.materialized[root]
+        else:
+            del self.states[root]
+
+    def __iter__(self) -> Iterator[Root]:
+        yield from self.states
+        yield from self.parents
+
+    def __len__(self) -> int:
+        return len(self.states) + len(self.parents)
+
+    def copy(self) -> Dict[Root, BeaconState]:
+        return dict(self.items())
+
+
+def _get_forkchoice_store_with_lazy_block_states(anchor_state: BeaconState, anchor_block: BeaconBlock) -> Store:
+    store = _get_forkchoice_store(anchor_state, anchor_block)
+    if LAZY_BLOCK_STATES:
+        store.block_states = LazyBlockStates(  # type: ignore
+            store, store.block_states, lru_size=SLOTS_PER_EPOCH)
+    return store
+
+
+_get_forkchoice_store = get_forkchoice_store
+get_forkchoice_store = _get_forkchoice_store_with_lazy_block_states
+
+
+# Reuse the state of a checkpoint root already advanced to an earlier epoch when storing a target checkpoint state
+REUSE_ADVANCED_CHECKPOINT_STATES = True
+
+
+@dataclass
+class CheckpointStateCacheStats(object):
+    hits: int = 0
+    misses: int = 0
+    reuses: int = 0
+
+
+def get_checkpoint_state_cache_stats(store: Store) -> CheckpointStateCacheStats:
+    if 'checkpoint_state_cache_stats' not in store.__dict__:
+        store.__dict__['checkpoint_state_cache_stats'] = CheckpointStateCacheStats()
+    return store.__dict__['checkpoint_state_cache_stats']
+
+
+def get_advanced_checkpoint_state(store: Store, target: Checkpoint) -> Optional[BeaconState]:
+    """
+    Return the stored state of ``target.root`` advanced to the latest epoch before ``target.epoch``, if any.
+    Only the epochs after the epoch of the block can hold a state advanced past the block state.
+    """
+    if target.root not in store.blocks:
+        return None
+    block_epoch = compute_epoch_at_slot(store.blocks[target.root].slot)
+    for epoch in range(target.epoch - 1, block_epoch, -1):
+        checkpoint = Checkpoint(epoch=epoch, root=target.root)
+        if checkpoint in store.checkpoint_states:
+            return store.checkpoint_states[checkpoint]
+    return None
+
+
+def _store_target_checkpoint_state_reusing_advanced_states(store: Store, target: Checkpoint) -> None:
+    stats = get_checkpoint_state_cache_stats(store)
+    if target in store.checkpoint_states:
+        stats.hits += 1
+        return
+    stats.misses += 1
+    advanced_state = get_advanced_checkpoint_state(store, target) if REUSE_ADVANCED_CHECKPOINT_STATES else None
+    if advanced_state is None:
+        _store_target_checkpoint_state(store, target)
+        return
+    stats.reuses += 1
+    base_state = copy(advanced_state)
+    process_slots(base_state, compute_start_slot_at_epoch(target.epoch))
+    store.checkpoint_states[target] = base_state
+
+
+_store_target_checkpoint_state = store_target_checkpoint_state
+store_target_checkpoint_state = _store_target_checkpoint_state_reusing_advanced_states
+
+
+def get_attestation_committee_indices(attestation: Attestation) -> Sequence[CommitteeIndex]:
+    return [attestation.data.index]
+
+
+def get_attesting_indices_from_committees(
+        state: BeaconState,
+        attestation: Attestation,
+        committees: Dict[Tuple[Slot, CommitteeIndex], Sequence[ValidatorIndex]]) -> Set[ValidatorIndex]:
+    """
+    ``get_attesting_indices`` resolving each beacon committee once per ``(slot, index)`` in ``committees``.
+    """
+    output: Set[ValidatorIndex] = set()
+    committee_offset = 0
+    for index in get_attestation_committee_indices(attestation):
+        key = (attestation.data.slot, index)
+        if key not in committees:
+            committees[key] = get_beacon_committee(state, attestation.data.slot, index)
+        committee = committees[key]
+        output.update(
+            validator_index for i, validator_index in enumerate(committee)
+            if attestation.aggregation_bits[committee_offset + i]
+        )
+        committee_offset += len(committee)
+    return output
+
+
+def on_attestations(store: Store, attestations: Sequence[Attestation], is_from_block: bool=False) -> Sequence[bool]:
+    """
+    Run ``on_attestation`` upon receiving a batch of ``attestations``, and return whether each one is accepted.
+
+    Attestations are grouped by target checkpoint, so each target state is stored once and each beacon committee
+    is resolved once per ``(slot, index)``. Aggregate signatures are verified together, and one by one only if the
+    batch fails. Latest messages are then updated in a single pass, in the order of ``attestations``.
+    An attestation that fails with any error, e.g. an ``IndexError`` on malformed aggregation bits, is rejected
+    on its own.
+    """
+    targets: dict[Checkpoint, list[int]] = {}
+    for i, attestation in enumerate(attestations):
+        try:
+            validate_on_attestation(store, attestation, is_from_block)
+        except Exception:
+            continue
+        targets.setdefault(attestation.data.target, []).append(i)
+
+    indexed_attestations: dict[int, IndexedAttestation] = {}
+    signature_sets: dict[int, Tuple[Sequence[BLSPubkey], Root, BLSSignature]] = {}
+    for target, target_indices in targets.items():
+        store_target_checkpoint_state(store, target)
+        target_state = store.checkpoint_states[target]
+        domain = get_domain(target_state, DOMAIN_BEACON_ATTESTER, target.epoch)
+        committees: dict[Tuple[Slot, CommitteeIndex], Sequence[ValidatorIndex]] = {}
+        for i in target_indices:
+            attestation = attestations[i]
+            try:
+                attesting_indices = sorted(get_attesting_indices_from_committees(target_state, attestation, committees))
+                if len(attesting_indices) == 0:
+                    continue
+                indexed_attestation = IndexedAttestation(
+                    attesting_indices=attesting_indices,
+                    data=attestation.data,
+                    signature=attestation.signature,
+                )
+                signature_set = (
+                    [target_state.validators[index].pubkey for index in attesting_indices],
+                    compute_signing_root(attestation.data, domain),
+                    attestation.signature,
+                )
+            except Exception:
+                continue
+            indexed_attestations[i] = indexed_attestation
+            signature_sets[i] = signature_set
+
+    if bls.BatchFastAggregateVerify(list(signature_sets.values())):
+        accepted = set(signature_sets.keys())
+    else:
+        accepted = set(i for i, signature_set in signature_sets.items() if bls.FastAggregateVerify(*signature_set))
+
+    for i in sorted(accepted):
+        update_latest_messages(store, indexed_attestations[i].attesting_indices, attestations[i])
+    return [i in accepted for i in range(len(attestations))]
+
+
+class PulledUpCheckpoints(NamedTuple):
+    current_justified_checkpoint: Checkpoint
+    finalized_checkpoint: Checkpoint
+
+
+def _get_justification_target_balances_phase0(state: BeaconState) -> Tuple[Gwei, Gwei]:
+    previous_attestations = get_matching_target_attestations(state, get_previous_epoch(state))
+    current_attestations = get_matching_target_attestations(state, get_current_epoch(state))
+    return get_attesting_balance(state, previous_attestations), get_attesting_balance(state, current_attestations)
+
+
+# The previous and current epoch target balances of ``process_justification_and_finalization`` of the current fork
+get_justification_target_balances = _get_justification_target_balances_phase0
+
+
+def compute_justification_and_finalization(state: BeaconState,
+                                           total_active_balance: Gwei,
+                                           previous_epoch_target_balance: Gwei,
+                                           current_epoch_target_balance: Gwei) -> PulledUpCheckpoints:
+    """
+    Return the justified and finalized checkpoints that ``weigh_justification_and_finalization`` leaves in ``state``,
+    without modifying ``state``.
+    """
+    previous_epoch = get_previous_epoch(state)
+    current_epoch = get_current_epoch(state)
+    old_previous_justified_checkpoint = state.previous_justified_checkpoint
+    old_current_justified_checkpoint = state.current_justified_checkpoint
+    current_justified_checkpoint = state.current_justified_checkpoint
+    finalized_checkpoint = state.finalized_checkpoint
+
+    # Process justifications
+    bits = [False] + [bool(bit) for bit in state.justification_bits[:JUSTIFICATION_BITS_LENGTH - 1]]
+    if previous_epoch_target_balance * 3 >= total_active_balance * 2:
+        current_justified_checkpoint = Checkpoint(epoch=previous_epoch, root=get_block_root(state, previous_epoch))
+        bits[1] = True
+    if current_epoch_target_balance * 3 >= total_active_balance * 2:
+        current_justified_checkpoint = Checkpoint(epoch=current_epoch, root=get_block_root(state, current_epoch))
+        bits[0] = True
+
+    # Process finalizations
+    if all(bits[1:4]) and old_previous_justified_checkpoint.epoch + 3 == current_epoch:
+        finalized_checkpoint = old_previous_justified_checkpoint
+    if all(bits[1:3]) and old_previous_justified_checkpoint.epoch + 2 == current_epoch:
+        finalized_checkpoint = old_previous_justified_checkpoint
+    if all(bits[0:3]) and old_current_justified_checkpoint.epoch + 2 == current_epoch:
+        finalized_checkpoint = old_current_justified_checkpoint
+    if all(bits[0:2]) and old_current_justified_checkpoint.epoch + 1 == current_epoch:
+        finalized_checkpoint = old_current_justified_checkpoint
+    return PulledUpCheckpoints(current_justified_checkpoint, finalized_checkpoint)
+
+
+def compute_pulled_up_checkpoints(state: BeaconState) -> PulledUpCheckpoints:
+    """
+    Return the justified and finalized checkpoints of ``state`` pulled up to the next epoch boundary,
+    as ``process_justification_and_finalization`` would leave them, without copying ``state``.
+    """
+    # Skip FFG updates in the first two epochs, as ``process_justification_and_finalization`` does
+    if get_current_epoch(state) <= GENESIS_EPOCH + 1:
+        return PulledUpCheckpoints(state.current_justified_checkpoint, state.finalized_checkpoint)
+    previous_target_balance, current_target_balance = get_justification_target_balances(state)
+    return compute_justification_and_finalization(
+        state, get_total_active_balance(state), previous_target_balance, current_target_balance)
+
+
+get_pulled_up_checkpoints = cache_this(
+    lambda state: (state.hash_tree_root(), get_current_epoch(state)),
+    lambda state: compute_pulled_up_checkpoints(state), lru_size=SLOTS_PER_EPOCH * 2)
+
+
+def get_generalized_index(ssz_class: Any, *path: PyUnion[int, SSZVariableName]) -> GeneralizedIndex:
+    ssz_path = Path(ssz_class)
+    for item in path:
+        ssz_path = ssz_path / item
+    return GeneralizedIndex(ssz_path.gindex())
+
+
+def compute_merkle_proof(object: SSZObject,
+                         index: GeneralizedIndex) -> list[Bytes32]:
+    return build_proof(object.get_backing(), index)
+
+
+# Select the array-backed ``process_rewards_and_penalties``; requires NumPy
+VECTORIZED_REWARDS_AND_PENALTIES = False
+# Select the fused ``process_epoch`` that runs over a single columnar snapshot; requires NumPy
+FUSED_EPOCH_PROCESSING = False
+
+
+def _get_inactivity_penalty_denominator_altair() -> uint64:
+    return config.INACTIVITY_SCORE_BIAS * INACTIVITY_PENALTY_QUOTIENT_ALTAIR
+
+
+# The inactivity penalty denominator of ``get_inactivity_penalty_deltas`` of the current fork
+get_inactivity_penalty_denominator = _get_inactivity_penalty_denominator_altair
+
+
+def _get_proportional_slashing_multiplier_altair() -> uint64:
+    return PROPORTIONAL_SLASHING_MULTIPLIER_ALTAIR
+
+
+# The proportional slashing multiplier of ``process_slashings`` of the current fork
+get_proportional_slashing_multiplier = _get_proportional_slashing_multiplier_altair
+
+
+@dataclass
+class EpochColumns(ValidatorColumns):
+    """
+    Per-validator columns of a ``BeaconState``, gathered once at the start of a fused epoch transition.
+    The columns are ``numpy`` arrays indexed by validator index and are kept in sync with the state
+    by the fused sub-steps that modify the corresponding fields.
+    """
+    previous_epoch_participation: Any
+    current_epoch_participation: Any
+    inactivity_scores: Any
+
+    def is_unslashed_participating(self, flag_index: int, epoch: Epoch, current_epoch: Epoch) -> Any:
+        if epoch == current_epoch:
+            participation = self.current_epoch_participation
+        else:
+            participation = self.previous_epoch_participation
+        has_flag = ((participation >> flag_index) & 1).astype(bool)
+        return self.is_active(epoch) & ~self.slashed & has_flag
+
+
+def get_epoch_columns(state: BeaconState) -> EpochColumns:
+    # The fused sub-steps update their columns, so they work on a copy of the shared registry snapshot
+    validator_columns = get_validator_columns(state)
+    return EpochColumns(
+        previous_epoch_participation=numpy.frombuffer(state.previous_epoch_participation.encode_bytes(), dtype='u1'),
+        current_epoch_participation=numpy.frombuffer(state.current_epoch_participation.encode_bytes(), dtype='u1'),
+        inactivity_scores=numpy.frombuffer(state.inactivity_scores.encode_bytes(), dtype='<u8'),
+        **{name: value.copy() for name, value in validator_columns.__dict__.items()},
+    )
+
+
+def extend_epoch_columns(state: BeaconState, columns: EpochColumns) -> None:
+    """
+    Append the registry columns of the validators added to ``state`` after ``columns`` was gathered.
+    """
+    start = len(columns.effective_balance)
+    validators = [state.validators[index] for index in range(start, len(state.validators))]
+    for name in VALIDATOR_COLUMNS_UINT64_FIELDS:
+        values = numpy.array([int(getattr(validator, name)) for validator in validators], dtype='<u8')
+        setattr(columns, name, numpy.concatenate([getattr(columns, name), values]))
+    columns.slashed = numpy.concatenate([
+        columns.slashed, numpy.array([bool(validator.slashed) for validator in validators], dtype=bool)])
+    columns.withdrawal_prefix = numpy.concatenate([
+        columns.withdrawal_prefix,
+        numpy.array([validator.withdrawal_credentials[0] for validator in validators], dtype='u1'),
+    ])
+
+
+def _sum_uint64_array(values: Any) -> int:
+    # Sum the 32-bit halves separately so that the sum cannot wrap around
+    return (int((values >> 32).sum()) << 32) + int((values & 0xFFFFFFFF).sum())
+
+
+def _get_total_balance_column(effective_balances: Any) -> Gwei:
+    return Gwei(max(int(EFFECTIVE_BALANCE_INCREMENT), _sum_uint64_array(effective_balances)))
+
+
+def process_justification_and_finalization_fused(state: BeaconState, columns: EpochColumns) -> None:
+    # Initial FFG checkpoint values have a `0x00` stub for `root`.
+    # Skip FFG updates in the first two epochs to avoid corner cases that might result in modifying this stub.
+    if get_current_epoch(state) <= GENESIS_EPOCH + 1:
+        return
+    current_epoch = get_current_epoch(state)
+    previous_target = columns.is_unslashed_participating(
+        TIMELY_TARGET_FLAG_INDEX, get_previous_epoch(state), current_epoch)
+    current_target = columns.is_unslashed_participating(TIMELY_TARGET_FLAG_INDEX, current_epoch, current_epoch)
+    total_active_balance = get_total_active_balance(state)
+    previous_target_balance = _get_total_balance_column(columns.effective_balance[previous_target])
+    current_target_balance = _get_total_balance_column(columns.effective_balance[current_target])
+    weigh_justification_and_finalization(state, total_active_balance, previous_target_balance, current_target_balance)
+
+
+def process_inactivity_updates_fused(state: BeaconState, columns: EpochColumns) -> None:
+    # Skip the genesis epoch as score updates are based on the previous epoch participation
+    if get_current_epoch(state) == GENESIS_EPOCH:
+        return
+
+    previous_epoch = get_previous_epoch(state)
+    eligible = columns.is_eligible(previous_epoch)
+    matching_target = eligible & columns.is_unslashed_participating(
+        TIMELY_TARGET_FLAG_INDEX, previous_epoch, get_current_epoch(state))
+    not_matching_target = eligible & ~matching_target
+    if int(columns.inactivity_scores[not_matching_target].max(initial=0)) + config.INACTIVITY_SCORE_BIAS >= 2**64:
+        _process_inactivity_updates(state)
+        columns.inactivity_scores = numpy.frombuffer(state.inactivity_scores.encode_bytes(), dtype='<u8')
+        return
+
+    scores = columns.inactivity_scores.copy()
+    # Increase the inactivity score of inactive validators
+    scores[matching_target] -= numpy.minimum(1, scores[matching_target])
+    scores[not_matching_target] += int(config.INACTIVITY_SCORE_BIAS)
+    # Decrease the inactivity score of all eligible validators during a leak-free epoch
+    if not is_in_inactivity_leak(state):
+        scores[eligible] -= numpy.minimum(int(config.INACTIVITY_SCORE_RECOVERY_RATE), scores[eligible])
+
+    if not numpy.array_equal(scores, columns.inactivity_scores):
+        state.inactivity_scores = packed_list_from_bytes(state.inactivity_scores.__class__, scores.tobytes())
+    columns.inactivity_scores = scores
+
+
+def process_rewards_and_penalties_fused(state: BeaconState, columns: EpochColumns) -> None:
+    # No rewards are applied at the end of `GENESIS_EPOCH` because rewards are for work done in the previous epoch
+    if get_current_epoch(state) == GENESIS_EPOCH:
+        return
+
+    previous_epoch = get_previous_epoch(state)
+    effective_balances = columns.effective_balance
+    inactivity_scores = columns.inactivity_scores
+    balances = numpy.frombuffer(state.balances.encode_bytes(), dtype='<u8')
+    eligible = columns.is_eligible(previous_epoch)
+
+    # Spec scalars are converted to `int` so that NumPy keeps the arithmetic in uint64
+    increment = int(EFFECTIVE_BALANCE_INCREMENT)
+    base_reward_per_increment = int(get_base_reward_per_increment(state))
+    max_base_reward = int(effective_balances.max(initial=0)) // increment * base_reward_per_increment
+    active_increments = int(get_total_active_balance(state)) // increment
+    base_rewards = effective_balances // increment * base_reward_per_increment
+    is_leaking = is_in_inactivity_leak(state)
+
+    deltas = []
+    for flag_index, flag_weight in enumerate(PARTICIPATION_FLAG_WEIGHTS):
+        weight = int(flag_weight)
+        participating = columns.is_unslashed_participating(flag_index, previous_epoch, get_current_epoch(state))
+        participating_balance = max(increment, _sum_uint64_array(effective_balances[participating]))
+        if participating_balance >= 2**64:
+            return _process_rewards_and_penalties(state)
+        participating_increments = participating_balance // increment
+        # Previous epoch participation can exceed the current active balance once validators have exited
+        if max_base_reward * weight * max(active_increments, participating_increments) >= 2**64:
+            return _process_rewards_and_penalties(state)
+        rewards = numpy.zeros_like(balances)
+        penalties = numpy.zeros_like(balances)
+        if not is_leaking:
+            rewards[participating] = (
+                base_rewards[participating] * weight * participating_increments
+                // (active_increments * int(WEIGHT_DENOMINATOR))
+            )
+        if flag_index != TIMELY_HEAD_FLAG_INDEX:
+            not_participating = eligible & ~participating
+            penalties[not_participating] = base_rewards[not_participating] * weight // int(WEIGHT_DENOMINATOR)
+        deltas.append((rewards, penalties))
+
+    matching_target = columns.is_unslashed_participating(
+        TIMELY_TARGET_FLAG_INDEX, previous_epoch, get_current_epoch(state))
+    not_matching_target = eligible & ~matching_target
+    max_penalty_numerator = (
+        int(effective_balances[not_matching_target].max(initial=0))
+        * int(inactivity_scores[not_matching_target].max(initial=0))
+    )
+    if max_penalty_numerator >= 2**64:
+        return _process_rewards_and_penalties(state)
+    inactivity_penalties = numpy.zeros_like(balances)
+    inactivity_penalties[not_matching_target] = (
+        effective_balances[not_matching_target] * inactivity_scores[not_matching_target]
+        // int(get_inactivity_penalty_denominator())
+    )
+    deltas.append((numpy.zeros_like(balances), inactivity_penalties))
+
+    # Apply the deltas in the same order as the reference, saturating each decrease at zero
+    for rewards, penalties in deltas:
+        increased_balances = balances + rewards
+        if numpy.any(increased_balances < balances):
+            return _process_rewards_and_penalties(state)
+        balances = numpy.where(penalties > increased_balances, 0, increased_balances - penalties).astype('<u8')
+
+    state.balances = packed_list_from_bytes(state.balances.__class__, balances.tobytes())
+
+
+def process_rewards_and_penalties_vectorized(state: BeaconState) -> None:
+    """
+    Array-backed ``process_rewards_and_penalties``.
+    Registry columns, previous epoch participation, inactivity scores and balances are read into uint64 arrays once,
+    the flag and inactivity deltas are computed over the whole registry,
+    and the balances are written back in bulk.
+    Falls back to the reference implementation whenever an intermediate value could overflow ``uint64``.
+    """
+    if get_current_epoch(state) == GENESIS_EPOCH:
+        return
+    process_rewards_and_penalties_fused(state, get_epoch_columns(state))
+
+
+def _registry_updates_drop_ejections(ejected: Any, view_updated: Any) -> bool:
+    # The reference updates validators through the views yielded by iterating ``state.validators``; each such write
+    # restores the registry captured when the iteration started, dropping the exits initiated on lower indices.
+    # Report whether that happens so that the fused step can defer to the reference and match it exactly.
+    ejected_indices = numpy.flatnonzero(ejected)
+    view_updated_indices = numpy.flatnonzero(view_updated)
+    return len(ejected_indices) > 0 and len(view_updated_indices) > 0 and view_updated_indices[-1] > ejected_indices[0]
+
+
+# The churn limit applied to the activation queue by ``process_registry_updates`` of the current fork
+get_fused_activation_churn_limit = get_validator_churn_limit
+
+
+def _process_registry_updates_fused_altair(state: BeaconState, columns: EpochColumns) -> None:
+    current_epoch = get_current_epoch(state)
+    # Process activation eligibility and ejections
+    queue_eligible = (
+        (columns.activation_eligibility_epoch == int(FAR_FUTURE_EPOCH))
+        & (columns.effective_balance == int(MAX_EFFECTIVE_BALANCE))
+    )
+    ejected = columns.is_active(current_epoch) & (columns.effective_balance <= int(config.EJECTION_BALANCE))
+    if _registry_updates_drop_ejections(ejected, queue_eligible):
+        return _process_registry_updates(state)
+    for index in numpy.flatnonzero(queue_eligible | ejected).tolist():
+        if queue_eligible[index]:
+            state.validators[index].activation_eligibility_epoch = current_epoch + 1
+            columns.activation_eligibility_epoch[index] = int(current_epoch) + 1
+        if ejected[index]:
+            initiate_validator_exit(state, ValidatorIndex(index))
+            columns.exit_epoch[index] = int(state.validators[index].exit_epoch)
+            columns.withdrawable_epoch[index] = int(state.validators[index].withdrawable_epoch)
+
+    # Queue validators eligible for activation and not yet dequeued for activation
+    activation_queue = numpy.flatnonzero(
+        (columns.activation_eligibility_epoch <= int(state.finalized_checkpoint.epoch))
+        & (columns.activation_epoch == int(FAR_FUTURE_EPOCH))
+    )
+    # Order by the sequence of activation_eligibility_epoch setting and then index
+    activation_queue = activation_queue[
+        numpy.argsort(columns.activation_eligibility_epoch[activation_queue], kind='stable')]
+    # Dequeued validators for activation up to activation churn limit
+    for index in activation_queue[:int(get_fused_activation_churn_limit(state))].tolist():
+        state.validators[index].activation_epoch = compute_activation_exit_epoch(current_epoch)
+        columns.activation_epoch[index] = int(state.validators[index].activation_epoch)
+
+
+def _get_slashing_penalty_altair(effective_balance: Gwei,
+                                 adjusted_total_slashing_balance: Gwei,
+                                 total_balance: Gwei) -> Gwei:
+    increment = EFFECTIVE_BALANCE_INCREMENT  # Factored out from penalty numerator to avoid uint64 overflow
+    penalty_numerator = effective_balance // increment * adjusted_total_slashing_balance
+    return penalty_numerator // total_balance * increment
+
+
+# The penalty of a slashed validator in ``process_slashings`` of the current fork
+get_slashing_penalty = _get_slashing_penalty_altair
+
+
+def process_slashings_fused(state: BeaconState, columns: EpochColumns) -> None:
+    epoch = get_current_epoch(state)
+    total_balance = get_total_active_balance(state)
+    # Computed before anything else, as the reference rejects the state on uint64 overflow
+    total_slashing_balance = sum(state.slashings) * get_proportional_slashing_multiplier()
+    # Only the slashed validators in the middle of their withdrawability delay this epoch are penalized
+    penalized = columns.slashed & (columns.withdrawable_epoch == int(epoch + EPOCHS_PER_SLASHINGS_VECTOR // 2))
+    if not numpy.any(penalized):
+        return
+    adjusted_total_slashing_balance = min(total_slashing_balance, total_balance)
+    for index in numpy.flatnonzero(penalized).tolist():
+        penalty = get_slashing_penalty(
+            state.validators[index].effective_balance, adjusted_total_slashing_balance, total_balance)
+        decrease_balance(state, ValidatorIndex(index), penalty)
+
+
+# The registry updates of the current fork, over a columnar snapshot
+process_registry_updates_fused = _process_registry_updates_fused_altair
+
+
+def process_effective_balance_updates_fused(state: BeaconState, columns: EpochColumns) -> int:
+    if len(columns.effective_balance) < len(state.validators):
+        extend_epoch_columns(state, columns)
+    balances = numpy.frombuffer(state.balances.encode_bytes(), dtype='<u8')
+    effective_balances = compute_effective_balance_column(balances, columns)
+    if effective_balances is None:
+        _process_effective_balance_updates(state)
+        effective_balances = get_validator_columns(state).effective_balance.copy()
+        rewritten = int((effective_balances != columns.effective_balance).sum())
+    else:
+        rewritten = write_effective_balance_column(state, columns.effective_balance, effective_balances)
+    columns.effective_balance = effective_balances
+    return rewritten
+
+
+# The state and columns of the fused epoch transition in progress, if any
+_fused_epoch_state: Optional[BeaconState] = None
+_fused_epoch_columns: Optional[EpochColumns] = None
+
+
+def get_fused_epoch_columns(state: BeaconState) -> Optional[EpochColumns]:
+    if _fused_epoch_state is state:
+        return _fused_epoch_columns
+    return None
+
+
+def process_epoch_fused(state: BeaconState) -> None:
+    """
+    Run ``process_epoch`` of the current fork with the justification, inactivity, rewards, registry, slashings
+    and effective balance steps computed over a single columnar snapshot of ``state``.
+    """
+    global _fused_epoch_state, _fused_epoch_columns
+    _fused_epoch_state, _fused_epoch_columns = state, get_epoch_columns(state)
+    try:
+        _process_epoch(state)
+    finally:
+        _fused_epoch_state, _fused_epoch_columns = None, None
+
+
+def _process_epoch_selected(state: BeaconState) -> None:
+    if FUSED_EPOCH_PROCESSING and NUMPY_AVAILABLE:
+        process_epoch_fused(state)
+    else:
+        _process_epoch(state)
+
+
+def _process_justification_and_finalization_selected(state: BeaconState) -> None:
+    columns = get_fused_epoch_columns(state)
+    if columns is not None:
+        process_justification_and_finalization_fused(state, columns)
+    else:
+        _process_justification_and_finalization(state)
+
+
+def _process_inactivity_updates_selected(state: BeaconState) -> None:
+    columns = get_fused_epoch_columns(state)
+    if columns is not None:
+        process_inactivity_updates_fused(state, columns)
+    else:
+        _process_inactivity_updates(state)
+
+
+def _process_rewards_and_penalties_selected(state: BeaconState) -> None:
+    columns = get_fused_epoch_columns(state)
+    if columns is not None:
+        process_rewards_and_penalties_fused(state, columns)
+    elif VECTORIZED_REWARDS_AND_PENALTIES and NUMPY_AVAILABLE:
+        process_rewards_and_penalties_vectorized(state)
+    else:
+        _process_rewards_and_penalties(state)
+
+
+def _process_registry_updates_selected(state: BeaconState) -> None:
+    columns = get_fused_epoch_columns(state)
+    if columns is not None:
+        process_registry_updates_fused(state, columns)
+    else:
+        _process_registry_updates(state)
+
+
+def _process_slashings_selected(state: BeaconState) -> None:
+    columns = get_fused_epoch_columns(state)
+    if columns is not None:
+        process_slashings_fused(state, columns)
+    else:
+        _process_slashings(state)
+
+
+def _process_effective_balance_updates_fused_selected(state: BeaconState) -> None:
+    columns = get_fused_epoch_columns(state)
+    if columns is not None:
+        process_effective_balance_updates_fused(state, columns)
+    else:
+        _process_effective_balance_updates_selected(state)
+
+
+_process_epoch = process_epoch
+process_epoch = _process_epoch_selected
+_process_justification_and_finalization = process_justification_and_finalization
+process_justification_and_finalization = _process_justification_and_finalization_selected
+_process_inactivity_updates = process_inactivity_updates
+process_inactivity_updates = _process_inactivity_updates_selected
+_process_rewards_and_penalties = process_rewards_and_penalties
+process_rewards_and_penalties = _process_rewards_and_penalties_selected
+_process_registry_updates = process_registry_updates
+process_registry_updates = _process_registry_updates_selected
+_process_slashings = process_slashings
+process_slashings = _process_slashings_selected
+process_effective_balance_updates = _process_effective_balance_updates_fused_selected
+
+
+def _get_next_sync_committee_indices_from_sample(state: BeaconState) -> Sequence[ValidatorIndex]:
+    epoch = Epoch(get_current_epoch(state) + 1)
+    return compute_balance_weighted_sample(
+        state,
+        get_active_validator_indices(state, epoch),
+        get_seed(state, epoch, DOMAIN_SYNC_COMMITTEE),
+        SYNC_COMMITTEE_SIZE,
+    )
+
+
+_get_next_sync_committee_indices = get_next_sync_committee_indices
+get_next_sync_committee_indices = _get_next_sync_committee_indices_from_sample
+
+
+def _get_justification_target_balances_altair(state: BeaconState) -> Tuple[Gwei, Gwei]:
+    if not NUMPY_AVAILABLE:
+        target_indices = [
+            get_unslashed_participating_indices(state, TIMELY_TARGET_FLAG_INDEX, epoch)
+            for epoch in (get_previous_epoch(state), get_current_epoch(state))
+        ]
+        return get_total_balance(state, target_indices[0]), get_total_balance(state, target_indices[1])
+    # Sum the target balances over the cached registry columns
+    columns = get_validator_columns(state)
+    target_balances: list[Gwei] = []
+    for epoch, participation in (
+        (get_previous_epoch(state), state.previous_epoch_participation),
+        (get_current_epoch(state), state.current_epoch_participation),
+    ):
+        flags = numpy.frombuffer(participation.encode_bytes(), dtype='u1')
+        has_target = ((flags >> TIMELY_TARGET_FLAG_INDEX) & 1).astype(bool)
+        participating = columns.is_active(epoch) & ~columns.slashed & has_target
+        target_balances.append(_get_total_balance_column(columns.effective_balance[participating]))
+    return target_balances[0], target_balances[1]
+
+
+get_justification_target_balances = _get_justification_target_balances_altair
+
+
+assert FINALIZED_ROOT_GINDEX == get_generalized_index(BeaconState, 'finalized_checkpoint', 'root')
+assert CURRENT_SYNC_COMMITTEE_GINDEX == get_generalized_index(BeaconState, 'current_sync_committee')
+assert NEXT_SYNC_COMMITTEE_GINDEX == get_generalized_index(BeaconState, 'next_sync_committee')
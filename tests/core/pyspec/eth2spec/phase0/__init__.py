@@ -0,0 +1 @@
+from . import mainnet as spec  # noqa:F401
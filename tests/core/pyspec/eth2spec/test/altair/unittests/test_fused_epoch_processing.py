@@ -0,0 +1,230 @@
+from random import Random
+
+import pytest
+
+from eth2spec.test.context import (
+    spec_state_test,
+    spec_test,
+    single_phase,
+    with_altair_and_later,
+    with_electra_and_later,
+    with_custom_state,
+    misc_balances,
+    default_activation_threshold,
+    dump_skipping_message,
+)
+from eth2spec.test.helpers.deposits import prepare_pending_deposit
+from eth2spec.test.helpers.forks import is_post_electra
+from eth2spec.test.helpers.inactivity_scores import randomize_inactivity_scores
+from eth2spec.test.helpers.random import (
+    randomize_state,
+    set_some_new_deposits,
+)
+from eth2spec.test.helpers.rewards import leaking
+from eth2spec.test.helpers.state import next_epoch, transition_to
+
+
+def check_fused_epoch_processing(spec, state):
+    """
+    Run ``process_epoch`` on copies of ``state`` step by step and fused, and check that the post-states match.
+    """
+    if not spec.NUMPY_AVAILABLE:
+        return dump_skipping_message("NumPy is not installed")
+
+    vectorized = spec.VECTORIZED_REWARDS_AND_PENALTIES, spec.VECTORIZED_EFFECTIVE_BALANCE_UPDATES
+    try:
+        spec.VECTORIZED_REWARDS_AND_PENALTIES = spec.VECTORIZED_EFFECTIVE_BALANCE_UPDATES = False
+        reference_state = state.copy()
+        spec._process_epoch(reference_state)
+    finally:
+        spec.VECTORIZED_REWARDS_AND_PENALTIES, spec.VECTORIZED_EFFECTIVE_BALANCE_UPDATES = vectorized
+
+    fused_state = state.copy()
+    spec.process_epoch_fused(fused_state)
+    assert spec.get_fused_epoch_columns(fused_state) is None
+    assert fused_state.balances == reference_state.balances
+    assert fused_state.inactivity_scores == reference_state.inactivity_scores
+    assert fused_state.validators == reference_state.validators
+    assert fused_state.hash_tree_root() == reference_state.hash_tree_root()
+
+
+def check_epoch_columns(spec, state, columns):
+    """
+    Check that the registry columns kept by the fused sub-steps match a fresh snapshot of ``state``.
+    """
+    validator_columns = spec.compute_validator_columns(state.validators)
+    for name, value in validator_columns.__dict__.items():
+        assert (getattr(columns, name) == value).all(), name
+
+
+def prepare_random_epoch_boundary(spec, state, seed):
+    next_epoch(spec, state)
+    next_epoch(spec, state)
+    randomize_state(spec, state, rng=Random(seed))
+    randomize_inactivity_scores(spec, state, rng=Random(seed + 1))
+    transition_to(spec, state, state.slot + spec.SLOTS_PER_EPOCH - 1)
+
+
+@with_altair_and_later
+@spec_state_test
+def test_genesis_epoch(spec, state):
+    check_fused_epoch_processing(spec, state)
+
+
+@with_altair_and_later
+@spec_state_test
+def test_random_state(spec, state):
+    prepare_random_epoch_boundary(spec, state, 1010)
+    check_fused_epoch_processing(spec, state)
+
+
+@with_altair_and_later
+@with_custom_state(balances_fn=misc_balances, threshold_fn=default_activation_threshold)
+@spec_test
+@single_phase
+def test_random_state_misc_balances(spec, state):
+    prepare_random_epoch_boundary(spec, state, 2020)
+    check_fused_epoch_processing(spec, state)
+
+
+@with_altair_and_later
+@spec_state_test
+@leaking()
+def test_random_state_leaking(spec, state):
+    randomize_state(spec, state, rng=Random(3030))
+    randomize_inactivity_scores(spec, state, rng=Random(3031))
+    assert spec.is_in_inactivity_leak(state)
+    check_fused_epoch_processing(spec, state)
+
+
+@with_altair_and_later
+@spec_state_test
+def test_slashings(spec, state):
+    prepare_random_epoch_boundary(spec, state, 4040)
+    current_epoch = spec.get_current_epoch(state)
+    for index in range(0, len(state.validators), 4):
+        state.validators[index].slashed = True
+        state.validators[index].withdrawable_epoch = current_epoch + spec.EPOCHS_PER_SLASHINGS_VECTOR // 2
+    state.slashings[0] = spec.MAX_EFFECTIVE_BALANCE * 8
+    check_fused_epoch_processing(spec, state)
+
+
+@with_altair_and_later
+@spec_state_test
+def test_slashings_overflow_without_midpoint_validators(spec, state):
+    if not spec.NUMPY_AVAILABLE:
+        return dump_skipping_message("NumPy is not installed")
+    prepare_random_epoch_boundary(spec, state, 4141)
+    # No validator reaches the slashing midpoint, the total slashing balance still overflows uint64
+    state.slashings[0] = 2**63
+
+    with pytest.raises(ValueError):
+        spec.process_epoch_fused(state.copy())
+    with pytest.raises(ValueError):
+        spec._process_epoch(state.copy())
+
+
+@with_altair_and_later
+@spec_state_test
+def test_ejections(spec, state):
+    prepare_random_epoch_boundary(spec, state, 5050)
+    for index in range(0, len(state.validators), 3):
+        state.validators[index].effective_balance = spec.config.EJECTION_BALANCE
+        state.balances[index] = spec.config.EJECTION_BALANCE
+    check_fused_epoch_processing(spec, state)
+
+
+@with_altair_and_later
+@spec_state_test
+def test_ejections_keep_columns_in_sync(spec, state):
+    if not spec.NUMPY_AVAILABLE:
+        return dump_skipping_message("NumPy is not installed")
+    prepare_random_epoch_boundary(spec, state, 5050)
+    current_epoch = spec.get_current_epoch(state)
+    ejected_index = next(
+        index for index, validator in enumerate(state.validators)
+        if spec.is_active_validator(validator, current_epoch) and validator.exit_epoch == spec.FAR_FUTURE_EPOCH
+    )
+    state.validators[ejected_index].effective_balance = spec.config.EJECTION_BALANCE
+
+    columns = spec.get_epoch_columns(state)
+    spec.process_registry_updates_fused(state, columns)
+    assert state.validators[ejected_index].exit_epoch < spec.FAR_FUTURE_EPOCH
+    check_epoch_columns(spec, state, columns)
+
+
+@with_altair_and_later
+@spec_state_test
+def test_activations(spec, state):
+    prepare_random_epoch_boundary(spec, state, 5050)
+    rng = Random(5051)
+    deposited_indices = set_some_new_deposits(spec, state, rng)
+    state.finalized_checkpoint.epoch = spec.get_previous_epoch(state)
+    for index in deposited_indices[::2]:
+        state.validators[index].activation_eligibility_epoch = state.finalized_checkpoint.epoch
+    check_fused_epoch_processing(spec, state)
+
+
+@with_altair_and_later
+@spec_state_test
+def test_ejections_and_activations(spec, state):
+    prepare_random_epoch_boundary(spec, state, 5050)
+    rng = Random(5052)
+    deposited_indices = set_some_new_deposits(spec, state, rng)
+    state.finalized_checkpoint.epoch = spec.get_previous_epoch(state)
+    for index in deposited_indices[::2]:
+        state.validators[index].activation_eligibility_epoch = state.finalized_checkpoint.epoch
+    for index in rng.sample(range(len(state.validators)), len(state.validators) // 4):
+        state.validators[index].effective_balance = spec.config.EJECTION_BALANCE
+        state.balances[index] = spec.config.EJECTION_BALANCE
+    check_fused_epoch_processing(spec, state)
+
+
+@with_altair_and_later
+@spec_state_test
+def test_effective_balance_hysteresis(spec, state):
+    prepare_random_epoch_boundary(spec, state, 6060)
+    rng = Random(6061)
+    increment = spec.EFFECTIVE_BALANCE_INCREMENT
+    for index in range(len(state.balances)):
+        delta = rng.randint(-2 * int(increment), 2 * int(increment))
+        state.balances[index] = max(0, int(state.balances[index]) + delta)
+    check_fused_epoch_processing(spec, state)
+
+
+@with_electra_and_later
+@spec_state_test
+def test_pending_deposits_new_validators(spec, state):
+    prepare_random_epoch_boundary(spec, state, 7070)
+    start = len(state.validators)
+    for offset, prefix in enumerate([spec.BLS_WITHDRAWAL_PREFIX, spec.COMPOUNDING_WITHDRAWAL_PREFIX]):
+        validator_index = start + offset
+        state.pending_deposits.append(prepare_pending_deposit(
+            spec, validator_index, spec.MIN_ACTIVATION_BALANCE,
+            withdrawal_credentials=prefix + b'\x00' * 11 + b'\x11' * 20,
+            signed=True,
+        ))
+    check_fused_epoch_processing(spec, state)
+
+
+@with_altair_and_later
+@spec_state_test
+def test_flag_selects_implementation(spec, state):
+    if not spec.NUMPY_AVAILABLE:
+        return dump_skipping_message("NumPy is not installed")
+    prepare_random_epoch_boundary(spec, state, 8080)
+    if is_post_electra(spec):
+        state.pending_deposits.append(prepare_pending_deposit(
+            spec, len(state.validators), spec.MIN_ACTIVATION_BALANCE, signed=True))
+
+    fused = spec.FUSED_EPOCH_PROCESSING
+    try:
+        post_states = []
+        for selected in (True, False):
+            spec.FUSED_EPOCH_PROCESSING = selected
+            post_state = state.copy()
+            spec.process_epoch(post_state)
+            post_states.append(post_state)
+    finally:
+        spec.FUSED_EPOCH_PROCESSING = fused
+    assert post_states[0].hash_tree_root() == post_states[1].hash_tree_root()
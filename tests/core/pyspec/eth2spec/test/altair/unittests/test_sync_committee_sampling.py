@@ -0,0 +1,22 @@
+from random import Random
+
+from eth2spec.test.context import (
+    spec_state_test,
+    with_altair_and_later,
+)
+
+
+@with_altair_and_later
+@spec_state_test
+def test_next_sync_committee_indices_match_reference(spec, state):
+    assert spec.get_next_sync_committee_indices(state) == spec._get_next_sync_committee_indices(state)
+
+
+@with_altair_and_later
+@spec_state_test
+def test_next_sync_committee_indices_match_reference_random_balances(spec, state):
+    rng = Random(4040)
+    increment = int(spec.EFFECTIVE_BALANCE_INCREMENT)
+    for validator in state.validators:
+        validator.effective_balance = rng.randint(1, int(spec.SAMPLING_MAX_EFFECTIVE_BALANCE) // increment) * increment
+    assert spec.get_next_sync_committee_indices(state) == spec._get_next_sync_committee_indices(state)
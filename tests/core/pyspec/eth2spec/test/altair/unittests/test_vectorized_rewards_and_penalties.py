@@ -0,0 +1,135 @@
+from random import Random
+
+import pytest
+
+from eth2spec.test.context import (
+    spec_state_test,
+    spec_test,
+    single_phase,
+    with_altair_and_later,
+    with_custom_state,
+    misc_balances,
+    default_activation_threshold,
+    dump_skipping_message,
+)
+from eth2spec.test.helpers.inactivity_scores import randomize_inactivity_scores
+from eth2spec.test.helpers.random import randomize_state
+from eth2spec.test.helpers.rewards import (
+    check_vectorized_rewards_and_penalties,
+    leaking,
+)
+from eth2spec.test.helpers.state import next_epoch
+
+
+@with_altair_and_later
+@spec_state_test
+def test_genesis_epoch_is_noop(spec, state):
+    if not spec.NUMPY_AVAILABLE:
+        return dump_skipping_message("NumPy is not installed")
+    pre_balances = state.balances.copy()
+    spec.process_rewards_and_penalties_vectorized(state)
+    assert state.balances == pre_balances
+
+
+@with_altair_and_later
+@spec_state_test
+def test_random_state(spec, state):
+    next_epoch(spec, state)
+    next_epoch(spec, state)
+    randomize_state(spec, state, rng=Random(1010))
+    randomize_inactivity_scores(spec, state, rng=Random(1011))
+    check_vectorized_rewards_and_penalties(spec, state)
+
+
+@with_altair_and_later
+@with_custom_state(balances_fn=misc_balances, threshold_fn=default_activation_threshold)
+@spec_test
+@single_phase
+def test_random_state_misc_balances(spec, state):
+    next_epoch(spec, state)
+    next_epoch(spec, state)
+    randomize_state(spec, state, rng=Random(2020))
+    randomize_inactivity_scores(spec, state, rng=Random(2021))
+    check_vectorized_rewards_and_penalties(spec, state)
+
+
+@with_altair_and_later
+@spec_state_test
+@leaking()
+def test_random_state_leaking(spec, state):
+    randomize_state(spec, state, rng=Random(3030))
+    randomize_inactivity_scores(spec, state, rng=Random(3031))
+    assert spec.is_in_inactivity_leak(state)
+    check_vectorized_rewards_and_penalties(spec, state)
+
+
+@with_altair_and_later
+@spec_state_test
+def test_zero_balances(spec, state):
+    next_epoch(spec, state)
+    next_epoch(spec, state)
+    randomize_state(spec, state, rng=Random(4040))
+    for index in range(0, len(state.validators), 3):
+        state.balances[index] = 0
+    check_vectorized_rewards_and_penalties(spec, state)
+
+
+@with_altair_and_later
+@spec_state_test
+def test_inactivity_penalty_overflow_falls_back_to_reference(spec, state):
+    if not spec.NUMPY_AVAILABLE:
+        return dump_skipping_message("NumPy is not installed")
+    next_epoch(spec, state)
+    next_epoch(spec, state)
+    state.previous_epoch_participation = [spec.ParticipationFlags(0)] * len(state.validators)
+    state.inactivity_scores[0] = 2**64 - 1
+
+    with pytest.raises(ValueError):
+        spec.process_rewards_and_penalties_vectorized(state.copy())
+    with pytest.raises(ValueError):
+        spec._process_rewards_and_penalties(state.copy())
+
+
+@with_altair_and_later
+@spec_state_test
+def test_flag_selects_implementation(spec, state):
+    if not spec.NUMPY_AVAILABLE:
+        return dump_skipping_message("NumPy is not installed")
+    next_epoch(spec, state)
+    next_epoch(spec, state)
+    randomize_state(spec, state, rng=Random(5050))
+
+    reference_state = state.copy()
+    spec._process_rewards_and_penalties(reference_state)
+
+    vectorized = spec.VECTORIZED_REWARDS_AND_PENALTIES
+    try:
+        for selected in (True, False):
+            spec.VECTORIZED_REWARDS_AND_PENALTIES = selected
+            post_state = state.copy()
+            spec.process_rewards_and_penalties(post_state)
+            assert post_state.hash_tree_root() == reference_state.hash_tree_root()
+    finally:
+        spec.VECTORIZED_REWARDS_AND_PENALTIES = vectorized
+
+
+@with_altair_and_later
+@spec_state_test
+def test_flag_reward_overflow_after_exits_falls_back_to_reference(spec, state):
+    if not spec.NUMPY_AVAILABLE:
+        return dump_skipping_message("NumPy is not installed")
+    next_epoch(spec, state)
+    next_epoch(spec, state)
+    current_epoch = spec.get_current_epoch(state)
+    # Validators exiting this epoch still count in the previous epoch participation, not in the active balance
+    for index in range(1, 9):
+        state.validators[index].effective_balance = 2**60
+        state.validators[index].exit_epoch = current_epoch
+    for index in range(9, len(state.validators)):
+        state.validators[index].exit_epoch = current_epoch - 1
+    state.previous_epoch_participation = [spec.ParticipationFlags(0b111)] * len(state.validators)
+
+    with pytest.raises(ValueError):
+        spec.process_rewards_and_penalties_vectorized(state.copy())
+    with pytest.raises(ValueError):
+        spec._process_rewards_and_penalties(state.copy())
@@ -413,6 +413,29 @@ def disable_process_reveal_deadlines(fn):
     return with_meta_tags({'reveal_deadlines_setting': 1})(entry)
 
 
+def with_spec_flags(flags: Dict[str, Any]):
+    """
+    Decorator to make a function execute with module-level flags of the spec set to the given values,
+    e.g. to select one of the optional implementations of the pyspec. The previous values are restored afterwards.
+    This decorator may only be applied to yielding spec test functions, and should be wrapped by vector_test,
+     as the yielding needs to complete before setting back the flags.
+    """
+    def decorator(fn):
+        def entry(*args, spec: Spec, **kw):
+            previous_flags = {name: getattr(spec, name) for name in flags}
+            for name, value in flags.items():
+                setattr(spec, name, value)
+            try:
+                res = fn(*args, spec=spec, **kw)
+                if res is not None:
+                    yield from res
+            finally:
+                for name, value in previous_flags.items():
+                    setattr(spec, name, value)
+        return entry
+    return decorator
+
+
 def with_all_phases(fn):
     """
     A decorator for running a test with every phase
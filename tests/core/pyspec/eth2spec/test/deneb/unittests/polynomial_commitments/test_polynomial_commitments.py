@@ -306,3 +306,30 @@ def test_bytes_to_bls_field_max(spec):
     """
 
     expect_assertion_error(lambda: spec.bytes_to_bls_field(b"\xFF" * 32))
+
+
+@with_deneb_and_later
+@spec_test
+@single_phase
+def test_kzg_domain_tables(spec):
+    """
+    Verify that the cached domain tables match the roots of unity and their bit-reversal permutation
+    """
+    for size in [1, 2, 64, spec.FIELD_ELEMENTS_PER_BLOB]:
+        roots_of_unity = spec._compute_roots_of_unity(size)
+        roots_of_unity_brp = spec._bit_reversal_permutation(roots_of_unity)
+        assert list(spec.compute_roots_of_unity(size)) == roots_of_unity
+        assert spec.bit_reversal_permutation(spec.compute_roots_of_unity(size)) == roots_of_unity_brp
+        assert spec.bit_reversal_permutation(list(range(size))) == spec._bit_reversal_permutation(list(range(size)))
+
+        domain = spec.get_kzg_domain(size)
+        cosets = domain.get_cosets(1)
+        assert list(cosets.shifts) == roots_of_unity_brp
+        for shift, shift_inverse, shift_power in zip(cosets.shifts, cosets.shift_inverses, cosets.shift_powers):
+            assert shift * shift_inverse == spec.BLSFieldElement(1)
+            assert shift_power == shift
+        for i in range(size):
+            assert domain.coset_shift_powers[i] * domain.coset_shift_inverse_powers[i] % BLS_MODULUS == 1
+
+    # Roots of unity of an order that is not a power of two are not cached
+    assert spec.compute_roots_of_unity(3) == spec._compute_roots_of_unity(3)
@@ -5,6 +5,7 @@ from eth2spec.test.context import (
     single_phase,
     with_config_overrides,
     with_fulu_and_later,
+    with_spec_flags,
 )
 from eth2spec.test.helpers.blob import (
     get_sample_blob,
@@ -68,6 +69,31 @@ def test_recover_matrix(spec):
     assert recovered_matrix == matrix
 
 
+@with_fulu_and_later
+@spec_test
+@single_phase
+@with_spec_flags({'BATCHED_RECOVER_MATRIX': True})
+def test_recover_matrix_batched_matches_reference(spec):
+    rng = random.Random(7788)
+
+    # Number of samples we will be recovering from
+    N_SAMPLES = spec.CELLS_PER_EXT_BLOB // 2
+
+    blob_count = 2
+    blobs = [get_sample_blob(spec, rng=rng) for _ in range(blob_count)]
+    matrix = spec.compute_matrix(blobs)
+
+    # The same columns are missing in every row, so the rows share their recovery
+    cell_indices = set(rng.sample(range(spec.CELLS_PER_EXT_BLOB), N_SAMPLES))
+    partial_matrix = [entry for entry in matrix if entry.column_index in cell_indices]
+
+    batched_matrix = spec.recover_matrix(partial_matrix, blob_count)
+    assert batched_matrix == spec._recover_matrix(partial_matrix, blob_count) == matrix
+
+    # A row without enough cells cannot be recovered
+    expect_assertion_error(lambda: spec.recover_matrix(partial_matrix[:-1], blob_count))
+
+
 @with_fulu_and_later
 @spec_test
 @single_phase
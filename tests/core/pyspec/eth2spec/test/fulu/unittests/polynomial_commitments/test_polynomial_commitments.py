@@ -4,6 +4,7 @@ from eth2spec.test.context import (
     single_phase,
     expect_assertion_error,
     with_fulu_and_later,
+    with_spec_flags,
 )
 from eth2spec.test.helpers.blob import (
     get_sample_blob,
@@ -283,3 +284,81 @@ def test_multiply_polynomial_degree_overflow(spec):
     poly2_coeff = [spec.BLSFieldElement(rng.randint(0, BLS_MODULUS - 1))
                    for _ in range(spec.FIELD_ELEMENTS_PER_BLOB + 1)]
     expect_assertion_error(lambda: spec.multiply_polynomialcoeff(poly1_coeff, poly2_coeff))
+
+
+@with_fulu_and_later
+@spec_test
+@single_phase
+@with_spec_flags({'ITERATIVE_NTT': True})
+def test_fft_iterative_matches_recursive(spec):
+    rng = random.Random(5566)
+
+    for size in [1, 2, 8, spec.FIELD_ELEMENTS_PER_CELL, spec.FIELD_ELEMENTS_PER_EXT_BLOB]:
+        roots_of_unity = spec.compute_roots_of_unity(size)
+        vals = [spec.BLSFieldElement(rng.randint(0, BLS_MODULUS - 1)) for _ in range(size)]
+        assert spec._fft_field(vals, roots_of_unity) == spec._fft_field_recursive(vals, roots_of_unity)
+        assert spec.fft_field(spec.fft_field(vals, roots_of_unity), roots_of_unity, inv=True) == vals
+        for inv in [False, True]:
+            assert spec.coset_fft_field(vals, roots_of_unity, inv) == spec._coset_fft_field(vals, roots_of_unity, inv)
+
+
+@with_fulu_and_later
+@spec_test
+@single_phase
+def test_cell_cosets(spec):
+    for cell_index in range(spec.CELLS_PER_EXT_BLOB):
+        coset = spec.coset_for_cell(cell_index)
+        shift = spec.coset_shift_for_cell(cell_index)
+        assert coset == spec._coset_for_cell(cell_index)
+        assert shift == spec._coset_shift_for_cell(cell_index)
+        assert coset[0] == shift
+        cell_cosets = spec.get_cell_cosets()
+        assert cell_cosets.shift_inverses[cell_index] == shift.inverse()
+        assert cell_cosets.shift_powers[cell_index] == shift.pow(spec.BLSFieldElement(spec.FIELD_ELEMENTS_PER_CELL))
+
+
+@with_fulu_and_later
+@spec_test
+@single_phase
+def test_compute_cells_and_kzg_proofs_fk20(spec):
+    rng = random.Random(5566)
+
+    for length in [spec.FIELD_ELEMENTS_PER_BLOB, spec.FIELD_ELEMENTS_PER_CELL + 1, 1]:
+        polynomial_coeff = spec.PolynomialCoeff([
+            spec.BLSFieldElement(rng.randint(0, BLS_MODULUS - 1)) for _ in range(length)
+        ])
+        cells, proofs = spec.compute_cells_and_kzg_proofs_polynomialcoeff(polynomial_coeff)
+        assert len(cells) == len(proofs) == spec.CELLS_PER_EXT_BLOB
+
+        for cell_index in rng.sample(range(spec.CELLS_PER_EXT_BLOB), 3):
+            proof, ys = spec.compute_kzg_proof_multi_impl(polynomial_coeff, spec.coset_for_cell(cell_index))
+            assert proofs[cell_index] == proof
+            assert cells[cell_index] == spec.coset_evals_to_cell(ys)
+
+
+@with_fulu_and_later
+@spec_test
+@single_phase
+def test_subproduct_tree_polynomials(spec):
+    rng = random.Random(5566)
+
+    def random_field_elements(count):
+        return [spec.BLSFieldElement(rng.randint(0, BLS_MODULUS - 1)) for _ in range(count)]
+
+    for count in [0, 1, 2, 3, spec.FIELD_ELEMENTS_PER_CELL, spec.NTT_MULTIPLICATION_THRESHOLD + 1]:
+        xs = random_field_elements(count)
+        ys = random_field_elements(count)
+        assert spec.vanishing_polynomialcoeff(xs) == spec._vanishing_polynomialcoeff(xs)
+        assert spec.interpolate_polynomialcoeff(xs, ys) == spec._interpolate_polynomialcoeff(xs, ys)
+        if count > 0:
+            other = random_field_elements(count + 1)
+            assert spec.multiply_polynomialcoeff(xs, other) == spec._multiply_polynomialcoeff(xs, other)
+
+    # Repeated points
+    xs = random_field_elements(2) * 2
+    assert spec.vanishing_polynomialcoeff(xs) == spec._vanishing_polynomialcoeff(xs)
+
+    missing_cell_indices = sorted(rng.sample(range(spec.CELLS_PER_EXT_BLOB), spec.CELLS_PER_EXT_BLOB // 2))
+    zero_poly_coeff = spec.construct_vanishing_polynomial(missing_cell_indices)
+    assert list(zero_poly_coeff) == spec._construct_vanishing_polynomial(missing_cell_indices)
+    assert spec.construct_vanishing_polynomial(missing_cell_indices) is zero_poly_coeff
@@ -1,5 +1,8 @@
+from random import Random
+
 from eth2spec.test.context import (
     expect_assertion_error,
+    spec_state_test,
     spec_test,
     single_phase,
     with_fulu_and_later,
@@ -64,3 +67,16 @@ def test_get_custody_columns_custody_size_more_than_number_of_groups(spec):
 @single_phase
 def test_compute_columns_for_custody_group_out_of_bound_custody_group(spec):
     expect_assertion_error(lambda: spec.compute_columns_for_custody_group(spec.config.NUMBER_OF_CUSTODY_GROUPS))
+
+
+@with_fulu_and_later
+@spec_state_test
+def test_get_validators_custody_requirement_matches_reference(spec, state):
+    rng = Random(1234)
+    for index in range(len(state.balances)):
+        state.balances[index] = rng.randint(0, 4 * int(spec.config.BALANCE_PER_ADDITIONAL_CUSTODY_GROUP))
+    validator_count = len(state.validators)
+    for count in (0, 1, validator_count // 2, validator_count):
+        validator_indices = rng.sample(range(validator_count), count)
+        assert spec.get_validators_custody_requirement(state, validator_indices) == (
+            spec._get_validators_custody_requirement(state, validator_indices))
@@ -69,6 +69,28 @@ def run_epoch_processing_with(spec, state, process_name: str):
       - post-state ('post'), state after calling ``process_name``
     """
     run_epoch_processing_to(spec, state, process_name)
+    if process_name == 'process_effective_balance_updates':
+        check_vectorized_effective_balance_updates(spec, state)
     yield 'pre', state
     getattr(spec, process_name)(state)
     yield 'post', state
+
+
+def check_vectorized_effective_balance_updates(spec, state):
+    """
+    Run ``process_effective_balance_updates`` on copies of ``state`` with the reference and the vectorized
+    implementation, check that the post-states match and that the rewritten count is exact, and return the count.
+    """
+    if not spec.NUMPY_AVAILABLE:
+        return
+
+    reference_state = state.copy()
+    spec._process_effective_balance_updates(reference_state)
+    vectorized_state = state.copy()
+    rewritten = spec.process_effective_balance_updates_vectorized(vectorized_state)
+    assert vectorized_state.hash_tree_root() == reference_state.hash_tree_root()
+    assert rewritten == sum(
+        1 for pre, post in zip(state.validators, reference_state.validators)
+        if pre.effective_balance != post.effective_balance
+    )
+    return rewritten
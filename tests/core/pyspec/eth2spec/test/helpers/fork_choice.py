@@ -2,6 +2,7 @@ from typing import NamedTuple, Sequence, Any
 
 from eth_utils import encode_hex
 from eth2spec.test.exceptions import BlockNotFoundException
+from eth2spec.test.helpers.forks import is_post_eip7732
 from eth2spec.test.helpers.attestations import (
     next_epoch_with_attestations,
     next_slots_with_attestations,
@@ -267,6 +268,9 @@ def add_attester_slashing(spec, store, attester_slashing, test_steps, valid=True
 
 def get_formatted_head_output(spec, store):
     head = spec.get_head(store)
+    if not is_post_eip7732(spec):
+        # Every head check also runs the proto-array fork choice against the reference
+        assert spec.get_head_proto_array(store) == spec._get_head(store) == head
     slot = store.blocks[head].slot
     return {
         'slot': int(slot),
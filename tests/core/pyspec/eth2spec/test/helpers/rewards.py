@@ -111,6 +111,24 @@ def run_deltas(spec, state):
         yield from run_get_inclusion_delay_deltas(spec, state)
     yield from run_get_inactivity_penalty_deltas(spec, state)
 
+    if is_post_altair(spec):
+        check_vectorized_rewards_and_penalties(spec, state)
+
+
+def check_vectorized_rewards_and_penalties(spec, state):
+    """
+    Check that the array-backed ``process_rewards_and_penalties`` gives the same post-state as the reference.
+    """
+    if not spec.NUMPY_AVAILABLE:
+        return
+
+    reference_state = state.copy()
+    spec._process_rewards_and_penalties(reference_state)
+    vectorized_state = state.copy()
+    spec.process_rewards_and_penalties_vectorized(vectorized_state)
+    assert vectorized_state.balances == reference_state.balances
+    assert vectorized_state.hash_tree_root() == reference_state.hash_tree_root()
+
 
 def deltas_name_to_flag_index(spec, deltas_name):
     if 'source' in deltas_name:
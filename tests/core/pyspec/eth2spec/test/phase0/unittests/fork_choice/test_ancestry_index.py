@@ -0,0 +1,56 @@
+from eth2spec.test.context import with_all_phases, spec_state_test
+from eth2spec.test.helpers.block import build_empty_block_for_next_slot
+from eth2spec.test.helpers.fork_choice import get_genesis_forkchoice_store
+from eth2spec.test.helpers.state import next_slots, state_transition_and_sign_block
+
+
+def add_block(spec, store, state, graffiti=b'\x00' * 32):
+    block = build_empty_block_for_next_slot(spec, state)
+    block.body.graffiti = graffiti
+    signed_block = state_transition_and_sign_block(spec, state, block)
+    spec.on_tick(store, store.genesis_time + block.slot * spec.config.SECONDS_PER_SLOT)
+    spec.on_block(store, signed_block)
+    return spec.hash_tree_root(block)
+
+
+def walk_ancestor(store, root, slot):
+    while store.blocks[root].slot > slot:
+        root = store.blocks[root].parent_root
+    return root
+
+
+@with_all_phases
+@spec_state_test
+def test_ancestry_index_matches_parent_walk(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+
+    # A chain with skipped slots, and a fork from its third block
+    fork_state = None
+    for i in range(12):
+        if i % 3 == 1:
+            next_slots(spec, state, 2)
+        add_block(spec, store, state)
+        if i == 2:
+            fork_state = state.copy()
+    for _ in range(4):
+        add_block(spec, store, fork_state, graffiti=b'\x0f' * 32)
+
+    for root, block in store.blocks.items():
+        for slot in range(block.slot + 2):
+            assert spec.get_ancestor(store, root, slot) == walk_ancestor(store, root, slot)
+    for root in store.blocks.keys():
+        assert spec.get_checkpoint_block(store, root, spec.GENESIS_EPOCH + 1) == walk_ancestor(
+            store, root, spec.compute_start_slot_at_epoch(spec.GENESIS_EPOCH + 1))
+
+
+@with_all_phases
+@spec_state_test
+def test_ancestry_index_jumps(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    roots = [store.justified_checkpoint.root]
+    for _ in range(9):
+        roots.append(add_block(spec, store, state))
+
+    assert spec.get_ancestor(store, roots[-1], spec.GENESIS_SLOT) == roots[0]
+    jumps = spec.get_ancestry_index(store).get_jumps(store, roots[-1])
+    assert jumps == [roots[-2], roots[-3], roots[-5], roots[-9]]
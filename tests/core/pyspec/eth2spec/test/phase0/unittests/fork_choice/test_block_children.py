@@ -0,0 +1,90 @@
+import inspect
+
+from eth2spec.test.context import with_all_phases, spec_state_test
+from eth2spec.test.helpers.block import build_empty_block_for_next_slot
+from eth2spec.test.helpers.fork_choice import get_genesis_forkchoice_store
+from eth2spec.test.helpers.state import state_transition_and_sign_block
+
+
+def add_block(spec, store, state, graffiti=b'\x00' * 32):
+    block = build_empty_block_for_next_slot(spec, state)
+    block.body.graffiti = graffiti
+    signed_block = state_transition_and_sign_block(spec, state, block)
+    spec.on_tick(store, store.genesis_time + block.slot * spec.config.SECONDS_PER_SLOT)
+    spec.on_block(store, signed_block)
+    return spec.hash_tree_root(block)
+
+
+def scan_children(store, root):
+    return sorted(child for child, block in store.blocks.items() if block.parent_root == root)
+
+
+@with_all_phases
+@spec_state_test
+def test_block_children_match_block_scan(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    anchor_root = store.justified_checkpoint.root
+
+    state_a = state.copy()
+    state_b = state.copy()
+    add_block(spec, store, state_a, graffiti=b'\x0a' * 32)
+    add_block(spec, store, state_b, graffiti=b'\x0b' * 32)
+    tip_a = add_block(spec, store, state_a)
+    add_block(spec, store, state_b)
+
+    for root in store.blocks.keys():
+        assert sorted(spec.get_children(store, root)) == scan_children(store, root)
+    assert len(spec.get_children(store, anchor_root)) == 2
+    # The first timely block of the slot is boosted
+    assert spec.get_head(store) == tip_a
+
+
+@with_all_phases
+@spec_state_test
+def test_block_children_follow_store_blocks(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    anchor_root = store.justified_checkpoint.root
+    root = add_block(spec, store, state)
+
+    # Blocks removed from the store leave the index
+    block = store.blocks.pop(root)
+    assert spec.get_children(store, anchor_root) == []
+
+    # Blocks inserted directly into the store are indexed
+    store.blocks[root] = block
+    assert spec.get_children(store, anchor_root) == [root]
+
+
+@with_all_phases
+@spec_state_test
+def test_block_children_follow_replaced_block(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    anchor_root = store.justified_checkpoint.root
+    state_a = state.copy()
+    root_a = add_block(spec, store, state_a, graffiti=b'\x0a' * 32)
+    child_a = add_block(spec, store, state_a)
+    assert spec.get_head(store) == child_a
+
+    # Replace a block with another one, keeping the number of blocks
+    block_b = build_empty_block_for_next_slot(spec, state)
+    block_b.body.graffiti = b'\x0b' * 32
+    state_transition_and_sign_block(spec, state.copy(), block_b)
+    root_b = spec.hash_tree_root(block_b)
+    del store.blocks[child_a]
+    store.blocks[root_b] = block_b
+    store.block_states[root_b] = store.block_states[root_a]
+    store.proposer_boost_root = spec.Root()
+
+    assert spec.get_children(store, root_a) == []
+    assert sorted(spec.get_children(store, anchor_root)) == sorted([root_a, root_b])
+    # Without votes or boost, ties are broken by favoring the lexicographically higher root
+    assert spec.get_head(store) == max(root_a, root_b)
+
+
+@with_all_phases
+@spec_state_test
+def test_fork_choice_reads_children_index(spec, state):
+    for function in (spec.filter_block_tree, spec._get_head):
+        source = inspect.getsource(function)
+        assert 'get_block_children(store).get(' in source
+        assert '.keys()' not in source
@@ -0,0 +1,56 @@
+from eth2spec.test.context import with_all_phases, spec_state_test
+from eth2spec.test.helpers.block import build_empty_block_for_next_slot
+from eth2spec.test.helpers.fork_choice import get_genesis_forkchoice_store
+from eth2spec.test.helpers.state import state_transition_and_sign_block
+
+
+def add_block(spec, store, state):
+    block = build_empty_block_for_next_slot(spec, state)
+    signed_block = state_transition_and_sign_block(spec, state, block)
+    spec.on_tick(store, store.genesis_time + block.slot * spec.config.SECONDS_PER_SLOT)
+    spec.on_block(store, signed_block)
+    return spec.hash_tree_root(block)
+
+
+def advanced_state_root(spec, store, target):
+    state = store.block_states[target.root].copy()
+    spec.process_slots(state, spec.compute_start_slot_at_epoch(target.epoch))
+    return spec.hash_tree_root(state)
+
+
+@with_all_phases
+@spec_state_test
+def test_checkpoint_state_cache_reuses_advanced_states(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    root = add_block(spec, store, state)
+    stats = spec.get_checkpoint_state_cache_stats(store)
+
+    # Later targets on the same root are advanced from the latest stored one
+    targets = [spec.Checkpoint(epoch=spec.GENESIS_EPOCH + epoch, root=root) for epoch in (1, 3, 2)]
+    for target in targets:
+        spec.store_target_checkpoint_state(store, target)
+        assert spec.hash_tree_root(store.checkpoint_states[target]) == advanced_state_root(spec, store, target)
+    assert (stats.hits, stats.misses, stats.reuses) == (0, 3, 2)
+
+    # Stored targets are not processed again
+    for target in targets:
+        spec.store_target_checkpoint_state(store, target)
+    assert (stats.hits, stats.misses, stats.reuses) == (3, 3, 2)
+
+
+@with_all_phases
+@spec_state_test
+def test_checkpoint_state_cache_reuse_disabled(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    root = add_block(spec, store, state)
+    stats = spec.get_checkpoint_state_cache_stats(store)
+
+    spec.REUSE_ADVANCED_CHECKPOINT_STATES = False
+    try:
+        for epoch in (1, 2):
+            target = spec.Checkpoint(epoch=spec.GENESIS_EPOCH + epoch, root=root)
+            spec.store_target_checkpoint_state(store, target)
+            assert spec.hash_tree_root(store.checkpoint_states[target]) == advanced_state_root(spec, store, target)
+    finally:
+        spec.REUSE_ADVANCED_CHECKPOINT_STATES = True
+    assert (stats.hits, stats.misses, stats.reuses) == (0, 2, 0)
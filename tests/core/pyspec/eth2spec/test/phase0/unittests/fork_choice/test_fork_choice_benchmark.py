@@ -0,0 +1,19 @@
+import json
+
+from eth2spec.test.context import with_all_phases, spec_state_test
+from eth2spec.test.utils.fork_choice_benchmark import run_fork_choice_benchmark
+
+
+@with_all_phases
+@spec_state_test
+def test_fork_choice_benchmark_report(spec, state):
+    on_block = spec.on_block
+    report = json.loads(json.dumps(run_fork_choice_benchmark(spec, state, forks=2, epochs=1)))
+
+    # The handlers are restored once the scenario is over
+    assert spec.on_block is on_block
+    assert report['operations']['on_block']['count'] == 2 * spec.SLOTS_PER_EPOCH
+    assert report['operations']['on_attestation']['count'] > 0
+    assert report['store']['blocks'] == 2 * spec.SLOTS_PER_EPOCH + 1
+    assert [epoch_report['epoch'] for epoch_report in report['per_epoch']] == [spec.GENESIS_EPOCH]
+    assert report['finalized_epoch'] == spec.GENESIS_EPOCH
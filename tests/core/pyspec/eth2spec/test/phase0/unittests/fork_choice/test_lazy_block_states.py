@@ -0,0 +1,116 @@
+from eth2spec.test.context import with_all_phases, with_bellatrix_and_later, spec_state_test
+from eth2spec.test.helpers.block import build_empty_block_for_next_slot
+from eth2spec.test.helpers.fork_choice import get_genesis_forkchoice_store
+from eth2spec.test.helpers.state import next_slots, state_transition_and_sign_block
+
+
+def add_block(spec, store, state):
+    block = build_empty_block_for_next_slot(spec, state)
+    signed_block = state_transition_and_sign_block(spec, state, block)
+    spec.on_tick(store, store.genesis_time + block.slot * spec.config.SECONDS_PER_SLOT)
+    spec.on_block(store, signed_block)
+    return spec.hash_tree_root(block)
+
+
+@with_all_phases
+@spec_state_test
+def test_lazy_block_states_replay_blocks(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    block_states = store.block_states
+    assert isinstance(block_states, spec.LazyBlockStates)
+
+    # Two epochs of blocks, with a skipped slot at the epoch boundary
+    state_roots = {}
+    for _ in range(spec.SLOTS_PER_EPOCH * 2 - 2):
+        if state.slot == spec.SLOTS_PER_EPOCH - 1:
+            next_slots(spec, state, 1)
+        root = add_block(spec, store, state)
+        state_roots[root] = spec.hash_tree_root(state)
+
+    # Full states are kept for the anchor and the first block of each epoch
+    full_roots = set(block_states.states)
+    assert len(full_roots) == 2
+    assert len(block_states) == len(store.blocks)
+    assert set(block_states) == set(store.blocks.keys())
+
+    # Evict the recent states, and materialize every state again
+    block_states.materialized.clear()
+    for root, state_root in state_roots.items():
+        assert root in block_states
+        assert spec.hash_tree_root(block_states[root]) == state_root
+    assert block_states.replays == len(state_roots) - 1
+
+    # Deleting a state keeps the states replayed on top of it in full
+    roots = list(state_roots)
+    block_states.materialized.clear()
+    del block_states[roots[-3]]
+    assert roots[-3] not in block_states
+    assert roots[-2] in block_states.states
+    assert spec.hash_tree_root(block_states[roots[-1]]) == state_roots[roots[-1]]
+
+
+@with_all_phases
+@spec_state_test
+def test_lazy_block_states_mapping_methods(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    block_states = store.block_states
+    anchor_root = store.finalized_checkpoint.root
+    add_block(spec, store, state)
+    root = add_block(spec, store, state)
+    assert root not in block_states.states
+    block_states.materialized.clear()
+
+    # Lazily kept states are seen by every read method
+    assert spec.hash_tree_root(block_states.get(root)) == spec.hash_tree_root(state)
+    assert block_states.get(spec.Root()) is None
+    assert set(block_states.keys()) == set(store.blocks.keys())
+    assert dict(block_states.items())[root] is block_states[root]
+    assert len(list(block_states.values())) == len(store.blocks)
+    assert block_states == {root: block_states[root] for root in store.blocks.keys()}
+    assert block_states.copy().keys() == block_states.keys()
+    assert block_states.pop(root) is not None
+    assert root not in block_states
+    assert anchor_root in block_states
+
+
+@with_bellatrix_and_later
+@spec_state_test
+def test_lazy_block_states_replay_without_execution_engine(spec, state):
+    class CountingExecutionEngine(spec.NoopExecutionEngine):
+        notified = 0
+
+        def verify_and_notify_new_payload(self, new_payload_request):
+            self.notified += 1
+            return True
+
+    store = get_genesis_forkchoice_store(spec, state)
+    block_states = store.block_states
+    execution_engine = spec.EXECUTION_ENGINE
+    counting_execution_engine = spec.EXECUTION_ENGINE = CountingExecutionEngine()
+    try:
+        roots = [add_block(spec, store, state) for _ in range(3)]
+        notified = counting_execution_engine.notified
+        assert notified > 0
+
+        # Replaying the imported blocks does not notify the execution engine again
+        block_states.materialized.clear()
+        for root in roots:
+            assert block_states[root].slot == store.blocks[root].slot
+        assert block_states.replays > 0
+        assert counting_execution_engine.notified == notified
+        assert spec.EXECUTION_ENGINE is counting_execution_engine
+    finally:
+        spec.EXECUTION_ENGINE = execution_engine
+
+
+@with_all_phases
+@spec_state_test
+def test_lazy_block_states_disabled(spec, state):
+    spec.LAZY_BLOCK_STATES = False
+    try:
+        store = get_genesis_forkchoice_store(spec, state)
+    finally:
+        spec.LAZY_BLOCK_STATES = True
+    assert type(store.block_states) is dict
+    root = add_block(spec, store, state)
+    assert spec.hash_tree_root(store.block_states[root]) == spec.hash_tree_root(state)
@@ -0,0 +1,98 @@
+from eth2spec.test.context import (
+    always_bls,
+    spec_state_test,
+    with_all_phases,
+)
+from eth2spec.test.helpers.attestations import get_valid_attestation
+from eth2spec.test.helpers.block import build_empty_block_for_next_slot
+from eth2spec.test.helpers.fork_choice import get_genesis_forkchoice_store
+from eth2spec.test.helpers.state import state_transition_and_sign_block
+
+
+def run_sequentially(spec, store, attestations, is_from_block=False):
+    results = []
+    for attestation in attestations:
+        try:
+            spec.on_attestation(store, attestation, is_from_block=is_from_block)
+        except (AssertionError, IndexError):
+            # As in ``expect_assertion_error``, an IndexError is like a failed assert
+            results.append(False)
+        else:
+            results.append(True)
+    return results
+
+
+@with_all_phases
+@spec_state_test
+@always_bls
+def test_on_attestations_matches_sequential_processing(spec, state):
+    stores = [get_genesis_forkchoice_store(spec, state) for _ in range(2)]
+    anchor_root = stores[0].justified_checkpoint.root
+    block = build_empty_block_for_next_slot(spec, state)
+    signed_block = state_transition_and_sign_block(spec, state, block)
+    for store in stores:
+        spec.on_tick(store, store.genesis_time + (block.slot + 1) * spec.config.SECONDS_PER_SLOT)
+        spec.on_block(store, signed_block)
+
+    attestation = get_valid_attestation(spec, state, signed=True)
+    anchor_attestation = get_valid_attestation(spec, state, beacon_block_root=anchor_root, signed=True)
+    # A signature over other data
+    wrong_signature = attestation.copy()
+    wrong_signature.signature = anchor_attestation.signature
+    # A target that is not in the store
+    unknown_target = attestation.copy()
+    unknown_target.data.target.root = b'\x42' * 32
+    attestations = [attestation, wrong_signature, anchor_attestation, unknown_target, attestation]
+
+    results = run_sequentially(spec, stores[0], attestations)
+    assert results == [True, False, True, False, True]
+    assert spec.on_attestations(stores[1], attestations) == results
+    assert stores[1].latest_messages == stores[0].latest_messages
+    assert spec.get_head(stores[1]) == spec.get_head(stores[0])
+
+
+@with_all_phases
+@spec_state_test
+@always_bls
+def test_on_attestations_from_block_matches_sequential_processing(spec, state):
+    stores = [get_genesis_forkchoice_store(spec, state) for _ in range(2)]
+    block = build_empty_block_for_next_slot(spec, state)
+    signed_block = state_transition_and_sign_block(spec, state, block)
+    attestation = get_valid_attestation(spec, state, signed=True)
+    next_block = build_empty_block_for_next_slot(spec, state)
+    next_block.body.attestations.append(attestation)
+    signed_next_block = state_transition_and_sign_block(spec, state, next_block)
+    for store in stores:
+        spec.on_tick(store, store.genesis_time + next_block.slot * spec.config.SECONDS_PER_SLOT)
+        spec.on_block(store, signed_block)
+        spec.on_block(store, signed_next_block)
+
+    attestations = signed_next_block.message.body.attestations
+    results = run_sequentially(spec, stores[0], attestations, is_from_block=True)
+    assert results == [True]
+    assert spec.on_attestations(stores[1], attestations, is_from_block=True) == results
+    assert stores[1].latest_messages == stores[0].latest_messages
+    assert spec.get_head(stores[1]) == spec.get_head(stores[0])
+
+
+@with_all_phases
+@spec_state_test
+@always_bls
+def test_on_attestations_rejects_malformed_attestation(spec, state):
+    stores = [get_genesis_forkchoice_store(spec, state) for _ in range(2)]
+    block = build_empty_block_for_next_slot(spec, state)
+    signed_block = state_transition_and_sign_block(spec, state, block)
+    for store in stores:
+        spec.on_tick(store, store.genesis_time + (block.slot + 1) * spec.config.SECONDS_PER_SLOT)
+        spec.on_block(store, signed_block)
+
+    attestation = get_valid_attestation(spec, state, signed=True)
+    # Aggregation bits shorter than the committee
+    malformed = attestation.copy()
+    malformed.aggregation_bits = type(attestation.aggregation_bits)(attestation.aggregation_bits[:1])
+    attestations = [attestation, malformed, attestation]
+
+    results = run_sequentially(spec, stores[0], attestations)
+    assert results == [True, False, True]
+    assert spec.on_attestations(stores[1], attestations) == results
+    assert stores[1].latest_messages == stores[0].latest_messages
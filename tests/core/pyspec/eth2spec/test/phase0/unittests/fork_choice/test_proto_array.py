@@ -0,0 +1,206 @@
+from eth2spec.test.context import with_all_phases, with_spec_flags, spec_state_test
+from eth2spec.test.helpers.attestations import get_valid_attestation
+from eth2spec.test.helpers.attester_slashings import get_valid_attester_slashing
+from eth2spec.test.helpers.block import build_empty_block_for_next_slot
+from eth2spec.test.helpers.fork_choice import get_genesis_forkchoice_store
+from eth2spec.test.helpers.state import state_transition_and_sign_block
+
+
+def add_block(spec, store, state, graffiti=b'\x00' * 32):
+    block = build_empty_block_for_next_slot(spec, state)
+    block.body.graffiti = graffiti
+    signed_block = state_transition_and_sign_block(spec, state, block)
+    spec.on_tick(store, store.genesis_time + block.slot * spec.config.SECONDS_PER_SLOT)
+    spec.on_block(store, signed_block)
+    return spec.hash_tree_root(block)
+
+
+def add_attestation(spec, store, state, slot, participants):
+    attestation = get_valid_attestation(
+        spec, state, slot=slot, signed=True,
+        filter_participant_set=lambda committee: set(sorted(committee)[participants]),
+    )
+    spec.on_tick(store, store.genesis_time + (slot + 1) * spec.config.SECONDS_PER_SLOT)
+    spec.on_attestation(store, attestation)
+    return attestation
+
+
+def assert_head_matches_reference(spec, store):
+    head = spec.get_head(store)
+    assert head == spec._get_head(store)
+    return head
+
+
+@with_all_phases
+@spec_state_test
+@with_spec_flags({'PROTO_ARRAY_FORK_CHOICE': True})
+def test_proto_array_head_follows_vote_changes(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    assert_head_matches_reference(spec, store)
+
+    state_a = state.copy()
+    state_b = state.copy()
+    root_a = add_block(spec, store, state_a, graffiti=b'\x0a' * 32)
+    root_b = add_block(spec, store, state_b, graffiti=b'\x0b' * 32)
+    assert_head_matches_reference(spec, store)
+
+    add_attestation(spec, store, state_a, state_a.slot, participants=slice(0, 1))
+    assert assert_head_matches_reference(spec, store) == root_a
+
+    add_attestation(spec, store, state_b, state_b.slot, participants=slice(1, 3))
+    assert assert_head_matches_reference(spec, store) == root_b
+
+    # Extending a fork moves the head to its tip only where the votes are
+    child_a = add_block(spec, store, state_a)
+    add_attestation(spec, store, state_a, state_a.slot, participants=slice(0, 3))
+    assert assert_head_matches_reference(spec, store) == child_a
+    assert spec.get_proto_array(store).weights[spec.get_proto_array(store).indices[root_b]] > 0
+
+
+@with_all_phases
+@spec_state_test
+@with_spec_flags({'PROTO_ARRAY_FORK_CHOICE': True})
+def test_proto_array_head_removes_equivocating_votes(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+
+    state_a = state.copy()
+    state_b = state.copy()
+    root_a = add_block(spec, store, state_a, graffiti=b'\x0a' * 32)
+    root_b = add_block(spec, store, state_b, graffiti=b'\x0b' * 32)
+    add_attestation(spec, store, state_a, state_a.slot, participants=slice(0, 1))
+    add_attestation(spec, store, state_b, state_b.slot, participants=slice(1, 3))
+    assert assert_head_matches_reference(spec, store) == root_b
+
+    # Slash the validators voting for ``root_b``
+    attester_slashing = get_valid_attester_slashing(
+        spec, state_b, slot=state_b.slot, signed_1=True, signed_2=True,
+        filter_participant_set=lambda committee: set(sorted(committee)[1:3]),
+    )
+    spec.on_attester_slashing(store, attester_slashing)
+    assert len(store.equivocating_indices) > 0
+    assert assert_head_matches_reference(spec, store) == root_a
+
+
+@with_all_phases
+@spec_state_test
+@with_spec_flags({'PROTO_ARRAY_FORK_CHOICE': True})
+def test_proto_array_flag_selects_implementation(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    add_block(spec, store, state)
+
+    spec.PROTO_ARRAY_FORK_CHOICE = False
+    head = spec.get_head(store)
+    assert 'proto_array' not in store.__dict__
+    spec.PROTO_ARRAY_FORK_CHOICE = True
+    assert spec.get_head(store) == head
+    assert 'proto_array' in store.__dict__
+
+
+@with_all_phases
+@spec_state_test
+def test_proto_array_off_by_default(spec, state):
+    assert not spec.PROTO_ARRAY_FORK_CHOICE
+    store = get_genesis_forkchoice_store(spec, state)
+    state_a = state.copy()
+    add_block(spec, store, state_a)
+    add_attestation(spec, store, state_a, state_a.slot, participants=slice(0, 1))
+    spec.get_head(store)
+    assert 'proto_array' not in store.__dict__
+
+
+@with_all_phases
+@spec_state_test
+@with_spec_flags({'PROTO_ARRAY_FORK_CHOICE': True})
+def test_proto_array_rebuilt_once_selected_again(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    state_a = state.copy()
+    state_b = state.copy()
+    root_a = add_block(spec, store, state_a, graffiti=b'\x0a' * 32)
+    root_b = add_block(spec, store, state_b, graffiti=b'\x0b' * 32)
+    add_attestation(spec, store, state_a, state_a.slot, participants=slice(0, 1))
+    assert assert_head_matches_reference(spec, store) == root_a
+
+    # Votes received while the proto-array is not selected are picked up once it is
+    spec.PROTO_ARRAY_FORK_CHOICE = False
+    add_attestation(spec, store, state_b, state_b.slot, participants=slice(1, 3))
+    assert 'proto_array' not in store.__dict__
+    spec.PROTO_ARRAY_FORK_CHOICE = True
+    assert assert_head_matches_reference(spec, store) == root_b
+    spec.check_proto_array_weights(store)
+
+
+@with_all_phases
+@spec_state_test
+@with_spec_flags({'PROTO_ARRAY_FORK_CHOICE': True, 'PROTO_ARRAY_DEBUG': True})
+def test_proto_array_debug_cross_checks_weights(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+
+    state_a = state.copy()
+    state_b = state.copy()
+    add_block(spec, store, state_a, graffiti=b'\x0a' * 32)
+    add_block(spec, store, state_b, graffiti=b'\x0b' * 32)
+    add_attestation(spec, store, state_a, state_a.slot, participants=slice(0, 2))
+    add_attestation(spec, store, state_b, state_b.slot, participants=slice(2, 3))
+    add_block(spec, store, state_b)
+    assert_head_matches_reference(spec, store)
+    attester_slashing = get_valid_attester_slashing(
+        spec, state_a, slot=state_a.slot, signed_1=True, signed_2=True,
+        filter_participant_set=lambda committee: set(sorted(committee)[0:1]),
+    )
+    spec.on_attester_slashing(store, attester_slashing)
+    assert_head_matches_reference(spec, store)
+
+
+@with_all_phases
+@spec_state_test
+@with_spec_flags({'PROTO_ARRAY_FORK_CHOICE': True})
+def test_proto_array_moves_votes_with_justified_balances(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    anchor_root = store.justified_checkpoint.root
+
+    state_a = state.copy()
+    state_b = state.copy()
+    root_a = add_block(spec, store, state_a, graffiti=b'\x0a' * 32)
+    root_b = add_block(spec, store, state_b, graffiti=b'\x0b' * 32)
+    attestation_a = add_attestation(spec, store, state_a, state_a.slot, participants=slice(0, 2))
+    add_attestation(spec, store, state_b, state_b.slot, participants=slice(2, 3))
+    assert assert_head_matches_reference(spec, store) == root_a
+
+    # A new justified checkpoint state in which the validators voting for ``root_a`` lost balance
+    justified_state = store.checkpoint_states[store.justified_checkpoint].copy()
+    for index in spec.get_attesting_indices(state_a, attestation_a):
+        justified_state.validators[index].effective_balance = spec.EFFECTIVE_BALANCE_INCREMENT
+    justified_checkpoint = spec.Checkpoint(epoch=store.justified_checkpoint.epoch + 1, root=anchor_root)
+    store.checkpoint_states[justified_checkpoint] = justified_state
+    store.justified_checkpoint = justified_checkpoint
+
+    assert assert_head_matches_reference(spec, store) == root_b
+    spec.check_proto_array_weights(store)
+
+
+@with_all_phases
+@spec_state_test
+@with_spec_flags({'PROTO_ARRAY_FORK_CHOICE': True})
+def test_proto_array_follows_replaced_block(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    state_a = state.copy()
+    state_b = state.copy()
+    root_a = add_block(spec, store, state_a, graffiti=b'\x0a' * 32)
+    add_block(spec, store, state_b, graffiti=b'\x0b' * 32)
+    add_attestation(spec, store, state_a, state_a.slot, participants=slice(0, 3))
+    child_a = add_block(spec, store, state_a)
+    assert assert_head_matches_reference(spec, store) == child_a
+
+    # Replace a block with another one, keeping the number of blocks
+    child_b = build_empty_block_for_next_slot(spec, state_b)
+    state_transition_and_sign_block(spec, state_b, child_b)
+    child_b_root = spec.hash_tree_root(child_b)
+    del store.blocks[child_a]
+    store.blocks[child_b_root] = child_b
+    store.block_states[child_b_root] = state_b.copy()
+    store.proposer_boost_root = spec.Root()
+
+    assert assert_head_matches_reference(spec, store) == root_a
+    assert child_a not in spec.get_proto_array(store).indices
+    assert child_b_root in spec.get_proto_array(store).indices
+    spec.check_proto_array_weights(store)
@@ -0,0 +1,145 @@
+from eth2spec.test.context import (
+    MINIMAL,
+    spec_state_test,
+    with_all_phases,
+    with_presets,
+    with_spec_flags,
+)
+from eth2spec.test.helpers.block import build_empty_block_for_next_slot
+from eth2spec.test.helpers.fork_choice import (
+    apply_next_epoch_with_attestations,
+    get_genesis_forkchoice_store,
+)
+from eth2spec.test.helpers.state import state_transition_and_sign_block
+
+
+def add_fork_block(spec, store, state):
+    fork_state = state.copy()
+    block = build_empty_block_for_next_slot(spec, fork_state)
+    block.body.graffiti = b'\x0f' * 32
+    signed_block = state_transition_and_sign_block(spec, fork_state, block)
+    spec.on_tick(store, store.genesis_time + block.slot * spec.config.SECONDS_PER_SLOT)
+    spec.on_block(store, signed_block)
+    return spec.hash_tree_root(block)
+
+
+def finalize(spec, state, store):
+    for _ in range(4):
+        state, store, _ = yield from apply_next_epoch_with_attestations(spec, state, store, True, True)
+    assert store.finalized_checkpoint.epoch > spec.GENESIS_EPOCH
+    return state
+
+
+@with_all_phases
+@spec_state_test
+@with_presets([MINIMAL], reason="too slow")
+def test_prune_store_on_finalization(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    anchor_root = store.finalized_checkpoint.root
+    fork_root = add_fork_block(spec, store, state)
+
+    yield from finalize(spec, state, store)
+
+    assert fork_root not in store.blocks
+    assert fork_root not in store.block_states
+    assert fork_root not in store.unrealized_justifications
+    # The chain from the anchor to the finalized block is kept, along with the descendants of the finalized block
+    assert anchor_root in store.blocks
+    assert anchor_root in store.block_states
+    finalized_slot = store.blocks[store.finalized_checkpoint.root].slot
+    for root in store.blocks.keys():
+        if store.blocks[root].slot <= finalized_slot:
+            assert spec.get_ancestor(store, store.finalized_checkpoint.root, store.blocks[root].slot) == root
+        else:
+            assert spec.get_checkpoint_block(store, root, store.finalized_checkpoint.epoch) == (
+                store.finalized_checkpoint.root)
+    for checkpoint in store.checkpoint_states.keys():
+        assert checkpoint.root in store.blocks
+    for message in store.latest_messages.values():
+        assert message.root in store.blocks
+
+    metrics = spec.get_store_prune_metrics(store)
+    assert metrics.prunes > 0
+    # Only the conflicting block is dropped
+    assert metrics.reclaimed['blocks'] == 1
+    assert metrics.reclaimed['block_states'] == 1
+    assert spec.get_head(store) == spec._get_head(store)
+
+
+@with_all_phases
+@spec_state_test
+@with_presets([MINIMAL], reason="too slow")
+@with_spec_flags({'PROTO_ARRAY_FORK_CHOICE': True, 'PROTO_ARRAY_DEBUG': True})
+def test_prune_store_keeps_finalized_chain(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    anchor_root = store.finalized_checkpoint.root
+    fork_root = add_fork_block(spec, store, state)
+
+    yield from finalize(spec, state, store)
+    assert fork_root not in store.blocks
+    assert spec.get_store_prune_metrics(store).prunes > 0
+
+    # Ancestors and weights below the finalized slot resolve as without pruning
+    head = spec.get_head(store)
+    assert head == spec._get_head(store)
+    finalized_root = store.finalized_checkpoint.root
+    for slot in range(store.blocks[finalized_root].slot + 1):
+        ancestor = spec.get_ancestor(store, head, slot)
+        assert ancestor == spec._get_ancestor(store, head, slot)
+        assert spec.get_weight(store, ancestor) >= spec.get_weight(store, finalized_root)
+    assert spec.get_ancestor(store, head, spec.GENESIS_SLOT) == anchor_root
+    assert spec.get_weight(store, anchor_root) > 0
+    spec.check_proto_array_weights(store)
+
+
+@with_all_phases
+@spec_state_test
+@with_presets([MINIMAL], reason="too slow")
+def test_prune_store_disabled(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    fork_root = add_fork_block(spec, store, state)
+
+    spec.PRUNE_STORE_ON_FINALIZATION = False
+    try:
+        yield from finalize(spec, state, store)
+    finally:
+        spec.PRUNE_STORE_ON_FINALIZATION = True
+
+    assert fork_root in store.blocks
+    assert spec.get_store_prune_metrics(store).prunes == 0
+    assert spec.prune_store(store)['blocks'] == 1
+    assert fork_root not in store.blocks
+
+
+@with_all_phases
+@spec_state_test
+@with_presets([MINIMAL], reason="too slow")
+def test_prune_store_deferred_then_pruned(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    fork_root = add_fork_block(spec, store, state)
+
+    spec.PRUNE_STORE_ON_FINALIZATION = False
+    try:
+        yield from finalize(spec, state, store)
+    finally:
+        spec.PRUNE_STORE_ON_FINALIZATION = True
+
+    # The proposer boost still references the conflicting block
+    store.proposer_boost_root = fork_root
+    assert spec.prune_store(store) == {}
+    metrics = spec.get_store_prune_metrics(store)
+    assert metrics.deferred == 1
+    assert fork_root in store.blocks
+
+    # Unchanged references do not retry the pruning
+    spec.update_unrealized_checkpoints(
+        store, store.unrealized_justified_checkpoint, store.unrealized_finalized_checkpoint)
+    assert metrics.deferred == 1
+    assert metrics.prunes == 0
+
+    # The next slot resets the proposer boost, and the deferred pruning goes through
+    spec.on_tick(store, store.time + spec.config.SECONDS_PER_SLOT)
+    assert store.proposer_boost_root == spec.Root()
+    assert metrics.prunes == 1
+    assert fork_root not in store.blocks
+    assert spec.get_head(store) == spec._get_head(store)
@@ -0,0 +1,61 @@
+import inspect
+
+from eth2spec.test.context import (
+    MINIMAL,
+    spec_state_test,
+    with_all_phases,
+    with_presets,
+)
+from eth2spec.test.helpers.attestations import state_transition_with_full_block
+from eth2spec.test.helpers.block import build_empty_block_for_next_slot
+from eth2spec.test.helpers.fork_choice import get_genesis_forkchoice_store
+from eth2spec.test.helpers.state import state_transition_and_sign_block
+
+
+def process_pulled_up_checkpoints(spec, state):
+    state = state.copy()
+    spec.process_justification_and_finalization(state)
+    return state.current_justified_checkpoint, state.finalized_checkpoint
+
+
+def drop_every_fifth_participant(slot, index, participants):
+    # Drop by position within the committee, so that every committee keeps a participant
+    return set(participant for position, participant in enumerate(sorted(participants)) if position % 5 != 4)
+
+
+@with_all_phases
+@spec_state_test
+@with_presets([MINIMAL], reason="too slow")
+def test_pulled_up_checkpoints_match_processing(spec, state):
+    for _ in range(spec.SLOTS_PER_EPOCH * 4):
+        state_transition_with_full_block(spec, state, True, True, participation_fn=drop_every_fifth_participant)
+        assert spec.compute_pulled_up_checkpoints(state) == process_pulled_up_checkpoints(spec, state)
+
+        # Slashed validators do not count towards the target balances
+        slashed_state = state.copy()
+        for index in range(0, len(slashed_state.validators), 4):
+            slashed_state.validators[index].slashed = True
+        assert spec.compute_pulled_up_checkpoints(slashed_state) == process_pulled_up_checkpoints(spec, slashed_state)
+    assert state.current_justified_checkpoint.epoch > spec.GENESIS_EPOCH
+
+
+@with_all_phases
+@spec_state_test
+def test_pulled_up_tip_unrealized_justification(spec, state):
+    store = get_genesis_forkchoice_store(spec, state)
+    block = build_empty_block_for_next_slot(spec, state)
+    signed_block = state_transition_and_sign_block(spec, state, block)
+    spec.on_tick(store, store.genesis_time + block.slot * spec.config.SECONDS_PER_SLOT)
+    spec.on_block(store, signed_block)
+
+    justified_checkpoint, _ = process_pulled_up_checkpoints(spec, state)
+    assert store.unrealized_justifications[spec.hash_tree_root(block)] == justified_checkpoint
+
+
+@with_all_phases
+@spec_state_test
+def test_pulled_up_tip_reads_checkpoints_cache(spec, state):
+    source = inspect.getsource(spec.compute_pulled_up_tip)
+    assert 'pulled_up = get_pulled_up_checkpoints(store.block_states[block_root])' in source
+    assert 'process_justification_and_finalization' not in source
+    assert '.copy()' not in source
@@ -0,0 +1,39 @@
+import random
+
+from eth2spec.test.context import (
+    spec_test,
+    spec_state_test,
+    single_phase,
+    with_all_phases,
+)
+
+
+def _random_seeds(rng, count):
+    return [bytes(rng.randint(0, 255) for _ in range(32)) for _ in range(count)]
+
+
+@with_all_phases
+@spec_test
+@single_phase
+def test_compute_shuffled_indices_matches_compute_shuffled_index(spec):
+    rng = random.Random(1234)
+    for seed in _random_seeds(rng, 5):
+        for count in [0, 1, 2, 3, 5, 10, 33, 100, 257, 1000]:
+            shuffled_indices = spec.compute_shuffled_indices(spec.uint64(count), seed)
+            assert len(shuffled_indices) == count
+            for i in range(count):
+                assert shuffled_indices[i] == spec.compute_shuffled_index(spec.uint64(i), spec.uint64(count), seed)
+
+
+@with_all_phases
+@spec_state_test
+def test_compute_committee_matches_per_index_reference(spec, state):
+    epoch = spec.get_current_epoch(state)
+    indices = spec.get_active_validator_indices(state, epoch)
+    seed = spec.get_seed(state, epoch, spec.DOMAIN_BEACON_ATTESTER)
+    count = spec.get_committee_count_per_slot(state, epoch) * spec.SLOTS_PER_EPOCH
+    for index in range(count):
+        assert (
+            spec.compute_committee(indices, seed, spec.uint64(index), count)
+            == spec._compute_committee(indices, seed, spec.uint64(index), count)
+        )
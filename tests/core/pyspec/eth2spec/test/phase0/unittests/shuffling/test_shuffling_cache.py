@@ -0,0 +1,70 @@
+from eth2spec.test.context import (
+    spec_state_test,
+    with_all_phases,
+)
+from eth2spec.test.helpers.state import next_epoch
+
+
+def _assert_committees_match_reference(spec, state, epoch):
+    start_slot = spec.compute_start_slot_at_epoch(epoch)
+    committee_count = spec.get_committee_count_per_slot(state, epoch)
+    for slot in range(start_slot, start_slot + spec.SLOTS_PER_EPOCH):
+        for index in range(committee_count):
+            assert (
+                spec.get_beacon_committee(state, spec.Slot(slot), spec.CommitteeIndex(index))
+                == spec._get_beacon_committee(state, spec.Slot(slot), spec.CommitteeIndex(index))
+            )
+
+
+@with_all_phases
+@spec_state_test
+def test_committees_match_reference(spec, state):
+    spec.SHUFFLING_CACHE.clear()
+    current_epoch = spec.get_current_epoch(state)
+    _assert_committees_match_reference(spec, state, current_epoch)
+    _assert_committees_match_reference(spec, state, current_epoch + 1)
+
+    next_epoch(spec, state)
+    _assert_committees_match_reference(spec, state, spec.get_previous_epoch(state))
+    _assert_committees_match_reference(spec, state, spec.get_current_epoch(state))
+
+
+@with_all_phases
+@spec_state_test
+def test_shuffling_computed_once_per_epoch(spec, state):
+    spec.SHUFFLING_CACHE.clear()
+    epoch = spec.get_current_epoch(state)
+    _assert_committees_match_reference(spec, state, epoch)
+    assert spec.SHUFFLING_CACHE.misses == 1
+    assert spec.SHUFFLING_CACHE.hits > 0
+
+
+@with_all_phases
+@spec_state_test
+def test_shuffling_reused_when_active_set_unchanged(spec, state):
+    spec.SHUFFLING_CACHE.clear()
+    epoch = spec.get_current_epoch(state)
+    committee = spec.get_beacon_committee(state, state.slot, 0)
+    assert spec.SHUFFLING_CACHE.misses == 1
+
+    # Mutating the registry without changing the active set keeps the shuffling
+    state.validators[0].effective_balance -= spec.EFFECTIVE_BALANCE_INCREMENT
+    assert spec.get_beacon_committee(state, state.slot, 0) == committee
+    assert spec.SHUFFLING_CACHE.misses == 1
+
+    # Exiting a validator changes the active set and the shuffling
+    state.validators[0].exit_epoch = epoch
+    assert spec.get_beacon_committee(state, state.slot, 0) == spec._get_beacon_committee(state, state.slot, 0)
+    assert 0 not in spec.get_active_validator_indices(state, epoch)
+    assert spec.SHUFFLING_CACHE.misses == 2
+
+
+@with_all_phases
+@spec_state_test
+def test_shuffling_cache_evicts_least_recently_used(spec, state):
+    spec.SHUFFLING_CACHE.clear()
+    for _ in range(spec.SHUFFLING_CACHE.size + 1):
+        spec.get_beacon_committee(state, state.slot, 0)
+        next_epoch(spec, state)
+    assert len(spec.SHUFFLING_CACHE.shufflings) == spec.SHUFFLING_CACHE.size
+    assert len(spec.SHUFFLING_CACHE.active_indices) <= spec.SHUFFLING_CACHE.size
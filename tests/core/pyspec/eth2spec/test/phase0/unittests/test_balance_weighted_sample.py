@@ -0,0 +1,35 @@
+from random import Random
+
+from eth2spec.test.context import (
+    spec_state_test,
+    with_all_phases,
+)
+
+
+def _randomize_effective_balances(spec, state, rng):
+    increment = int(spec.EFFECTIVE_BALANCE_INCREMENT)
+    for validator in state.validators:
+        validator.effective_balance = rng.randint(0, int(spec.SAMPLING_MAX_EFFECTIVE_BALANCE) // increment) * increment
+
+
+@with_all_phases
+@spec_state_test
+def test_swap_or_not_shuffle_matches_compute_shuffled_index(spec, state):
+    rng = Random(1010)
+    for index_count in (1, 2, 3, 255, 256, 257, 1000):
+        seed = spec.Bytes32(rng.randbytes(32))
+        shuffle = spec.SwapOrNotShuffle(spec.uint64(index_count), seed)
+        for index in rng.sample(range(index_count), min(index_count, 32)):
+            assert shuffle.get(spec.uint64(index)) == spec._compute_shuffled_index(
+                spec.uint64(index), spec.uint64(index_count), seed)
+
+
+@with_all_phases
+@spec_state_test
+def test_proposer_index_matches_reference(spec, state):
+    rng = Random(2020)
+    _randomize_effective_balances(spec, state, rng)
+    indices = spec.get_active_validator_indices(state, spec.get_current_epoch(state))
+    for _ in range(64):
+        seed = spec.Bytes32(rng.randbytes(32))
+        assert spec.compute_proposer_index(state, indices, seed) == spec._compute_proposer_index(state, indices, seed)
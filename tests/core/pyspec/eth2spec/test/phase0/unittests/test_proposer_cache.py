@@ -0,0 +1,98 @@
+from eth2spec.test.context import (
+    expect_assertion_error,
+    spec_state_test,
+    with_all_phases,
+)
+from eth2spec.test.helpers.state import next_epoch, next_slot
+
+
+def _assert_proposers_match_reference(spec, state):
+    epoch = spec.get_current_epoch(state)
+    proposer_indices = spec.get_beacon_proposer_indices(state, epoch)
+    assert len(proposer_indices) == spec.SLOTS_PER_EPOCH
+    slot_state = state.copy()
+    for i, proposer_index in enumerate(proposer_indices):
+        slot_state.slot = spec.compute_start_slot_at_epoch(epoch) + i
+        assert proposer_index == spec._get_beacon_proposer_index(slot_state)
+        assert spec.get_beacon_proposer_index(slot_state) == proposer_index
+
+
+@with_all_phases
+@spec_state_test
+def test_proposer_indices_match_reference(spec, state):
+    spec.PROPOSER_CACHE.clear()
+    _assert_proposers_match_reference(spec, state)
+    assert spec.PROPOSER_CACHE.misses == 1
+
+
+@with_all_phases
+@spec_state_test
+def test_proposer_index_reads_table(spec, state):
+    spec.PROPOSER_CACHE.clear()
+    proposer_indices = spec.get_beacon_proposer_indices(state, spec.get_current_epoch(state))
+    for _ in range(spec.SLOTS_PER_EPOCH - 1):
+        next_slot(spec, state)
+        assert spec.get_beacon_proposer_index(state) == proposer_indices[state.slot % spec.SLOTS_PER_EPOCH]
+    assert spec.PROPOSER_CACHE.misses == 1
+
+
+@with_all_phases
+@spec_state_test
+def test_next_epoch_uses_new_table(spec, state):
+    spec.PROPOSER_CACHE.clear()
+    spec.get_beacon_proposer_index(state)
+    state.slot += spec.SLOTS_PER_EPOCH
+    _assert_proposers_match_reference(spec, state)
+    assert spec.PROPOSER_CACHE.misses == 2
+
+
+@with_all_phases
+@spec_state_test
+def test_changed_effective_balance_resamples_slot(spec, state):
+    spec.PROPOSER_CACHE.clear()
+    proposer_index = spec.get_beacon_proposer_index(state)
+
+    state.validators[proposer_index].effective_balance = 0
+    assert spec.get_beacon_proposer_index(state) != proposer_index
+    _assert_proposers_match_reference(spec, state)
+
+
+@with_all_phases
+@spec_state_test
+def test_changed_active_set_uses_new_table(spec, state):
+    spec.PROPOSER_CACHE.clear()
+    proposer_index = spec.get_beacon_proposer_index(state)
+
+    other_state = state.copy()
+    other_state.validators[proposer_index].exit_epoch = spec.get_current_epoch(state)
+    _assert_proposers_match_reference(spec, other_state)
+    assert proposer_index not in spec.get_beacon_proposer_indices(other_state, spec.get_current_epoch(state))
+    _assert_proposers_match_reference(spec, state)
+    assert spec.PROPOSER_CACHE.misses == 2
+
+
+@with_all_phases
+@spec_state_test
+def test_next_epoch_lookahead(spec, state):
+    spec.PROPOSER_CACHE.clear()
+    next_epoch(spec, state)
+    epoch = spec.get_current_epoch(state) + spec.MIN_SEED_LOOKAHEAD
+    proposer_indices = spec.get_beacon_proposer_indices(state, epoch)
+    assert len(proposer_indices) == spec.SLOTS_PER_EPOCH
+
+    # The lookahead holds once the epoch is reached, as the effective balances are unchanged
+    effective_balances = [validator.effective_balance for validator in state.validators]
+    for _ in range(spec.MIN_SEED_LOOKAHEAD):
+        next_epoch(spec, state)
+    assert [validator.effective_balance for validator in state.validators] == effective_balances
+    _assert_proposers_match_reference(spec, state)
+    assert spec.get_beacon_proposer_indices(state, epoch) == proposer_indices
+
+
+@with_all_phases
+@spec_state_test
+def test_lookahead_beyond_seed_lookahead(spec, state):
+    epoch = spec.get_current_epoch(state)
+    expect_assertion_error(lambda: spec.get_beacon_proposer_indices(state, epoch + spec.MIN_SEED_LOOKAHEAD + 1))
+    next_epoch(spec, state)
+    expect_assertion_error(lambda: spec.get_beacon_proposer_indices(state, epoch))
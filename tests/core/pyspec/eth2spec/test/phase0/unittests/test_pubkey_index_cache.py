@@ -0,0 +1,140 @@
+import pytest
+
+from eth2spec.test.context import (
+    spec_state_test,
+    with_all_phases,
+)
+from eth2spec.test.helpers.keys import pubkeys
+
+
+def _assert_lookups_match_registry(spec, state):
+    registry_pubkeys = [v.pubkey for v in state.validators]
+    for pubkey in set(registry_pubkeys):
+        assert spec.get_validator_index_by_pubkey(state, pubkey) == registry_pubkeys.index(pubkey)
+    unknown_pubkey = next(pubkey for pubkey in pubkeys if pubkey not in registry_pubkeys)
+    assert spec.get_validator_index_by_pubkey(state, unknown_pubkey) is None
+
+
+def _add_validator(spec, state, pubkey):
+    withdrawal_credentials = spec.BLS_WITHDRAWAL_PREFIX + spec.hash(pubkey)[1:]
+    spec.add_validator_to_registry(state, pubkey, withdrawal_credentials, spec.MAX_EFFECTIVE_BALANCE)
+
+
+@with_all_phases
+@spec_state_test
+def test_lookups_match_registry(spec, state):
+    spec.PUBKEY_INDEX_CACHE.clear()
+    _assert_lookups_match_registry(spec, state)
+    assert spec.PUBKEY_INDEX_CACHE.rebuilds == 1
+
+
+@with_all_phases
+@spec_state_test
+def test_copies_share_index(spec, state):
+    spec.PUBKEY_INDEX_CACHE.clear()
+    spec.get_validator_index_by_pubkey(state, state.validators[0].pubkey)
+    spec.get_validator_index_by_pubkey(state.copy(), state.validators[1].pubkey)
+    assert spec.PUBKEY_INDEX_CACHE.rebuilds == 1
+    assert spec.PUBKEY_INDEX_CACHE.hits == 1
+
+
+@with_all_phases
+@spec_state_test
+def test_registry_updates_derive_index(spec, state):
+    spec.PUBKEY_INDEX_CACHE.clear()
+    spec.get_validator_index_by_pubkey(state, state.validators[0].pubkey)
+
+    # Changing fields other than the pubkey keeps the index
+    state.validators[0].effective_balance -= spec.EFFECTIVE_BALANCE_INCREMENT
+    state.validators[len(state.validators) - 1].exit_epoch = spec.get_current_epoch(state)
+    _assert_lookups_match_registry(spec, state)
+    assert spec.PUBKEY_INDEX_CACHE.rebuilds == 1
+    assert spec.PUBKEY_INDEX_CACHE.derivations == 1
+
+
+@with_all_phases
+@spec_state_test
+def test_add_validator_to_registry_extends_index(spec, state):
+    spec.PUBKEY_INDEX_CACHE.clear()
+    spec.get_validator_index_by_pubkey(state, state.validators[0].pubkey)
+    count = len(state.validators)
+
+    _add_validator(spec, state, pubkeys[count])
+    _add_validator(spec, state, pubkeys[count + 1])
+    assert spec.get_validator_index_by_pubkey(state, pubkeys[count]) == count
+    assert spec.get_validator_index_by_pubkey(state, pubkeys[count + 1]) == count + 1
+    _assert_lookups_match_registry(spec, state)
+    assert spec.PUBKEY_INDEX_CACHE.rebuilds == 1
+
+
+@with_all_phases
+@spec_state_test
+def test_diverging_registries(spec, state):
+    spec.PUBKEY_INDEX_CACHE.clear()
+    spec.get_validator_index_by_pubkey(state, state.validators[0].pubkey)
+    count = len(state.validators)
+
+    state_a = state.copy()
+    state_b = state.copy()
+    _add_validator(spec, state_a, pubkeys[count])
+    _add_validator(spec, state_b, pubkeys[count + 1])
+    _assert_lookups_match_registry(spec, state_a)
+    _assert_lookups_match_registry(spec, state_b)
+    _assert_lookups_match_registry(spec, state)
+    assert spec.get_validator_index_by_pubkey(state_a, pubkeys[count + 1]) is None
+    assert spec.get_validator_index_by_pubkey(state_b, pubkeys[count]) is None
+    assert spec.PUBKEY_INDEX_CACHE.rebuilds == 1
+
+
+@with_all_phases
+@spec_state_test
+def test_changed_pubkey_reindexes_from_change(spec, state):
+    spec.PUBKEY_INDEX_CACHE.clear()
+    spec.get_validator_index_by_pubkey(state, state.validators[0].pubkey)
+    previous_pubkey = state.validators[3].pubkey
+
+    state.validators[3].pubkey = pubkeys[len(state.validators)]
+    assert spec.get_validator_index_by_pubkey(state, previous_pubkey) is None
+    assert spec.get_validator_index_by_pubkey(state, pubkeys[len(state.validators)]) == 3
+    _assert_lookups_match_registry(spec, state)
+    assert spec.PUBKEY_INDEX_CACHE.rebuilds == 1
+    assert spec.PUBKEY_INDEX_CACHE.derivations == 1
+
+
+@with_all_phases
+@spec_state_test
+def test_unrelated_registry_rebuilds_index(spec, state):
+    spec.PUBKEY_INDEX_CACHE.clear()
+    spec.get_validator_index_by_pubkey(state, state.validators[0].pubkey)
+
+    state.validators[0].pubkey = pubkeys[len(state.validators)]
+    _assert_lookups_match_registry(spec, state)
+    assert spec.PUBKEY_INDEX_CACHE.rebuilds == 2
+
+
+@with_all_phases
+@spec_state_test
+def test_duplicate_pubkey_returns_lowest_index(spec, state):
+    spec.PUBKEY_INDEX_CACHE.clear()
+    state.validators[5].pubkey = state.validators[2].pubkey
+    assert spec.get_validator_index_by_pubkey(state, state.validators[2].pubkey) == 2
+    _assert_lookups_match_registry(spec, state)
+
+
+@with_all_phases
+@spec_state_test
+def test_validator_pubkeys_match_registry_list(spec, state):
+    state.validators[5].pubkey = state.validators[2].pubkey
+    registry_pubkeys = [v.pubkey for v in state.validators]
+    validator_pubkeys = spec.get_validator_pubkeys(state)
+    for pubkey in set(registry_pubkeys):
+        assert pubkey in validator_pubkeys
+        assert validator_pubkeys.index(pubkey) == registry_pubkeys.index(pubkey)
+
+    # Like the list it stands in for, it keeps to the registry it was taken from
+    count = len(state.validators)
+    _add_validator(spec, state, pubkeys[count])
+    assert pubkeys[count] not in validator_pubkeys
+    with pytest.raises(ValueError):
+        validator_pubkeys.index(pubkeys[count])
+    assert pubkeys[count] in spec.get_validator_pubkeys(state)
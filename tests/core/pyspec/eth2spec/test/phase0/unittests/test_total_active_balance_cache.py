@@ -0,0 +1,104 @@
+from random import Random
+
+from eth2spec.test.context import (
+    spec_state_test,
+    with_all_phases,
+)
+from eth2spec.test.helpers.attestations import next_epoch_with_attestations
+from eth2spec.test.helpers.keys import pubkeys
+from eth2spec.test.helpers.state import next_epoch
+
+
+def _assert_total_matches_reference(spec, state):
+    assert spec.get_total_active_balance(state) == spec._get_total_active_balance(state)
+
+
+@with_all_phases
+@spec_state_test
+def test_total_matches_reference(spec, state):
+    spec.TOTAL_ACTIVE_BALANCE_CACHE.clear()
+    _assert_total_matches_reference(spec, state)
+    _assert_total_matches_reference(spec, state.copy())
+    assert spec.TOTAL_ACTIVE_BALANCE_CACHE.rebuilds == 1
+    assert spec.TOTAL_ACTIVE_BALANCE_CACHE.hits == 1
+
+
+@with_all_phases
+@spec_state_test
+def test_registry_updates_derive_total(spec, state):
+    spec.TOTAL_ACTIVE_BALANCE_CACHE.clear()
+    spec.get_total_active_balance(state)
+    current_epoch = spec.get_current_epoch(state)
+
+    # Effective balance update
+    state.validators[0].effective_balance -= spec.EFFECTIVE_BALANCE_INCREMENT
+    _assert_total_matches_reference(spec, state)
+    # Exit
+    state.validators[1].exit_epoch = current_epoch
+    _assert_total_matches_reference(spec, state)
+    # Activation
+    state.validators[1].exit_epoch = spec.FAR_FUTURE_EPOCH
+    state.validators[2].activation_epoch = current_epoch + 1
+    _assert_total_matches_reference(spec, state)
+    state.validators[2].activation_epoch = current_epoch
+    _assert_total_matches_reference(spec, state)
+    # Slashing
+    spec.slash_validator(state, 3)
+    _assert_total_matches_reference(spec, state)
+    assert spec.TOTAL_ACTIVE_BALANCE_CACHE.rebuilds == 1
+    assert spec.TOTAL_ACTIVE_BALANCE_CACHE.derivations == 5
+
+
+@with_all_phases
+@spec_state_test
+def test_appended_validators_derive_total(spec, state):
+    spec.TOTAL_ACTIVE_BALANCE_CACHE.clear()
+    spec.get_total_active_balance(state)
+    count = len(state.validators)
+
+    withdrawal_credentials = spec.BLS_WITHDRAWAL_PREFIX + spec.hash(pubkeys[count])[1:]
+    spec.add_validator_to_registry(state, pubkeys[count], withdrawal_credentials, spec.MAX_EFFECTIVE_BALANCE)
+    _assert_total_matches_reference(spec, state)
+    state.validators[count].activation_epoch = spec.get_current_epoch(state)
+    _assert_total_matches_reference(spec, state)
+    assert spec.TOTAL_ACTIVE_BALANCE_CACHE.rebuilds == 1
+
+
+@with_all_phases
+@spec_state_test
+def test_shorter_registry_rebuilds_total(spec, state):
+    spec.TOTAL_ACTIVE_BALANCE_CACHE.clear()
+    shorter_state = state.copy()
+    count = len(state.validators)
+    withdrawal_credentials = spec.BLS_WITHDRAWAL_PREFIX + spec.hash(pubkeys[count])[1:]
+    spec.add_validator_to_registry(state, pubkeys[count], withdrawal_credentials, spec.MAX_EFFECTIVE_BALANCE)
+    state.validators[count].activation_epoch = spec.get_current_epoch(state)
+
+    _assert_total_matches_reference(spec, state)
+    _assert_total_matches_reference(spec, shorter_state)
+    assert spec.TOTAL_ACTIVE_BALANCE_CACHE.rebuilds == 2
+
+
+@with_all_phases
+@spec_state_test
+def test_new_epoch_rebuilds_total(spec, state):
+    spec.TOTAL_ACTIVE_BALANCE_CACHE.clear()
+    spec.get_total_active_balance(state)
+    next_epoch(spec, state)
+    _assert_total_matches_reference(spec, state)
+    assert spec.TOTAL_ACTIVE_BALANCE_CACHE.rebuilds == 2
+
+
+@with_all_phases
+@spec_state_test
+def test_debug_mode_through_epoch_transitions(spec, state):
+    spec.TOTAL_ACTIVE_BALANCE_CACHE.clear()
+    spec.TOTAL_ACTIVE_BALANCE_CACHE.debug = True
+    try:
+        # Exits initiated now take effect during the transitions below
+        for index in Random(1010).sample(range(len(state.validators)), 4):
+            spec.initiate_validator_exit(state, index)
+        for _ in range(spec.MAX_SEED_LOOKAHEAD + 3):
+            _, _, state = next_epoch_with_attestations(spec, state, True, True)
+    finally:
+        spec.TOTAL_ACTIVE_BALANCE_CACHE.debug = False
@@ -0,0 +1,80 @@
+from random import Random
+
+from eth2spec.test.context import (
+    spec_state_test,
+    with_all_phases,
+)
+from eth2spec.test.helpers.random import randomize_state
+
+
+def _assert_columns_match_registry(spec, state):
+    columns = spec.get_validator_columns(state)
+    assert len(columns.effective_balance) == len(state.validators)
+    for index, validator in enumerate(state.validators):
+        for name in spec.VALIDATOR_COLUMNS_UINT64_FIELDS:
+            assert columns.__dict__[name][index] == getattr(validator, name)
+        assert columns.slashed[index] == validator.slashed
+        assert columns.withdrawal_prefix[index] == validator.withdrawal_credentials[0]
+
+
+def _assert_queries_match_reference(spec, state):
+    for epoch in (spec.get_previous_epoch(state), spec.get_current_epoch(state), spec.get_current_epoch(state) + 1):
+        indices = spec._get_active_validator_indices(state, epoch)
+        assert spec.get_active_validator_indices(state, epoch) == indices
+        assert spec.SHUFFLING_CACHE.get_active_indices_and_digest(state, epoch)[1] == spec.hash(
+            b"".join(spec.uint_to_bytes(index) for index in indices))
+    assert spec.get_eligible_validator_indices(state) == spec._get_eligible_validator_indices(state)
+
+
+@with_all_phases
+@spec_state_test
+def test_columns_match_registry(spec, state):
+    if not spec.NUMPY_AVAILABLE:
+        return
+    randomize_state(spec, state, rng=Random(1010))
+    _assert_columns_match_registry(spec, state)
+    _assert_queries_match_reference(spec, state)
+
+
+@with_all_phases
+@spec_state_test
+def test_registry_change_gathers_new_snapshot(spec, state):
+    if not spec.NUMPY_AVAILABLE:
+        return
+    spec.VALIDATOR_COLUMNS_CACHE.clear()
+    spec.get_validator_columns(state)
+    spec.get_validator_columns(state.copy())
+    assert spec.VALIDATOR_COLUMNS_CACHE.misses == 1
+    assert spec.VALIDATOR_COLUMNS_CACHE.hits == 1
+
+    # Balance changes leave the registry subtree intact
+    state.balances[0] += 1
+    spec.get_validator_columns(state)
+    assert spec.VALIDATOR_COLUMNS_CACHE.misses == 1
+
+    state.validators[0].exit_epoch = spec.get_current_epoch(state)
+    _assert_columns_match_registry(spec, state)
+    assert spec.VALIDATOR_COLUMNS_CACHE.misses == 2
+
+
+@with_all_phases
+@spec_state_test
+def test_queries_follow_registry_changes(spec, state):
+    current_epoch = spec.get_current_epoch(state)
+    _assert_queries_match_reference(spec, state)
+    state.validators[1].exit_epoch = current_epoch
+    state.validators[2].activation_epoch = current_epoch + 1
+    state.validators[3].slashed = True
+    state.validators[3].exit_epoch = current_epoch
+    state.validators[3].withdrawable_epoch = current_epoch + spec.EPOCHS_PER_SLASHINGS_VECTOR
+    _assert_queries_match_reference(spec, state)
+
+
+@with_all_phases
+@spec_state_test
+def test_cached_columns_are_read_only(spec, state):
+    if not spec.NUMPY_AVAILABLE:
+        return
+    columns = spec.get_validator_columns(state)
+    for value in columns.__dict__.values():
+        assert not value.flags.writeable
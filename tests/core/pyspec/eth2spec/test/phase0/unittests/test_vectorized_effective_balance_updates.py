@@ -0,0 +1,80 @@
+from random import Random
+
+from eth2spec.test.context import (
+    spec_state_test,
+    with_all_phases,
+)
+from eth2spec.test.helpers.epoch_processing import check_vectorized_effective_balance_updates
+from eth2spec.test.helpers.forks import is_post_electra
+
+
+def _randomize_balances(spec, state, rng):
+    increment = int(spec.EFFECTIVE_BALANCE_INCREMENT)
+    for index in range(len(state.balances)):
+        delta = rng.randint(-2 * increment, 2 * increment)
+        state.balances[index] = max(0, int(state.balances[index]) + delta)
+
+
+@with_all_phases
+@spec_state_test
+def test_no_updates(spec, state):
+    assert check_vectorized_effective_balance_updates(spec, state) in (0, None)
+
+
+@with_all_phases
+@spec_state_test
+def test_random_balances(spec, state):
+    _randomize_balances(spec, state, Random(1010))
+    check_vectorized_effective_balance_updates(spec, state)
+
+
+@with_all_phases
+@spec_state_test
+def test_hysteresis_boundaries(spec, state):
+    increment = int(spec.EFFECTIVE_BALANCE_INCREMENT)
+    hysteresis_increment = increment // int(spec.HYSTERESIS_QUOTIENT)
+    downward = hysteresis_increment * int(spec.HYSTERESIS_DOWNWARD_MULTIPLIER)
+    upward = hysteresis_increment * int(spec.HYSTERESIS_UPWARD_MULTIPLIER)
+    effective_balance = int(state.validators[0].effective_balance) - increment
+    deltas = [-downward - 1, -downward, 0, upward, upward + 1]
+    for index, delta in enumerate(deltas):
+        state.validators[index].effective_balance = effective_balance
+        state.balances[index] = effective_balance + delta
+    check_vectorized_effective_balance_updates(spec, state)
+
+
+@with_all_phases
+@spec_state_test
+def test_balances_above_maximum(spec, state):
+    rng = Random(2020)
+    for index in range(len(state.balances)):
+        state.balances[index] = rng.randint(0, 4 * int(spec.MAX_EFFECTIVE_BALANCE))
+        if is_post_electra(spec) and index % 2 == 0:
+            state.validators[index].withdrawal_credentials = (
+                spec.COMPOUNDING_WITHDRAWAL_PREFIX + state.validators[index].withdrawal_credentials[1:])
+    check_vectorized_effective_balance_updates(spec, state)
+
+
+@with_all_phases
+@spec_state_test
+def test_overflowing_balance_falls_back(spec, state):
+    state.balances[0] = 2**64 - 1
+    _randomize_balances(spec, state, Random(3030))
+    check_vectorized_effective_balance_updates(spec, state)
+
+
+@with_all_phases
+@spec_state_test
+def test_flag_selects_implementation(spec, state):
+    _randomize_balances(spec, state, Random(4040))
+    vectorized = spec.VECTORIZED_EFFECTIVE_BALANCE_UPDATES
+    try:
+        post_states = []
+        for selected in (True, False):
+            spec.VECTORIZED_EFFECTIVE_BALANCE_UPDATES = selected
+            post_state = state.copy()
+            spec.process_effective_balance_updates(post_state)
+            post_states.append(post_state)
+    finally:
+        spec.VECTORIZED_EFFECTIVE_BALANCE_UPDATES = vectorized
+    assert post_states[0].hash_tree_root() == post_states[1].hash_tree_root()
@@ -0,0 +1,219 @@
+"""
+Benchmark harness for the fork-choice handlers.
+
+Runs synthetic scenarios of ``validators`` validators split over ``forks`` competing chains for ``epochs`` epochs,
+driven through the fork-choice test helpers. The attesting validators of each chain stay below the
+justification threshold, so the scenarios run without finality. Reports the per-operation latency
+of the fork-choice handlers, the peak memory and the ``Store`` sizes as JSON.
+
+Usage:
+    python -m eth2spec.test.utils.fork_choice_benchmark --fork altair --validators 512 --forks 2 --epochs 4
+"""
+
+import argparse
+import dataclasses
+import json
+import resource
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from collections.abc import Mapping
+
+from eth2spec.test.context import default_activation_threshold
+from eth2spec.test.helpers.attestations import get_valid_attestation
+from eth2spec.test.helpers.block import build_empty_block_for_next_slot
+from eth2spec.test.helpers.constants import MINIMAL, MAINNET
+from eth2spec.test.helpers.fork_choice import (
+    add_attestations,
+    get_genesis_forkchoice_store,
+    on_tick_and_append_step,
+    output_head_check,
+    tick_and_add_block,
+)
+from eth2spec.test.helpers.genesis import create_genesis_state
+from eth2spec.test.helpers.keys import pubkeys
+from eth2spec.test.helpers.specs import spec_targets
+from eth2spec.test.helpers.state import state_transition_and_sign_block
+from eth2spec.utils import bls
+
+# The fork-choice handlers whose latency is recorded
+TIMED_OPERATIONS = ('on_tick', 'on_block', 'on_attestation', 'on_attestations', 'get_head')
+
+
+def run_all(generator):
+    for _ in generator:
+        pass
+
+
+def timed(fn, latencies):
+    def wrapper(*args, **kw):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kw)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    return wrapper
+
+
+def summarize_latencies(latencies):
+    ordered = sorted(latencies)
+    return {
+        'count': len(ordered),
+        'total_s': sum(ordered),
+        'mean_s': sum(ordered) / len(ordered),
+        'min_s': ordered[0],
+        'p50_s': ordered[len(ordered) // 2],
+        'p90_s': ordered[len(ordered) * 9 // 10],
+        'max_s': ordered[-1],
+    }
+
+
+def get_store_sizes(store):
+    sizes = {
+        field.name: len(getattr(store, field.name))
+        for field in dataclasses.fields(store)
+        if isinstance(getattr(store, field.name), (Mapping, set))
+    }
+    # Lazily kept block states only hold some of the states in full
+    sizes['full_block_states'] = len(getattr(store.block_states, 'states', store.block_states))
+    return sizes
+
+
+def get_participation_fn(forks, fork_index, participation):
+    """
+    Return a participation filter keeping the validators of chain ``fork_index``,
+    i.e. the ``participation`` share of the validators assigned to it.
+    """
+    def participation_fn(slot, committee_index, committee):
+        return set(
+            validator_index for validator_index in committee
+            if validator_index % forks == fork_index and (validator_index // forks) % 100 < participation * 100
+        )
+    return participation_fn
+
+
+def get_chain_attestations(spec, state, participation_fn):
+    """
+    Return the attestations of the committees of ``state.slot`` to the head of ``state``,
+    with a single attestation for each committee with participants.
+    """
+    slot = state.slot
+    attestations = []
+    for index in range(spec.get_committee_count_per_slot(state, spec.compute_epoch_at_slot(slot))):
+        committee = set(spec.get_beacon_committee(state, slot, index))
+        if len(participation_fn(slot, index, committee)) == 0:
+            continue
+        attestations.append(get_valid_attestation(
+            spec, state, slot, index=index, signed=True,
+            filter_participant_set=lambda participants: participation_fn(slot, index, participants),
+        ))
+    return attestations
+
+
+def run_fork_choice_benchmark(spec, genesis_state, forks=2, epochs=2, participation=0.6, trace_memory=False):
+    """
+    Run a scenario of ``forks`` chains built on ``genesis_state`` for ``epochs`` epochs, and return its report.
+
+    Every chain has a block at every slot. The attestations of each chain to its head are received over the wire
+    at the next slot, before they are included in the next block of the chain.
+    Only the ``participation`` share of the validators attests, so that no checkpoint is justified.
+    """
+    assert 0 < participation < 2 / 3
+    latencies = defaultdict(list)
+    reference_operations = {name: getattr(spec, name) for name in TIMED_OPERATIONS}
+    for name, fn in reference_operations.items():
+        setattr(spec, name, timed(fn, latencies[name]))
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        store = get_genesis_forkchoice_store(spec, genesis_state)
+        states = [genesis_state.copy() for _ in range(forks)]
+        participation_fns = [get_participation_fn(forks, fork_index, participation) for fork_index in range(forks)]
+        pending_attestations = [[] for _ in range(forks)]
+        per_epoch = []
+        for slot in range(genesis_state.slot + 1, genesis_state.slot + 1 + epochs * spec.SLOTS_PER_EPOCH):
+            test_steps = []
+            on_tick_and_append_step(spec, store, store.genesis_time + slot * spec.config.SECONDS_PER_SLOT, test_steps)
+            for fork_index, state in enumerate(states):
+                run_all(add_attestations(spec, store, pending_attestations[fork_index], test_steps))
+                block = build_empty_block_for_next_slot(spec, state)
+                block.body.graffiti = fork_index.to_bytes(32, 'little')
+                attestations_limit = type(block.body.attestations).limit()
+                for attestation in pending_attestations[fork_index][:attestations_limit]:
+                    block.body.attestations.append(attestation)
+                signed_block = state_transition_and_sign_block(spec, state, block)
+                run_all(tick_and_add_block(spec, store, signed_block, test_steps))
+                pending_attestations[fork_index] = get_chain_attestations(spec, state, participation_fns[fork_index])
+            output_head_check(spec, store, test_steps)
+            if (slot + 1) % spec.SLOTS_PER_EPOCH == 0:
+                per_epoch.append({
+                    'epoch': int(spec.compute_epoch_at_slot(slot)),
+                    'elapsed_s': time.perf_counter() - start,
+                    'store': get_store_sizes(store),
+                })
+        report = {
+            'scenario': {
+                'fork': spec.fork,
+                'preset': spec.config.PRESET_BASE,
+                'validators': len(genesis_state.validators),
+                'forks': forks,
+                'epochs': epochs,
+                'participation': participation,
+                'bls_active': bls.bls_active,
+            },
+            'elapsed_s': time.perf_counter() - start,
+            'operations': {name: summarize_latencies(values) for name, values in latencies.items() if values},
+            'store': get_store_sizes(store),
+            'per_epoch': per_epoch,
+            'justified_epoch': int(store.justified_checkpoint.epoch),
+            'finalized_epoch': int(store.finalized_checkpoint.epoch),
+            'peak_memory': {
+                'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            },
+        }
+        if trace_memory:
+            report['peak_memory']['traced_bytes'] = tracemalloc.get_traced_memory()[1]
+        return report
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        for name, fn in reference_operations.items():
+            setattr(spec, name, fn)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fork', default='phase0', help='the fork of the spec to benchmark')
+    parser.add_argument('--preset', default=MINIMAL, choices=[MINIMAL, MAINNET])
+    parser.add_argument('--validators', type=int, default=256, help='the number of validators at genesis')
+    parser.add_argument('--forks', type=int, default=2, help='the number of competing chains')
+    parser.add_argument('--epochs', type=int, default=2, help='the number of epochs without finality')
+    parser.add_argument('--participation', type=float, default=0.6,
+                        help='the share of validators attesting, below the 2/3 justification threshold')
+    parser.add_argument('--bls', action='store_true', help='sign and verify with BLS')
+    parser.add_argument('--trace-memory', action='store_true', help='also trace the peak of Python allocations')
+    parser.add_argument('--output', default=None, help='the JSON report path, defaults to stdout')
+    args = parser.parse_args(argv)
+    if not 0 < args.validators <= len(pubkeys):
+        parser.error(f'--validators must be between 1 and {len(pubkeys)}')
+
+    spec = spec_targets[args.preset][args.fork]
+    bls.bls_active = args.bls
+    balances = [spec.MAX_EFFECTIVE_BALANCE] * args.validators
+    genesis_state = create_genesis_state(spec, balances, default_activation_threshold(spec))
+    report = run_fork_choice_benchmark(
+        spec, genesis_state,
+        forks=args.forks, epochs=args.epochs, participation=args.participation, trace_memory=args.trace_memory,
+    )
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+from eth2spec.test.context import expect_assertion_error, spec_state_test, with_whisk_and_later
+from eth2spec.test.helpers.state import next_slot
+
+
+@with_whisk_and_later
+@spec_state_test
+def test_proposer_indices_not_available(spec, state):
+    assert not hasattr(spec, 'get_beacon_proposer_indices')
+
+
+@with_whisk_and_later
+@spec_state_test
+def test_proposer_index_from_block_header(spec, state):
+    proposer_index = spec.ValidatorIndex(len(state.validators) - 1)
+    state.latest_block_header.slot = state.slot
+    state.latest_block_header.proposer_index = proposer_index
+    assert spec.get_beacon_proposer_index(state) == proposer_index
+
+    # The proposer of a slot whose block header is not processed yet is unknown
+    next_slot(spec, state)
+    expect_assertion_error(lambda: spec.get_beacon_proposer_index(state))
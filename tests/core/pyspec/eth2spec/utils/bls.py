@@ -177,6 +177,29 @@ def FastAggregateVerify(pubkeys, message, signature):
         return result
 
 
+@only_with_bls(alt_return=True)
+def BatchFastAggregateVerify(signature_sets):
+    """
+    Verify a sequence of ``(pubkeys, message, signature)`` sets, as ``FastAggregateVerify`` would each of them.
+    With milagro, the sets are checked together with a single randomized multi-pairing.
+    """
+    try:
+        if bls == milagro_bls or bls == fastest_bls:
+            result = milagro_bls.VerifyMultipleAggregateSignatures([
+                (signature, milagro_bls._AggregatePKs(list(pubkeys)), message)
+                for pubkeys, message, signature in signature_sets
+            ])
+        else:
+            result = all(
+                FastAggregateVerify(pubkeys, message, signature)
+                for pubkeys, message, signature in signature_sets
+            )
+    except Exception:
+        result = False
+    finally:
+        return result
+
+
 @only_with_bls(alt_return=STUB_SIGNATURE)
 def Aggregate(signatures):
     if bls == arkworks_bls:  # no signature API in arkworks
@@ -1,8 +1,10 @@
-from typing import TypeVar
+from typing import Dict, List, Sequence, TypeVar
 
-from remerkleable.basic import uint
+from remerkleable.basic import uint, uint256
 from remerkleable.core import Type, View
 from remerkleable.byte_arrays import Bytes32
+from remerkleable.settings import Root
+from remerkleable.tree import Node, PairNode, RootNode, get_depth, subtree_fill_to_contents
 
 
 def ssz_serialize(obj: View) -> bytes:
@@ -35,3 +37,70 @@ V = TypeVar('V', bound=View)
 # Helper method for typing copies, and avoiding a example_input.copy() method call, instead of copy(example_input)
 def copy(obj: V) -> V:
     return obj.copy()
+
+
+def _collect_subtree_nodes(node: Node, depth: int, start: int, end: int, out: List[Node]) -> None:
+    if depth == 0:
+        out.append(node)
+        return
+    pivot = 1 << (depth - 1)
+    if start < pivot:
+        _collect_subtree_nodes(node.get_left(), depth - 1, start, min(end, pivot), out)
+    if end > pivot:
+        _collect_subtree_nodes(node.get_right(), depth - 1, max(start, pivot) - pivot, end - pivot, out)
+
+
+def get_element_nodes(obj: View, start: int = 0) -> List[Node]:
+    """
+    Return the backing nodes of the elements of a (non-packed) SSZ list from index ``start`` on, in order.
+    Reads the tree directly, without creating a view per element.
+    """
+    out: List[Node] = []
+    count = len(obj)
+    if count > start:
+        _collect_subtree_nodes(obj.get_backing().get_left(), obj.__class__.contents_depth(), start, count, out)
+    return out
+
+
+def get_container_field_nodes(nodes: Sequence[Node],
+                              container_type: Type[View],
+                              field_name: str) -> List[Node]:
+    """
+    Return the backing node of the field ``field_name`` of each of the container backing ``nodes``.
+    """
+    field_keys = list(container_type.fields().keys())
+    depth = get_depth(len(field_keys))
+    path = [(field_keys.index(field_name) >> bit) & 1 for bit in reversed(range(depth))]
+    out = []
+    for node in nodes:
+        for bit in path:
+            node = node.get_right() if bit else node.get_left()
+        out.append(node)
+    return out
+
+
+def get_container_field_roots(nodes: Sequence[Node],
+                              container_type: Type[View],
+                              field_names: Sequence[str]) -> Dict[str, bytes]:
+    """
+    Return, for each of ``field_names``, the concatenated 32-byte leaf chunks of that field over the
+    container backing ``nodes``. Only meaningful for fields that fit in a single chunk (basic types, ``Bytes32``);
+    e.g. the little-endian value of a ``uint64`` field is in the first 8 bytes of each chunk.
+    """
+    return {
+        name: b"".join(node.merkle_root() for node in get_container_field_nodes(nodes, container_type, name))
+        for name in field_names
+    }
+
+
+def packed_list_from_bytes(typ: Type[View], data: bytes) -> View:
+    """
+    Build a list of basic elements from its serialization by packing ``data`` straight into leaf chunks,
+    instead of decoding a view per element.
+    """
+    length = len(data) // typ.element_cls().type_byte_length()
+    chunks: List[Node] = [
+        RootNode(Root(data[i:i + 32].ljust(32, b"\x00"))) for i in range(0, len(data), 32)
+    ]
+    contents = subtree_fill_to_contents(chunks, typ.contents_depth())
+    return typ.view_from_backing(PairNode(contents, uint256(length).get_backing()))